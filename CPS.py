@@ -7,7 +7,18 @@ import xmlrpc.client
 import socket
 import os
 import struct
+import threading
 from enum import IntEnum
+from cps_codec import Encoders, StructResult, RobotState, TimedResult
+from cps_pipeline import CPSPipeline
+from cps_stats import CommandStats, RttEstimator
+from cps_channels import BoxChannels, Telemetry
+from cps_telemetry import TelemetryCache, SnapshotFields, readSnapshot
+from cps_motion import MotionFuture, failedMotion
+from cps_wait import WaitEngine, motionState, fsmState
+from cps_fsm import FSMWatcher
+from cps_pose import rpyToQuaternion, quaternionToRpy, fillResult
+from cps_kincache import KinematicsCache
 
 
 # from yaml import compose_all
@@ -75,7 +86,13 @@ dic_ErrorCode = {
     39501: "命令输入参数错误",
     39502: "命令响应中参数错误",
     39503: "Socket通讯错误(超时、接收异常等)",
-    39504: "跟机器人连接错误"
+    39504: "跟机器人连接错误",
+    39505: "等待运动完成超时",
+    39506: "只读代理不支持该命令",
+    39507: "目标位置超出工作空间(本地逆解)",
+    39508: "逆解超出关节范围(本地逆解)",
+    39509: "等待运动完成时机器人报错",
+    39510: "等待运动完成时急停或断电"
 }
 
 
@@ -84,31 +101,53 @@ class RbtClient(object):
     clientPort = 10003
     xmlrpcAddr = 'http://127.0.0.1:20000'
     m_bConnect = False
+    RecvBufSize = 4096
+    # 等待应答的超时(s),None为一直等待;由CPSClient.setRecvTimeout设置
+    # 超时后迟到的应答无法与后续请求对应,连接关闭,返回39503
+    RecvTimeout = None
+    # 启动主站,上电,断电耗时可能超过任何合理的超时,设置了超时也一直等待
+    LongCommands = (b'StartMaster', b'Electrify', b'BlackOut')
+    m_stats = None
+    # 最近一次应答的(发送时间, 接收时间),time.monotonic(),普通列表result的时间戳从这里取
+    lastReplyTime = None
 
     # tcp = socket.socket()
 
     def __init__(self):
+        # 预分配的接收缓冲区,recv_into直接写入,避免每次应答重新分配
+        self.m_recvBuf = bytearray(self.RecvBufSize)
+        self.m_recvView = memoryview(self.m_recvBuf)
+        # 已接收但尚未取走的字节(半条应答或多读到的下一条应答)
+        self.m_pending = bytearray()
+        # 一次发送与对应应答的接收在锁内完成,多线程共用同一连接时应答不会错位
+        self.m_lock = threading.RLock()
+        # 每次收发的往返时间
+        self.m_rtt = RttEstimator()
         return
 
     def Connect2CPS(self, hostName, nPort):
-        try:
-            self.xmlrpcAddr = 'http://'
-            self.xmlrpcAddr += hostName
-            self.xmlrpcAddr += ':20000'
-            self.tcp = socket.socket()
-            print(self.xmlrpcAddr)
-            self.rpcClient = xmlrpc.client.ServerProxy(self.xmlrpcAddr)
-            self.clientIP = hostName
-            self.clientPort = nPort
-            self.tcp.connect((self.clientIP, self.clientPort))
-            self.m_bConnect = True
-            return 0
-        except:
-            self.m_bConnect = False
-            return
+        with self.m_lock:
+            try:
+                self.xmlrpcAddr = 'http://'
+                self.xmlrpcAddr += hostName
+                self.xmlrpcAddr += ':20000'
+                self.tcp = socket.socket()
+                print(self.xmlrpcAddr)
+                self.rpcClient = xmlrpc.client.ServerProxy(self.xmlrpcAddr)
+                self.clientIP = hostName
+                self.clientPort = nPort
+                self.tcp.connect((self.clientIP, self.clientPort))
+                self.tcp.settimeout(self.RecvTimeout)
+                del self.m_pending[:]
+                self.m_bConnect = True
+                return 0
+            except:
+                self.m_bConnect = False
+                return
 
     def DisconnectFromCPS(self):
-        self.tcp.close()
+        with self.m_lock:
+            self.tcp.close()
         return 0
 
     def sendHRLog(self, nLevel, msg):
@@ -116,8 +155,9 @@ class RbtClient(object):
 
     def sendScriptFinish(self, errorCode):
         command = 'SendScriptFinish,0,' + str(errorCode) + ',;'
-        self.tcp.send(command.encode())
-        self.tcp.recv(self.clientPort).decode("utf-8", "ignore")
+        with self.m_lock:
+            self.tcp.sendall(command.encode())
+            self.recvFrame()
 
     def sendScriptError(self, msg):
         self.rpcClient.SendScriptError(str(msg), str(""))
@@ -144,38 +184,139 @@ class RbtClient(object):
         self.rpcClient.SendVarValue(str(VarName), ValueStr)
         # return retData
 
+    def recvFrame(self):
+        # 读取一条以';'结尾的完整应答
+        # 一次recv可能只收到半条应答,也可能收到多条应答,多出的字节留在m_pending中给下一次读取
+        scan = 0
+        while True:
+            end = self.m_pending.find(b';', scan)
+            if end >= 0:
+                frame = self.m_pending[:end + 1]
+                del self.m_pending[:end + 1]
+                return frame.decode("utf-8", "ignore").strip()
+            scan = len(self.m_pending)
+            nRecv = self.tcp.recv_into(self.m_recvBuf)
+            if nRecv == 0:
+                raise ConnectionError('connection closed by CPS')
+            self.m_pending += self.m_recvView[:nRecv]
+
+    def setRecvTimeout(self, timeout):
+        with self.m_lock:
+            self.RecvTimeout = timeout
+            if self.m_bConnect:
+                self.tcp.settimeout(timeout)
+
+    def isLongCommand(self, cmd):
+        if type(cmd) is not bytes:
+            cmd = cmd.encode()
+        return cmd[:cmd.find(b',')] in self.LongCommands
+
     def sendAndRecv(self, cmd, result):
-        # print(cmd)
+        # 非列表的result(ArrayResult/StructResult/TimedResult)记录发送与接收时间,普通列表记录在lastReplyTime
+        with self.m_lock:
+            sendTime = time.monotonic()
+            blocking = self.RecvTimeout is not None and self.isLongCommand(cmd)
+            try:
+                if blocking:
+                    self.tcp.settimeout(None)
+                self.tcp.sendall(cmd if type(cmd) is bytes else cmd.encode())
+            except OSError as e:
+                return self.commError(e)
+            errorCode = self.recvReply(cmd, result)
+            recvTime = time.monotonic()
+            if blocking and self.m_bConnect:
+                self.tcp.settimeout(self.RecvTimeout)
+            if self.m_bConnect:
+                self.m_rtt.update(recvTime - sendTime)
+            self.lastReplyTime = (sendTime, recvTime)
+            if type(result) is not list:
+                result.sendTime = sendTime
+                result.recvTime = recvTime
+            return errorCode
+
+    def enableStats(self, stats):
+        # stats为CommandStats时开启统计,None时关闭
+        # 开启时用实例属性覆盖sendAndRecv/recvFrame,关闭后恢复为类方法,不统计时没有额外开销
+        self.m_stats = stats
+        if stats is None:
+            self.__dict__.pop('sendAndRecv', None)
+            self.__dict__.pop('recvFrame', None)
+        else:
+            self.sendAndRecv = self.sendAndRecvStats
+            self.recvFrame = self.recvFrameStats
+
+    def sendAndRecvStats(self, cmd, result):
+        with self.m_lock:
+            self.m_nRecv = 0
+            start = time.perf_counter()
+            errorCode = RbtClient.sendAndRecv(self, cmd, result)
+            self.m_stats.record(cmd, errorCode, time.perf_counter() - start, len(cmd), self.m_nRecv)
+        return errorCode
+
+    def recvFrameStats(self):
+        frame = RbtClient.recvFrame(self)
+        self.m_nRecv += len(frame)
+        return frame
+
+    def logPrefix(self, cmd):
+        # 只在出错时拼接日志,cmd可能是编码后的bytes
+        if type(cmd) is bytes:
+            cmd = cmd.decode("utf-8", "ignore")
+        return '[script]sendAndRecv:' + cmd
+
+    def logReply(self, cmd, msg):
+        # 日志经XML-RPC发送,日志服务不可用时不影响应答的处理
+        try:
+            self.sendHRLog(2, self.logPrefix(cmd) + msg)
+        except Exception:
+            pass
+
+    def commError(self, error=None):
+        # 通讯异常后缓冲区中的残留字节与迟到的应答已无法与请求对应: 丢弃残留字节并关闭连接,需重新连接
+        del self.m_pending[:]
+        self.m_bConnect = False
+        try:
+            self.tcp.close()
+        except OSError:
+            pass
+        if isinstance(error, socket.timeout):
+            self.m_rtt.backoff()
+            return 39503
+        return 39500
+
+    def recvReply(self, cmd, result):
+        # 接收并解析cmd对应的一条应答,结果写入result
+        # result也可以是cps_codec中的ArrayResult/StructResult,应答字段直接解析为数值
+        # 只有收发异常才视为连接断开;应答无法解析时返回39502,连接与已收到的后续应答不受影响
         try:
-            self.tcp.send(cmd.encode())
-            ret = self.tcp.recv(self.clientPort).decode("utf-8", "ignore")
-            retData = ret.split(',')
-            logmsg = '[script]sendAndRecv:' + cmd
-            if len(retData) < 3:
-                logmsg = logmsg + ' exit with ServerReturnError'
-                self.sendHRLog(2, logmsg)
-                os._exit(0)
-
-            if retData[0] == "errorcmd":
-                logmsg = logmsg + ' exit with errorcmd'
-                self.sendHRLog(2, logmsg)
-                os._exit(0)
+            ret = self.recvFrame()
+        except OSError as e:
+            return self.commError(e)
+        retData = ret.split(',', 2)
+        if len(retData) < 3:
+            self.logReply(cmd, ' exit with ServerReturnError')
+            os._exit(0)
+
+        if retData[0] == "errorcmd":
+            self.logReply(cmd, ' exit with errorcmd')
+            os._exit(0)
 
+        try:
             if retData[1] == "Fail":
-                logmsg = logmsg + 'exit with Fail[' + retData[1] + ']'
-                self.sendHRLog(2, logmsg)
-                errorData = int(retData[2])
-                return errorData
-
-            del retData[0]
-            del retData[0]
-            retData.pop()
-            result.clear()
-            for i in range(0, len(retData)):
-                result.append(retData[i])
-        except:
-            self.m_bConnect = False
-            return 39500
+                self.logReply(cmd, 'exit with Fail[' + retData[1] + ']')
+                return int(retData[2].split(',', 1)[0])
+
+            if type(result) is not list:
+                result.decodeFields(retData[2])
+                return 0
+        except ValueError:
+            return 39502
+
+        retData = retData[2].split(',')
+        retData.pop()
+        result.clear()
+        for i in range(0, len(retData)):
+            result.append(retData[i])
         return 0
 
 
@@ -185,6 +326,9 @@ class CPSClient(object):
     xmlrpcAddr = 'http://127.0.0.1:20000'
     g_clients = []
     MaxBox = 5
+    waitEngine = WaitEngine()
+    # 正解/逆解缓存,enableKinCache开启
+    m_kinCache = None
 
     dic_FSM = {
         0: "未初始化",
@@ -235,64 +379,295 @@ class CPSClient(object):
     }
 
     def __init__(self):
+        # 每个CPSClient使用自己的连接;同一连接可被多个线程共用,由RbtClient.m_lock保证收发配对
+        self.g_clients = []
         for i in range(self.MaxBox):
             self.g_clients.append(RbtClient())
+        self.m_telemetry = {}
+        self.m_fsm = {}
         return
 
-    def _waitMotion(self, isblending):
-        motionIndex = 0
-        doneFlag = '0'
-        movingFlag = '1'
-        if isblending:
-            motionIndex = 11
-            doneFlag = '1'
-            movingFlag = '0'
-
-        time.sleep(0.02)
-        nDisableCNT = 0
-        while True:
-            if (nDisableCNT >= 5):
-                time.sleep(0.01)
-                os._exit(0)
-            ret = self.HRIF_ReadRobotState(ret)
-            if (ret[1] == '0'):
-                nDisableCNT += 1
-                log = ('[script]EnableState[' + ret[2] + '],count[' + str(nDisableCNT) + '] error')
-                continue
-            else:
-                nDisableCNT = 0
-
-            if (ret[2] == '1' or ret[7] == '1' or ret[9] == '0' or ret[10] == '0'):
-                log = ('[script]errorState[' + ret[2] + '],emergency[' + ret[7] + '],Electfify[' + ret[9] + ']')
-                print(log)
-                time.sleep(0.1)
-                os._exit(0)
-            elif ret[8] == '1':
-                time.sleep(0.01)
-                continue
+    '''
+    *	@param brief:等待运动完成或过渡完成,查询频率随预计完成时间调整,异常时返回原因而不退出进程
+    *	@param isblending: True等待过渡完成(blendingDone),否则等待运动停止
+    *	@param boxID:电箱ID
+    *	@param rbtID:机器人ID
+    *	@param expected: 预计运动时间(s),可由cps_wait.expectedMoveTime估计,None表示未知
+    *	@param timeout: 期限(s),None表示不限
+    *	@param return: cps_wait.WaitResult
+    '''
+
+    def _waitMotion(self, isblending, boxID=0, rbtID=0, expected=None, timeout=None):
+        state = StructResult(RobotState, dtype=int)
+        nDisableCNT = [0]
+
+        def poll():
+            ret = self.HRIF_ReadRobotState(boxID, rbtID, state)
+            if ret != 0:
+                return 'commError', ret, None
+            rbt = state.value
+            reason, errorCode = motionState(rbt, isblending)
+            # 偶发读到去使能时不立即结束,连续5次才认为已去使能
+            if reason == 'disabled':
+                nDisableCNT[0] += 1
+                return ('disabled' if nDisableCNT[0] >= 5 else None), 0, rbt
+            nDisableCNT[0] = 0
+            return reason, errorCode, rbt
+
+        # 未知运动时间时先等待指令生效
+        return self.waitEngine.wait(poll, expected, timeout, 0.02 if expected is None else None)
+
+    '''
+    *	@param brief:批量指令模式,with内调用的HRIF_*命令在退出时一次发出,按顺序匹配应答
+    *	@param boxID:电箱ID
+    *	@param channel: 使用openChannel打开的连接,如'telemetry',未打开时使用原连接
+    *	@param return: CPSPipeline
+    '''
+
+    def pipeline(self, boxID, channel=None):
+        return CPSPipeline(self, boxID, channel)
+
+    '''
+    *	@param brief:电箱连接的往返时间估计,每次收发后更新
+    *	@param boxID:电箱ID
+    *	@param channel: openChannel打开的连接,默认原连接
+    *	@param return: cps_stats.RttEstimator,srtt/rttvar/minRtt与rto()单位为秒
+    '''
+
+    def rtt(self, boxID, channel=None):
+        client = self.g_clients[boxID]
+        if hasattr(client, 'channels'):
+            client = client.channels.get(channel, client.control)
+        return client.m_rtt
+
+    '''
+    *	@param brief:电箱最近一次应答的时间戳,用于普通列表result
+                     只对应该电箱(所有通道)最后完成的一次收发,多个线程共用连接时无法区分是哪次调用,应改用TimedResult
+    *	@param boxID:电箱ID
+    *	@param return: (发送时间, 接收时间),time.monotonic();尚无应答时为None
+    '''
+
+    def lastReplyTime(self, boxID):
+        client = self.g_clients[boxID]
+        clients = client.channels.values() if hasattr(client, 'channels') else [client]
+        times = [c.lastReplyTime for c in clients if c.lastReplyTime is not None]
+        return max(times, key=lambda t: t[1]) if times else None
+
+    '''
+    *	@param brief:设置等待应答的超时,超时后连接关闭,该命令与尚未收到应答的批量命令返回39503,需重新连接
+                     默认None一直等待;HRIF_Connect2Controller,HRIF_Electrify,HRIF_BlackOut始终一直等待
+    *	@param boxID:电箱ID
+    *	@param timeout: 超时(s),None表示一直等待
+    *	@param channel: openChannel打开的连接,None为该电箱的全部连接
+    '''
 
+    def setRecvTimeout(self, boxID, timeout, channel=None):
+        client = self.g_clients[boxID]
+        if not hasattr(client, 'channels'):
+            client.setRecvTimeout(timeout)
+        elif channel is None:
+            for c in client.channels.values():
+                c.setRecvTimeout(timeout)
+        else:
+            client.channels[channel].setRecvTimeout(timeout)
+
+    '''
+    *	@param brief:开启或关闭各电箱连接的指令统计,关闭时不产生开销
+    *	@param enable: True开启(清空已有统计),False关闭
+    '''
+
+    def enableStats(self, enable=True):
+        for client in self.g_clients:
+            client.enableStats(CommandStats() if enable else None)
+
+    '''
+    *	@param brief:指令统计快照
+    *	@param reset: 取快照后清空统计
+    *	@param return: {boxID: {命令: {count, errors, bytesSent, bytesRecv, totalTime, minTime, maxTime, hist}}}
+                      errors为 {错误码: {count, name}},name取自dic_ErrorCode;hist为cps_stats的对数分桶延迟直方图
+    '''
 
-            elif ret[6] == '1':
-                time.sleep(0.01)
+    def stats(self, reset=False):
+        snapshot = {}
+        for boxID in range(self.MaxBox):
+            stats = self.g_clients[boxID].m_stats
+            if stats is None:
                 continue
+            snapshot[boxID] = stats.snapshot(dic_ErrorCode)
+            if reset:
+                stats.reset()
+        return snapshot
+
+    '''
+    *	@param brief:开启或关闭HRIF_GetInverseKin/HRIF_GetForwardKin的应答缓存,输入相同时不再发往控制器
+                     HRIF_SetTCP/SetUCS/SetTCPByName/SetUCSByName,重新连接,或HRIF_ReadRobotModel读到不同型号时清空该电箱的缓存;
+                     其他途径(如示教器)修改控制器配置后应调用kinCache().invalidate();
+                     pipeline中的正解/逆解不经过缓存,pipeline中的上述命令在收到应答后同样清空缓存
+    *	@param enable: True开启(清空已有缓存),False关闭
+    *	@param capacity: 每个电箱最多缓存的应答数,按最近最少使用淘汰
+    *	@param quantum: 输入的量化步长(mm/°)
+    '''
+
+    def enableKinCache(self, enable=True, capacity=1024, quantum=0.001):
+        self.m_kinCache = KinematicsCache(capacity, quantum) if enable else None
+
+    '''
+    *	@param brief:正解/逆解缓存,未开启时为None
+    *	@param return: cps_kincache.KinematicsCache
+    '''
+
+    def kinCache(self):
+        return self.m_kinCache
+
+    '''
+    *	@param brief:正解/逆解缓存的统计快照
+    *	@param reset: 取快照后清空统计
+    *	@param return: {hits, misses, hitRate, evictions, invalidations, size, capacity},未开启时为None
+    '''
 
+    def kinCacheStats(self, reset=False):
+        cache = self.m_kinCache
+        if cache is None:
+            return None
+        snapshot = cache.snapshot()
+        if reset:
+            cache.reset()
+        return snapshot
 
-            elif ret[motionIndex] == doneFlag:
-                log = ('[script]ret[' + str(motionIndex) + ']==' + ret[motionIndex])
-                print(log)
-                break
+    def cachedKin(self, boxID, key, encoder, args, result):
+        # 未命中时发往控制器,只缓存成功的应答
+        cache = self.m_kinCache
+        fields = cache.get(boxID, key)
+        if fields is None:
+            fields = []
+            nRet = self.g_clients[boxID].sendAndRecv(encoder(*args), fields)
+            if nRet != 0:
+                return nRet
+            cache.put(boxID, key, fields)
+        if type(result) is list:
+            result.clear()
+            result.extend(fields)
+        else:
+            result.decodeFields(','.join(fields) + ',;')
+        return 0
+
+    def invalidateKinCache(self, boxID, nRet=0):
+        if self.m_kinCache is not None:
+            self.m_kinCache.invalidate(boxID)
+        return nRet
+
+    '''
+    *	@param brief:机器人的后台遥测缓存,同一电箱的同一机器人只启动一个轮询线程,读取方共享
+                     打开了telemetry通道时轮询走该通道,不与控制命令排队
+    *	@param boxID:电箱ID
+    *	@param rbtID:机器人ID,一般为0
+    *	@param rate: 首次创建时的轮询频率(Hz)
+    *	@param return: TelemetryCache
+    '''
+
+    def telemetry(self, boxID, rbtID=0, rate=100.0):
+        cache = self.m_telemetry.get((boxID, rbtID))
+        if cache is None:
+            cache = TelemetryCache(self, boxID, rbtID, rate)
+            self.m_telemetry[(boxID, rbtID)] = cache
+        cache.start()
+        return cache
 
+    '''
+    *	@param brief:运动完成的future,运动指令返回后调用;HRIF_MoveL/MoveJ/WayPoint传入future=True时自动创建
+    *	@param boxID:电箱ID
+    *	@param rbtID:机器人ID,一般为0
+    *	@param errorCode: 运动指令的错误码,非0时返回已完成的future(reason为'commandFailed')
+    *	@param blending: True时过渡完成即结束
+    *	@param timeout: 期限(s)
+    *	@param return: future,result()为cps_motion.MotionResult
+    '''
+
+    def motionFuture(self, boxID, rbtID=0, errorCode=0, blending=False, timeout=None):
+        if errorCode != 0:
+            return failedMotion(errorCode)
+        return MotionFuture(self.telemetry(boxID, rbtID), blending, timeout)
 
-            elif ret[motionIndex] == movingFlag:
-                log = ('ret[' + str(motionIndex) + ']==' + ret[motionIndex])
-                time.sleep(0.01)
+    '''
+    *	@param brief:停止机器人的后台轮询,其状态机订阅随之失效
+    *	@param boxID:电箱ID
+    *	@param rbtID:机器人ID,None表示该电箱的全部机器人
+    '''
+
+    def stopTelemetry(self, boxID, rbtID=None):
+        for key in list(self.m_telemetry):
+            if key[0] != boxID or (rbtID is not None and key[1] != rbtID):
                 continue
+            watcher = self.m_fsm.pop(key, None)
+            if watcher is not None:
+                watcher.close()
+            self.m_telemetry.pop(key).stop()
 
-            else:
-                log = ('[script]waitBlendingDone unknow status exit')
-                print(log)
-                os._exit(0)
-        return
+    '''
+    *	@param brief:订阅机器人状态机(RbtFSM)跳变,回调在遥测轮询线程中执行,应尽快返回
+                     同一机器人的所有订阅共用一路遥测轮询(见telemetry)
+                     sub = cps.subscribeFSM(boxID, onStop, [RbtFSM.enCPSState_RobotCollisionStop])
+                     sub.cancel()
+    *	@param boxID:电箱ID
+    *	@param callback: callback(cps_fsm.FSMTransition),包含跳变前后状态与跳变时间
+    *	@param states: 只通知进入这些状态的跳变,None表示全部
+    *	@param debounce: 去抖时间(s),新状态持续该时间后才通知
+    *	@param return: cps_fsm.FSMSubscription
+    '''
+
+    def subscribeFSM(self, boxID, callback, states=None, debounce=0.0, rbtID=0):
+        return self.fsmWatcher(boxID, rbtID).subscribe(callback, states, debounce)
+
+    '''
+    *	@param brief:以异步迭代器接收状态机跳变,需在协程中调用,参数同subscribeFSM
+                     async for transition in cps.fsmTransitions(boxID, [RbtFSM.enCPSState_Standy]):
+                         ...
+    *	@param return: cps_fsm.FSMStream,close()结束迭代
+    '''
+
+    def fsmTransitions(self, boxID, states=None, debounce=0.0, rbtID=0):
+        return self.fsmWatcher(boxID, rbtID).stream(states, debounce)
+
+    def fsmWatcher(self, boxID, rbtID=0):
+        watcher = self.m_fsm.get((boxID, rbtID))
+        if watcher is None:
+            watcher = FSMWatcher(self.telemetry(boxID, rbtID), RbtFSM)
+            self.m_fsm[(boxID, rbtID)] = watcher
+        return watcher
+
+    '''
+    *	@param brief:为电箱打开额外的TCP连接,HRIF_*按命令类别分配到各连接,互不排队
+                     telemetry: Read*读取命令;servo: StartServo/PushServo*等;其余命令(含HRIF_GrpStop)走原连接
+                     需先HRIF_Connect,默认连接到同一地址
+    *	@param boxID:电箱ID
+    *	@param name: 'telemetry' 或 'servo'
+    *	@param return: 错误码
+    '''
+
+    def openChannel(self, boxID, name, hostName=None, nPort=None):
+        if boxID >= self.MaxBox or name not in ('telemetry', 'servo'):
+            return 39501
+        client = self.g_clients[boxID]
+        if not client.isConnected():
+            return 39500
+        if not isinstance(client, BoxChannels):
+            client = BoxChannels(client, RbtClient)
+            self.g_clients[boxID] = client
+        return client.open(name, hostName or client.clientIP, nPort or client.clientPort)
+
+    '''
+    *	@param brief:关闭openChannel打开的连接,对应命令回到原连接
+    *	@param name: 'telemetry'或'servo',原连接不能关闭
+    *	@param return: 错误码
+    '''
+
+    def closeChannel(self, boxID, name):
+        if boxID >= self.MaxBox or name not in ('telemetry', 'servo'):
+            return 39501
+        client = self.g_clients[boxID]
+        if isinstance(client, BoxChannels):
+            client.close(name)
+        return 0
 
     #
     # part 1 初始化
@@ -308,6 +683,7 @@ class CPSClient(object):
     def HRIF_Connect(self, boxID, hostName, nPort):
         if boxID >= self.MaxBox:
             return 39501
+        self.invalidateKinCache(boxID)
         try:
             self.g_clients[boxID].Connect2CPS(hostName, nPort)
             return 0
@@ -324,6 +700,8 @@ class CPSClient(object):
     def HRIF_DisConnect(self, boxID):
         if boxID >= self.MaxBox:
             return 39501
+        self.stopTelemetry(boxID)
+        self.invalidateKinCache(boxID)
         try:
             self.g_clients[boxID].DisconnectFromCPS()
             return 0
@@ -350,8 +728,7 @@ class CPSClient(object):
 
     def HRIF_ShutdownRobot(self, boxID):
         result = []
-        command = 'OSCmd,1,;'
-        return self.g_clients[boxID].sendAndRecv(command, result)
+        return self.g_clients[boxID].sendAndRecv(Encoders.ShutdownRobot(), result)
 
     '''
     *	@index : 5
@@ -362,8 +739,7 @@ class CPSClient(object):
 
     def HRIF_Connect2Box(self, boxID):
         result = []
-        command = 'ConnectToBox,;'
-        return self.g_clients[boxID].sendAndRecv(command, result)
+        return self.g_clients[boxID].sendAndRecv(Encoders.Connect2Box(), result)
 
     '''
     *	@index : 6
@@ -374,8 +750,7 @@ class CPSClient(object):
 
     def HRIF_Electrify(self, boxID):
         result = []
-        command = 'Electrify,;'
-        return self.g_clients[boxID].sendAndRecv(command, result)
+        return self.g_clients[boxID].sendAndRecv(Encoders.Electrify(), result)
 
     '''
     *	@index : 7
@@ -386,8 +761,7 @@ class CPSClient(object):
 
     def HRIF_BlackOut(self, boxID):
         result = []
-        command = 'BlackOut,;'
-        return self.g_clients[boxID].sendAndRecv(command, result)
+        return self.g_clients[boxID].sendAndRecv(Encoders.BlackOut(), result)
 
     '''
     *	@index : 8
@@ -398,9 +772,7 @@ class CPSClient(object):
 
     def HRIF_Connect2Controller(self, boxID):
         result = []
-        command = 'StartMaster,'
-        command += ';'
-        return self.g_clients[boxID].sendAndRecv(command, result)
+        return self.g_clients[boxID].sendAndRecv(Encoders.Connect2Controller(), result)
 
     '''
     *	@index : 9
@@ -411,9 +783,7 @@ class CPSClient(object):
     '''
 
     def HRIF_IsSimulateRobot(self, boxID, result):
-        command = 'IsSimulation,'
-        command += ';'
-        return self.g_clients[boxID].sendAndRecv(command, result)
+        return self.g_clients[boxID].sendAndRecv(Encoders.IsSimulateRobot(), result)
 
     '''
     *	@index : 10
@@ -424,9 +794,7 @@ class CPSClient(object):
     '''
 
     def HRIF_IsControllerStarted(self, boxID, result):
-        command = 'ReadControllerState,'
-        command += ';'
-        return self.g_clients[boxID].sendAndRecv(command, result)
+        return self.g_clients[boxID].sendAndRecv(Encoders.IsControllerStarted(), result)
 
     '''
     *	@index : 11
@@ -445,10 +813,7 @@ class CPSClient(object):
     '''
 
     def HRIF_ReadVersion(self, boxID, rbtID, result):
-        command = 'ReadVersion,'
-        command += str(rbtID) + ','
-        command += ';'
-        return self.g_clients[boxID].sendAndRecv(command, result)
+        return self.g_clients[boxID].sendAndRecv(Encoders.ReadVersion(rbtID), result)
 
     '''
     *	@index : 12
@@ -460,10 +825,26 @@ class CPSClient(object):
     '''
 
     def HRIF_ReadRobotModel(self, boxID, rbtID, result):
-        command = 'ReadRobotModel,'
-        command += str(rbtID) + ','
-        command += ';'
-        return self.g_clients[boxID].sendAndRecv(command, result)
+        # 型号名称先按字符串接收,用于检查正解/逆解缓存;result为ArrayResult/StructResult时再解码
+        fields = result if isinstance(result, list) else TimedResult()
+        nRet = self.g_clients[boxID].sendAndRecv(Encoders.ReadRobotModel(rbtID), fields)
+        if nRet != 0:
+            return nRet
+        return self.applyRobotModel(boxID, fields, result)
+
+    def applyRobotModel(self, boxID, fields, result):
+        # 由字符串应答检查缓存的型号并填充result;pipeline在收到应答后调用
+        if self.m_kinCache is not None and len(fields) > 0:
+            self.m_kinCache.checkModel(boxID, fields[0])
+        if fields is result:
+            return 0
+        try:
+            result.decodeFields(','.join(fields) + ',;')
+        except ValueError:
+            return 39502
+        result.sendTime = fields.sendTime
+        result.recvTime = fields.recvTime
+        return 0
 
     #
     # part 2 轴控制指令
@@ -479,10 +860,7 @@ class CPSClient(object):
 
     def HRIF_GrpEnable(self, boxID, rbtID):
         result = []
-        command = 'GrpPowerOn,'
-        command += str(rbtID) + ','
-        command += ';'
-        return self.g_clients[boxID].sendAndRecv(command, result)
+        return self.g_clients[boxID].sendAndRecv(Encoders.GrpEnable(rbtID), result)
 
     '''
     *	@index : 2
@@ -494,10 +872,7 @@ class CPSClient(object):
 
     def HRIF_GrpDisable(self, boxID, rbtID):
         result = []
-        command = 'GrpPowerOff,'
-        command += str(rbtID) + ','
-        command += ';'
-        return self.g_clients[boxID].sendAndRecv(command, result)
+        return self.g_clients[boxID].sendAndRecv(Encoders.GrpDisable(rbtID), result)
 
     '''
     *	@index : 3
@@ -509,10 +884,7 @@ class CPSClient(object):
 
     def HRIF_GrpReset(self, boxID, rbtID):
         result = []
-        command = 'GrpReset,'
-        command += str(rbtID) + ','
-        command += ';'
-        return self.g_clients[boxID].sendAndRecv(command, result)
+        return self.g_clients[boxID].sendAndRecv(Encoders.GrpReset(rbtID), result)
 
     '''
     *	@index : 4
@@ -524,10 +896,7 @@ class CPSClient(object):
 
     def HRIF_GrpStop(self, boxID, rbtID):
         result = []
-        command = 'GrpStop,'
-        command += str(rbtID) + ','
-        command += ';'
-        return self.g_clients[boxID].sendAndRecv(command, result)
+        return self.g_clients[boxID].sendAndRecv(Encoders.GrpStop(rbtID), result)
 
     '''
     *	@index : 5
@@ -539,10 +908,7 @@ class CPSClient(object):
 
     def HRIF_GrpInterrupt(self, boxID, rbtID):
         result = []
-        command = 'GrpInterrupt,'
-        command += str(rbtID) + ','
-        command += ';'
-        return self.g_clients[boxID].sendAndRecv(command, result)
+        return self.g_clients[boxID].sendAndRecv(Encoders.GrpInterrupt(rbtID), result)
 
     '''
     *	@index : 6
@@ -554,10 +920,7 @@ class CPSClient(object):
 
     def HRIF_GrpContinue(self, boxID, rbtID):
         result = []
-        command = 'GrpContinue,'
-        command += str(rbtID) + ','
-        command += ';'
-        return self.g_clients[boxID].sendAndRecv(command, result)
+        return self.g_clients[boxID].sendAndRecv(Encoders.GrpContinue(rbtID), result)
 
     '''
     *	@index : 7
@@ -569,10 +932,7 @@ class CPSClient(object):
 
     def HRIF_GrpCloseFreeDriver(self, boxID, rbtID):
         result = []
-        command = 'GrpCloseFreeDriver,'
-        command += str(rbtID) + ','
-        command += ';'
-        return self.g_clients[boxID].sendAndRecv(command, result)
+        return self.g_clients[boxID].sendAndRecv(Encoders.GrpCloseFreeDriver(rbtID), result)
 
     '''
     *	@index : 8
@@ -584,10 +944,7 @@ class CPSClient(object):
 
     def HRIF_GrpOpenFreeDriver(self, boxID, rbtID):
         result = []
-        command = 'GrpOpenFreeDriver,'
-        command += str(rbtID) + ','
-        command += ';'
-        return self.g_clients[boxID].sendAndRecv(command, result)
+        return self.g_clients[boxID].sendAndRecv(Encoders.GrpOpenFreeDriver(rbtID), result)
 
     #
     # part 3 脚本控制指令
@@ -604,12 +961,7 @@ class CPSClient(object):
     '''
 
     def HRIF_RunFunc(self, boxID, funcName, params, result):
-        command = 'RunFunc,'
-        command += funcName + ','
-        for param in params:
-            command += str(param) + ','
-        command += ';'
-        return self.g_clients[boxID].sendAndRecv(command, result)
+        return self.g_clients[boxID].sendAndRecv(Encoders.RunFunc(funcName, params), result)
 
     '''
     *	@index : 2
@@ -620,8 +972,7 @@ class CPSClient(object):
 
     def HRIF_StartScript(self, boxID):
         result = []
-        command = 'StartScript,;'
-        return self.g_clients[boxID].sendAndRecv(command, result)
+        return self.g_clients[boxID].sendAndRecv(Encoders.StartScript(), result)
 
     '''
     *	@index : 3
@@ -633,10 +984,7 @@ class CPSClient(object):
 
     def HRIF_StopScript(self, boxID, rbtID):
         result = []
-        command = 'StopScript,'
-        command += str(rbtID) + ','
-        command += ';'
-        return self.g_clients[boxID].sendAndRecv(command, result)
+        return self.g_clients[boxID].sendAndRecv(Encoders.StopScript(rbtID), result)
 
     '''
     *	@index : 4
@@ -647,8 +995,7 @@ class CPSClient(object):
 
     def HRIF_PauseScript(self, boxID):
         result = []
-        command = 'PauseScript,;'
-        return self.g_clients[boxID].sendAndRecv(command, result)
+        return self.g_clients[boxID].sendAndRecv(Encoders.PauseScript(), result)
 
     '''
     *	@index : 5
@@ -659,8 +1006,7 @@ class CPSClient(object):
 
     def HRIF_ContinueScript(self, boxID):
         result = []
-        command = 'ContinueScript,;'
-        return self.g_clients[boxID].sendAndRecv(command, result)
+        return self.g_clients[boxID].sendAndRecv(Encoders.ContinueScript(), result)
 
     #
     # part 4 电箱控制指令
@@ -681,10 +1027,7 @@ class CPSClient(object):
     '''
 
     def HRIF_ReadBoxInfo(self, boxID, rbtID, result):
-        command = 'ReadBoxInfo,'
-        command += str(rbtID) + ','
-        command += ';'
-        return self.g_clients[boxID].sendAndRecv(command, result)
+        return self.g_clients[boxID].sendAndRecv(Encoders.ReadBoxInfo(rbtID), result)
 
     '''
     *	@index : 2
@@ -696,8 +1039,7 @@ class CPSClient(object):
     '''
 
     def HRIF_ReadBoxCI(self, boxID, bit, result):
-        command = 'ReadBoxCI,' + str(bit) + ',;'
-        return self.g_clients[boxID].sendAndRecv(command, result)
+        return self.g_clients[boxID].sendAndRecv(Encoders.ReadBoxCI(bit), result)
 
     '''
     *	@index : 3
@@ -709,8 +1051,7 @@ class CPSClient(object):
     '''
 
     def HRIF_ReadBoxDI(self, boxID, bit, result):
-        command = 'ReadBoxDI,' + str(bit) + ',;'
-        return self.g_clients[boxID].sendAndRecv(command, result)
+        return self.g_clients[boxID].sendAndRecv(Encoders.ReadBoxDI(bit), result)
 
     '''
     *	@index : 4
@@ -722,8 +1063,7 @@ class CPSClient(object):
     '''
 
     def HRIF_ReadBoxCO(self, boxID, bit, result):
-        command = 'ReadBoxCO,' + str(bit) + ',;'
-        return self.g_clients[boxID].sendAndRecv(command, result)
+        return self.g_clients[boxID].sendAndRecv(Encoders.ReadBoxCO(bit), result)
 
     '''
     *	@index : 5
@@ -735,8 +1075,7 @@ class CPSClient(object):
     '''
 
     def HRIF_ReadBoxDO(self, boxID, bit, result):
-        command = 'ReadBoxDO,' + str(bit) + ',;'
-        return self.g_clients[boxID].sendAndRecv(command, result)
+        return self.g_clients[boxID].sendAndRecv(Encoders.ReadBoxDO(bit), result)
 
     '''
     *	@index : 6
@@ -748,8 +1087,7 @@ class CPSClient(object):
     '''
 
     def HRIF_ReadBoxAI(self, boxID, bit, result):
-        command = 'ReadBoxAI,' + str(bit) + ',;'
-        return self.g_clients[boxID].sendAndRecv(command, result)
+        return self.g_clients[boxID].sendAndRecv(Encoders.ReadBoxAI(bit), result)
 
     '''
     *	@index : 7
@@ -762,8 +1100,7 @@ class CPSClient(object):
     '''
 
     def HRIF_ReadBoxAO(self, boxID, bit, result):
-        command = 'ReadBoxAO,' + str(bit) + ',;'
-        return self.g_clients[boxID].sendAndRecv(command, result)
+        return self.g_clients[boxID].sendAndRecv(Encoders.ReadBoxAO(bit), result)
 
     '''
     *	@index : 8
@@ -776,8 +1113,7 @@ class CPSClient(object):
 
     def HRIF_SetBoxCO(self, boxID, bit, state):
         result = []
-        command = 'SetBoxCO,' + str(bit) + ',' + str(state) + ',;'
-        return self.g_clients[boxID].sendAndRecv(command, result)
+        return self.g_clients[boxID].sendAndRecv(Encoders.SetBoxCO(bit, state), result)
 
     '''
     *	@index : 9
@@ -790,8 +1126,7 @@ class CPSClient(object):
 
     def HRIF_SetBoxDO(self, boxID, bit, state):
         result = []
-        command = 'SetBoxDO,' + str(bit) + ',' + str(state) + ',;'
-        return self.g_clients[boxID].sendAndRecv(command, result)
+        return self.g_clients[boxID].sendAndRecv(Encoders.SetBoxDO(bit, state), result)
 
     '''
     *	@index : 10
@@ -804,8 +1139,7 @@ class CPSClient(object):
 
     def HRIF_SetBoxAOMode(self, boxID, index, pattern):
         result = []
-        command = 'SetBoxAOMode,' + str(index) + ',' + str(pattern) + ',;'
-        return self.g_clients[boxID].sendAndRecv(command, result)
+        return self.g_clients[boxID].sendAndRecv(Encoders.SetBoxAOMode(index, pattern), result)
 
     '''
     *	@index : 11
@@ -819,8 +1153,7 @@ class CPSClient(object):
 
     def HRIF_SetBoxAOVal(self, boxID, index, value, pattern):
         result = []
-        command = 'SetBoxAO,' + str(index) + ',' + str(value) + ',' + str(pattern) + ',;'
-        return self.g_clients[boxID].sendAndRecv(command, result)
+        return self.g_clients[boxID].sendAndRecv(Encoders.SetBoxAOVal(index, value, pattern), result)
 
     '''
     *	@index : 12
@@ -834,12 +1167,7 @@ class CPSClient(object):
 
     def HRIF_SetEndDO(self, boxID, rbtID, bit, state):
         result = []
-        command = 'SetEndDO,'
-        command += str(rbtID) + ','
-        command += str(bit) + ','
-        command += str(state) + ','
-        command += ';'
-        return self.g_clients[boxID].sendAndRecv(command, result)
+        return self.g_clients[boxID].sendAndRecv(Encoders.SetEndDO(rbtID, bit, state), result)
 
     '''
     *	@index : 13
@@ -852,11 +1180,7 @@ class CPSClient(object):
     '''
 
     def HRIF_ReadEndDI(self, boxID, rbtID, bit, result):
-        command = 'ReadEI,'
-        command += str(rbtID) + ','
-        command += str(bit) + ','
-        command += ';'
-        return self.g_clients[boxID].sendAndRecv(command, result)
+        return self.g_clients[boxID].sendAndRecv(Encoders.ReadEndDI(rbtID, bit), result)
 
     '''
     *	@index : 14
@@ -869,11 +1193,7 @@ class CPSClient(object):
     '''
 
     def HRIF_ReadEndDO(self, boxID, rbtID, bit, result):
-        command = 'ReadEO,'
-        command += str(rbtID) + ','
-        command += str(bit) + ','
-        command += ';'
-        return self.g_clients[boxID].sendAndRecv(command, result)
+        return self.g_clients[boxID].sendAndRecv(Encoders.ReadEndDO(rbtID, bit), result)
 
     '''
     *	@index : 15
@@ -886,11 +1206,7 @@ class CPSClient(object):
     '''
 
     def HRIF_ReadEndAI(self, boxID, rbtID, bit, result):
-        command = 'ReadEAI,'
-        command += str(rbtID) + ','
-        command += str(bit) + ','
-        command += ';'
-        return self.g_clients[boxID].sendAndRecv(command, result)
+        return self.g_clients[boxID].sendAndRecv(Encoders.ReadEndAI(rbtID, bit), result)
 
     '''
     *	@index : 16
@@ -902,10 +1218,7 @@ class CPSClient(object):
     '''
 
     def HRIF_ReadEndBTN(self, boxID, rbtID, result):
-        command = 'ReadEndBTN,'
-        command += str(rbtID) + ','
-        command += ';'
-        return self.g_clients[boxID].sendAndRecv(command, result)
+        return self.g_clients[boxID].sendAndRecv(Encoders.ReadEndBTN(rbtID), result)
 
     #
     # part 5 状态读取与设置指令 
@@ -922,10 +1235,7 @@ class CPSClient(object):
 
     def HRIF_SetOverride(self, boxID, rbtID, vel):
         result = []
-        command = 'SetOverride,'
-        command += str(rbtID) + ','
-        command += str(vel) + ',;'
-        return self.g_clients[boxID].sendAndRecv(command, result)
+        return self.g_clients[boxID].sendAndRecv(Encoders.SetOverride(rbtID, vel), result)
 
     '''
     *	@index : 2
@@ -938,10 +1248,7 @@ class CPSClient(object):
 
     def HRIF_SetToolMotion(self, boxID, rbtID, state):
         result = []
-        command = 'SetTCPMotion,'
-        command += str(rbtID) + ','
-        command += str(state) + ',;'
-        return self.g_clients[boxID].sendAndRecv(command, result)
+        return self.g_clients[boxID].sendAndRecv(Encoders.SetToolMotion(rbtID, state), result)
 
     '''
     *	@index : 3
@@ -957,14 +1264,7 @@ class CPSClient(object):
 
     def HRIF_SetPayload(self, boxID, rbtID, Mass, Center_X, Center_Y, Center_Z):
         result = []
-        command = 'SetPayload,'
-        command += str(rbtID) + ','
-        command += str(Mass) + ','
-        command += str(Center_X) + ','
-        command += str(Center_Y) + ','
-        command += str(Center_Z) + ','
-        command += ';'
-        return self.g_clients[boxID].sendAndRecv(command, result)
+        return self.g_clients[boxID].sendAndRecv(Encoders.SetPayload(rbtID, Mass, Center_X, Center_Y, Center_Z), result)
 
     '''
     *	@index : 4
@@ -977,13 +1277,7 @@ class CPSClient(object):
 
     def HRIF_SetJointMaxVel(self, boxID, rbtID, Joint):
         result = []
-        command = 'SetJointMaxVel,'
-        command += str(rbtID) + ','
-        for i in range(len(Joint)):
-            command += str(Joint[i]) + ','
-        command += ';'
-        print(command)
-        return self.g_clients[boxID].sendAndRecv(command, result)
+        return self.g_clients[boxID].sendAndRecv(Encoders.SetJointMaxVel(rbtID, Joint), result)
 
     '''
     *	@index : 5
@@ -996,12 +1290,7 @@ class CPSClient(object):
 
     def HRIF_SetJointMaxAcc(self, boxID, rbtID, Joint):
         result = []
-        command = 'SetJointMaxAcc,'
-        command += str(rbtID) + ','
-        for i in range(len(Joint)):
-            command += str(Joint[i]) + ','
-        command += ';'
-        return self.g_clients[boxID].sendAndRecv(command, result)
+        return self.g_clients[boxID].sendAndRecv(Encoders.SetJointMaxAcc(rbtID, Joint), result)
 
     '''
     *	@index : 6
@@ -1014,11 +1303,7 @@ class CPSClient(object):
 
     def HRIF_SetLinearMaxVel(self, boxID, rbtID, MaxVel):
         result = []
-        command = 'SetLinearMaxVel,'
-        command += str(rbtID) + ','
-        command += str(MaxVel) + ','
-        command += ';'
-        return self.g_clients[boxID].sendAndRecv(command, result)
+        return self.g_clients[boxID].sendAndRecv(Encoders.SetLinearMaxVel(rbtID, MaxVel), result)
 
     '''
     *	@index : 7
@@ -1031,11 +1316,7 @@ class CPSClient(object):
 
     def HRIF_SetLinearMaxAcc(self, boxID, rbtID, MaxAcc):
         result = []
-        command = 'SetLinearMaxAcc,'
-        command += str(rbtID) + ','
-        command += str(MaxAcc) + ','
-        command += ';'
-        return self.g_clients[boxID].sendAndRecv(command, result)
+        return self.g_clients[boxID].sendAndRecv(Encoders.SetLinearMaxAcc(rbtID, MaxAcc), result)
 
     '''
     *	@index : 8
@@ -1049,33 +1330,7 @@ class CPSClient(object):
 
     def HRIF_SetMaxAcsRange(self, boxID, rbtID, pMax, pMin):
         result = []
-        command = 'SetMaxAcsRange,'
-        command += str(rbtID) + ','
-        command += str(pMax[0])
-        command += ','
-        command += str(pMax[1])
-        command += ','
-        command += str(pMax[2])
-        command += ','
-        command += str(pMax[3])
-        command += ','
-        command += str(pMax[4])
-        command += ','
-        command += str(pMax[5])
-        command += ','
-        command += str(pMin[0])
-        command += ','
-        command += str(pMin[1])
-        command += ','
-        command += str(pMin[2])
-        command += ','
-        command += str(pMin[3])
-        command += ','
-        command += str(pMin[4])
-        command += ','
-        command += str(pMin[5])
-        command += ',;'
-        return self.g_clients[boxID].sendAndRecv(command, result)
+        return self.g_clients[boxID].sendAndRecv(Encoders.SetMaxAcsRange(rbtID, pMax, pMin), result)
 
     '''
     *	@index : 9
@@ -1090,36 +1345,7 @@ class CPSClient(object):
 
     def HRIF_SetMaxPcsRange(self, boxID, rbtID, pMax, pMin, pUcs):
         result = []
-        command = 'SetMaxPcsRange,'
-        command += str(rbtID) + ','
-        command += str(pMax[0])
-        command += ','
-        command += str(pMax[1])
-        command += ','
-        command += str(pMax[2])
-        command += ','
-        command += str(180)
-        command += ','
-        command += str(180)
-        command += ','
-        command += str(180)
-        command += ','
-        command += str(pMin[0])
-        command += ','
-        command += str(pMin[1])
-        command += ','
-        command += str(pMin[2])
-        command += ','
-        command += str(-180)
-        command += ','
-        command += str(-180)
-        command += ','
-        command += str(-180)
-        command += ','
-        for i in range(0, 6):
-            command += str(pUcs[i]) + ','
-        command += ';'
-        return self.g_clients[boxID].sendAndRecv(command, result)
+        return self.g_clients[boxID].sendAndRecv(Encoders.SetMaxPcsRange(rbtID, pMax, pMin, pUcs), result)
 
     '''
     *	@index : 10
@@ -1131,10 +1357,7 @@ class CPSClient(object):
     '''
 
     def HRIF_ReadJointMaxVel(self, boxID, rbtID, result):
-        command = 'ReadJointMaxVel,'
-        command += str(rbtID) + ','
-        command += ';'
-        return self.g_clients[boxID].sendAndRecv(command, result)
+        return self.g_clients[boxID].sendAndRecv(Encoders.ReadJointMaxVel(rbtID), result)
 
     '''
     *	@index : 11
@@ -1146,10 +1369,7 @@ class CPSClient(object):
     '''
 
     def HRIF_ReadJointMaxAcc(self, boxID, rbtID, result):
-        command = 'ReadJointMaxAcc,'
-        command += str(rbtID) + ','
-        command += ';'
-        return self.g_clients[boxID].sendAndRecv(command, result)
+        return self.g_clients[boxID].sendAndRecv(Encoders.ReadJointMaxAcc(rbtID), result)
 
     '''
     *	@index : 12
@@ -1161,10 +1381,7 @@ class CPSClient(object):
     '''
 
     def HRIF_ReadJointMaxJerk(self, boxID, rbtID, result):
-        command = 'ReadJointMaxJerk,'
-        command += str(rbtID) + ','
-        command += ';'
-        return self.g_clients[boxID].sendAndRecv(command, result)
+        return self.g_clients[boxID].sendAndRecv(Encoders.ReadJointMaxJerk(rbtID), result)
 
     '''
     *	@index : 13
@@ -1178,10 +1395,7 @@ class CPSClient(object):
     '''
 
     def HRIF_ReadLinearMaxSpeed(self, boxID, rbtID, result):
-        command = 'ReadLinearMaxVel,'
-        command += str(rbtID) + ','
-        command += ';'
-        return self.g_clients[boxID].sendAndRecv(command, result)
+        return self.g_clients[boxID].sendAndRecv(Encoders.ReadLinearMaxSpeed(rbtID), result)
 
     '''
     *	@index : 14
@@ -1196,10 +1410,7 @@ class CPSClient(object):
     '''
 
     def HRIF_ReadEmergencyInfo(self, boxID, rbtID, result):
-        command = 'ReadEmergencyInfo,'
-        command += str(rbtID) + ','
-        command += ';'
-        return self.g_clients[boxID].sendAndRecv(command, result)
+        return self.g_clients[boxID].sendAndRecv(Encoders.ReadEmergencyInfo(rbtID), result)
 
     '''
     *	@index : 15
@@ -1223,10 +1434,25 @@ class CPSClient(object):
     '''
 
     def HRIF_ReadRobotState(self, boxID, rbtID, result):
-        command = 'ReadRobotState,'
-        command += str(rbtID) + ','
-        command += ';'
-        return self.g_clients[boxID].sendAndRecv(command, result)
+        return self.g_clients[boxID].sendAndRecv(Encoders.ReadRobotState(rbtID), result)
+
+    '''
+    *	@index : 
+    *	@param brief:一次读取机器人完整状态,各读取指令连续发出后再依次接收应答,只有一次往返延迟
+                     返回的各项属于同一时间区间[sendTime, recvTime]
+                     snap = cps.HRIF_ReadSnapshot(boxID, rbtID, ('state', 'pos'))
+                     if snap.errorCode == 0: snap.pos.pcs
+    *	@param boxID:电箱ID
+    *	@param rbtID:机器人ID,一般为0
+    *	@param fields: 需要读取的内容,取自cps_telemetry.SnapshotFields:
+                       state(ReadRobotState),pos(ReadActPos),jointVel(ReadActJointVel),
+                       jointCur(ReadActJointCur),ftData(ReadFTData),fsm(ReadCurFSM)
+    *	@param channel: 使用openChannel打开的连接,未打开时使用原连接
+    *	@param return: cps_telemetry.RobotSnapshot,errorCode为0表示成功,未读取的内容为None
+    '''
+
+    def HRIF_ReadSnapshot(self, boxID, rbtID, fields=SnapshotFields, channel=Telemetry):
+        return readSnapshot(self, boxID, rbtID, fields, channel)
 
     '''
     *	@index : 16
@@ -1245,10 +1471,7 @@ class CPSClient(object):
 
     def HRIF_ReadRobotFlags(self, boxID, rbtID, result):
         result2 = []
-        command = 'ReadRobotState,'
-        command += str(rbtID) + ','
-        command += ';'
-        DataRet = self.g_clients[boxID].sendAndRecv(command, result2)
+        DataRet = self.g_clients[boxID].sendAndRecv(Encoders.ReadRobotState(rbtID), result2)
         for i in range(8):
             result += str(result2[i])
         return DataRet
@@ -1263,10 +1486,7 @@ class CPSClient(object):
     '''
 
     def HRIF_ReadCurWaypointID(self, boxID, rbtID, result):
-        command = 'ReadCurWayPointID,'
-        command += str(rbtID) + ','
-        command += ';'
-        return self.g_clients[boxID].sendAndRecv(command, result)
+        return self.g_clients[boxID].sendAndRecv(Encoders.ReadCurWaypointID(rbtID), result)
 
     '''
     *	@index : 18
@@ -1278,10 +1498,7 @@ class CPSClient(object):
     '''
 
     def HRIF_ReadAxiserrorCode(self, boxID, rbtID, result):
-        command = 'ReadAxisErrorCode,'
-        command += str(rbtID) + ','
-        command += ';'
-        return self.g_clients[boxID].sendAndRecv(command, result)
+        return self.g_clients[boxID].sendAndRecv(Encoders.ReadAxiserrorCode(rbtID), result)
 
     '''
     *	@index : 19
@@ -1294,10 +1511,7 @@ class CPSClient(object):
     '''
 
     def HRIF_ReadCurFSM(self, boxID, rbtID, result):
-        command = 'ReadCurFSM,'
-        command += str(rbtID) + ','
-        command += ';'
-        return self.g_clients[boxID].sendAndRecv(command, result)
+        return self.g_clients[boxID].sendAndRecv(Encoders.ReadCurFSM(rbtID), result)
 
     '''
       *	@index : 20
@@ -1309,10 +1523,7 @@ class CPSClient(object):
     '''
 
     def HRIF_ReadCurFSMFromCPS(self, boxID, rbtID, result):
-        command = 'ReadCurFSM,'
-        command += str(rbtID) + ','
-        command += ';'
-        nRet = self.g_clients[boxID].sendAndRecv(command, result)
+        nRet = self.g_clients[boxID].sendAndRecv(Encoders.ReadCurFSM(rbtID), result)
         if len(result) < 1:
             return nRet
         strRes = self.dic_FSM.get(int(result[0]))
@@ -1336,10 +1547,7 @@ class CPSClient(object):
     '''
 
     def HRIF_ReadActPos(self, boxID, rbtID, result):
-        command = 'ReadActPos,'
-        command += str(rbtID) + ','
-        command += ';'
-        return self.g_clients[boxID].sendAndRecv(command, result)
+        return self.g_clients[boxID].sendAndRecv(Encoders.ReadActPos(rbtID), result)
 
     '''
     *	@index : 2
@@ -1351,10 +1559,7 @@ class CPSClient(object):
     '''
 
     def HRIF_ReadCmdJointPos(self, boxID, rbtID, result):
-        command = 'ReadCmdPos,'
-        command += str(rbtID) + ','
-        command += ';'
-        return self.g_clients[boxID].sendAndRecv(command, result)
+        return self.g_clients[boxID].sendAndRecv(Encoders.ReadCmdJointPos(rbtID), result)
 
     '''
     *	@index : 3
@@ -1366,10 +1571,7 @@ class CPSClient(object):
     '''
 
     def HRIF_ReadActJointPos(self, boxID, rbtID, result):
-        command = 'ReadActACS,'
-        command += str(rbtID) + ','
-        command += ';'
-        return self.g_clients[boxID].sendAndRecv(command, result)
+        return self.g_clients[boxID].sendAndRecv(Encoders.ReadActJointPos(rbtID), result)
 
     '''
     *	@index : 4
@@ -1381,10 +1583,7 @@ class CPSClient(object):
     '''
 
     def HRIF_ReadCmdTcpPos(self, boxID, rbtID, result):
-        command = 'ReadCmdPos,'
-        command += str(rbtID) + ','
-        command += ';'
-        errorCode = self.g_clients[boxID].sendAndRecv(command, result)
+        errorCode = self.g_clients[boxID].sendAndRecv(Encoders.ReadCmdJointPos(rbtID), result)
         if errorCode != 0:
             return errorCode
         del result[6]
@@ -1423,10 +1622,7 @@ class CPSClient(object):
     '''
 
     def HRIF_ReadCmdJointVel(self, boxID, rbtID, result):
-        command = 'ReadCmdJointVel,'
-        command += str(rbtID) + ','
-        command += ';'
-        return self.g_clients[boxID].sendAndRecv(command, result)
+        return self.g_clients[boxID].sendAndRecv(Encoders.ReadCmdJointVel(rbtID), result)
 
     '''
     *	@index : 7
@@ -1438,10 +1634,7 @@ class CPSClient(object):
     '''
 
     def HRIF_ReadActJointVel(self, boxID, rbtID, result):
-        command = 'ReadActJointVel,'
-        command += str(rbtID) + ','
-        command += ';'
-        return self.g_clients[boxID].sendAndRecv(command, result)
+        return self.g_clients[boxID].sendAndRecv(Encoders.ReadActJointVel(rbtID), result)
 
     '''
     *	@index : 8
@@ -1453,10 +1646,7 @@ class CPSClient(object):
     '''
 
     def HRIF_ReadCmdTcpVel(self, boxID, rbtID, result):
-        command = 'ReadCmdTcpVel,'
-        command += str(rbtID) + ','
-        command += ';'
-        return self.g_clients[boxID].sendAndRecv(command, result)
+        return self.g_clients[boxID].sendAndRecv(Encoders.ReadCmdTcpVel(rbtID), result)
 
     '''
     *	@index : 9
@@ -1468,10 +1658,7 @@ class CPSClient(object):
     '''
 
     def HRIF_ReadActTcpVel(self, boxID, rbtID, result):
-        command = 'ReadActTcpVel,'
-        command += str(rbtID) + ','
-        command += ';'
-        return self.g_clients[boxID].sendAndRecv(command, result)
+        return self.g_clients[boxID].sendAndRecv(Encoders.ReadActTcpVel(rbtID), result)
 
     '''
     *	@index : 10
@@ -1483,10 +1670,7 @@ class CPSClient(object):
     '''
 
     def HRIF_ReadCmdJointCur(self, boxID, rbtID, result):
-        command = 'ReadCmdJointCur,'
-        command += str(rbtID) + ','
-        command += ';'
-        return self.g_clients[boxID].sendAndRecv(command, result)
+        return self.g_clients[boxID].sendAndRecv(Encoders.ReadCmdJointCur(rbtID), result)
 
     '''
     *	@index : 11
@@ -1498,10 +1682,7 @@ class CPSClient(object):
     '''
 
     def HRIF_ReadActJointCur(self, boxID, rbtID, result):
-        command = 'ReadActJointCur,'
-        command += str(rbtID) + ','
-        command += ';'
-        return self.g_clients[boxID].sendAndRecv(command, result)
+        return self.g_clients[boxID].sendAndRecv(Encoders.ReadActJointCur(rbtID), result)
 
     '''
     *	@index : 12
@@ -1514,10 +1695,7 @@ class CPSClient(object):
     '''
 
     def HRIF_ReadTcpVelocity(self, boxID, rbtID, result):
-        command = 'ReadTcpVelocity,'
-        command += str(rbtID) + ','
-        command += ';'
-        return self.g_clients[boxID].sendAndRecv(command, result)
+        return self.g_clients[boxID].sendAndRecv(Encoders.ReadTcpVelocity(rbtID), result)
 
     #
     # part 7 坐标转换计算指令  
@@ -1535,18 +1713,15 @@ class CPSClient(object):
     *	@param result[0] : 欧拉角 Rx
     *	@param result[1] : 欧拉角 Ry
     *	@param result[2] : 欧拉角 Rz
+    *	@param local : True时由cps_pose在本地计算,不经过网络,结果字符串格式与控制器应答相同;
+                       批量转换直接使用cps_pose.quaternionToRpy
     *	@param return: 错误码
     '''
 
-    def HRIF_Quaternion2RPY(self, boxID, rbtID, dQuaW, dQuaX, dQuaY, dQuaZ, result):
-        command = 'Quaternion2RPY,'
-        command += str(rbtID) + ','
-        command += str(dQuaW) + ','
-        command += str(dQuaX) + ','
-        command += str(dQuaY) + ','
-        command += str(dQuaZ) + ','
-        command += ';'
-        return self.g_clients[boxID].sendAndRecv(command, result)
+    def HRIF_Quaternion2RPY(self, boxID, rbtID, dQuaW, dQuaX, dQuaY, dQuaZ, result, local=False):
+        if local:
+            return fillResult(quaternionToRpy([dQuaW, dQuaX, dQuaY, dQuaZ]), result)
+        return self.g_clients[boxID].sendAndRecv(Encoders.Quaternion2RPY(rbtID, dQuaW, dQuaX, dQuaY, dQuaZ), result)
 
     '''
     *	@index : 2
@@ -1560,17 +1735,14 @@ class CPSClient(object):
     *	@param result[1] : dQuaX
     *	@param result[2] : dQuaY
     *	@param result[3] : dQuaZ
+    *	@param local : True时由cps_pose在本地计算,见HRIF_Quaternion2RPY;批量转换直接使用cps_pose.rpyToQuaternion
     *	@param return: 错误码
     '''
 
-    def HRIF_RPY2Quaternion(self, boxID, rbtID, Rx, Ry, Rz, result):
-        command = 'RPY2Quaternion,'
-        command += str(rbtID) + ','
-        command += str(Rx) + ','
-        command += str(Ry) + ','
-        command += str(Rz) + ','
-        command += ';'
-        return self.g_clients[boxID].sendAndRecv(command, result)
+    def HRIF_RPY2Quaternion(self, boxID, rbtID, Rx, Ry, Rz, result, local=False):
+        if local:
+            return fillResult(rpyToQuaternion([Rx, Ry, Rz]), result)
+        return self.g_clients[boxID].sendAndRecv(Encoders.RPY2Quaternion(rbtID, Rx, Ry, Rz), result)
 
     '''
     *	@index : 3
@@ -1586,18 +1758,11 @@ class CPSClient(object):
     '''
 
     def HRIF_GetInverseKin(self, boxID, rbtID, rawPCS, rawACS, tcp, ucs, result):
-        command = 'PCS2ACS,'
-        command += str(rbtID) + ','
-        for i in range(0, 6):
-            command += str(rawPCS[i]) + ','
-        for i in range(0, 6):
-            command += str(rawACS[i]) + ','
-        for i in range(0, 6):
-            command += str(tcp[i]) + ','
-        for i in range(0, 6):
-            command += str(ucs[i]) + ','
-        command += ';'
-        return self.g_clients[boxID].sendAndRecv(command, result)
+        cache = self.m_kinCache
+        if cache is not None:
+            return self.cachedKin(boxID, cache.key('PCS2ACS', rbtID, rawPCS, rawACS, tcp, ucs), Encoders.GetInverseKin,
+                                  (rbtID, rawPCS, rawACS, tcp, ucs), result)
+        return self.g_clients[boxID].sendAndRecv(Encoders.GetInverseKin(rbtID, rawPCS, rawACS, tcp, ucs), result)
 
     '''
     *	@index : 4
@@ -1612,16 +1777,11 @@ class CPSClient(object):
     '''
 
     def HRIF_GetForwardKin(self, boxID, rbtID, rawACS, tcp, ucs, result):
-        command = 'ACS2PCS,'
-        command += str(rbtID) + ','
-        for i in range(0, 6):
-            command += str(rawACS[i]) + ','
-        for i in range(0, 6):
-            command += str(tcp[i]) + ','
-        for i in range(0, 6):
-            command += str(ucs[i]) + ','
-        command += ';'
-        return self.g_clients[boxID].sendAndRecv(command, result)
+        cache = self.m_kinCache
+        if cache is not None:
+            return self.cachedKin(boxID, cache.key('ACS2PCS', rbtID, rawACS, tcp, ucs), Encoders.GetForwardKin,
+                                  (rbtID, rawACS, tcp, ucs), result)
+        return self.g_clients[boxID].sendAndRecv(Encoders.GetForwardKin(rbtID, rawACS, tcp, ucs), result)
 
     '''
     *	@index : 5
@@ -1636,16 +1796,7 @@ class CPSClient(object):
     '''
 
     def HRIF_Base2UcsTcp(self, boxID, rbtID, Base, TCP, UCS, result):
-        command = 'Base2UcsTcp,'
-        command += str(rbtID) + ','
-        for i in range(0, 6):
-            command += str(Base[i]) + ','
-        for i in range(0, 6):
-            command += str(TCP[i]) + ','
-        for i in range(0, 6):
-            command += str(UCS[i]) + ','
-        command += ';'
-        return self.g_clients[boxID].sendAndRecv(command, result)
+        return self.g_clients[boxID].sendAndRecv(Encoders.Base2UcsTcp(rbtID, Base, TCP, UCS), result)
 
     '''
     *	@index : 6
@@ -1659,15 +1810,7 @@ class CPSClient(object):
     '''
 
     def HRIF_UcsTcp2Base(self, boxID, UcsTcp, TCP, UCS, result):
-        command = 'UcsTcp2Base,0,'
-        for i in range(0, 6):
-            command += str(UcsTcp[i]) + ','
-        for i in range(0, 6):
-            command += str(TCP[i]) + ','
-        for i in range(0, 6):
-            command += str(UCS[i]) + ','
-        command += ';'
-        return self.g_clients[boxID].sendAndRecv(command, result)
+        return self.g_clients[boxID].sendAndRecv(Encoders.UcsTcp2Base(UcsTcp, TCP, UCS), result)
 
     '''
     *	@index : 7
@@ -1681,14 +1824,7 @@ class CPSClient(object):
     '''
 
     def HRIF_PoseAdd(self, boxID, rbtID, pos1, pos2, result):
-        command = 'PoseAdd,'
-        command += str(rbtID) + ','
-        for i in range(0, 6):
-            command += str(pos1[i]) + ','
-        for i in range(0, 6):
-            command += str(pos2[i]) + ','
-        command += ';'
-        return self.g_clients[boxID].sendAndRecv(command, result)
+        return self.g_clients[boxID].sendAndRecv(Encoders.PoseAdd(rbtID, pos1, pos2), result)
 
     '''
     *	@index : 8
@@ -1702,14 +1838,7 @@ class CPSClient(object):
     '''
 
     def HRIF_PoseSub(self, boxID, rbtID, pos1, pos2, result):
-        command = 'PoseSub,'
-        command += str(rbtID) + ','
-        for i in range(0, 6):
-            command += str(pos1[i]) + ','
-        for i in range(0, 6):
-            command += str(pos2[i]) + ','
-        command += ';'
-        return self.g_clients[boxID].sendAndRecv(command, result)
+        return self.g_clients[boxID].sendAndRecv(Encoders.PoseSub(rbtID, pos1, pos2), result)
 
     '''
     *	@index : 9
@@ -1724,14 +1853,7 @@ class CPSClient(object):
     '''
 
     def HRIF_PoseTrans(self, boxID, rbtID, pos1, pos2, result):
-        command = 'PoseTrans,'
-        command += str(rbtID) + ','
-        for i in range(0, 6):
-            command += str(pos1[i]) + ','
-        for i in range(0, 6):
-            command += str(pos2[i]) + ','
-        command += ';'
-        return self.g_clients[boxID].sendAndRecv(command, result)
+        return self.g_clients[boxID].sendAndRecv(Encoders.PoseTrans(rbtID, pos1, pos2), result)
 
     '''
     *	@index : 10
@@ -1744,12 +1866,7 @@ class CPSClient(object):
     '''
 
     def HRIF_PoseInverse(self, boxID, rbtID, pos1, result):
-        command = 'PoseInverse,'
-        command += str(rbtID) + ','
-        for i in range(0, 6):
-            command += str(pos1[i]) + ','
-        command += ';'
-        return self.g_clients[boxID].sendAndRecv(command, result)
+        return self.g_clients[boxID].sendAndRecv(Encoders.PoseInverse(rbtID, pos1), result)
 
     '''
     *	@index : 11
@@ -1764,14 +1881,7 @@ class CPSClient(object):
     '''
 
     def HRIF_PoseDist(self, boxID, rbtID, pos1, pos2, result):
-        command = 'CalPointDistance,'
-        command += str(rbtID) + ','
-        for i in range(0, 6):
-            command += str(pos1[i]) + ','
-        for i in range(0, 6):
-            command += str(pos2[i]) + ','
-        command += ';'
-        return self.g_clients[boxID].sendAndRecv(command, result)
+        return self.g_clients[boxID].sendAndRecv(Encoders.PoseDist(rbtID, pos1, pos2), result)
 
     '''
     *	@index : 12
@@ -1786,15 +1896,7 @@ class CPSClient(object):
     '''
 
     def HRIF_PoseInterpolate(self, boxID, rbtID, pos1, pos2, alpha, result):
-        command = 'PoseInterpolate,'
-        command += str(rbtID) + ','
-        for i in range(0, 6):
-            command += str(pos1[i]) + ','
-        for i in range(0, 6):
-            command += str(pos2[i]) + ','
-        command += str(alpha) + ','
-        command += ';'
-        return self.g_clients[boxID].sendAndRecv(command, result)
+        return self.g_clients[boxID].sendAndRecv(Encoders.PoseInterpolate(rbtID, pos1, pos2, alpha), result)
 
     '''
     *	@index : 13
@@ -1812,21 +1914,7 @@ class CPSClient(object):
     '''
 
     def HRIF_PoseDefdFrame(self, boxID, rbtID, pos1, pos2, pos3, pos4, pos5, pos6, result):
-        command = 'DefdFrame,'
-        command += str(rbtID) + ','
-        for i in range(0, 3):
-            command += str(pos1[i]) + ','
-        for i in range(0, 3):
-            command += str(pos2[i]) + ','
-        for i in range(0, 3):
-            command += str(pos3[i]) + ','
-        for i in range(0, 3):
-            command += str(pos4[i]) + ','
-        for i in range(0, 3):
-            command += str(pos5[i]) + ','
-        for i in range(0, 3):
-            command += str(pos6[i]) + ','
-        command += ';'
+        command = Encoders.PoseDefdFrame(rbtID, pos1, pos2, pos3, pos4, pos5, pos6)
         return self.g_clients[boxID].sendAndRecv(command, result)
 
     #
@@ -1844,12 +1932,8 @@ class CPSClient(object):
 
     def HRIF_SetTCP(self, boxID, rbtID, TCP):
         result = []
-        command = 'SetCurTCP,'
-        command += str(rbtID) + ','
-        for i in range(0, 6):
-            command += str(TCP[i]) + ','
-        command += ';'
-        return self.g_clients[boxID].sendAndRecv(command, result)
+        nRet = self.g_clients[boxID].sendAndRecv(Encoders.SetTCP(rbtID, TCP), result)
+        return self.invalidateKinCache(boxID, nRet)
 
     '''
     *	@index : 2
@@ -1862,12 +1946,8 @@ class CPSClient(object):
 
     def HRIF_SetUCS(self, boxID, rbtID, UCS):
         result = []
-        command = 'SetCurUCS,'
-        command += str(rbtID) + ','
-        for i in range(0, 6):
-            command += str(UCS[i]) + ','
-        command += ';'
-        return self.g_clients[boxID].sendAndRecv(command, result)
+        nRet = self.g_clients[boxID].sendAndRecv(Encoders.SetUCS(rbtID, UCS), result)
+        return self.invalidateKinCache(boxID, nRet)
 
     '''
     *	@index : 3
@@ -1879,10 +1959,7 @@ class CPSClient(object):
     '''
 
     def HRIF_ReadCurTCP(self, boxID, rbtID, result):
-        command = 'ReadCurTCP,'
-        command += str(rbtID) + ','
-        command += ';'
-        return self.g_clients[boxID].sendAndRecv(command, result)
+        return self.g_clients[boxID].sendAndRecv(Encoders.ReadCurTCP(rbtID), result)
 
     '''
     *	@index : 4
@@ -1894,10 +1971,7 @@ class CPSClient(object):
     '''
 
     def HRIF_ReadCurUCS(self, boxID, rbtID, result):
-        command = 'ReadCurUCS,'
-        command += str(rbtID) + ','
-        command += ';'
-        return self.g_clients[boxID].sendAndRecv(command, result)
+        return self.g_clients[boxID].sendAndRecv(Encoders.ReadCurUCS(rbtID), result)
 
     '''
     *	@index : 5
@@ -1910,10 +1984,8 @@ class CPSClient(object):
 
     def HRIF_SetTCPByName(self, boxID, rbtID, TcpName):
         result = []
-        command = 'SetTCPByName,'
-        command += str(rbtID) + ','
-        command += str(TcpName) + ',;'
-        return self.g_clients[boxID].sendAndRecv(command, result)
+        nRet = self.g_clients[boxID].sendAndRecv(Encoders.SetTCPByName(rbtID, TcpName), result)
+        return self.invalidateKinCache(boxID, nRet)
 
     '''
     *	@index : 6
@@ -1926,10 +1998,8 @@ class CPSClient(object):
 
     def HRIF_SetUCSByName(self, boxID, rbtID, UcsName):
         result = []
-        command = 'SetUCSByName,'
-        command += str(rbtID) + ','
-        command += str(UcsName) + ',;'
-        return self.g_clients[boxID].sendAndRecv(command, result)
+        nRet = self.g_clients[boxID].sendAndRecv(Encoders.SetUCSByName(rbtID, UcsName), result)
+        return self.invalidateKinCache(boxID, nRet)
 
     '''
     *	@index : 7
@@ -1942,10 +2012,7 @@ class CPSClient(object):
     '''
 
     def HRIF_ReadTCPByName(self, boxID, rbtID, TCP, result):
-        command = 'ReadTCPByName,'
-        command += str(rbtID) + ','
-        command += str(TCP) + ',;'
-        return self.g_clients[boxID].sendAndRecv(command, result)
+        return self.g_clients[boxID].sendAndRecv(Encoders.ReadTCPByName(rbtID, TCP), result)
 
     '''
     *	@index : 8
@@ -1958,10 +2025,7 @@ class CPSClient(object):
     '''
 
     def HRIF_ReadUCSByName(self, boxID, rbtID, UCS, result):
-        command = 'ReadUCSByName,'
-        command += str(rbtID) + ','
-        command += str(UCS) + ',;'
-        return self.g_clients[boxID].sendAndRecv(command, result)
+        return self.g_clients[boxID].sendAndRecv(Encoders.ReadUCSByName(rbtID, UCS), result)
 
     #
     # part 9 力控控制指令
@@ -1978,10 +2042,7 @@ class CPSClient(object):
 
     def HRIF_SetForceControlState(self, boxID, rbtID, state):
         result = []
-        command = 'SetForceControlState,'
-        command += str(rbtID) + ','
-        command += str(state) + ',;'
-        return self.g_clients[boxID].sendAndRecv(command, result)
+        return self.g_clients[boxID].sendAndRecv(Encoders.SetForceControlState(rbtID, state), result)
 
     '''
     *	@index : 2
@@ -1996,10 +2057,7 @@ class CPSClient(object):
     '''
 
     def HRIF_ReadForceControlState(self, boxID, rbtID, result):
-        command = 'ReadFTControlState,'
-        command += str(rbtID) + ','
-        command += ';'
-        return self.g_clients[boxID].sendAndRecv(command, result)
+        return self.g_clients[boxID].sendAndRecv(Encoders.ReadForceControlState(rbtID), result)
 
     '''
     *	@index : 3
@@ -2012,11 +2070,7 @@ class CPSClient(object):
     '''
 
     def HRIF_SetForceToolCoordinateMotion(self, boxID, rbtID, mode, result):
-        command = 'SetForceToolCoordinateMotion,'
-        command += str(rbtID) + ','
-        command += str(mode)
-        command += ',;'
-        return self.g_clients[boxID].sendAndRecv(command, result)
+        return self.g_clients[boxID].sendAndRecv(Encoders.SetForceToolCoordinateMotion(rbtID, mode), result)
 
     '''
     *	@index : 4
@@ -2028,10 +2082,7 @@ class CPSClient(object):
 
     def HRIF_ForceControlInterrupt(self, boxID, rbtID):
         result = []
-        command = 'GrpFCInterrupt,'
-        command += str(rbtID) + ','
-        command += ';'
-        return self.g_clients[boxID].sendAndRecv(command, result)
+        return self.g_clients[boxID].sendAndRecv(Encoders.ForceControlInterrupt(rbtID), result)
 
     '''
     *	@index : 5
@@ -2043,10 +2094,7 @@ class CPSClient(object):
 
     def HRIF_ForceControlContinue(self, boxID, rbtID):
         result = []
-        command = 'GrpFCContinue,'
-        command += str(rbtID) + ','
-        command += ';'
-        return self.g_clients[boxID].sendAndRecv(command, result)
+        return self.g_clients[boxID].sendAndRecv(Encoders.ForceControlContinue(rbtID), result)
 
     '''
     *	@index : 6
@@ -2058,10 +2106,7 @@ class CPSClient(object):
 
     def HRIF_SetForceZero(self, boxID, rbtID):
         result = []
-        command = 'SetForceZero,'
-        command += str(rbtID) + ','
-        command += ';'
-        return self.g_clients[boxID].sendAndRecv(command, result)
+        return self.g_clients[boxID].sendAndRecv(Encoders.SetForceZero(rbtID), result)
 
     '''
     *	@index : 7
@@ -2075,11 +2120,7 @@ class CPSClient(object):
 
     def HRIF_SetMaxSearchVelocities(self, boxID, rbtID, MaxLinearVelocity, MaxAngularVelocity):
         result = []
-        command = 'HRSetMaxSearchVelocities,'
-        command += str(rbtID) + ','
-        command += str(MaxLinearVelocity) + ','
-        command += str(MaxAngularVelocity) + ','
-        command += ';'
+        command = Encoders.SetMaxSearchVelocities(rbtID, MaxLinearVelocity, MaxAngularVelocity)
         return self.g_clients[boxID].sendAndRecv(command, result)
 
     '''
@@ -2098,12 +2139,7 @@ class CPSClient(object):
 
     def HRIF_SetControlFreedom(self, boxID, rbtID, freedom):
         result = []
-        command = 'HRSetControlFreedom,'
-        command += str(rbtID) + ','
-        for i in range(0, 6):
-            command += str(freedom[i]) + ','
-        command += ';'
-        return self.g_clients[boxID].sendAndRecv(command, result)
+        return self.g_clients[boxID].sendAndRecv(Encoders.SetControlFreedom(rbtID, freedom), result)
 
     '''
     *	@index : 9
@@ -2116,11 +2152,7 @@ class CPSClient(object):
 
     def HRIF_SetForceControlStrategy(self, boxID, rbtID, strategy):
         result = []
-        command = 'HRSetForceControlStrategy,'
-        command += str(rbtID) + ','
-        command += str(strategy)
-        command += ',;'
-        return self.g_clients[boxID].sendAndRecv(command, result)
+        return self.g_clients[boxID].sendAndRecv(Encoders.SetForceControlStrategy(rbtID, strategy), result)
 
     '''
     *	@index : 10
@@ -2133,12 +2165,7 @@ class CPSClient(object):
 
     def HRIF_SetFreeDrivePositionAndOrientation(self, boxID, rbtID, position):
         result = []
-        command = 'SetFTPosition,'
-        command += str(rbtID) + ','
-        for i in range(0, 6):
-            command += str(position[i]) + ','
-        command += ';'
-        return self.g_clients[boxID].sendAndRecv(command, result)
+        return self.g_clients[boxID].sendAndRecv(Encoders.SetFreeDrivePositionAndOrientation(rbtID, position), result)
 
     '''
     *	@index : 11
@@ -2156,21 +2183,7 @@ class CPSClient(object):
 
     def HRIF_SetPIDControlParams(self, boxID, rbtID, fP, fI, fD, tP, tI, tD):
         result = []
-        command = 'HRSetPIDControlParams,'
-        command += str(rbtID) + ','
-        command += str(fP)
-        command += ','
-        command += str(fI)
-        command += ','
-        command += str(fD)
-        command += ','
-        command += str(tP)
-        command += ','
-        command += str(tI)
-        command += ','
-        command += str(tD)
-        command += ',;'
-        return self.g_clients[boxID].sendAndRecv(command, result)
+        return self.g_clients[boxID].sendAndRecv(Encoders.SetPIDControlParams(rbtID, fP, fI, fD, tP, tI, tD), result)
 
     '''
     *	@index : 12
@@ -2183,12 +2196,7 @@ class CPSClient(object):
 
     def HRIF_SetMassParams(self, boxID, rbtID, mass):
         result = []
-        command = 'HRSetMassParams,'
-        command += str(rbtID) + ','
-        for i in range(0, 6):
-            command += str(mass[i]) + ','
-        command += ';'
-        return self.g_clients[boxID].sendAndRecv(command, result)
+        return self.g_clients[boxID].sendAndRecv(Encoders.SetMassParams(rbtID, mass), result)
 
     '''
     *	@index : 13
@@ -2201,13 +2209,7 @@ class CPSClient(object):
 
     def HRIF_SetDampParams(self, boxID, rbtID, damp):
         result = []
-        command = 'HRSetDampParams,'
-        command += str(rbtID) + ','
-        for i in range(0, 6):
-            command += str(damp[i]) + ','
-        command += ';'
-        retData = self.g_clients[boxID].sendAndRecv(command, result)
-        return retData
+        return self.g_clients[boxID].sendAndRecv(Encoders.SetDampParams(rbtID, damp), result)
 
     '''
     *	@index : 14
@@ -2220,13 +2222,7 @@ class CPSClient(object):
 
     def HRIF_SetStiffParams(self, boxID, rbtID, stiff):
         result = []
-        command = 'HRSetStiffParams,'
-        command += str(rbtID) + ','
-        for i in range(0, 6):
-            command += str(stiff[i]) + ','
-        command += ';'
-        retData = self.g_clients[boxID].sendAndRecv(command, result)
-        return retData
+        return self.g_clients[boxID].sendAndRecv(Encoders.SetStiffParams(rbtID, stiff), result)
 
     '''
     *	@index : 15
@@ -2239,12 +2235,7 @@ class CPSClient(object):
 
     def HRIF_SetForceControlGoal(self, boxID, rbtID, forcegoal):
         result = []
-        command = 'HRSetControlGoal,'
-        command += str(rbtID) + ','
-        for i in range(0, 6):
-            command += str(forcegoal[i]) + ','
-        command += ';'
-        return self.g_clients[boxID].sendAndRecv(command, result)
+        return self.g_clients[boxID].sendAndRecv(Encoders.SetForceControlGoal(rbtID, forcegoal), result)
 
     '''
     *	@index : 16
@@ -2258,14 +2249,7 @@ class CPSClient(object):
 
     def HRIF_SetControlGoal(self, boxID, rbtID, forcegoal, distance):
         result = []
-        command = 'HRSetControlGoal,'
-        command += str(rbtID) + ','
-        for i in range(0, 6):
-            command += str(forcegoal[i]) + ','
-        for i in range(0, 6):
-            command += str(distance[i]) + ','
-        command += ';'
-        return self.g_clients[boxID].sendAndRecv(command, result)
+        return self.g_clients[boxID].sendAndRecv(Encoders.SetControlGoal(rbtID, forcegoal, distance), result)
 
     '''
     *	@index : 17
@@ -2279,14 +2263,7 @@ class CPSClient(object):
 
     def HRIF_SetForceDataLimit(self, boxID, rbtID, max, min):
         result = []
-        command = 'HRSetForceDataLimit,'
-        command += str(rbtID) + ','
-        for i in range(0, 6):
-            command += str(max[i]) + ','
-        for i in range(0, 6):
-            command += str(min[i]) + ','
-        command += ';'
-        return self.g_clients[boxID].sendAndRecv(command, result)
+        return self.g_clients[boxID].sendAndRecv(Encoders.SetForceDataLimit(rbtID, max, min), result)
 
     '''
     *	@index : 18
@@ -2300,11 +2277,7 @@ class CPSClient(object):
 
     def HRIF_SetForceDistanceLimit(self, boxID, rbtID, allowDistance, strengthLevel):
         result = []
-        command = 'HRSetForceDistanceLimit,'
-        command += str(rbtID) + ','
-        command += str(allowDistance) + ','
-        command += str(strengthLevel) + ','
-        command += ';'
+        command = Encoders.SetForceDistanceLimit(rbtID, allowDistance, strengthLevel)
         return self.g_clients[boxID].sendAndRecv(command, result)
 
     '''
@@ -2318,13 +2291,10 @@ class CPSClient(object):
 
     def HRIF_SetForceFreeDriveMode(self, boxID, rbtID, state):
         result = []
-        command = ''
         if state == 0:
-            command = 'GrpCloseFreeDriver,'
+            command = Encoders.GrpCloseFreeDriver(rbtID)
         else:
-            command = 'GrpOpenFreeDriver,'
-        command += str(rbtID) + ','
-        command += ';'
+            command = Encoders.GrpOpenFreeDriver(rbtID)
         return self.g_clients[boxID].sendAndRecv(command, result)
 
     '''
@@ -2342,10 +2312,7 @@ class CPSClient(object):
     '''
 
     def HRIF_ReadFTCabData(self, boxID, rbtID, result):
-        command = 'ReadFTCabData,'
-        command += str(rbtID) + ','
-        command += ';'
-        return self.g_clients[boxID].sendAndRecv(command, result)
+        return self.g_clients[boxID].sendAndRecv(Encoders.ReadFTCabData(rbtID), result)
 
     '''
     *	@index : 21
@@ -2362,10 +2329,7 @@ class CPSClient(object):
     '''
 
     def HRIF_ReadFTData(self, boxID, rbtID, result):
-        command = 'ReadForceData,'
-        command += str(rbtID) + ','
-        command += ';'
-        return self.g_clients[boxID].sendAndRecv(command, result)
+        return self.g_clients[boxID].sendAndRecv(Encoders.ReadFTData(rbtID), result)
 
     '''
     *	@index : 22
@@ -2380,13 +2344,7 @@ class CPSClient(object):
 
     def HRIF_SetTangentForceBounds(self, boxID, rbtID, Max, Min, Vel):
         result = []
-        command = 'SetTangentForceBounds,'
-        command += str(rbtID) + ','
-        command += str(Max) + ','
-        command += str(Min) + ','
-        command += str(Vel) + ','
-        command += ';'
-        return self.g_clients[boxID].sendAndRecv(command, result)
+        return self.g_clients[boxID].sendAndRecv(Encoders.SetTangentForceBounds(rbtID, Max, Min, Vel), result)
 
     '''
     *	@index : 
@@ -2412,32 +2370,12 @@ class CPSClient(object):
     def HRIF_SetScriptForceControlState(self, boxID, rbtID, state, FTMode, UCS, vel, forces, freedom, PID, Mass, Damp,
                                         Stiff):
         result = []
-        command = 'SetScriptForceControlState,'
-        command += str(rbtID) + ','
-        command += str(state) + ','
-        command += str(FTMode) + ','
-        command += str(UCS) + ','
-        for i in range(0, 2):
-            command += str(vel[i]) + ','
-        for i in range(0, 6):
-            command += str(forces[i]) + ','
-        for i in range(0, 6):
-            command += str(freedom[i]) + ','
-        for i in range(0, 6):
-            command += str(PID[i]) + ','
-        for i in range(0, 6):
-            command += str(Mass[i]) + ','
-        for i in range(0, 6):
-            command += str(Damp[i]) + ','
-        for i in range(0, 6):
-            command += str(Stiff[i]) + ','
-        command += ';'
+        command = Encoders.SetScriptForceControlState(rbtID, state, FTMode, UCS, vel, forces, freedom, PID, Mass, Damp,
+                                                      Stiff)
         retData = self.g_clients[boxID].sendAndRecv(command, result)
         if retData == 0:
+            command = Encoders.ReadForceControlState(rbtID)
             while True:
-                command = 'ReadFTControlState,'
-                command += str(rbtID) + ','
-                command += ';'
                 retData = self.g_clients[boxID].sendAndRecv(command, result)
                 if state == 1:
                     if int(result[0]) == 2:
@@ -2465,12 +2403,7 @@ class CPSClient(object):
 
     def HRIF_ShortJogJ(self, boxID, rbtID, axisId, derection):
         result = []
-        command = 'ShortJogJ,'
-        command += str(rbtID) + ','
-        command += str(axisId) + ','
-        command += str(derection) + ','
-        command += ';'
-        return self.g_clients[boxID].sendAndRecv(command, result)
+        return self.g_clients[boxID].sendAndRecv(Encoders.ShortJogJ(rbtID, axisId, derection), result)
 
     '''
     *	@index : 2
@@ -2484,12 +2417,7 @@ class CPSClient(object):
 
     def HRIF_ShortJogL(self, boxID, rbtID, pcsId, derection):
         result = []
-        command = 'ShortJogL,'
-        command += str(rbtID) + ','
-        command += str(pcsId) + ','
-        command += str(derection) + ','
-        command += ';'
-        return self.g_clients[boxID].sendAndRecv(command, result)
+        return self.g_clients[boxID].sendAndRecv(Encoders.ShortJogL(rbtID, pcsId, derection), result)
 
     '''
     *	@index : 3
@@ -2504,13 +2432,7 @@ class CPSClient(object):
 
     def HRIF_LongJogJ(self, boxID, rbtID, axisId, derection, state):
         result = []
-        command = 'LongJogJ,'
-        command += str(rbtID) + ','
-        command += str(axisId) + ','
-        command += str(derection) + ','
-        command += str(state) + ','
-        command += ';'
-        return self.g_clients[boxID].sendAndRecv(command, result)
+        return self.g_clients[boxID].sendAndRecv(Encoders.LongJogJ(rbtID, axisId, derection, state), result)
 
     '''
     *	@index : 4
@@ -2525,13 +2447,7 @@ class CPSClient(object):
 
     def HRIF_LongJogL(self, boxID, rbtID, pcsId, derection, state):
         result = []
-        command = 'LongJogL,'
-        command += str(rbtID) + ','
-        command += str(pcsId) + ','
-        command += str(derection) + ','
-        command += str(state) + ','
-        command += ';'
-        return self.g_clients[boxID].sendAndRecv(command, result)
+        return self.g_clients[boxID].sendAndRecv(Encoders.LongJogL(rbtID, pcsId, derection, state), result)
 
     ''' 
     *	@index : 5
@@ -2543,10 +2459,7 @@ class CPSClient(object):
 
     def HRIF_LongMoveEvent(self, boxID, rbtID):
         result = []
-        command = 'LongMoveEvent,'
-        command += str(rbtID) + ','
-        command += ';'
-        return self.g_clients[boxID].sendAndRecv(command, result)
+        return self.g_clients[boxID].sendAndRecv(Encoders.LongMoveEvent(rbtID), result)
 
     ''' 
     *	@index : 6
@@ -2604,26 +2517,8 @@ class CPSClient(object):
     def HRIF_WayPointEx(self, boxID, rbtID, type, points, RawACSpoints, tcp, ucs, speed, acc, radius, isJoint, isSeek,
                         bit, state, cmdID):
         result = []
-        command = 'WayPointEx,'
-        command += str(rbtID) + ','
-        for i in range(0, 6):
-            command += str(points[i]) + ','
-        for i in range(0, 6):
-            command += str(RawACSpoints[i]) + ','
-        for i in range(0, 6):
-            command += str(ucs[i]) + ','
-        for i in range(0, 6):
-            command += str(tcp[i]) + ','
-        command += str(speed) + ','
-        command += str(acc) + ','
-        command += str(radius) + ','
-        command += str(type) + ','
-        command += str(isJoint) + ','
-        command += str(isSeek) + ','
-        command += str(bit) + ','
-        command += str(state) + ','
-        command += cmdID + ','
-        command += ';'
+        command = Encoders.WayPointEx(rbtID, points, RawACSpoints, ucs, tcp, speed, acc, radius, type, isJoint, isSeek,
+                                      bit, state, cmdID)
         return self.g_clients[boxID].sendAndRecv(command, result)
 
     '''
@@ -2642,31 +2537,20 @@ class CPSClient(object):
     *	@param isJoint : 是否使用关节角度作为目标点,如果type==0,则isJoint有起作用
     *	@param isSeek,bit,state:探寻参数,当isSeek为1,则开启探寻,这时电箱的DO bit位为state时,就停止运动,否则运动到目标点再停止
     *	@param cmdID:当前路点ID,可以自定义,也可以按顺序设置为“1”,“2”,“3”
+    *	@param future: True时返回运动完成的MotionFuture(由telemetry()的快照驱动),而不是错误码
+    *	@param timeout: future的期限(s)
     *	@param return: 错误码
     '''
 
     def HRIF_WayPoint(self, boxID, rbtID, type, points, RawACSpoints, tcp, ucs, speed, Acc, radius, isJoint, isSeek,
-                      bit, state, cmdID):
+                      bit, state, cmdID, future=False, timeout=None):
         result = []
-        command = 'WayPoint,'
-        command += str(rbtID) + ','
-        for i in range(0, 6):
-            command += str(points[i]) + ','
-        for i in range(0, 6):
-            command += str(RawACSpoints[i]) + ','
-        command += str(tcp) + ','
-        command += str(ucs) + ','
-        command += str(speed) + ','
-        command += str(Acc) + ','
-        command += str(radius) + ','
-        command += str(type) + ','
-        command += str(isJoint) + ','
-        command += str(isSeek) + ','
-        command += str(bit) + ','
-        command += str(state) + ','
-        command += str(cmdID) + ','
-        command += ';'
-        return self.g_clients[boxID].sendAndRecv(command, result)
+        command = Encoders.WayPoint(rbtID, points, RawACSpoints, tcp, ucs, speed, Acc, radius, type, isJoint, isSeek,
+                                    bit, state, cmdID)
+        errorCode = self.g_clients[boxID].sendAndRecv(command, result)
+        if future:
+            return self.motionFuture(boxID, rbtID, errorCode, radius > 0, timeout)
+        return errorCode
 
     '''
     *	@index : 10
@@ -2695,26 +2579,8 @@ class CPSClient(object):
     def HRIF_WayPoint2(self, boxID, rbtID, EndPos, AuxPos, cmdID, Tcp, Ucs, Vel, Acc, Radius, type, isJoint, isSeek,
                        bit, state, AcsPos):
         result = []
-        command = 'WayPoint2,'
-        command += str(rbtID) + ','
-        for i in range(0, 6):
-            command += str(EndPos[i]) + ','
-        for i in range(0, 6):
-            command += str(AuxPos[i]) + ','
-        command += str(cmdID) + ','
-        command += str(Tcp) + ','
-        command += str(Ucs) + ','
-        command += str(Vel) + ','
-        command += str(Acc) + ','
-        command += str(Radius) + ','
-        command += str(type) + ','
-        command += str(isJoint) + ','
-        command += str(isSeek) + ','
-        command += str(bit) + ','
-        command += str(state) + ','
-        for i in range(0, 6):
-            command += str(AcsPos[i]) + ','
-        command += ';'
+        command = Encoders.WayPoint2(rbtID, EndPos, AuxPos, cmdID, Tcp, Ucs, Vel, Acc, Radius, type, isJoint, isSeek,
+                                     bit, state, AcsPos)
         return self.g_clients[boxID].sendAndRecv(command, result)
 
     '''
@@ -2732,31 +2598,20 @@ class CPSClient(object):
     *	@param isJoint : 是否使用关节角度作为目标点,如果type==0,则isJoint有起作用
     *	@param isSeek,bit,state:探寻参数,当isSeek为1,则开启探寻,这时电箱的DO bit位为state时,就停止运动,否则运动到目标点再停止
     *	@param cmdID:当前路点ID,可以自定义,也可以按顺序设置为“1”,“2”,“3”
+    *	@param future: True时返回运动完成的MotionFuture(由telemetry()的快照驱动),而不是错误码
+    *	@param timeout: future的期限(s)
     *	@param return: 错误码
     '''
 
     def HRIF_MoveJ(self, boxID, rbtID, points, RawACSpoints, tcp, ucs, speed, Acc, radius, isJoint, isSeek, bit, state,
-                   cmdID):
+                   cmdID, future=False, timeout=None):
         result = []
-        command = 'WayPoint,'
-        command += str(rbtID) + ','
-        for i in range(0, 6):
-            command += str(points[i]) + ','
-        for i in range(0, 6):
-            command += str(RawACSpoints[i]) + ','
-        command += str(tcp) + ','
-        command += str(ucs) + ','
-        command += str(speed) + ','
-        command += str(Acc) + ','
-        command += str(radius) + ','
-        command += '0,'
-        command += str(isJoint) + ','
-        command += str(isSeek) + ','
-        command += str(bit) + ','
-        command += str(state) + ','
-        command += str(cmdID) + ','
-        command += ';'
-        return self.g_clients[boxID].sendAndRecv(command, result)
+        command = Encoders.MoveJ(rbtID, points, RawACSpoints, tcp, ucs, speed, Acc, radius, isJoint, isSeek, bit, state,
+                                 cmdID)
+        errorCode = self.g_clients[boxID].sendAndRecv(command, result)
+        if future:
+            return self.motionFuture(boxID, rbtID, errorCode, radius > 0, timeout)
+        return errorCode
 
     '''
     *	@index : 12
@@ -2772,30 +2627,19 @@ class CPSClient(object):
     *	@param radius : 是过渡半径,单位毫米
     *	@param isSeek,bit,state:探寻参数,当isSeek为1,则开启探寻,这时电箱的DO bit位为state时,就停止运动,否则运动到目标点再停止
     *	@param cmdID:当前路点ID,可以自定义,也可以按顺序设置为“1”,“2”,“3”
+    *	@param future: True时返回运动完成的MotionFuture(由telemetry()的快照驱动),而不是错误码
+    *	@param timeout: future的期限(s)
     *	@param return: 错误码
     '''
 
-    def HRIF_MoveL(self, boxID, rbtID, points, RawACSpoints, tcp, ucs, speed, Acc, radius, isSeek, bit, state, cmdID):
+    def HRIF_MoveL(self, boxID, rbtID, points, RawACSpoints, tcp, ucs, speed, Acc, radius, isSeek, bit, state, cmdID,
+                   future=False, timeout=None):
         result = []
-        command = 'WayPoint,'
-        command += str(rbtID) + ','
-        for i in range(0, 6):
-            command += str(points[i]) + ','
-        for i in range(0, 6):
-            command += str(RawACSpoints[i]) + ','
-        command += str(tcp) + ','
-        command += str(ucs) + ','
-        command += str(speed) + ','
-        command += str(Acc) + ','
-        command += str(radius) + ','
-        command += '1,'
-        command += '0,'
-        command += str(isSeek) + ','
-        command += str(bit) + ','
-        command += str(state) + ','
-        command += str(cmdID) + ','
-        command += ';'
-        return self.g_clients[boxID].sendAndRecv(command, result)
+        command = Encoders.MoveL(rbtID, points, RawACSpoints, tcp, ucs, speed, Acc, radius, isSeek, bit, state, cmdID)
+        errorCode = self.g_clients[boxID].sendAndRecv(command, result)
+        if future:
+            return self.motionFuture(boxID, rbtID, errorCode, radius > 0, timeout)
+        return errorCode
 
     '''
     *	@index : 13
@@ -2821,24 +2665,8 @@ class CPSClient(object):
     def HRIF_MoveC(self, boxID, rbtID, StartPoint, AuxPoint, EndPoint, fixedPosure, nMoveCType, nRadLen, speed, Acc,
                    radius, tcp, ucs, cmdID):
         result = []
-        command = 'MoveC,'
-        command += str(rbtID) + ','
-        for i in range(0, 6):
-            command += str(StartPoint[i]) + ','
-        for i in range(0, 6):
-            command += str(AuxPoint[i]) + ','
-        for i in range(0, 6):
-            command += str(EndPoint[i]) + ','
-        command += str(fixedPosure) + ','
-        command += str(nMoveCType) + ','
-        command += str(nRadLen) + ','
-        command += str(speed) + ','
-        command += str(Acc) + ','
-        command += str(radius) + ','
-        command += str(tcp) + ','
-        command += str(ucs) + ','
-        command += str(cmdID) + ','
-        command += ';'
+        command = Encoders.MoveC(rbtID, StartPoint, AuxPoint, EndPoint, fixedPosure, nMoveCType, nRadLen, speed, Acc,
+                                 radius, tcp, ucs, cmdID)
         return self.g_clients[boxID].sendAndRecv(command, result)
 
     '''
@@ -2868,28 +2696,8 @@ class CPSClient(object):
     def HRIF_MoveZ(self, boxID, rbtID, StartPoint, EndPoint, PlanePoint, Speed, Acc, WIdth, Density, EnableDensity,
                    EnablePlane, EnableWaiTime, PosiTime, NegaTime, Radius, tcp, ucs, cmdID):
         result = []
-        command = 'MoveZ,'
-        command += str(rbtID) + ','
-        for i in range(0, 6):
-            command += str(StartPoint[i]) + ','
-        for i in range(0, 6):
-            command += str(EndPoint[i]) + ','
-        for i in range(0, 6):
-            command += str(PlanePoint[i]) + ','
-        command += str(Speed) + ','
-        command += str(Acc) + ','
-        command += str(WIdth) + ','
-        command += str(Density) + ','
-        command += str(EnableDensity) + ','
-        command += str(EnablePlane) + ','
-        command += str(EnableWaiTime) + ','
-        command += str(PosiTime) + ','
-        command += str(NegaTime) + ','
-        command += str(Radius) + ','
-        command += str(tcp) + ','
-        command += str(ucs) + ','
-        command += str(cmdID) + ','
-        command += ';'
+        command = Encoders.MoveZ(rbtID, StartPoint, EndPoint, PlanePoint, Speed, Acc, WIdth, Density, EnableDensity,
+                                 EnablePlane, EnableWaiTime, PosiTime, NegaTime, Radius, tcp, ucs, cmdID)
         return self.g_clients[boxID].sendAndRecv(command, result)
 
     '''
@@ -2917,28 +2725,8 @@ class CPSClient(object):
     def HRIF_MoveE(self, boxID, rbtID, dP1, dP2, dP3, dP4, dP5, nOrientMode, nMoveType, dArcLength, dVelocity, dAcc,
                    Radius, tcp, ucs, cmdID):
         result = []
-        command = 'MoveE,'
-        command += str(rbtID) + ','
-        for i in range(0, 6):
-            command += str(dP1[i]) + ','
-        for i in range(0, 6):
-            command += str(dP2[i]) + ','
-        for i in range(0, 6):
-            command += str(dP3[i]) + ','
-        for i in range(0, 6):
-            command += str(dP4[i]) + ','
-        for i in range(0, 6):
-            command += str(dP5[i]) + ','
-        command += str(nOrientMode) + ','
-        command += str(nMoveType) + ','
-        command += str(dArcLength) + ','
-        command += str(dVelocity) + ','
-        command += str(dAcc) + ','
-        command += str(Radius) + ','
-        command += str(tcp) + ','
-        command += str(ucs) + ','
-        command += str(cmdID) + ','
-        command += ';'
+        command = Encoders.MoveE(rbtID, dP1, dP2, dP3, dP4, dP5, nOrientMode, nMoveType, dArcLength, dVelocity, dAcc,
+                                 Radius, tcp, ucs, cmdID)
         return self.g_clients[boxID].sendAndRecv(command, result)
 
     '''
@@ -2960,17 +2748,8 @@ class CPSClient(object):
     def HRIF_MoveS(self, boxID, rbtID, dSpiralIncrement, dSpiralDiameter, dVelocity, dAcc, dRadius, sTcpName, sUcsName,
                    cmdID):
         result = []
-        command = 'MoveS,'
-        command += str(rbtID) + ','
-        command += str(dSpiralIncrement) + ','
-        command += str(dSpiralDiameter) + ','
-        command += str(dVelocity) + ','
-        command += str(dAcc) + ','
-        command += str(dRadius) + ','
-        command += str(sTcpName) + ','
-        command += str(sUcsName) + ','
-        command += str(cmdID) + ','
-        command += ';'
+        command = Encoders.MoveS(rbtID, dSpiralIncrement, dSpiralDiameter, dVelocity, dAcc, dRadius, sTcpName, sUcsName,
+                                 cmdID)
         return self.g_clients[boxID].sendAndRecv(command, result)
 
     '''
@@ -2985,13 +2764,7 @@ class CPSClient(object):
 
     def HRIF_MoveRelJ(self, boxID, rbtID, nAxis, nDirection, dDistance):
         result = []
-        command = 'MoveRelJ,'
-        command += str(rbtID) + ','
-        command += str(nAxis) + ','
-        command += str(nDirection) + ','
-        command += str(dDistance) + ','
-        command += ';'
-        return self.g_clients[boxID].sendAndRecv(command, result)
+        return self.g_clients[boxID].sendAndRecv(Encoders.MoveRelJ(rbtID, nAxis, nDirection, dDistance), result)
 
     '''
     *	@index : 18
@@ -3006,14 +2779,7 @@ class CPSClient(object):
 
     def HRIF_MoveRelL(self, boxID, rbtID, nAxis, nDirection, dDistance, nToolMotion):
         result = []
-        command = 'MoveRelL,'
-        command += str(rbtID) + ','
-        command += str(nAxis) + ','
-        command += str(nDirection) + ','
-        command += str(dDistance) + ','
-        command += str(nToolMotion) + ','
-        command += ';'
-        print(command)
+        command = Encoders.MoveRelL(rbtID, nAxis, nDirection, dDistance, nToolMotion)
         return self.g_clients[boxID].sendAndRecv(command, result)
 
     '''
@@ -3043,30 +2809,9 @@ class CPSClient(object):
     def HRIF_WayPointRel(self, boxID, rbtID, nType, nPointList, Pos, rawACT, nrelMoveType, nAxisMask, dTarget, sTcpName,
                          sUcsName, dVelocity, dAcc, dRadius, nIsUseJoint, nIsSeek, nIOBit, nIOState, strcmdID):
         result = []
-        command = 'WayPointRel,'
-        command += str(rbtID) + ','
-        command += str(nType) + ','
-        command += str(nPointList) + ','
-        for i in range(0, 6):
-            command += str(Pos[i]) + ','
-        for i in range(0, 6):
-            command += str(rawACT[i]) + ','
-        command += str(nrelMoveType) + ','
-        for i in range(0, 6):
-            command += str(nAxisMask[i]) + ','
-        for i in range(0, 6):
-            command += str(dTarget[i]) + ','
-        command += str(sTcpName) + ','
-        command += str(sUcsName) + ','
-        command += str(dVelocity) + ','
-        command += str(dAcc) + ','
-        command += str(dRadius) + ','
-        command += str(nIsUseJoint) + ','
-        command += str(nIsSeek) + ','
-        command += str(nIOBit) + ','
-        command += str(nIOState) + ','
-        command += str(strcmdID) + ',;'
-        print(command)
+        command = Encoders.WayPointRel(rbtID, nType, nPointList, Pos, rawACT, nrelMoveType, nAxisMask, dTarget,
+                                       sTcpName, sUcsName, dVelocity, dAcc, dRadius, nIsUseJoint, nIsSeek, nIOBit,
+                                       nIOState, strcmdID)
         return self.g_clients[boxID].sendAndRecv(command, result)
 
     # part 11 连续轨迹运动类控制指令
@@ -3085,13 +2830,7 @@ class CPSClient(object):
 
     def HRIF_StartPushMovePathJ(self, boxID, rbtID, trackName, speedRatio, radius):
         result = []
-        command = 'StartPushMovePath,'
-        command += str(rbtID) + ','
-        command += trackName + ','
-        command += str(speedRatio) + ','
-        command += str(radius) + ','
-        command += ';'
-        print(command)
+        command = Encoders.StartPushMovePathJ(rbtID, trackName, speedRatio, radius)
         return self.g_clients[boxID].sendAndRecv(command, result)
 
     '''
@@ -3106,14 +2845,7 @@ class CPSClient(object):
 
     def HRIF_PushMovePathJ(self, boxID, rbtID, trackName, paramsJ):
         result = []
-        command = 'PushMovePathJ,'
-        command += str(rbtID) + ','
-        command += trackName
-        command += ','
-        for i in range(0, 6):
-            command += str(paramsJ[i]) + ','
-        command += ';'
-        return self.g_clients[boxID].sendAndRecv(command, result)
+        return self.g_clients[boxID].sendAndRecv(Encoders.PushMovePathJ(rbtID, trackName, paramsJ), result)
 
     '''
     *	@index : 3
@@ -3127,11 +2859,7 @@ class CPSClient(object):
 
     def HRIF_EndPushMovePathJ(self, boxID, rbtID, trackName):
         result = []
-        command = 'EndPushMovePath,'
-        command += str(rbtID) + ','
-        command += trackName + ','
-        command += ';'
-        return self.g_clients[boxID].sendAndRecv(command, result)
+        return self.g_clients[boxID].sendAndRecv(Encoders.EndPushMovePathJ(rbtID, trackName), result)
 
     '''
     *	@index : 4
@@ -3144,11 +2872,7 @@ class CPSClient(object):
 
     def HRIF_MovePathJ(self, boxID, rbtID, trajectName):
         result = []
-        command = 'MovePath,'
-        command += str(rbtID) + ','
-        command += str(trajectName) + ','
-        command += ';'
-        return self.g_clients[boxID].sendAndRecv(command, result)
+        return self.g_clients[boxID].sendAndRecv(Encoders.MovePathJ(rbtID, trajectName), result)
 
     '''
     *	@index : 5
@@ -3167,12 +2891,7 @@ class CPSClient(object):
     '''
 
     def HRIF_ReadMovePathJState(self, boxID, rbtID, trackName, result):
-        command = 'ReadMovePathState,'
-        command += str(rbtID) + ','
-        command += trackName + ','
-        command += ';'
-        retData = self.g_clients[boxID].sendAndRecv(command, result)
-        return retData
+        return self.g_clients[boxID].sendAndRecv(Encoders.ReadMovePathJState(rbtID, trackName), result)
 
     '''
     *	@index : 6
@@ -3186,12 +2905,7 @@ class CPSClient(object):
 
     def HRIF_UpdateMovePathJName(self, boxID, rbtID, trackName, newName):
         result = []
-        command = 'UpdateMovePathName,'
-        command += str(rbtID) + ','
-        command += trackName + ','
-        command += newName + ','
-        command += ';'
-        return self.g_clients[boxID].sendAndRecv(command, result)
+        return self.g_clients[boxID].sendAndRecv(Encoders.UpdateMovePathJName(rbtID, trackName, newName), result)
 
     '''
     *	@index : 7
@@ -3204,11 +2918,7 @@ class CPSClient(object):
 
     def HRIF_DelMovePathJ(self, boxID, rbtID, trackName):
         result = []
-        command = 'DelMovePath,'
-        command += str(rbtID) + ','
-        command += trackName + ','
-        command += ';'
-        return self.g_clients[boxID].sendAndRecv(command, result)
+        return self.g_clients[boxID].sendAndRecv(Encoders.DelMovePathJ(rbtID, trackName), result)
 
     '''
     *	@index : 8
@@ -3222,10 +2932,7 @@ class CPSClient(object):
     '''
 
     def HRIF_ReadTrackProcess(self, boxID, rbtID, result):
-        command = 'ReadSoftMotionProgress,'
-        command += str(rbtID) + ','
-        command += ';'
-        return self.g_clients[boxID].sendAndRecv(command, result)
+        return self.g_clients[boxID].sendAndRecv(Encoders.ReadTrackProcess(rbtID), result)
 
     '''
     *	@index : 9
@@ -3243,16 +2950,7 @@ class CPSClient(object):
 
     def HRIF_InitMovePathL(self, boxID, rbtID, trackName, vel, acc, jerk, ucs, tcp):
         result = []
-        command = 'InitMovePathL,'
-        command += str(rbtID) + ','
-        command += trackName + ','
-        command += str(vel) + ','
-        command += str(acc) + ','
-        command += str(jerk) + ','
-        command += ucs + ','
-        command += tcp + ','
-        command += ';'
-        print(command)
+        command = Encoders.InitMovePathL(rbtID, trackName, vel, acc, jerk, ucs, tcp)
         return self.g_clients[boxID].sendAndRecv(command, result)
 
     '''
@@ -3267,13 +2965,7 @@ class CPSClient(object):
 
     def HRIF_PushMovePathL(self, boxID, rbtID, trackName, paramPcs):
         result = []
-        command = 'PushMovePathL,'
-        command += str(rbtID) + ','
-        command += trackName + ','
-        for i in range(0, 6):
-            command += str(paramPcs[i]) + ','
-        command += ';'
-        return self.g_clients[boxID].sendAndRecv(command, result)
+        return self.g_clients[boxID].sendAndRecv(Encoders.PushMovePathL(rbtID, trackName, paramPcs), result)
 
     '''
     *	@index : 11
@@ -3289,17 +2981,7 @@ class CPSClient(object):
 
     def HRIF_PushMovePaths(self, boxID, rbtID, trackName, moveType, pointsSize, points):
         result = []
-        command = 'PushMovePaths,'
-        command += str(rbtID) + ','
-        command += trackName
-        command += ','
-        command += str(moveType)
-        command += ','
-        command += str(pointsSize)
-        command += ','
-        for pos in points:
-            command += str(pos) + ','
-        command += ';'
+        command = Encoders.PushMovePaths(rbtID, trackName, moveType, pointsSize, points)
         return self.g_clients[boxID].sendAndRecv(command, result)
 
     '''
@@ -3313,11 +2995,7 @@ class CPSClient(object):
 
     def HRIF_MovePathL(self, boxID, rbtID, trackName):
         result = []
-        command = 'MovePathL,'
-        command += str(rbtID) + ','
-        command += trackName
-        command += ',;'
-        return self.g_clients[boxID].sendAndRecv(command, result)
+        return self.g_clients[boxID].sendAndRecv(Encoders.MovePathL(rbtID, trackName), result)
 
     '''
     *	@index : 13
@@ -3330,11 +3008,7 @@ class CPSClient(object):
 
     def HRIF_SetMovePathOverride(self, boxID, rbtID, MovePathOverride):
         result = []
-        command = 'SetMovePathOverride,'
-        command += str(rbtID) + ','
-        command += str(MovePathOverride)
-        command += ',;'
-        return self.g_clients[boxID].sendAndRecv(command, result)
+        return self.g_clients[boxID].sendAndRecv(Encoders.SetMovePathOverride(rbtID, MovePathOverride), result)
 
     #
     # part 12 Servo 运动类控制指令
@@ -3352,10 +3026,7 @@ class CPSClient(object):
 
     def HRIF_StartServo(self, boxID, rbtID, servoTime, lookaheadTime):
         result = []
-        command = 'StartServo,'
-        command += str(rbtID) + ','
-        command += str(servoTime) + ',' + str(lookaheadTime) + ',;'
-        return self.g_clients[boxID].sendAndRecv(command, result)
+        return self.g_clients[boxID].sendAndRecv(Encoders.StartServo(rbtID, servoTime, lookaheadTime), result)
 
     '''
     *	@index : 2
@@ -3368,12 +3039,7 @@ class CPSClient(object):
 
     def HRIF_PushServoJ(self, boxID, rbtID, dACS):
         result = []
-        command = 'PushServoJ,'
-        command += str(rbtID) + ','
-        for i in range(0, 6):
-            command += str(dACS[i]) + ','
-        command += ';'
-        return self.g_clients[boxID].sendAndRecv(command, result)
+        return self.g_clients[boxID].sendAndRecv(Encoders.PushServoJ(rbtID, dACS), result)
 
     '''
     *	@index : 3
@@ -3388,16 +3054,7 @@ class CPSClient(object):
 
     def HRIF_PushServoP(self, boxID, rbtID, pose, ucs, tcp):
         result = []
-        command = 'PushServoP,'
-        command += str(rbtID) + ','
-        for i in range(0, 6):
-            command += str(pose[i]) + ','
-        for i in range(0, 6):
-            command += str(ucs[i]) + ','
-        for i in range(0, 6):
-            command += str(tcp[i]) + ','
-        command += ';'
-        return self.g_clients[boxID].sendAndRecv(command, result)
+        return self.g_clients[boxID].sendAndRecv(Encoders.PushServoP(rbtID, pose, ucs, tcp), result)
 
     '''
     *	@index : 4
@@ -3409,10 +3066,7 @@ class CPSClient(object):
 
     def HRIF_InitServoEsJ(self, boxID, rbtID):
         result = []
-        command = 'InitServoEsJ,'
-        command += str(rbtID) + ','
-        command += ';'
-        return self.g_clients[boxID].sendAndRecv(command, result)
+        return self.g_clients[boxID].sendAndRecv(Encoders.InitServoEsJ(rbtID), result)
 
     '''
     *	@index : 5
@@ -3426,12 +3080,7 @@ class CPSClient(object):
 
     def HRIF_StartServoEsJ(self, boxID, rbtID, dServoTime, dLookaheadTime):
         result = []
-        command = 'StartServoEsJ,'
-        command += str(rbtID) + ','
-        command += str(dServoTime) + ','
-        command += str(dLookaheadTime) + ','
-        command += ';'
-        return self.g_clients[boxID].sendAndRecv(command, result)
+        return self.g_clients[boxID].sendAndRecv(Encoders.StartServoEsJ(rbtID, dServoTime, dLookaheadTime), result)
 
     '''
     *	@index : 6
@@ -3445,13 +3094,7 @@ class CPSClient(object):
 
     def HRIF_PushServoEsJ(self, boxID, rbtID, nPointSize, sPoints):
         result = []
-        command = 'PushServoEsJ,'
-        command += str(rbtID) + ','
-        command += str(nPointSize) + ','
-        for i in range(len(sPoints)):
-            command += str(sPoints[i]) + ','
-        command += ';'
-        return self.g_clients[boxID].sendAndRecv(command, result)
+        return self.g_clients[boxID].sendAndRecv(Encoders.PushServoEsJ(rbtID, nPointSize, sPoints), result)
 
     '''
     *	@index : 7
@@ -3463,10 +3106,7 @@ class CPSClient(object):
     '''
 
     def HRIF_ReadServoEsJState(self, boxID, rbtID, result):
-        command = 'ReadServoEsJState,'
-        command += str(rbtID) + ','
-        command += ';'
-        return self.g_clients[boxID].sendAndRecv(command, result)
+        return self.g_clients[boxID].sendAndRecv(Encoders.ReadServoEsJState(rbtID), result)
 
     #
     # part 13 相对跟踪运动类控制指令
@@ -3486,13 +3126,7 @@ class CPSClient(object):
 
     def HRIF_SetMoveTraceParams(self, boxID, rbtID, state, distance, dAwayVelocity, dGobackVelocity):
         result = []
-        command = 'SetMoveTraceParams,'
-        command += str(rbtID) + ','
-        command += str(state) + ','
-        command += str(distance) + ','
-        command += str(dAwayVelocity) + ','
-        command += str(dGobackVelocity) + ','
-        command += ';'
+        command = Encoders.SetMoveTraceParams(rbtID, state, distance, dAwayVelocity, dGobackVelocity)
         return self.g_clients[boxID].sendAndRecv(command, result)
 
     '''
@@ -3508,13 +3142,7 @@ class CPSClient(object):
 
     def HRIF_SetMoveTraceInitParams(self, boxID, rbtID, dK, dB, maxLimit, minLinit):
         result = []
-        command = 'SetMoveTraceInitParams,'
-        command += str(rbtID) + ','
-        command += str(dK) + ','
-        command += str(dB) + ','
-        command += str(maxLimit) + ','
-        command += str(minLinit) + ','
-        command += ';'
+        command = Encoders.SetMoveTraceInitParams(rbtID, dK, dB, maxLimit, minLinit)
         return self.g_clients[boxID].sendAndRecv(command, result)
 
     '''
@@ -3528,12 +3156,7 @@ class CPSClient(object):
 
     def HRIF_SetMoveTraceUcs(self, boxID, rbtID, direction):
         result = []
-        command = 'SetMoveTraceUcs,'
-        command += str(rbtID) + ','
-        for i in range(len(direction)):
-            command += str(direction[i]) + ','
-        command += ';'
-        return self.g_clients[boxID].sendAndRecv(command, result)
+        return self.g_clients[boxID].sendAndRecv(Encoders.SetMoveTraceUcs(rbtID, direction), result)
 
     '''
     *	@index : 4
@@ -3546,10 +3169,7 @@ class CPSClient(object):
 
     def HRIF_SetTrackingState(self, boxID, rbtID, state):
         result = []
-        command = 'SetTrackingState,'
-        command += str(rbtID) + ','
-        command += str(state) + ',;'
-        return self.g_clients[boxID].sendAndRecv(command, result)
+        return self.g_clients[boxID].sendAndRecv(Encoders.SetTrackingState(rbtID, state), result)
 
     #
     # part 14 其他指令
@@ -3565,13 +3185,7 @@ class CPSClient(object):
     '''
 
     def HRIF_HRAppCmd(self, boxID, name, cmd, param, result):
-        command = 'HRAppCmd,'
-        command += str(name) + ','
-        command += str(cmd) + ','
-        for i in range(len(param)):
-            command += str(param[i]) + ','
-        command += ';'
-        return self.g_clients[boxID].sendAndRecv(command, result)
+        return self.g_clients[boxID].sendAndRecv(Encoders.HRAppCmd(name, cmd, param), result)
 
     '''
     *	@index : 2
@@ -3588,17 +3202,9 @@ class CPSClient(object):
 
     def HRIF_WriteEndHoldingRegisters(self, boxID, rbtID, nSlaveID, nFunction, nRegAddr, nRegCount, data):
         result = []
-        command = 'WriteHoldingRegisters,'
-        command += str(rbtID) + ','
-        command += str(nSlaveID) + ','
-        command += str(nFunction) + ','
-        command += str(nRegAddr) + ','
-        command += str(nRegCount) + ','
         if nRegCount != len(data):
             return ['-1']
-        for i in range(nRegCount):
-            command += str(data[i]) + ','
-        command += ';'
+        command = Encoders.WriteEndHoldingRegisters(rbtID, nSlaveID, nFunction, nRegAddr, nRegCount, data)
         return self.g_clients[boxID].sendAndRecv(command, result)
 
     '''
@@ -3622,55 +3228,48 @@ class CPSClient(object):
     '''
 
     def HRIF_ReadEndHoldingRegisters(self, boxID, rbtID, nSlaveID, nFunction, nRegAddr, nRegCount, result):
-        command = 'ReadHoldingRegisters,'
-        command += str(rbtID) + ','
-        command += str(nSlaveID) + ','
-        command += str(nFunction) + ','
-        command += str(nRegAddr) + ','
-        command += str(nRegCount) + ',;'
-        retData = self.g_clients[boxID].sendAndRecv(command, result)
-        return retData
+        command = Encoders.ReadEndHoldingRegisters(rbtID, nSlaveID, nFunction, nRegAddr, nRegCount)
+        return self.g_clients[boxID].sendAndRecv(command, result)
 
     '''
     *	@index : 
-    *	@param brief:等待机器人运动停止
-    *	@param return: 错误码
+    *	@param brief:等待机器人运动停止,查询频率随预计完成时间调整
+                     状态机为 11 安全光幕处理, 12 安全光幕, 25 运动中, 26 长点动, 27 停止中, 32 暂停 时继续等待,
+                     进入错误或急停状态时结束,其余状态视为运动完成(分类见cps_wait.fsmState)
+    *	@param result: 最后读到的状态机状态
+    *	@param expected: 预计运动时间(s),None表示未知
+    *	@param timeout: 期限(s),None表示不限
+    *	@param return: 错误码: 0 运动完成; 39505 超时;
+                     39509 机器人报错(9,10 安全光幕错误, 17 EtherCAT错误, 20 超出安全空间, 21 碰撞停车, 22 机器人错误,
+                     24 去使能); 39510 急停或断电(2 电箱断开, 4,5 急停, 6,7 本体断电); 其余为读取状态的错误码
     '''
 
-    def waitMovementDone(self, boxID, rbtID, result):
-        while True:
-            command = 'ReadCurFSM,'
-            command += str(rbtID) + ','
-            command += ';'
+    def waitMovementDone(self, boxID, rbtID, result, expected=None, timeout=None):
+        command = Encoders.ReadCurFSM(rbtID)
+
+        def poll():
             retData = self.g_clients[boxID].sendAndRecv(command, result)
             if retData != 0:
-                return retData
-            if int(result[0]) == 25:
-                time.sleep(0.1)
-                continue
-            else:
-                break
-        return 0
+                return 'commError', retData, None
+            fsm = int(result[0])
+            return fsmState(fsm), 0, fsm
+
+        ret = self.waitEngine.wait(poll, expected, timeout, 0.0)
+        if ret.reason == 'timeout':
+            return 39505
+        if ret.reason == 'error':
+            return 39509
+        if ret.reason == 'estop':
+            return 39510
+        return ret.errorCode
 
     # sendVarValue
     # No output 
 
     def cdsSetIO(self, boxID, nEndDOMask, nEndDOVal, nBoxDOMask, nBoxDOVal, nBoxCOMask, nBoxCOVal, nBoxAOCH0_Mask,
                  nBoxAOCH0_Mode, nBoxAOCH1_Mask, nBoxAOCH1_Mode, dbBoxAOCH0_Val, dbBoxAOCH1_Val, result):
-        command = 'cdsSetIO,'
-        command += str(nEndDOMask) + ','
-        command += str(nEndDOVal) + ','
-        command += str(nBoxDOMask) + ','
-        command += str(nBoxDOVal) + ','
-        command += str(nBoxCOMask) + ','
-        command += str(nBoxCOVal) + ','
-        command += str(nBoxAOCH0_Mask) + ','
-        command += str(nBoxAOCH0_Mode) + ','
-        command += str(nBoxAOCH1_Mask) + ','
-        command += str(nBoxAOCH1_Mode) + ','
-        command += str(dbBoxAOCH0_Val) + ','
-        command += str(dbBoxAOCH1_Val) + ','
-        command += ';'
+        command = Encoders.cdsSetIO(nEndDOMask, nEndDOVal, nBoxDOMask, nBoxDOVal, nBoxCOMask, nBoxCOVal, nBoxAOCH0_Mask,
+                                    nBoxAOCH0_Mode, nBoxAOCH1_Mask, nBoxAOCH1_Mode, dbBoxAOCH0_Val, dbBoxAOCH1_Val)
         return self.g_clients[boxID].sendAndRecv(command, result)
 
 
@@ -0,0 +1,79 @@
+#!/usr/bin/env python
+# _*_ coding:utf-8 _*_
+# 多线程共用一个CPSClient与每个线程独立CPSClient的对比测试,并检查应答是否错位
+# 每个线程交替调用 HRIF_ReadActPos 与 HRIF_PushServoJ
+# 用法: python bench_contention.py [--threads 1,2,4,8] [--calls 500] [--latency 0.0005]
+
+import argparse
+import threading
+import time
+
+from CPS import CPSClient
+from cps_sim import CPSSimulator
+
+ACS = [0.0, 0.0, 90.0, 0.0, 90.0, 0.0]
+
+
+def worker(cps, calls, samples, errors):
+    for i in range(calls):
+        result = []
+        t0 = time.perf_counter()
+        if i % 2 == 0:
+            ret = cps.HRIF_ReadActPos(0, 0, result)
+            # 应答错位时字段数不对或收到了别的命令的应答
+            if ret != 0 or len(result) != 24:
+                errors.append(i)
+        else:
+            if cps.HRIF_PushServoJ(0, 0, ACS) != 0:
+                errors.append(i)
+        samples.append(time.perf_counter() - t0)
+
+
+def run(port, nThreads, calls, shared):
+    clients = []
+    for i in range(1 if shared else nThreads):
+        cps = CPSClient()
+        cps.HRIF_Connect(0, '127.0.0.1', port)
+        clients.append(cps)
+    samples = []
+    errors = []
+    threads = [threading.Thread(target=worker, args=(clients[i % len(clients)], calls, samples, errors))
+               for i in range(nThreads)]
+    start = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    total = time.perf_counter() - start
+    for cps in clients:
+        cps.HRIF_DisConnect(0)
+    samples.sort()
+    return {
+        'connections': len(clients),
+        'cmds_per_s': len(samples) / total,
+        'p50_us': samples[len(samples) // 2] * 1e6,
+        'p99_us': samples[int(len(samples) * 0.99)] * 1e6,
+        'errors': len(errors),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--threads', default='1,2,4,8')
+    parser.add_argument('--calls', type=int, default=500, help='每个线程的调用次数')
+    parser.add_argument('--latency', type=float, default=0.0005, help='模拟器每批数据的固定延迟(s)')
+    args = parser.parse_args()
+
+    print('%-8s %-10s %6s %12s %10s %10s %7s' % ('threads', 'client', 'conns', 'cmds/s', 'p50(us)', 'p99(us)',
+                                                'errors'))
+    with CPSSimulator(port=0, rpcPort=None, latency=args.latency) as sim:
+        for nThreads in [int(n) for n in args.threads.split(',')]:
+            for shared in (True, False):
+                r = run(sim.port, nThreads, args.calls, shared)
+                print('%-8d %-10s %6d %12.0f %10.1f %10.1f %7d' % (
+                    nThreads, 'shared' if shared else 'per-thread', r['connections'], r['cmds_per_s'],
+                    r['p50_us'], r['p99_us'], r['errors']))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,154 @@
+#!/usr/bin/env python
+# _*_ coding:utf-8 _*_
+# CPS客户端往返延迟与吞吐测试,默认在进程内启动 cps_sim 模拟器
+# 用法: python bench_cps.py [--iterations 2000] [--latency 0.0005] [--jitter 0.0002]
+#                          [--output result.json] [--compare old.json]
+#       连接已有的控制器或模拟器: python bench_cps.py --host 192.168.0.10 --port 10003
+
+import argparse
+import json
+import platform
+import subprocess
+import time
+
+from CPS import CPSClient
+from cps_sim import CPSSimulator
+
+ACS = [0.0, 0.0, 90.0, 0.0, 90.0, 0.0]
+PCS = [420.0, 0.0, 380.0, 180.0, 0.0, 180.0]
+ZERO = [0.0] * 6
+
+
+def pathPoints(size):
+    points = []
+    for i in range(size):
+        points += [ACS[0] + 0.01 * i, ACS[1], ACS[2], ACS[3], ACS[4], ACS[5]]
+    return points
+
+
+def benchCases():
+    '''
+    *	@param brief:测试用例 (名称, 调用函数),调用函数参数为 (cps, boxID, rbtID),返回错误码
+    '''
+    cases = [
+        ('ReadRobotState', lambda cps, boxID, rbtID: cps.HRIF_ReadRobotState(boxID, rbtID, [])),
+        ('ReadActPos', lambda cps, boxID, rbtID: cps.HRIF_ReadActPos(boxID, rbtID, [])),
+        ('PushServoJ', lambda cps, boxID, rbtID: cps.HRIF_PushServoJ(boxID, rbtID, ACS)),
+        ('SetBoxDO', lambda cps, boxID, rbtID: cps.HRIF_SetBoxDO(boxID, 0, 0)),
+        ('GetInverseKin', lambda cps, boxID, rbtID: cps.HRIF_GetInverseKin(boxID, rbtID, PCS, ACS, ZERO, ZERO, [])),
+        ('ReadSnapshot', lambda cps, boxID, rbtID: cps.HRIF_ReadSnapshot(boxID, rbtID).errorCode),
+    ]
+    for size in (10, 100, 1000):
+        points = pathPoints(size)
+        cases.append(('PushMovePaths[%d]' % size,
+                      lambda cps, boxID, rbtID, size=size, points=points:
+                      cps.HRIF_PushMovePaths(boxID, rbtID, 'bench', 0, size, points)))
+    return cases
+
+
+def percentile(sortedValues, p):
+    # 最近秩法
+    index = int(round(p / 100.0 * (len(sortedValues) - 1)))
+    return sortedValues[index]
+
+
+def runCase(cps, func, iterations, warmup):
+    for i in range(warmup):
+        func(cps, 0, 0)
+    samples = []
+    errors = 0
+    start = time.perf_counter()
+    for i in range(iterations):
+        t0 = time.perf_counter()
+        if func(cps, 0, 0) != 0:
+            errors += 1
+        samples.append(time.perf_counter() - t0)
+    total = time.perf_counter() - start
+    samples.sort()
+    return {
+        'iterations': iterations,
+        'errors': errors,
+        'p50_us': percentile(samples, 50) * 1e6,
+        'p95_us': percentile(samples, 95) * 1e6,
+        'p99_us': percentile(samples, 99) * 1e6,
+        'max_us': samples[-1] * 1e6,
+        'mean_us': total / iterations * 1e6,
+        'cmds_per_s': iterations / total,
+    }
+
+
+def gitRevision():
+    try:
+        return subprocess.check_output(['git', 'rev-parse', '--short', 'HEAD'],
+                                       stderr=subprocess.DEVNULL).decode().strip()
+    except (OSError, subprocess.CalledProcessError):
+        return ''
+
+
+def printResults(results, baseline=None):
+    header = '%-20s %10s %10s %10s %12s' % ('command', 'p50(us)', 'p95(us)', 'p99(us)', 'cmds/s')
+    if baseline is not None:
+        header += ' %10s' % 'p50 delta'
+    print(header)
+    for name, r in results.items():
+        line = '%-20s %10.1f %10.1f %10.1f %12.0f' % (name, r['p50_us'], r['p95_us'], r['p99_us'], r['cmds_per_s'])
+        if baseline is not None and name in baseline:
+            line += ' %+9.1f%%' % ((r['p50_us'] / baseline[name]['p50_us'] - 1) * 100)
+        if r['errors']:
+            line += '  errors=%d' % r['errors']
+        print(line)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--iterations', type=int, default=2000)
+    parser.add_argument('--warmup', type=int, default=100)
+    parser.add_argument('--host', default=None, help='不指定时在进程内启动模拟器')
+    parser.add_argument('--port', type=int, default=10003)
+    parser.add_argument('--latency', type=float, default=0.0, help='模拟器每批数据的固定延迟(s)')
+    parser.add_argument('--jitter', type=float, default=0.0, help='模拟器随机延迟上限(s)')
+    parser.add_argument('--filter', default='', help='只运行名称包含该字符串的用例')
+    parser.add_argument('--output', default=None, help='结果保存为JSON')
+    parser.add_argument('--compare', default=None, help='与之前保存的JSON结果对比')
+    args = parser.parse_args()
+
+    sim = None
+    host, port = args.host, args.port
+    if host is None:
+        sim = CPSSimulator(port=0, rpcPort=None, latency=args.latency, jitter=args.jitter)
+        host, port = '127.0.0.1', sim.start()
+
+    cps = CPSClient()
+    if cps.HRIF_Connect(0, host, port) != 0:
+        raise SystemExit('connect %s:%d failed' % (host, port))
+    results = {}
+    for name, func in benchCases():
+        if args.filter in name:
+            results[name] = runCase(cps, func, args.iterations, args.warmup)
+    cps.HRIF_DisConnect(0)
+    if sim is not None:
+        sim.stop()
+
+    baseline = None
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)['results']
+    printResults(results, baseline)
+
+    if args.output:
+        report = {
+            'revision': gitRevision(),
+            'time': time.strftime('%Y-%m-%d %H:%M:%S'),
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'server': 'cps_sim' if sim is not None else '%s:%d' % (host, port),
+            'latency': args.latency,
+            'jitter': args.jitter,
+            'results': results,
+        }
+        with open(args.output, 'w') as f:
+            json.dump(report, f, indent=2)
+
+
+if __name__ == '__main__':
+    main()
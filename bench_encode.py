@@ -0,0 +1,104 @@
+#!/usr/bin/env python
+# _*_ coding:utf-8 _*_
+# 指令编码耗时对比: 原先逐个字段字符串拼接 与 cps_codec 预编译编码函数
+# 用法: python bench_encode.py [--number 100000]
+
+import argparse
+import timeit
+
+from cps_codec import Encoders
+
+
+def legacyReadActPos(rbtID):
+    command = 'ReadActPos,'
+    command += str(rbtID) + ','
+    command += ';'
+    return command.encode()
+
+
+def legacyPushServoJ(rbtID, dACS):
+    command = 'PushServoJ,'
+    command += str(rbtID) + ','
+    for i in range(0, 6):
+        command += str(dACS[i]) + ','
+    command += ';'
+    return command.encode()
+
+
+def legacyPushServoP(rbtID, pose, ucs, tcp):
+    command = 'PushServoP,'
+    command += str(rbtID) + ','
+    for i in range(0, 6):
+        command += str(pose[i]) + ','
+    for i in range(0, 6):
+        command += str(ucs[i]) + ','
+    for i in range(0, 6):
+        command += str(tcp[i]) + ','
+    command += ';'
+    return command.encode()
+
+
+def legacyMoveL(rbtID, points, RawACSpoints, tcp, ucs, speed, Acc, radius, isSeek, bit, state, cmdID):
+    command = 'WayPoint,'
+    command += str(rbtID) + ','
+    for i in range(0, 6):
+        command += str(points[i]) + ','
+    for i in range(0, 6):
+        command += str(RawACSpoints[i]) + ','
+    command += str(tcp) + ','
+    command += str(ucs) + ','
+    command += str(speed) + ','
+    command += str(Acc) + ','
+    command += str(radius) + ','
+    command += '1,'
+    command += '0,'
+    command += str(isSeek) + ','
+    command += str(bit) + ','
+    command += str(state) + ','
+    command += str(cmdID) + ','
+    command += ';'
+    return command.encode()
+
+
+def legacyPushMovePaths(rbtID, trackName, moveType, pointsSize, points):
+    command = 'PushMovePaths,'
+    command += str(rbtID) + ','
+    command += str(trackName) + ','
+    command += str(moveType) + ','
+    command += str(pointsSize) + ','
+    for pos in points:
+        command += str(pos) + ','
+    command += ';'
+    return command.encode()
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--number', type=int, default=100000)
+    args = parser.parse_args()
+
+    acs = [12.5, -30.25, 90.0, 0.125, 45.5, -180.0]
+    pcs = [420.5, -12.75, 380.0, 180.0, 0.0, -90.0]
+    zero = [0.0] * 6
+    path = [0.001 * i for i in range(600)]
+    cases = [
+        ('ReadActPos', lambda: legacyReadActPos(0), lambda: Encoders.ReadActPos(0)),
+        ('PushServoJ', lambda: legacyPushServoJ(0, acs), lambda: Encoders.PushServoJ(0, acs)),
+        ('PushServoP', lambda: legacyPushServoP(0, pcs, zero, zero), lambda: Encoders.PushServoP(0, pcs, zero, zero)),
+        ('MoveL', lambda: legacyMoveL(0, pcs, acs, 'TCP', 'Base', 100, 500, 0, 0, 0, 0, 'ID0'),
+         lambda: Encoders.MoveL(0, pcs, acs, 'TCP', 'Base', 100, 500, 0, 0, 0, 0, 'ID0')),
+        ('PushMovePaths x100', lambda: legacyPushMovePaths(0, 'track', 0, 100, path),
+         lambda: Encoders.PushMovePaths(0, 'track', 0, 100, path)),
+    ]
+
+    print('%-20s %12s %12s %8s' % ('command', 'concat(us)', 'encoder(us)', 'speedup'))
+    for name, legacy, encoder in cases:
+        assert legacy() == encoder()
+        number = args.number if 'x100' not in name else max(1, args.number // 100)
+        tLegacy = min(timeit.repeat(legacy, number=number, repeat=3)) / number
+        tEncoder = min(timeit.repeat(encoder, number=number, repeat=3)) / number
+        print('%-20s %12.3f %12.3f %7.2fx' % (name, tLegacy * 1e6, tEncoder * 1e6, tLegacy / tEncoder))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,69 @@
+#!/usr/bin/env python
+# _*_ coding:utf-8 _*_
+# 正解/逆解缓存(CPSClient.enableKinCache)的对比测试
+# 示教再现场景: 同一组示教点反复求逆解与正解,比较关闭与开启缓存时每次调用的耗时,
+# 并验证HRIF_SetTCP后缓存被清空,之后的结果重新由控制器计算
+# 用法: python bench_kincache.py [--points 200] [--rounds 10] [--latency 0.001]
+
+import argparse
+import time
+
+from CPS import CPSClient
+from cps_kinematics import forwardKin, randomJoints, nominalModel
+from cps_sim import CPSSimulator
+
+TCP = [0.0, 0.0, 120.0, 0.0, 0.0, 0.0]
+UCS = [0.0] * 6
+
+
+def repeat(cps, joints, poses, rounds):
+    count = 0
+    start = time.perf_counter()
+    for r in range(rounds):
+        for i in range(len(joints)):
+            result = []
+            cps.HRIF_GetInverseKin(0, 0, poses[i], joints[i], TCP, UCS, result)
+            cps.HRIF_GetForwardKin(0, 0, joints[i], TCP, UCS, result)
+            count += 2
+    return (time.perf_counter() - start) / count
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--points', type=int, default=200)
+    parser.add_argument('--rounds', type=int, default=10)
+    parser.add_argument('--latency', type=float, default=0.001)
+    args = parser.parse_args()
+
+    joints = randomJoints(args.points, limit=120.0, seed=0)
+    poses = [[round(v, 3) for v in pose] for pose in forwardKin(joints, nominalModel('Elfin05'), TCP, UCS).tolist()]
+    joints = [[round(v, 3) for v in joint] for joint in joints.tolist()]
+    with CPSSimulator(port=0, rpcPort=None, latency=args.latency) as sim:
+        cps = CPSClient()
+        cps.HRIF_Connect(0, '127.0.0.1', sim.port)
+        plain = repeat(cps, joints, poses, args.rounds)
+
+        cps.enableKinCache(capacity=4 * args.points)
+        cached = repeat(cps, joints, poses, args.rounds)
+        stats = cps.kinCacheStats(reset=True)
+
+        before, after = [], []
+        cps.HRIF_GetForwardKin(0, 0, joints[0], TCP, UCS, before)
+        cps.HRIF_SetTCP(0, 0, TCP)
+        size = cps.kinCacheStats()['size']
+        cps.HRIF_GetForwardKin(0, 0, joints[0], TCP, UCS, after)
+        afterStats = cps.kinCacheStats()
+        cps.HRIF_DisConnect(0)
+
+    print('%d points x %d rounds, latency %.1f ms' % (args.points, args.rounds, args.latency * 1e3))
+    print('%-12s %12s' % ('cache', 'us/call'))
+    print('%-12s %12.1f' % ('off', plain * 1e6))
+    print('%-12s %12.1f' % ('on', cached * 1e6))
+    print('hits %d, misses %d, hit rate %.3f, evictions %d, size %d'
+          % (stats['hits'], stats['misses'], stats['hitRate'], stats['evictions'], stats['size']))
+    print('after HRIF_SetTCP: size %d, next call miss %s, same result %s'
+          % (size, afterStats['misses'] == 1, before == after))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,114 @@
+#!/usr/bin/env python
+# _*_ coding:utf-8 _*_
+# 本地正解/逆解(cps_kinematics.forwardKin/inverseKin)的性能与核对
+# 1. 同样N组关节角: 逐个调用HRIF_GetForwardKin,经pipeline批量调用,本地一次向量化计算
+# 2. crossCheck比较本地与控制器的结果
+# 3. 逆解同上,参考关节角在目标关节角上加随机偏差,crossCheckInverse检验选解是否一致
+# 不指定--host时连接本地模拟器,模拟器的正解与逆解即cps_kinematics的名义参数,核对结果必然一致,只验证流程;
+# 连接真实控制器时应先用registerModel登记该型号的实际参数,核对的是登记的参数;
+# 未登记时退回名义参数并给出提示,此时的误差只说明名义参数与控制器的差别
+# 用法: python bench_kinematics.py [--host 192.168.0.10] [--port 10003] [-n 1000]
+
+import argparse
+import time
+
+import numpy as np
+
+from CPS import CPSClient
+from cps_kinematics import forwardKin, inverseKin, randomJoints, crossCheck, crossCheckInverse, readModel, \
+    nominalModel
+from cps_sim import CPSSimulator
+
+TCP = [0.0, 0.0, 120.0, 0.0, 0.0, 0.0]
+UCS = [300.0, -200.0, 50.0, 0.0, 0.0, 90.0]
+
+
+def run(cps, n):
+    joints = randomJoints(n, seed=0)
+    nRet, model = readModel(cps, 0, 0)
+    if nRet == 39501:
+        name = []
+        cps.HRIF_ReadRobotModel(0, 0, name)
+        try:
+            model = nominalModel(name[0] if name else '')
+        except ValueError as e:
+            print(e)
+            return
+        print('model %s is not registered, using uncalibrated nominal parameters' % model.name)
+    elif nRet != 0:
+        print('read robot model failed: %d' % nRet)
+        return
+    print('model: %s' % (model,))
+
+    start = time.perf_counter()
+    for j in joints[:min(n, 200)]:
+        cps.HRIF_GetForwardKin(0, 0, j.tolist(), TCP, UCS, [])
+    single = (time.perf_counter() - start) / min(n, 200)
+
+    start = time.perf_counter()
+    check = crossCheck(cps, 0, 0, joints, model, TCP, UCS)
+    piped = (time.perf_counter() - start) / n
+
+    start = time.perf_counter()
+    forwardKin(joints, model, TCP, UCS)
+    local = (time.perf_counter() - start) / n
+
+    print('%-24s %12s' % ('method', 'us/pose'))
+    print('%-24s %12.1f' % ('HRIF_GetForwardKin', single * 1e6))
+    print('%-24s %12.1f' % ('pipeline', piped * 1e6))
+    print('%-24s %12.3f' % ('forwardKin (N=%d)' % n, local * 1e6))
+    if check.errorCode != 0:
+        print('cross check failed: %d' % check.errorCode)
+    else:
+        print('cross check: max position error %.4f mm, max rotation error %.4f deg, %s'
+              % (check.maxPosError, check.maxRotError, 'ok' if check.ok else 'MISMATCH'))
+
+    ref = joints + np.random.default_rng(1).normal(0.0, 5.0, joints.shape)
+    poses = forwardKin(joints, model, TCP, UCS)
+    start = time.perf_counter()
+    for i in range(min(n, 200)):
+        cps.HRIF_GetInverseKin(0, 0, poses[i].tolist(), ref[i].tolist(), TCP, UCS, [])
+    single = (time.perf_counter() - start) / min(n, 200)
+
+    start = time.perf_counter()
+    check = crossCheckInverse(cps, 0, 0, joints, ref, model, TCP, UCS)
+    piped = (time.perf_counter() - start) / n
+
+    targets = np.concatenate([poses] * max(1, 100000 // n))
+    start = time.perf_counter()
+    codes, solved = inverseKin(targets, np.concatenate([ref] * max(1, 100000 // n)), model, TCP, UCS)
+    local = (time.perf_counter() - start) / len(targets)
+
+    print()
+    print('%-24s %12s' % ('method', 'us/pose'))
+    print('%-24s %12.1f' % ('HRIF_GetInverseKin', single * 1e6))
+    print('%-24s %12.1f' % ('pipeline', piped * 1e6))
+    print('%-24s %12.3f' % ('inverseKin (N=%d)' % len(targets), local * 1e6))
+    if check.errorCode != 0:
+        print('inverse cross check failed: %d' % check.errorCode)
+    else:
+        print('inverse cross check: max joint error %.4f deg, %d branch mismatches, %s'
+              % (check.maxJointError, check.mismatch, 'ok' if check.ok else 'MISMATCH'))
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--host', default=None)
+    parser.add_argument('--port', type=int, default=10003)
+    parser.add_argument('-n', type=int, default=1000)
+    args = parser.parse_args()
+
+    cps = CPSClient()
+    if args.host is not None:
+        cps.HRIF_Connect(0, args.host, args.port)
+        run(cps, args.n)
+        cps.HRIF_DisConnect(0)
+        return
+    with CPSSimulator(port=0, rpcPort=None, latency=0.0005) as sim:
+        cps.HRIF_Connect(0, '127.0.0.1', sim.port)
+        run(cps, args.n)
+        cps.HRIF_DisConnect(0)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,60 @@
+#!/usr/bin/env python
+# _*_ coding:utf-8 _*_
+# 批量指令模式与逐条收发的对比测试
+# 用法: python bench_pipeline.py [--cycles 200] [--rtt 0.002]
+
+import argparse
+import time
+
+from CPS import CPSClient
+from cps_sim import CPSSimulator
+
+
+def read_sequential(cps, boxID, rbtID):
+    state, pos, vel, cur, ft = [], [], [], [], []
+    cps.HRIF_ReadRobotState(boxID, rbtID, state)
+    cps.HRIF_ReadActPos(boxID, rbtID, pos)
+    cps.HRIF_ReadActJointVel(boxID, rbtID, vel)
+    cps.HRIF_ReadActJointCur(boxID, rbtID, cur)
+    cps.HRIF_ReadFTData(boxID, rbtID, ft)
+
+
+def read_pipelined(cps, boxID, rbtID):
+    state, pos, vel, cur, ft = [], [], [], [], []
+    with cps.pipeline(boxID) as p:
+        p.HRIF_ReadRobotState(boxID, rbtID, state)
+        p.HRIF_ReadActPos(boxID, rbtID, pos)
+        p.HRIF_ReadActJointVel(boxID, rbtID, vel)
+        p.HRIF_ReadActJointCur(boxID, rbtID, cur)
+        p.HRIF_ReadFTData(boxID, rbtID, ft)
+
+
+def run(func, cps, cycles):
+    start = time.perf_counter()
+    for i in range(cycles):
+        func(cps, 0, 0)
+    return (time.perf_counter() - start) / cycles
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--cycles', type=int, default=200)
+    parser.add_argument('--rtt', type=float, default=0.002, help='模拟的网络往返时间(s)')
+    args = parser.parse_args()
+
+    # 模拟器每收到一批数据延迟rtt后逐条应答
+    with CPSSimulator(port=0, rpcPort=None, latency=args.rtt) as sim:
+        cps = CPSClient()
+        cps.HRIF_Connect(0, '127.0.0.1', sim.port)
+        tSeq = run(read_sequential, cps, args.cycles)
+        tPipe = run(read_pipelined, cps, args.cycles)
+        cps.HRIF_DisConnect(0)
+
+    print('5 reads per cycle, rtt %.1f ms, %d cycles' % (args.rtt * 1000, args.cycles))
+    print('sequential : %8.3f ms/cycle' % (tSeq * 1000))
+    print('pipeline   : %8.3f ms/cycle' % (tPipe * 1000))
+    print('speedup    : %8.2fx' % (tSeq / tPipe))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,90 @@
+#!/usr/bin/env python
+# _*_ coding:utf-8 _*_
+# 本地点位计算(cps_pose)与控制器点位计算指令的性能与核对
+# 对每种指令: 逐个调用HRIF_*,本地一次计算N组,并用crossCheckPoses比较结果
+# 四元数与RPY互换同样比较,并检查本地格式化的字符串是否与控制器应答完全相同(含Ry=±90°的万向节锁)
+# 不指定--host时连接本地模拟器(模拟器的点位计算即cps_pose,只验证流程)
+# 用法: python bench_pose.py [--host 192.168.0.10] [--port 10003] [-n 1000]
+
+import argparse
+import time
+
+from CPS import CPSClient
+from cps_pose import PoseOps, randomPoses, crossCheckPoses, randomRpy, rpyToQuaternion, quaternionToRpy, \
+    crossCheckQuaternions
+from cps_sim import CPSSimulator
+
+
+def run(cps, n):
+    pos1 = randomPoses(n, seed=0)
+    pos2 = randomPoses(n, seed=1)
+    alpha = 0.25
+    args = {'pos1': pos1, 'pos2': pos2, 'alpha': alpha}
+    checks = crossCheckPoses(cps, 0, 0, pos1, pos2, alpha)
+    print('%-16s %14s %14s %12s %12s  %s' % ('op', 'remote us/op', 'local us/op', 'pos err', 'rot err', 'check'))
+    for name, method, local, params in PoseOps:
+        count = min(n, 200)
+        start = time.perf_counter()
+        for i in range(count):
+            values = [args[p][i].tolist() if p != 'alpha' else alpha for p in params]
+            getattr(cps, method)(0, 0, *(values + [[]]))
+        remote = (time.perf_counter() - start) / count
+
+        start = time.perf_counter()
+        local(*[args[p] for p in params])
+        localTime = (time.perf_counter() - start) / n
+
+        check = checks[name]
+        if check.errorCode != 0:
+            print('%-16s %14.1f %14.3f %12s %12s  failed %d' % (name, remote * 1e6, localTime * 1e6, '-', '-',
+                                                                 check.errorCode))
+        else:
+            print('%-16s %14.1f %14.3f %12.5f %12.5f  %s' % (name, remote * 1e6, localTime * 1e6, check.maxPosError,
+                                                             check.maxRotError, 'ok' if check.ok else 'MISMATCH'))
+
+    rpy = randomRpy(n, seed=2)
+    quat = rpyToQuaternion(rpy)
+    checks = crossCheckQuaternions(cps, 0, 0, rpy)
+    print()
+    print('%-16s %14s %14s %12s %12s  %s' % ('op', 'remote us/op', 'local us/op', 'max error', 'text diff', 'check'))
+    for name, method, local, values in (('RPY2Quaternion', 'HRIF_RPY2Quaternion', rpyToQuaternion, rpy),
+                                        ('Quaternion2RPY', 'HRIF_Quaternion2RPY', quaternionToRpy, quat)):
+        count = min(n, 200)
+        start = time.perf_counter()
+        for i in range(count):
+            getattr(cps, method)(0, 0, *(values[i].tolist() + [[]]))
+        remote = (time.perf_counter() - start) / count
+
+        start = time.perf_counter()
+        local(values)
+        localTime = (time.perf_counter() - start) / n
+
+        check = checks.get(name)
+        if check is None or check.errorCode != 0:
+            print('%-16s %14.1f %14.3f %12s %12s  failed' % (name, remote * 1e6, localTime * 1e6, '-', '-'))
+        else:
+            print('%-16s %14.1f %14.3f %12.5f %12d  %s' % (name, remote * 1e6, localTime * 1e6, check.maxError,
+                                                           check.textMismatch, 'ok' if check.ok else 'MISMATCH'))
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--host', default=None)
+    parser.add_argument('--port', type=int, default=10003)
+    parser.add_argument('-n', type=int, default=1000)
+    args = parser.parse_args()
+
+    cps = CPSClient()
+    if args.host is not None:
+        cps.HRIF_Connect(0, args.host, args.port)
+        run(cps, args.n)
+        cps.HRIF_DisConnect(0)
+        return
+    with CPSSimulator(port=0, rpcPort=None, latency=0.0005) as sim:
+        cps.HRIF_Connect(0, '127.0.0.1', sim.port)
+        run(cps, args.n)
+        cps.HRIF_DisConnect(0)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,75 @@
+#!/usr/bin/env python
+# _*_ coding:utf-8 _*_
+# 延迟补偿(cps_signal.StatePredictor)的对比测试
+# 模拟器在给定往返延迟下执行关节运动,客户端每个周期读取一次带时间戳的ActPos,
+# 分别用"最后读到的位置"与StatePredictor.predictPose()估计PushServoJ生效时刻的关节位置,
+# 事后以全部采样插值得到该时刻的实际位置,统计两种估计的误差
+# 用法: python bench_predict.py [--latency 0.002,0.005,0.01] [--rate 100]
+
+import argparse
+import time
+
+import numpy as np
+
+from CPS import CPSClient
+from cps_codec import StructResult, ActPos, ActPosSizes
+from cps_sim import CPSSimulator
+from cps_signal import StatePredictor
+
+HOME = [0.0, 0.0, 90.0, 0.0, 90.0, 0.0]
+TARGET = [40.0, -20.0, 110.0, 10.0, 60.0, 30.0]
+
+
+def run(latency, rate):
+    with CPSSimulator(port=0, rpcPort=None, latency=latency) as sim:
+        cps = CPSClient()
+        cps.HRIF_Connect(0, '127.0.0.1', sim.port)
+        cps.HRIF_GrpEnable(0, 0)
+        predictor = StatePredictor()
+        pos = StructResult(ActPos, ActPosSizes)
+        samples = []
+        estimates = []
+        period = 1.0 / rate
+        for dest in (TARGET, HOME):
+            cps.HRIF_MoveJ(0, 0, [0] * 6, dest, 'TCP', 'Base', 60, 240, 0, 1, 0, 0, 0, '0')
+            end = time.monotonic() + 1.6
+            while time.monotonic() < end:
+                if cps.HRIF_ReadActPos(0, 0, pos) == 0:
+                    joint = pos.value.joint.copy()
+                    samples.append(((pos.sendTime + pos.recvTime) * 0.5, joint))
+                    predictor.updateResult(pos)
+                    target = predictor.applyTime()
+                    predicted = predictor.predictPose(target)
+                    if predicted is not None:
+                        estimates.append((target, joint, predicted))
+                time.sleep(period)
+        cps.HRIF_DisConnect(0)
+    t = np.array([s[0] for s in samples])
+    q = np.array([s[1] for s in samples])
+    holdErr, predErr = [], []
+    for target, joint, predicted in estimates:
+        if target > t[-1]:
+            continue
+        actual = np.array([np.interp(target, t, q[:, k]) for k in range(6)])
+        holdErr.append(np.abs(joint - actual).max())
+        predErr.append(np.abs(predicted - actual).max())
+    return np.array(holdErr), np.array(predErr), predictor.rtt.srtt
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--latency', default='0.002,0.005,0.01', help='模拟器往返延迟(s)')
+    parser.add_argument('--rate', type=float, default=100.0)
+    args = parser.parse_args()
+
+    print('%-10s %10s %16s %16s %16s %16s' % ('rtt(ms)', 'srtt(ms)', 'hold rms(deg)', 'hold p95(deg)',
+                                                'pred rms(deg)', 'pred p95(deg)'))
+    for latency in [float(v) for v in args.latency.split(',')]:
+        hold, pred, srtt = run(latency, args.rate)
+        print('%-10.1f %10.2f %16.4f %16.4f %16.4f %16.4f' % (
+            latency * 1e3, srtt * 1e3, np.sqrt(np.mean(hold ** 2)), np.percentile(hold, 95),
+            np.sqrt(np.mean(pred ** 2)), np.percentile(pred, 95)))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,68 @@
+#!/usr/bin/env python
+# _*_ coding:utf-8 _*_
+# 由位置推导速度(cps_signal)与读取控制器速度的对比测试
+# 模拟器执行往返关节运动,每个周期用HRIF_ReadSnapshot同时读取位置与关节速度,
+# 以读到的速度为参考,统计DerivedSignals推导结果的误差,以及两种方式每个周期的请求数
+# 用法: python bench_signal.py [--rate 100] [--window 7] [--order 2]
+
+import argparse
+import time
+
+import numpy as np
+
+from CPS import CPSClient
+from cps_sim import CPSSimulator
+from cps_signal import DerivedSignals
+
+HOME = [0.0, 0.0, 90.0, 0.0, 90.0, 0.0]
+TARGET = [40.0, -20.0, 110.0, 10.0, 60.0, 30.0]
+
+
+def collect(cps, rate, duration, signalSets):
+    errors = dict([(name, []) for name in signalSets])
+    period = 1.0 / rate
+    end = time.monotonic() + duration
+    while time.monotonic() < end:
+        snap = cps.HRIF_ReadSnapshot(0, 0, ('pos', 'jointVel'))
+        if snap.errorCode == 0:
+            for name, signals in signalSets.items():
+                signals.append((snap.sendTime + snap.recvTime) * 0.5, snap.pos.joint, snap.pos.pcs)
+                derived = signals.latest()
+                if derived is not None:
+                    errors[name].append(derived.jointVel - snap.jointVel)
+        time.sleep(period)
+    return errors
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--rate', type=float, default=100.0)
+    parser.add_argument('--window', type=int, default=7)
+    parser.add_argument('--order', type=int, default=2)
+    args = parser.parse_args()
+
+    signalSets = {
+        'savgol': DerivedSignals(args.window, args.order),
+        'diff': DerivedSignals(method='diff'),
+    }
+    with CPSSimulator(port=0, rpcPort=None) as sim:
+        cps = CPSClient()
+        cps.HRIF_Connect(0, '127.0.0.1', sim.port)
+        cps.HRIF_GrpEnable(0, 0)
+        errors = dict([(name, []) for name in signalSets])
+        for dest in (TARGET, HOME):
+            cps.HRIF_MoveJ(0, 0, [0] * 6, dest, 'TCP', 'Base', 60, 240, 0, 1, 0, 0, 0, '0')
+            for name, values in collect(cps, args.rate, 1.6, signalSets).items():
+                errors[name] += values
+        cps.HRIF_DisConnect(0)
+
+    # 推导只需ReadActPos,读取速度需ReadActPos + ReadActJointVel + ReadActTcpVel
+    print('%-8s %14s %14s %10s' % ('method', 'rms(deg/s)', 'p95(deg/s)', 'reads/cyc'))
+    for name, values in errors.items():
+        err = np.abs(np.array(values))
+        print('%-8s %14.3f %14.3f %10d' % (name, np.sqrt(np.mean(err ** 2)), np.percentile(err, 95), 1))
+    print('%-8s %14s %14s %10d' % ('read', '-', '-', 3))
+
+
+if __name__ == '__main__':
+    main()
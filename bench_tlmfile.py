@@ -0,0 +1,92 @@
+#!/usr/bin/env python
+# _*_ coding:utf-8 _*_
+# 遥测文件(cps_tlmfile)与CSV的对比测试: 文件大小,整体载入时间,按时间截取时间
+# 数据为合成的100Hz ReadActPos + ReadRobotState + FSM样本
+# 用法: python bench_tlmfile.py [--samples 360000] [--dir /tmp/bench_tlm]
+
+import argparse
+import os
+import shutil
+import time
+
+import numpy as np
+
+from cps_tlmfile import TelemetryWriter, TelemetryFile
+
+
+def makeSamples(n):
+    t = np.arange(n) * 0.01
+    joint = np.column_stack([30.0 * np.sin(t * (0.1 + 0.02 * k)) for k in range(6)])
+    pcs = np.column_stack([400.0 + 100.0 * np.sin(t * (0.05 + 0.01 * k)) for k in range(6)])
+    moving = (np.sin(t * 0.2) > 0).astype(int)
+    return t, joint, pcs, moving
+
+
+def writeCsv(path, t, joint, pcs, moving):
+    zeros = np.zeros((len(t), 6))
+    state = np.zeros((len(t), 13), int)
+    state[:, 0] = moving
+    state[:, 1] = 1
+    state[:, 11] = 1 - moving
+    fsm = np.where(moving == 1, 25, 33)
+    data = np.column_stack([t, joint, pcs, zeros, zeros, state, fsm])
+    np.savetxt(path, data, fmt=['%.3f'] + ['%.6f'] * 24 + ['%d'] * 14, delimiter=',')
+
+
+def writeTlm(path, t, joint, pcs, moving):
+    zeros = np.zeros(6)
+    with TelemetryWriter(path) as writer:
+        for i in range(len(t)):
+            m = int(moving[i])
+            state = (m, 1, 0, 0, 0, 0, 0, 0, 0, 1, 1, 1 - m, 1 - m)
+            writer.append(t[i], joint[i], pcs[i], zeros, zeros, state, 25 if m else 33)
+
+
+def dirSize(path):
+    return sum([os.path.getsize(os.path.join(path, name)) for name in os.listdir(path)])
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--samples', type=int, default=360000, help='样本数,默认为100Hz下1小时')
+    parser.add_argument('--dir', default='/tmp/bench_tlm')
+    args = parser.parse_args()
+
+    if os.path.isdir(args.dir):
+        shutil.rmtree(args.dir)
+    os.makedirs(args.dir)
+    csvPath = os.path.join(args.dir, 'run.csv')
+    tlmPath = os.path.join(args.dir, 'run.tlm')
+    samples = makeSamples(args.samples)
+    t0 = time.perf_counter()
+    writeCsv(csvPath, *samples)
+    csvWrite = time.perf_counter() - t0
+    t0 = time.perf_counter()
+    writeTlm(tlmPath, *samples)
+    tlmWrite = time.perf_counter() - t0
+
+    t0 = time.perf_counter()
+    data = np.loadtxt(csvPath, delimiter=',')
+    csvLoad = time.perf_counter() - t0
+    mid = samples[0][len(samples[0]) // 2]
+    t0 = time.perf_counter()
+    rows = data[(data[:, 0] >= mid) & (data[:, 0] < mid + 10.0)]
+    csvSlice = time.perf_counter() - t0
+
+    t0 = time.perf_counter()
+    tlm = TelemetryFile(tlmPath)
+    tlmLoad = time.perf_counter() - t0
+    t0 = time.perf_counter()
+    view = tlm.slice(mid, mid + 10.0)
+    tlmSlice = time.perf_counter() - t0
+    assert len(view['time']) == len(rows)
+    assert np.allclose(view['joint'], rows[:, 1:7], atol=1e-4)
+
+    print('%-6s %12s %10s %10s %12s' % ('format', 'size(MB)', 'write(s)', 'open(s)', 'slice(ms)'))
+    print('%-6s %12.1f %10.2f %10.3f %12.3f' % ('csv', os.path.getsize(csvPath) / 1e6, csvWrite, csvLoad,
+                                                csvSlice * 1e3))
+    print('%-6s %12.1f %10.2f %10.3f %12.3f' % ('tlm', dirSize(tlmPath) / 1e6, tlmWrite, tlmLoad, tlmSlice * 1e3))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,71 @@
+#!/usr/bin/env python
+# _*_ coding:utf-8 _*_
+# 等待运动完成: 固定间隔查询与WaitEngine自适应查询的对比测试
+# 对每段关节运动统计查询次数,以及从模拟器运动结束到等待返回的滞后
+# 用法: python bench_wait.py [--moves 5,30,90] [--speed 60] [--acc 360] [--latency 0.001]
+
+import argparse
+import time
+
+from CPS import CPSClient
+from cps_sim import CPSSimulator
+from cps_wait import WaitEngine, expectedMoveTime
+
+HOME = [0.0, 0.0, 90.0, 0.0, 90.0, 0.0]
+
+
+def waitFixed(cps, period):
+    # 原_waitMotion的做法,固定间隔查询
+    engine = WaitEngine(period, period, 1.0)
+    return engine.wait(lambda: pollMoving(cps), None, None, 0.02)
+
+
+def pollMoving(cps):
+    result = []
+    ret = cps.HRIF_ReadRobotState(0, 0, result)
+    if ret != 0:
+        return 'commError', ret, None
+    return (None if result[0] == '1' else 'done'), 0, None
+
+
+def run(cps, sim, angle, speed, acc, mode):
+    target = list(HOME)
+    target[0] += angle
+    samples = []
+    for dest in (target, HOME):
+        start = list(sim.robot.joint)
+        cps.HRIF_MoveJ(0, 0, [0] * 6, dest, 'TCP', 'Base', speed, acc, 0, 1, 0, 0, 0, '0')
+        # 模拟器中本段运动的结束时刻
+        motion = sim.robot.m_motion
+        doneTime = motion[0] + motion[1]
+        if mode == 'fixed':
+            r = waitFixed(cps, 0.01)
+        else:
+            r = cps._waitMotion(False, 0, 0, expectedMoveTime(start, dest, speed, acc, 1))
+        lag = time.monotonic() - doneTime
+        samples.append((r.polls, lag, r.reason))
+    return samples
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--moves', default='5,30,90', help='关节1转角(°)')
+    parser.add_argument('--speed', type=float, default=60.0)
+    parser.add_argument('--acc', type=float, default=360.0)
+    parser.add_argument('--latency', type=float, default=0.001, help='模拟器每批数据的固定延迟(s)')
+    args = parser.parse_args()
+
+    print('%-8s %-9s %8s %10s %8s' % ('angle', 'mode', 'polls', 'lag(ms)', 'reason'))
+    with CPSSimulator(port=0, rpcPort=None, latency=args.latency) as sim:
+        cps = CPSClient()
+        cps.HRIF_Connect(0, '127.0.0.1', sim.port)
+        cps.HRIF_GrpEnable(0, 0)
+        for angle in [float(a) for a in args.moves.split(',')]:
+            for mode in ('fixed', 'adaptive'):
+                for polls, lag, reason in run(cps, sim, angle, args.speed, args.acc, mode):
+                    print('%-8.1f %-9s %8d %10.1f %8s' % (angle, mode, polls, lag * 1e3, reason))
+        cps.HRIF_DisConnect(0)
+
+
+if __name__ == '__main__':
+    main()
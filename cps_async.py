@@ -0,0 +1,248 @@
+#!/usr/bin/env python
+# _*_ coding:utf-8 _*_
+
+import asyncio
+import time
+from collections import deque
+
+from CPS import CPSClient
+from cps_codec import StructResult, RobotState, ActPosSizes
+from cps_pipeline import CmdRecorder
+from cps_telemetry import SnapshotFields, snapshotResults, makeSnapshot, failedSnapshot
+
+
+def parseReply(ret, result):
+    '''
+    *	@param brief:解析 'Command,OK,fields,;' / 'Command,Fail,code,;' 格式的应答
+    *	@param ret : 一条完整应答
+    *	@param result : 应答字段写入该列表,或cps_codec中的ArrayResult/StructResult
+    *	@param return: 错误码,应答格式错误时返回39502
+    '''
+    retData = ret.split(',', 2)
+    if len(retData) < 3 or retData[0] == "errorcmd":
+        return 39502
+    if retData[1] == "Fail":
+        return int(retData[2].split(',', 1)[0])
+    if type(result) is not list:
+        try:
+            result.decodeFields(retData[2])
+        except ValueError:
+            return 39502
+        return 0
+    retData = retData[2].split(',')
+    retData.pop()
+    result.clear()
+    result.extend(retData)
+    return 0
+
+
+class AsyncBoxConnection(object):
+    '''
+    *	@param brief:单个电箱的asyncio连接,应答按发送顺序由一个读取任务分发给等待的future
+    '''
+
+    def __init__(self):
+        self.reader = None
+        self.writer = None
+        self.m_pending = deque()
+        self.m_readTask = None
+        self.m_bConnect = False
+        # 最近一次应答的(发送时间, 接收时间)
+        self.lastReplyTime = None
+
+    async def open(self, hostName, nPort):
+        self.reader, self.writer = await asyncio.open_connection(hostName, nPort)
+        self.m_bConnect = True
+        self.m_readTask = asyncio.ensure_future(self.readLoop())
+
+    async def close(self):
+        self.m_bConnect = False
+        if self.writer is not None:
+            self.writer.close()
+        if self.m_readTask is not None:
+            self.m_readTask.cancel()
+            try:
+                await self.m_readTask
+            except asyncio.CancelledError:
+                pass
+        self.failPending(39500)
+
+    def failPending(self, code):
+        while self.m_pending:
+            cmd, result, future, sendTime = self.m_pending.popleft()
+            if not future.done():
+                future.set_result(code)
+
+    async def readLoop(self):
+        try:
+            while True:
+                frame = await self.reader.readuntil(b';')
+                if not self.m_pending:
+                    continue
+                cmd, result, future, sendTime = self.m_pending.popleft()
+                code = parseReply(frame.decode("utf-8", "ignore").strip(), result)
+                self.lastReplyTime = (sendTime, time.monotonic())
+                if type(result) is not list:
+                    result.sendTime, result.recvTime = self.lastReplyTime
+                future.set_result(code)
+        except (asyncio.IncompleteReadError, asyncio.LimitOverrunError, ConnectionError):
+            self.m_bConnect = False
+            self.failPending(39500)
+
+    def send(self, cmd, result):
+        # 入队与写入之间没有await,并发调用时队列顺序与发送顺序一致
+        future = asyncio.get_running_loop().create_future()
+        self.m_pending.append((cmd, result, future, time.monotonic()))
+        self.writer.write(cmd if type(cmd) is bytes else cmd.encode())
+        return future
+
+    async def drain(self):
+        # 发送缓冲区超过上限时等待写出,连接断开时等待中的请求返回39500
+        try:
+            await self.writer.drain()
+        except ConnectionError:
+            self.m_bConnect = False
+            self.failPending(39500)
+
+
+class AsyncCPSClient(object):
+    '''
+    *	@param brief:基于asyncio的CPSClient,HRIF_*与CPSClient参数相同,需await调用
+                     每个电箱一个读取任务,多个协程可同时等待各自的应答
+                     可额外传入timeout关键字参数(秒),超时返回39503并关闭该电箱的连接,需重新连接
+                     不支持future参数,运动完成需另行查询(如HRIF_IsMotionDone)
+    '''
+
+    MaxBox = CPSClient.MaxBox
+    timeout = 5.0
+
+    # 组合指令需要多次收发,由本类单独实现或不支持
+    Unsupported = ('HRIF_ReadRobotFlags', 'HRIF_ReadCurFSMFromCPS', 'HRIF_SetScriptForceControlState',
+                   'HRIF_ReadSnapshot')
+
+    def __init__(self):
+        self.g_clients = [AsyncBoxConnection() for i in range(self.MaxBox)]
+        # HRIF_*在替身上执行,只用来生成命令字符串
+        self.m_view = CPSClient.__new__(CPSClient)
+        self.m_view.g_clients = [CmdRecorder() for i in range(self.MaxBox)]
+
+    async def HRIF_Connect(self, boxID, hostName, nPort):
+        if boxID >= self.MaxBox:
+            return 39501
+        try:
+            await self.g_clients[boxID].open(hostName, nPort)
+            return 0
+        except OSError:
+            return 39504
+
+    async def HRIF_DisConnect(self, boxID):
+        if boxID >= self.MaxBox:
+            return 39501
+        await self.g_clients[boxID].close()
+        return 0
+
+    async def HRIF_IsConnected(self, boxID):
+        return self.g_clients[boxID].m_bConnect
+
+    def lastReplyTime(self, boxID):
+        # 同CPSClient.lastReplyTime,多个协程并发请求时应改用TimedResult
+        return self.g_clients[boxID].lastReplyTime
+
+    async def sendAndRecv(self, boxID, cmd, result, timeout=None):
+        client = self.g_clients[boxID]
+        if not client.m_bConnect:
+            return 39500
+        future = client.send(cmd, result)
+        try:
+            return await asyncio.wait_for(self.exchange(client, future), timeout or self.timeout)
+        except asyncio.TimeoutError:
+            # 应答没有序号,迟到的应答会被当作下一条请求的应答,只能关闭连接;其他等待中的请求返回39500
+            if not future.done():
+                future.set_result(39503)
+            await client.close()
+            return 39503
+
+    async def exchange(self, client, future):
+        await client.drain()
+        # shield: 超时取消的是等待,future由sendAndRecv设置结果
+        return await asyncio.shield(future)
+
+    def __getattr__(self, name):
+        if not name.startswith('HRIF_') or name in self.Unsupported:
+            raise AttributeError(name)
+        method = getattr(self.m_view, name)
+
+        async def call(*args, timeout=None, **kwargs):
+            if kwargs.get('future'):
+                # 运动完成的future依赖CPSClient的后台遥测线程
+                raise ValueError(name + ': future is not supported by AsyncCPSClient')
+            boxID = kwargs['boxID'] if 'boxID' in kwargs else args[0]
+            recorder = self.m_view.g_clients[boxID]
+            ret = method(*args, **kwargs)
+            if not recorder.cmds:
+                # 参数检查未通过,没有生成命令
+                return ret
+            cmds = recorder.cmds[:]
+            del recorder.cmds[:]
+            for cmd, result in cmds:
+                ret = await self.sendAndRecv(boxID, cmd, result, timeout)
+                if ret != 0:
+                    break
+            return ret
+
+        return call
+
+    async def HRIF_IsMotionDone(self, boxID, rbtID, result, timeout=None):
+        # 状态位由cps_codec.RobotState解码,字段数不符返回39502
+        state = StructResult(RobotState, dtype=int)
+        errorCode = await self.HRIF_ReadRobotState(boxID, rbtID, state, timeout=timeout)
+        if errorCode != 0:
+            return errorCode
+        result.append(state.value.blendingDone == 1 and state.value.moving == 0)
+        return errorCode
+
+    async def HRIF_IsBlendingDone(self, boxID, rbtID, result, timeout=None):
+        state = StructResult(RobotState, dtype=int)
+        errorCode = await self.HRIF_ReadRobotState(boxID, rbtID, state, timeout=timeout)
+        if errorCode != 0:
+            return errorCode
+        # 与CPSClient相同,结果为字符串
+        result.append(str(state.value.blendingDone))
+        return errorCode
+
+    async def HRIF_ReadSnapshot(self, boxID, rbtID, fields=SnapshotFields, timeout=None):
+        reads = snapshotResults(fields)
+        sendTime = time.monotonic()
+        if reads is None:
+            return failedSnapshot(sendTime, sendTime, 39501)
+        recorder = self.m_view.g_clients[boxID]
+        for name, method, result in reads:
+            getattr(self.m_view, method)(boxID, rbtID, result)
+        cmds = recorder.cmds[:]
+        del recorder.cmds[:]
+        # 各请求在第一次await之前依次写出,应答按顺序分发
+        codes = await asyncio.gather(*[self.sendAndRecv(boxID, cmd, result, timeout) for cmd, result in cmds])
+        return makeSnapshot(sendTime, time.monotonic(), codes, reads)
+
+    async def HRIF_ReadActTcpPos(self, boxID, rbtID, result, timeout=None):
+        # 与CPSClient相同取ReadActPos应答的第一组6个值,字段数按cps_codec.ActPosSizes检查
+        retData = []
+        errorCode = await self.HRIF_ReadActPos(boxID, rbtID, retData, timeout=timeout)
+        if errorCode != 0:
+            return errorCode
+        if len(retData) != sum(ActPosSizes):
+            return 39502
+        result.extend(retData[0:ActPosSizes[0]])
+        return errorCode
+
+    async def HRIF_ReadCmdTcpPos(self, boxID, rbtID, result, timeout=None):
+        # 与CPSClient相同,去掉ReadCmdPos应答的第二组6个值
+        retData = []
+        errorCode = await self.HRIF_ReadCmdJointPos(boxID, rbtID, retData, timeout=timeout)
+        if errorCode != 0:
+            return errorCode
+        if len(retData) < 12:
+            return 39502
+        del retData[6:12]
+        result.extend(retData)
+        return errorCode
@@ -0,0 +1,355 @@
+#!/usr/bin/env python
+# _*_ coding:utf-8 _*_
+# 本机遥测分发: 一个进程持有控制器连接并轮询,其他进程通过共享内存读取最新快照
+# 用法: python cps_broker.py [--host 127.0.0.1] [--port 10003] [--box 0] [--rbt 0] [--rate 100]
+#                           [--fields state,pos,jointVel,jointCur,fsm]
+# 订阅方:
+#     cps = BrokerClient()
+#     cps.HRIF_Connect(0, '127.0.0.1', 10003)
+#     cps.HRIF_ReadActPos(0, 0, result)
+
+import argparse
+import re
+import threading
+import time
+import zlib
+from multiprocessing import resource_tracker, shared_memory
+
+import numpy as np
+
+from CPS import CPSClient
+from cps_telemetry import SnapshotFields, RobotSnapshot, failedSnapshot
+from cps_codec import RobotState, ActPos
+
+# 只读代理不支持的命令
+ErrReadOnly = 39506
+
+# 共享内存布局: uint64 序号(写入中为奇数) + uint64 数据的CRC32 + float64 数据
+#   sendTime, recvTime, errorCode, polled, state(13), pos(24), jointVel(6), jointCur(6), ftData(6), fsm
+#   polled: 分发方轮询的内容,按SnapshotFields顺序的位掩码
+Layout = (('sendTime', 1), ('recvTime', 1), ('errorCode', 1), ('polled', 1), ('state', 13), ('pos', 24),
+          ('jointVel', 6), ('jointCur', 6), ('ftData', 6), ('fsm', 1))
+Slices = {}
+_offset = 0
+for _name, _size in Layout:
+    Slices[_name] = slice(_offset, _offset + _size)
+    _offset += _size
+PayloadSize = _offset
+HeaderSize = 16
+
+# 代理可应答的协议命令 -> (内容, 数据段, 是否为整数)
+ServedReads = {
+    b'ReadRobotState': ('state', Slices['state'], True),
+    b'ReadActPos': ('pos', Slices['pos'], False),
+    b'ReadActACS': ('pos', slice(Slices['pos'].start, Slices['pos'].start + 6), False),
+    b'ReadActJointVel': ('jointVel', Slices['jointVel'], False),
+    b'ReadActJointCur': ('jointCur', Slices['jointCur'], False),
+    b'ReadForceData': ('ftData', Slices['ftData'], False),
+    b'ReadCurFSM': ('fsm', Slices['fsm'], True),
+}
+
+
+def fieldMask(fields):
+    # 内容列表 -> polled位掩码
+    return sum([1 << SnapshotFields.index(name) for name in fields])
+
+
+def brokerName(hostName, nPort, boxID):
+    '''
+    *	@param brief:控制器地址对应的共享内存名,分发方与订阅方使用同样的地址得到同一区域
+    '''
+    return 'cps_broker_%s_%d_%d' % (re.sub('[^0-9A-Za-z]', '_', hostName), nPort, boxID)
+
+
+def attachShm(name):
+    '''
+    *	@param brief:以只读方身份打开已有的共享内存,不登记到resource_tracker
+                     Python 3.13起使用track=False;更早的版本打开时会登记,进程退出时被删除,因此立即注销
+    '''
+    try:
+        return shared_memory.SharedMemory(name, track=False)
+    except TypeError:
+        pass
+    shm = shared_memory.SharedMemory(name)
+    try:
+        # POSIX上登记的是带'/'前缀的名称,与shm.name不同;Windows上不登记
+        resource_tracker.unregister('/' + shm.name, 'shared_memory')
+    except Exception:
+        pass
+    return shm
+
+
+def checksum(data):
+    return zlib.crc32(data.data)
+
+
+class TelemetryBroker(object):
+    '''
+    *	@param brief:按固定频率用HRIF_ReadSnapshot读取完整状态,以seqlock方式写入共享内存
+                     写入前后序号各加1,读取方看到奇数或前后序号不同时重读,读写都不加锁;
+                     numpy写入不保证其他CPU上的可见顺序,因此数据后另写CRC32,
+                     读取方校验不一致时同样重读,不依赖内存序
+                     with TelemetryBroker(cps, '127.0.0.1', 10003, boxID) as broker:
+                         ...
+    *	@param cps: 已连接的CPSClient
+    *	@param hostName/nPort: 控制器地址,用于共享内存命名
+    *	@param rate: 轮询频率(Hz)
+    *	@param fields: 轮询的内容,SnapshotFields的子集;任一读取失败整个快照即失败,
+                       应只包含控制器支持的内容(如没有力传感器时去掉ftData);未轮询的内容订阅方读取时返回39506
+    '''
+
+    def __init__(self, cps, hostName, nPort, boxID=0, rbtID=0, rate=100.0, fields=SnapshotFields):
+        for name in fields:
+            if name not in SnapshotFields:
+                raise ValueError('unknown snapshot field: ' + name)
+        self.m_cps = cps
+        self.boxID = boxID
+        self.rbtID = rbtID
+        self.rate = rate
+        self.fields = tuple(fields)
+        self.name = brokerName(hostName, nPort, boxID)
+        self.m_shm = None
+        self.m_thread = None
+        self.m_bRun = False
+        self.publishCount = 0
+
+    def __enter__(self):
+        self.start()
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.stop()
+        return False
+
+    def start(self):
+        if self.m_thread is not None:
+            return
+        try:
+            self.m_shm = shared_memory.SharedMemory(self.name, create=True, size=HeaderSize + PayloadSize * 8)
+        except FileExistsError:
+            # 上次异常退出残留的区域
+            self.m_shm = shared_memory.SharedMemory(self.name)
+        self.m_seq = np.ndarray(1, np.uint64, self.m_shm.buf, 0)
+        self.m_crc = np.ndarray(1, np.uint64, self.m_shm.buf, 8)
+        self.m_data = np.ndarray(PayloadSize, np.float64, self.m_shm.buf, HeaderSize)
+        self.m_seq[0] = 0
+        self.m_bRun = True
+        self.m_thread = threading.Thread(target=self.run, name='TelemetryBroker-%d' % self.boxID, daemon=True)
+        self.m_thread.start()
+
+    def stop(self):
+        self.m_bRun = False
+        if self.m_thread is not None:
+            self.m_thread.join()
+            self.m_thread = None
+        if self.m_shm is not None:
+            del self.m_seq, self.m_crc, self.m_data
+            self.m_shm.close()
+            self.m_shm.unlink()
+            self.m_shm = None
+
+    def publish(self, snapshot):
+        data = self.m_data
+        data[0] = snapshot.sendTime
+        data[1] = snapshot.recvTime
+        data[2] = snapshot.errorCode
+        data[3] = fieldMask(self.fields)
+        if snapshot.errorCode == 0:
+            for name in self.fields:
+                value = getattr(snapshot, name)
+                data[Slices[name]] = np.concatenate(value) if name == 'pos' else value
+        self.m_crc[0] = checksum(data)
+        self.publishCount += 1
+
+    def run(self):
+        period = 1.0 / self.rate
+        nextTime = time.monotonic()
+        failed = False
+        while self.m_bRun:
+            try:
+                snapshot = self.m_cps.HRIF_ReadSnapshot(self.boxID, self.rbtID, self.fields)
+                failed = False
+            except Exception as e:
+                # 读取出错时发布失败快照并继续轮询,订阅方得到39503而不是停止更新的旧数据;连续出错只打印一次
+                if not failed:
+                    print('TelemetryBroker poll error: ' + repr(e))
+                failed = True
+                now = time.monotonic()
+                snapshot = failedSnapshot(now, now, 39503)
+            self.m_seq[0] += 1
+            self.publish(snapshot)
+            self.m_seq[0] += 1
+            nextTime += period
+            delay = nextTime - time.monotonic()
+            if delay > 0:
+                time.sleep(delay)
+            else:
+                nextTime = time.monotonic()
+
+
+def isPolled(data, name):
+    return (int(data[Slices['polled']][0]) >> SnapshotFields.index(name)) & 1 == 1
+
+
+class BrokerConnection(object):
+    '''
+    *	@param brief:代替RbtClient放在BrokerClient.g_clients中,读取命令由共享内存中的最新快照应答
+    *	@param boxID:电箱ID
+    *	@param staleTime: 快照超过该时长(s)未更新时认为分发进程已停止,返回39503
+    '''
+
+    m_stats = None
+
+    def __init__(self, boxID, staleTime=1.0):
+        self.boxID = boxID
+        self.staleTime = staleTime
+        self.m_shm = None
+        self.m_bConnect = False
+
+    def Connect2CPS(self, hostName, nPort):
+        self.DisconnectFromCPS()
+        # 只读取,不负责删除
+        self.m_shm = attachShm(brokerName(hostName, nPort, self.boxID))
+        self.m_seq = np.ndarray(1, np.uint64, self.m_shm.buf, 0)
+        self.m_crc = np.ndarray(1, np.uint64, self.m_shm.buf, 8)
+        self.m_data = np.ndarray(PayloadSize, np.float64, self.m_shm.buf, HeaderSize)
+        self.m_bConnect = True
+        return 0
+
+    def DisconnectFromCPS(self):
+        if self.m_shm is not None:
+            del self.m_seq, self.m_crc, self.m_data
+            self.m_shm.close()
+            self.m_shm = None
+        self.m_bConnect = False
+        return 0
+
+    def isConnected(self):
+        return self.m_bConnect
+
+    def read(self):
+        '''
+        *	@param return: 一致的数据拷贝,连续重读失败时返回None
+        '''
+        for i in range(1000):
+            seq = int(self.m_seq[0])
+            if seq & 1 or seq == 0:
+                time.sleep(0)
+                continue
+            data = self.m_data.copy()
+            crc = int(self.m_crc[0])
+            if int(self.m_seq[0]) == seq and checksum(data) == crc:
+                return data
+        return None
+
+    def readSnapshot(self):
+        '''
+        *	@param return: (错误码, 数据)
+        '''
+        if not self.m_bConnect:
+            return 39500, None
+        data = self.read()
+        if data is None or time.monotonic() - data[1] > self.staleTime:
+            return 39503, None
+        return int(data[2]), data
+
+    def sendAndRecv(self, cmd, result):
+        if type(cmd) is not bytes:
+            cmd = cmd.encode()
+        served = ServedReads.get(cmd[:cmd.find(b',')])
+        if served is None:
+            return ErrReadOnly
+        errorCode, data = self.readSnapshot()
+        if errorCode != 0:
+            return errorCode
+        name, part, isInt = served
+        if not isPolled(data, name):
+            return ErrReadOnly
+        values = data[part]
+        if isInt:
+            fields = ['%d' % v for v in values]
+        else:
+            fields = ['%.3f' % v for v in values]
+        if type(result) is list:
+            result.clear()
+            result.extend(fields)
+        else:
+            result.decodeFields(','.join(fields) + ',;')
+            result.sendTime = float(data[0])
+            result.recvTime = float(data[1])
+        return 0
+
+
+class BrokerClient(CPSClient):
+    '''
+    *	@param brief:只读代理,接口与CPSClient相同,HRIF_Connect连接本机分发进程而不是控制器
+                     支持的接口: HRIF_ReadRobotState,HRIF_ReadActPos,HRIF_ReadActJointPos,HRIF_ReadActJointVel,
+                     HRIF_ReadActJointCur,HRIF_ReadFTData,HRIF_ReadCurFSM,以及基于这些读取的HRIF_IsMotionDone,
+                     HRIF_ReadActTcpPos,HRIF_ReadSnapshot,telemetry,subscribeFSM等;其余接口返回39506
+    '''
+
+    def __init__(self):
+        CPSClient.__init__(self)
+        self.g_clients = [BrokerConnection(i) for i in range(self.MaxBox)]
+
+    def HRIF_Connect(self, boxID, hostName, nPort):
+        if boxID >= self.MaxBox:
+            return 39501
+        try:
+            return self.g_clients[boxID].Connect2CPS(hostName, nPort)
+        except FileNotFoundError:
+            return 39504
+
+    def HRIF_ReadSnapshot(self, boxID, rbtID, fields=SnapshotFields, channel=None):
+        client = self.g_clients[boxID]
+        errorCode, data = client.readSnapshot()
+        now = time.monotonic()
+        if errorCode != 0:
+            return failedSnapshot(now, now, errorCode)
+        values = dict.fromkeys(SnapshotFields)
+        for name in fields:
+            if name not in SnapshotFields:
+                return failedSnapshot(now, now, 39501)
+            if not isPolled(data, name):
+                return failedSnapshot(now, now, ErrReadOnly)
+            part = data[Slices[name]]
+            if name == 'state':
+                values[name] = RobotState._make(part.astype(int).tolist())
+            elif name == 'pos':
+                values[name] = ActPos(part[0:6], part[6:12], part[12:18], part[18:24])
+            elif name == 'fsm':
+                values[name] = int(part[0])
+            else:
+                values[name] = part
+        return RobotSnapshot(float(data[0]), float(data[1]), 0, **values)
+
+    def pipeline(self, boxID, channel=None):
+        raise ValueError('BrokerClient does not support pipelines')
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=10003)
+    parser.add_argument('--box', type=int, default=0)
+    parser.add_argument('--rbt', type=int, default=0)
+    parser.add_argument('--rate', type=float, default=100.0)
+    parser.add_argument('--fields', default=','.join(SnapshotFields), help='轮询的内容,没有力传感器时去掉ftData')
+    args = parser.parse_args()
+
+    cps = CPSClient()
+    if cps.HRIF_Connect(args.box, args.host, args.port) != 0 or not cps.HRIF_IsConnected(args.box):
+        print('connect to %s:%d failed' % (args.host, args.port))
+        return
+    with TelemetryBroker(cps, args.host, args.port, args.box, args.rbt, args.rate, args.fields.split(',')) as broker:
+        print('broker %s running at %.0f Hz, Ctrl-C to stop' % (broker.name, args.rate))
+        try:
+            while True:
+                time.sleep(1.0)
+        except KeyboardInterrupt:
+            pass
+    cps.HRIF_DisConnect(args.box)
+
+
+if __name__ == '__main__':
+    main()
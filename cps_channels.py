@@ -0,0 +1,98 @@
+#!/usr/bin/env python
+# _*_ coding:utf-8 _*_
+
+from cps_codec import CommandTable
+
+Control = 'control'
+Telemetry = 'telemetry'
+Servo = 'servo'
+
+ServoCommands = ('StartServo', 'PushServoJ', 'PushServoP', 'InitServoEsJ', 'StartServoEsJ', 'PushServoEsJ',
+                 'ReadServoEsJState')
+
+
+def commandChannel(command):
+    '''
+    *	@param brief:协议命令所属的通道,读取类命令走telemetry,Servo命令走servo,其余走control
+    '''
+    if command in ServoCommands:
+        return Servo
+    if command.startswith('Read'):
+        return Telemetry
+    return Control
+
+
+# 协议命令(bytes) -> 通道,control通道的命令不放入表中
+ChannelRoutes = {}
+for _api, _command, _spec in CommandTable:
+    if commandChannel(_command) != Control:
+        ChannelRoutes[_command.encode()] = commandChannel(_command)
+
+
+class BoxChannels(object):
+    '''
+    *	@param brief:单个电箱的多条TCP连接,代替RbtClient放在CPSClient.g_clients中
+                     sendAndRecv按协议命令类别选择连接,未打开的通道回落到control
+                     其余属性与方法(Connect2CPS之外)均转给control连接,批量指令等仍走control
+    *	@param control: 原有的RbtClient,作为control通道
+    *	@param factory: 新建通道连接的类,一般为RbtClient
+    '''
+
+    def __init__(self, control, factory):
+        self.control = control
+        self.channels = {Control: control}
+        self.m_factory = factory
+        self.m_routes = {}
+
+    def __getattr__(self, name):
+        return getattr(self.control, name)
+
+    def open(self, name, hostName, nPort):
+        client = self.channels.get(name)
+        if client is None:
+            client = self.m_factory()
+            if self.control.m_stats is not None:
+                client.enableStats(self.control.m_stats)
+            client.RecvTimeout = self.control.RecvTimeout
+        client.Connect2CPS(hostName, nPort)
+        if not client.isConnected():
+            return 39504
+        self.channels[name] = client
+        self.updateRoutes()
+        return 0
+
+    def close(self, name):
+        if name == Control:
+            return
+        client = self.channels.pop(name, None)
+        if client is not None:
+            client.DisconnectFromCPS()
+            client.m_bConnect = False
+        self.updateRoutes()
+
+    def updateRoutes(self):
+        # 新表建好后一次赋值替换,其他线程的sendAndRecv不会看到只填了一半的表
+        routes = {}
+        for command, name in ChannelRoutes.items():
+            if name in self.channels:
+                routes[command] = self.channels[name]
+        self.m_routes = routes
+
+    def sendAndRecv(self, cmd, result):
+        if type(cmd) is not bytes:
+            cmd = cmd.encode()
+        return self.m_routes.get(cmd[:cmd.find(b',')], self.control).sendAndRecv(cmd, result)
+
+    def Connect2CPS(self, hostName, nPort):
+        return self.control.Connect2CPS(hostName, nPort)
+
+    def DisconnectFromCPS(self):
+        for name in list(self.channels):
+            if name != Control:
+                self.close(name)
+        return self.control.DisconnectFromCPS()
+
+    def enableStats(self, stats):
+        # 各通道共用同一份统计
+        for client in self.channels.values():
+            client.enableStats(stats)
@@ -0,0 +1,447 @@
+#!/usr/bin/env python
+# _*_ coding:utf-8 _*_
+
+# 指令编码表: (接口名, 协议命令, 参数)
+# 参数按发送顺序以空格分隔:
+#   name:t    单个值
+#   name:Nt   序列的前N个值
+#   name:*t   变长序列,全部发送
+#   =v        固定值
+# 类型 t: i 整数, f 浮点, s 字符串
+# 编码时统一按str()格式化,与原先逐个 command += str(x) + ',' 拼接的结果逐字节一致
+
+from collections import namedtuple
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+CommandTable = (
+    #
+    # part 1 初始化
+    #
+    ('ShutdownRobot', 'OSCmd', '=1'),
+    ('Connect2Box', 'ConnectToBox', ''),
+    ('Electrify', 'Electrify', ''),
+    ('BlackOut', 'BlackOut', ''),
+    ('Connect2Controller', 'StartMaster', ''),
+    ('IsSimulateRobot', 'IsSimulation', ''),
+    ('IsControllerStarted', 'ReadControllerState', ''),
+    ('ReadVersion', 'ReadVersion', 'rbtID:i'),
+    ('ReadRobotModel', 'ReadRobotModel', 'rbtID:i'),
+    #
+    # part 2 轴控制指令
+    #
+    ('GrpEnable', 'GrpPowerOn', 'rbtID:i'),
+    ('GrpDisable', 'GrpPowerOff', 'rbtID:i'),
+    ('GrpReset', 'GrpReset', 'rbtID:i'),
+    ('GrpStop', 'GrpStop', 'rbtID:i'),
+    ('GrpInterrupt', 'GrpInterrupt', 'rbtID:i'),
+    ('GrpContinue', 'GrpContinue', 'rbtID:i'),
+    ('GrpCloseFreeDriver', 'GrpCloseFreeDriver', 'rbtID:i'),
+    ('GrpOpenFreeDriver', 'GrpOpenFreeDriver', 'rbtID:i'),
+    #
+    # part 3 脚本控制指令
+    #
+    ('RunFunc', 'RunFunc', 'funcName:s params:*s'),
+    ('StartScript', 'StartScript', ''),
+    ('StopScript', 'StopScript', 'rbtID:i'),
+    ('PauseScript', 'PauseScript', ''),
+    ('ContinueScript', 'ContinueScript', ''),
+    #
+    # part 4 电箱控制指令
+    #
+    ('ReadBoxInfo', 'ReadBoxInfo', 'rbtID:i'),
+    ('ReadBoxCI', 'ReadBoxCI', 'bit:i'),
+    ('ReadBoxDI', 'ReadBoxDI', 'bit:i'),
+    ('ReadBoxCO', 'ReadBoxCO', 'bit:i'),
+    ('ReadBoxDO', 'ReadBoxDO', 'bit:i'),
+    ('ReadBoxAI', 'ReadBoxAI', 'bit:i'),
+    ('ReadBoxAO', 'ReadBoxAO', 'bit:i'),
+    ('SetBoxCO', 'SetBoxCO', 'bit:i state:i'),
+    ('SetBoxDO', 'SetBoxDO', 'bit:i state:i'),
+    ('SetBoxAOMode', 'SetBoxAOMode', 'index:i pattern:i'),
+    ('SetBoxAOVal', 'SetBoxAO', 'index:i value:f pattern:i'),
+    ('SetEndDO', 'SetEndDO', 'rbtID:i bit:i state:i'),
+    ('ReadEndDI', 'ReadEI', 'rbtID:i bit:i'),
+    ('ReadEndDO', 'ReadEO', 'rbtID:i bit:i'),
+    ('ReadEndAI', 'ReadEAI', 'rbtID:i bit:i'),
+    ('ReadEndBTN', 'ReadEndBTN', 'rbtID:i'),
+    #
+    # part 5 状态读取与设置指令
+    #
+    ('SetOverride', 'SetOverride', 'rbtID:i vel:f'),
+    ('SetToolMotion', 'SetTCPMotion', 'rbtID:i state:i'),
+    ('SetPayload', 'SetPayload', 'rbtID:i Mass:f Center_X:f Center_Y:f Center_Z:f'),
+    ('SetJointMaxVel', 'SetJointMaxVel', 'rbtID:i Joint:*f'),
+    ('SetJointMaxAcc', 'SetJointMaxAcc', 'rbtID:i Joint:*f'),
+    ('SetLinearMaxVel', 'SetLinearMaxVel', 'rbtID:i MaxVel:f'),
+    ('SetLinearMaxAcc', 'SetLinearMaxAcc', 'rbtID:i MaxAcc:f'),
+    ('SetMaxAcsRange', 'SetMaxAcsRange', 'rbtID:i pMax:6f pMin:6f'),
+    ('SetMaxPcsRange', 'SetMaxPcsRange', 'rbtID:i pMax:3f =180 =180 =180 pMin:3f =-180 =-180 =-180 pUcs:6f'),
+    ('ReadJointMaxVel', 'ReadJointMaxVel', 'rbtID:i'),
+    ('ReadJointMaxAcc', 'ReadJointMaxAcc', 'rbtID:i'),
+    ('ReadJointMaxJerk', 'ReadJointMaxJerk', 'rbtID:i'),
+    ('ReadLinearMaxSpeed', 'ReadLinearMaxVel', 'rbtID:i'),
+    ('ReadEmergencyInfo', 'ReadEmergencyInfo', 'rbtID:i'),
+    ('ReadRobotState', 'ReadRobotState', 'rbtID:i'),
+    ('ReadCurWaypointID', 'ReadCurWayPointID', 'rbtID:i'),
+    ('ReadAxiserrorCode', 'ReadAxisErrorCode', 'rbtID:i'),
+    ('ReadCurFSM', 'ReadCurFSM', 'rbtID:i'),
+    #
+    # part 6 位置,速度,电流读取指令
+    #
+    ('ReadActPos', 'ReadActPos', 'rbtID:i'),
+    ('ReadCmdJointPos', 'ReadCmdPos', 'rbtID:i'),
+    ('ReadActJointPos', 'ReadActACS', 'rbtID:i'),
+    ('ReadCmdJointVel', 'ReadCmdJointVel', 'rbtID:i'),
+    ('ReadActJointVel', 'ReadActJointVel', 'rbtID:i'),
+    ('ReadCmdTcpVel', 'ReadCmdTcpVel', 'rbtID:i'),
+    ('ReadActTcpVel', 'ReadActTcpVel', 'rbtID:i'),
+    ('ReadCmdJointCur', 'ReadCmdJointCur', 'rbtID:i'),
+    ('ReadActJointCur', 'ReadActJointCur', 'rbtID:i'),
+    ('ReadTcpVelocity', 'ReadTcpVelocity', 'rbtID:i'),
+    #
+    # part 7 坐标转换计算指令
+    #
+    ('Quaternion2RPY', 'Quaternion2RPY', 'rbtID:i dQuaW:f dQuaX:f dQuaY:f dQuaZ:f'),
+    ('RPY2Quaternion', 'RPY2Quaternion', 'rbtID:i Rx:f Ry:f Rz:f'),
+    ('GetInverseKin', 'PCS2ACS', 'rbtID:i rawPCS:6f rawACS:6f tcp:6f ucs:6f'),
+    ('GetForwardKin', 'ACS2PCS', 'rbtID:i rawACS:6f tcp:6f ucs:6f'),
+    ('Base2UcsTcp', 'Base2UcsTcp', 'rbtID:i Base:6f TCP:6f UCS:6f'),
+    ('UcsTcp2Base', 'UcsTcp2Base', '=0 UcsTcp:6f TCP:6f UCS:6f'),
+    ('PoseAdd', 'PoseAdd', 'rbtID:i pos1:6f pos2:6f'),
+    ('PoseSub', 'PoseSub', 'rbtID:i pos1:6f pos2:6f'),
+    ('PoseTrans', 'PoseTrans', 'rbtID:i pos1:6f pos2:6f'),
+    ('PoseInverse', 'PoseInverse', 'rbtID:i pos1:6f'),
+    ('PoseDist', 'CalPointDistance', 'rbtID:i pos1:6f pos2:6f'),
+    ('PoseInterpolate', 'PoseInterpolate', 'rbtID:i pos1:6f pos2:6f alpha:f'),
+    ('PoseDefdFrame', 'DefdFrame', 'rbtID:i pos1:3f pos2:3f pos3:3f pos4:3f pos5:3f pos6:3f'),
+    #
+    # part 8 工具坐标与用户坐标读写指令
+    #
+    ('SetTCP', 'SetCurTCP', 'rbtID:i TCP:6f'),
+    ('SetUCS', 'SetCurUCS', 'rbtID:i UCS:6f'),
+    ('ReadCurTCP', 'ReadCurTCP', 'rbtID:i'),
+    ('ReadCurUCS', 'ReadCurUCS', 'rbtID:i'),
+    ('SetTCPByName', 'SetTCPByName', 'rbtID:i TcpName:s'),
+    ('SetUCSByName', 'SetUCSByName', 'rbtID:i UcsName:s'),
+    ('ReadTCPByName', 'ReadTCPByName', 'rbtID:i TCP:s'),
+    ('ReadUCSByName', 'ReadUCSByName', 'rbtID:i UCS:s'),
+    #
+    # part 9 力控控制指令
+    #
+    ('SetForceControlState', 'SetForceControlState', 'rbtID:i state:i'),
+    ('ReadForceControlState', 'ReadFTControlState', 'rbtID:i'),
+    ('SetForceToolCoordinateMotion', 'SetForceToolCoordinateMotion', 'rbtID:i mode:i'),
+    ('ForceControlInterrupt', 'GrpFCInterrupt', 'rbtID:i'),
+    ('ForceControlContinue', 'GrpFCContinue', 'rbtID:i'),
+    ('SetForceZero', 'SetForceZero', 'rbtID:i'),
+    ('SetMaxSearchVelocities', 'HRSetMaxSearchVelocities', 'rbtID:i MaxLinearVelocity:f MaxAngularVelocity:f'),
+    ('SetControlFreedom', 'HRSetControlFreedom', 'rbtID:i freedom:6i'),
+    ('SetForceControlStrategy', 'HRSetForceControlStrategy', 'rbtID:i strategy:i'),
+    ('SetFreeDrivePositionAndOrientation', 'SetFTPosition', 'rbtID:i position:6f'),
+    ('SetPIDControlParams', 'HRSetPIDControlParams', 'rbtID:i fP:f fI:f fD:f tP:f tI:f tD:f'),
+    ('SetMassParams', 'HRSetMassParams', 'rbtID:i mass:6f'),
+    ('SetDampParams', 'HRSetDampParams', 'rbtID:i damp:6f'),
+    ('SetStiffParams', 'HRSetStiffParams', 'rbtID:i stiff:6f'),
+    ('SetForceControlGoal', 'HRSetControlGoal', 'rbtID:i forcegoal:6f'),
+    ('SetControlGoal', 'HRSetControlGoal', 'rbtID:i forcegoal:6f distance:6f'),
+    ('SetForceDataLimit', 'HRSetForceDataLimit', 'rbtID:i max:6f min:6f'),
+    ('SetForceDistanceLimit', 'HRSetForceDistanceLimit', 'rbtID:i allowDistance:f strengthLevel:f'),
+    ('ReadFTCabData', 'ReadFTCabData', 'rbtID:i'),
+    ('ReadFTData', 'ReadForceData', 'rbtID:i'),
+    ('SetTangentForceBounds', 'SetTangentForceBounds', 'rbtID:i Max:f Min:f Vel:f'),
+    ('SetScriptForceControlState', 'SetScriptForceControlState',
+     'rbtID:i state:i FTMode:i UCS:s vel:2f forces:6f freedom:6i PID:6f Mass:6f Damp:6f Stiff:6f'),
+    #
+    # part 10 通用运动类控制指令
+    #
+    ('ShortJogJ', 'ShortJogJ', 'rbtID:i axisId:i derection:i'),
+    ('ShortJogL', 'ShortJogL', 'rbtID:i pcsId:i derection:i'),
+    ('LongJogJ', 'LongJogJ', 'rbtID:i axisId:i derection:i state:i'),
+    ('LongJogL', 'LongJogL', 'rbtID:i pcsId:i derection:i state:i'),
+    ('LongMoveEvent', 'LongMoveEvent', 'rbtID:i'),
+    ('WayPointEx', 'WayPointEx',
+     'rbtID:i points:6f RawACSpoints:6f ucs:6f tcp:6f speed:f acc:f radius:f type:i isJoint:i isSeek:i bit:i '
+     'state:i cmdID:s'),
+    ('WayPoint', 'WayPoint',
+     'rbtID:i points:6f RawACSpoints:6f tcp:s ucs:s speed:f Acc:f radius:f type:i isJoint:i isSeek:i bit:i '
+     'state:i cmdID:s'),
+    ('WayPoint2', 'WayPoint2',
+     'rbtID:i EndPos:6f AuxPos:6f cmdID:s Tcp:s Ucs:s Vel:f Acc:f Radius:f type:i isJoint:i isSeek:i bit:i '
+     'state:i AcsPos:6f'),
+    ('MoveJ', 'WayPoint',
+     'rbtID:i points:6f RawACSpoints:6f tcp:s ucs:s speed:f Acc:f radius:f =0 isJoint:i isSeek:i bit:i state:i '
+     'cmdID:s'),
+    ('MoveL', 'WayPoint',
+     'rbtID:i points:6f RawACSpoints:6f tcp:s ucs:s speed:f Acc:f radius:f =1 =0 isSeek:i bit:i state:i '
+     'cmdID:s'),
+    ('MoveC', 'MoveC',
+     'rbtID:i StartPoint:6f AuxPoint:6f EndPoint:6f fixedPosure:i nMoveCType:i nRadLen:f speed:f Acc:f '
+     'radius:f tcp:s ucs:s cmdID:s'),
+    ('MoveZ', 'MoveZ',
+     'rbtID:i StartPoint:6f EndPoint:6f PlanePoint:6f Speed:f Acc:f WIdth:f Density:f EnableDensity:i '
+     'EnablePlane:i EnableWaiTime:i PosiTime:f NegaTime:f Radius:f tcp:s ucs:s cmdID:s'),
+    ('MoveE', 'MoveE',
+     'rbtID:i dP1:6f dP2:6f dP3:6f dP4:6f dP5:6f nOrientMode:i nMoveType:i dArcLength:f dVelocity:f dAcc:f '
+     'Radius:f tcp:s ucs:s cmdID:s'),
+    ('MoveS', 'MoveS',
+     'rbtID:i dSpiralIncrement:f dSpiralDiameter:f dVelocity:f dAcc:f dRadius:f sTcpName:s sUcsName:s '
+     'cmdID:s'),
+    ('MoveRelJ', 'MoveRelJ', 'rbtID:i nAxis:i nDirection:i dDistance:f'),
+    ('MoveRelL', 'MoveRelL', 'rbtID:i nAxis:i nDirection:i dDistance:f nToolMotion:i'),
+    ('WayPointRel', 'WayPointRel',
+     'rbtID:i nType:i nPointList:i Pos:6f rawACT:6f nrelMoveType:i nAxisMask:6i dTarget:6f sTcpName:s '
+     'sUcsName:s dVelocity:f dAcc:f dRadius:f nIsUseJoint:i nIsSeek:i nIOBit:i nIOState:i strcmdID:s'),
+    #
+    # part 11 连续轨迹运动类控制指令
+    #
+    ('StartPushMovePathJ', 'StartPushMovePath', 'rbtID:i trackName:s speedRatio:f radius:f'),
+    ('PushMovePathJ', 'PushMovePathJ', 'rbtID:i trackName:s paramsJ:6f'),
+    ('EndPushMovePathJ', 'EndPushMovePath', 'rbtID:i trackName:s'),
+    ('MovePathJ', 'MovePath', 'rbtID:i trajectName:s'),
+    ('ReadMovePathJState', 'ReadMovePathState', 'rbtID:i trackName:s'),
+    ('UpdateMovePathJName', 'UpdateMovePathName', 'rbtID:i trackName:s newName:s'),
+    ('DelMovePathJ', 'DelMovePath', 'rbtID:i trackName:s'),
+    ('ReadTrackProcess', 'ReadSoftMotionProgress', 'rbtID:i'),
+    ('InitMovePathL', 'InitMovePathL', 'rbtID:i trackName:s vel:f acc:f jerk:f ucs:s tcp:s'),
+    ('PushMovePathL', 'PushMovePathL', 'rbtID:i trackName:s paramPcs:6f'),
+    ('PushMovePaths', 'PushMovePaths', 'rbtID:i trackName:s moveType:i pointsSize:i points:*f'),
+    ('MovePathL', 'MovePathL', 'rbtID:i trackName:s'),
+    ('SetMovePathOverride', 'SetMovePathOverride', 'rbtID:i MovePathOverride:f'),
+    #
+    # part 12 Servo 运动类控制指令
+    #
+    ('StartServo', 'StartServo', 'rbtID:i servoTime:f lookaheadTime:f'),
+    ('PushServoJ', 'PushServoJ', 'rbtID:i dACS:6f'),
+    ('PushServoP', 'PushServoP', 'rbtID:i pose:6f ucs:6f tcp:6f'),
+    ('InitServoEsJ', 'InitServoEsJ', 'rbtID:i'),
+    ('StartServoEsJ', 'StartServoEsJ', 'rbtID:i dServoTime:f dLookaheadTime:f'),
+    ('PushServoEsJ', 'PushServoEsJ', 'rbtID:i nPointSize:i sPoints:*f'),
+    ('ReadServoEsJState', 'ReadServoEsJState', 'rbtID:i'),
+    #
+    # part 13 相对跟踪运动类控制指令
+    #
+    ('SetMoveTraceParams', 'SetMoveTraceParams', 'rbtID:i state:i distance:f dAwayVelocity:f dGobackVelocity:f'),
+    ('SetMoveTraceInitParams', 'SetMoveTraceInitParams', 'rbtID:i dK:f dB:f maxLimit:f minLinit:f'),
+    ('SetMoveTraceUcs', 'SetMoveTraceUcs', 'rbtID:i direction:*f'),
+    ('SetTrackingState', 'SetTrackingState', 'rbtID:i state:i'),
+    #
+    # part 14 其他指令
+    #
+    ('HRAppCmd', 'HRAppCmd', 'name:s cmd:s param:*s'),
+    ('WriteEndHoldingRegisters', 'WriteHoldingRegisters',
+     'rbtID:i nSlaveID:i nFunction:i nRegAddr:i nRegCount:i data:*i'),
+    ('ReadEndHoldingRegisters', 'ReadHoldingRegisters', 'rbtID:i nSlaveID:i nFunction:i nRegAddr:i nRegCount:i'),
+    ('cdsSetIO', 'cdsSetIO',
+     'nEndDOMask:i nEndDOVal:i nBoxDOMask:i nBoxDOVal:i nBoxCOMask:i nBoxCOVal:i nBoxAOCH0_Mask:i '
+     'nBoxAOCH0_Mode:i nBoxAOCH1_Mask:i nBoxAOCH1_Mode:i dbBoxAOCH0_Val:f dbBoxAOCH1_Val:f'),
+)
+
+
+def parseArgSpec(spec):
+    '''
+    *	@param brief:解析参数描述
+    *	@param return: [(name, count, type)],count为None表示单个值,'*'表示变长;固定值的name为None,type为该值
+    '''
+    fields = []
+    for item in spec.split():
+        if item.startswith('='):
+            fields.append((None, None, item[1:]))
+            continue
+        name, kind = item.split(':')
+        count = kind[:-1]
+        if count == '':
+            count = None
+        elif count != '*':
+            count = int(count)
+        fields.append((name, count, kind[-1]))
+    return fields
+
+
+def joinSeq(seq):
+    if len(seq) == 0:
+        return ''
+    return ','.join(map(str, seq)) + ','
+
+
+def compileEncoder(api, command, spec):
+    '''
+    *	@param brief:由参数描述生成编码函数,参数顺序与发送顺序一致,返回bytes
+    '''
+    args = []
+    values = []
+    template = command.replace('%', '%%') + ','
+    for name, count, kind in parseArgSpec(spec):
+        if name is None:
+            template += kind.replace('%', '%%') + ','
+            continue
+        args.append(name)
+        if count is None:
+            template += '%s,'
+            values.append(name)
+        elif count == '*':
+            template += '%s'
+            values.append('joinSeq(%s)' % name)
+        else:
+            template += '%s,' * count
+            values.extend(['%s[%d]' % (name, i) for i in range(count)])
+    template += ';'
+    namespace = {'joinSeq': joinSeq, 'template': template, 'const': template.replace('%%', '%').encode()}
+    if values:
+        source = 'def %s(%s):\n    return (template %% (%s,)).encode()\n' % (api, ', '.join(args), ', '.join(values))
+    else:
+        source = 'def %s():\n    return const\n' % api
+    exec(source, namespace)
+    return namespace[api]
+
+
+def toInt(value):
+    return int(float(value))
+
+
+Converters = {'i': toInt, 'f': float, 's': str}
+
+
+def decodeCommand(frame):
+    '''
+    *	@param brief:编码的逆过程,将 'Command,args,;' 解析为 (命令, {参数名: 值}),供模拟器使用
+                     多个接口共用同一协议命令时按CommandTable中第一个接口的参数解析,固定值字段跳过
+    *	@param frame: 一条完整命令
+    *	@param return: (命令, 参数字典),未知命令的参数字典为空
+    '''
+    values = frame.split(',')
+    command = values[0]
+    values = values[1:-1]
+    args = {}
+    fields = CommandSpecs.get(command)
+    if fields is None:
+        return command, args
+    pos = 0
+    for name, count, kind in fields:
+        if name is None:
+            pos += 1
+            continue
+        convert = Converters[kind]
+        if count is None:
+            args[name] = convert(values[pos])
+            pos += 1
+        elif count == '*':
+            args[name] = [convert(v) for v in values[pos:]]
+            pos = len(values)
+        else:
+            args[name] = [convert(v) for v in values[pos:pos + count]]
+            pos += count
+    return command, args
+
+
+class Encoders(object):
+    '''
+    *	@param brief:由CommandTable生成的编码函数,例如 Encoders.PushServoJ(rbtID, dACS) -> b'PushServoJ,0,...,;'
+    '''
+
+
+# 协议命令 -> 参数描述
+CommandSpecs = {}
+
+for _api, _command, _spec in CommandTable:
+    setattr(Encoders, _api, staticmethod(compileEncoder(_api, _command, _spec)))
+    CommandSpecs.setdefault(_command, parseArgSpec(_spec))
+
+
+# ReadActPos 应答: 关节位置,迪卡尔位置,工具坐标,用户坐标,各6个值
+ActPos = namedtuple('ActPos', ['joint', 'pcs', 'tcp', 'ucs'])
+ActPosSizes = (6, 6, 6, 6)
+
+# ReadRobotState 应答的13个状态位
+RobotState = namedtuple('RobotState', ['moving', 'enabled', 'error', 'errorCode', 'errorAxis', 'brake', 'paused',
+                                       'emergencyStop', 'safetyGuard', 'electrify', 'boxConnected', 'blendingDone',
+                                       'inPos'])
+
+
+class ArrayResult(object):
+    '''
+    *	@param brief:数值应答解码,代替列表作为result传入HRIF_*读取接口
+                     应答字段不经过字符串列表,直接一次解析为NumPy数组 self.values
+                     pos = ArrayResult()
+                     cps.HRIF_ReadActJointCur(boxID, rbtID, pos) -> pos.values
+                     同一对象可在循环中重复传入,只适用于单条指令且字段全为数值的读取接口
+    *	@param dtype: 数组类型,默认float64,状态位可用int
+    '''
+
+    def __init__(self, dtype=None):
+        if np is None:
+            raise ImportError('ArrayResult requires numpy')
+        self.dtype = np.float64 if dtype is None else dtype
+        self.values = np.zeros(0, self.dtype)
+        # 最近一次请求发出与应答收到的time.monotonic()时间,由RbtClient填写
+        self.sendTime = None
+        self.recvTime = None
+
+    def decodeFields(self, fields):
+        # fields: 'v1,v2,...,;' 即应答中OK之后的部分,含非数值字段或字段数不符时抛出ValueError
+        # np.fromstring直接解析为float64,不生成中间的字符串列表
+        end = fields.rfind(',')
+        text = fields[:end] if end >= 0 else ''
+        values = np.fromstring(text, np.float64, sep=',')
+        if len(values) != (text.count(',') + 1 if text else 0):
+            raise ValueError('malformed numeric reply: %r' % fields)
+        self.values = values.astype(self.dtype, copy=False)
+        return self.values
+
+
+class TimedResult(list):
+    '''
+    *	@param brief:带时间戳的列表结果,用法与普通列表result相同,字段为字符串
+                     pos = TimedResult()
+                     cps.HRIF_ReadActPos(boxID, rbtID, pos) -> pos[0:6], pos.sendTime, pos.recvTime
+    '''
+
+    def __init__(self, *args):
+        list.__init__(self, *args)
+        self.sendTime = None
+        self.recvTime = None
+
+    def decodeFields(self, fields):
+        values = fields.split(',')
+        values.pop()
+        self[:] = values
+        return self
+
+
+class StructResult(ArrayResult):
+    '''
+    *	@param brief:将数值应答解码为namedtuple self.value,各字段为数组切片或单个值
+                     pos = StructResult(ActPos, ActPosSizes)
+                     cps.HRIF_ReadActPos(boxID, rbtID, pos) -> pos.value.pcs
+    *	@param struct: namedtuple类型
+    *	@param sizes: 各字段占用的值个数,None表示每个字段一个值
+    *	@param dtype: 同ArrayResult
+    '''
+
+    def __init__(self, struct, sizes=None, dtype=None):
+        ArrayResult.__init__(self, dtype)
+        self.struct = struct
+        self.value = None
+        self.m_slices = None
+        self.m_count = len(struct._fields)
+        if sizes is not None:
+            self.m_slices = []
+            start = 0
+            for size in sizes:
+                self.m_slices.append(slice(start, start + size))
+                start += size
+            self.m_count = start
+
+    def decodeFields(self, fields):
+        # 字段数与struct不符时抛出ValueError,self.value保持上一次的结果
+        values = ArrayResult.decodeFields(self, fields)
+        if len(values) != self.m_count:
+            raise ValueError('%s expects %d fields, got %d' % (self.struct.__name__, self.m_count, len(values)))
+        if self.m_slices is None:
+            self.value = self.struct._make(values.tolist())
+        else:
+            self.value = self.struct._make([values[s] for s in self.m_slices])
+        return self.value
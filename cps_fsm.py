@@ -0,0 +1,145 @@
+#!/usr/bin/env python
+# _*_ coding:utf-8 _*_
+
+import asyncio
+import threading
+from collections import namedtuple
+
+# 一次状态机跳变
+#   previous/current: 跳变前后的状态(RbtFSM,不在枚举中的值为int)
+#   time: 首次观察到新状态的快照的收发时间中点(time.monotonic())
+#   lastSeen: 最后一次观察到旧状态的时间,跳变发生在(lastSeen, time]之间
+FSMTransition = namedtuple('FSMTransition', ['previous', 'current', 'time', 'lastSeen'])
+
+
+class FSMSubscription(object):
+    '''
+    *	@param brief:单个订阅,由FSMWatcher在轮询线程中驱动
+                     新状态需持续debounce秒(按快照接收时间)才报告,更短的抖动被忽略;报告的时间仍为首次观察到的时间
+    *	@param callback: callback(FSMTransition)
+    *	@param states: 只报告进入这些状态的跳变,None表示全部
+    *	@param debounce: 去抖时间(s),0表示立即报告
+    '''
+
+    def __init__(self, watcher, callback, states=None, debounce=0.0):
+        self.m_watcher = watcher
+        self.m_callback = callback
+        self.m_states = None if states is None else frozenset([int(s) for s in states])
+        self.m_debounce = debounce
+        self.m_confirmed = None
+        self.m_lastSeen = None
+        self.m_candidate = None
+        self.m_candidateTime = None
+        self.m_candidateRecv = None
+
+    def cancel(self):
+        self.m_watcher.unsubscribe(self)
+
+    def onSample(self, fsm, sendTime, recvTime):
+        if self.m_confirmed is None or fsm == self.m_confirmed:
+            # 订阅时的状态不算跳变
+            self.m_confirmed = fsm
+            self.m_lastSeen = recvTime
+            self.m_candidate = None
+            return
+        if fsm != self.m_candidate:
+            self.m_candidate = fsm
+            self.m_candidateTime = (sendTime + recvTime) * 0.5
+            self.m_candidateRecv = recvTime
+        if recvTime - self.m_candidateRecv < self.m_debounce:
+            return
+        transition = FSMTransition(self.m_watcher.toState(self.m_confirmed), self.m_watcher.toState(fsm),
+                                   self.m_candidateTime, self.m_lastSeen)
+        self.m_confirmed = fsm
+        self.m_lastSeen = recvTime
+        self.m_candidate = None
+        if self.m_states is None or fsm in self.m_states:
+            self.m_callback(transition)
+
+
+class FSMStream(object):
+    '''
+    *	@param brief:以异步迭代器方式接收跳变,需在协程中创建,否则抛出RuntimeError
+                     async for transition in cps.fsmTransitions(boxID, [RbtFSM.enCPSState_Standy]):
+                         ...
+                     stream.close()结束迭代并取消订阅
+    '''
+
+    def __init__(self, watcher, states=None, debounce=0.0):
+        self.m_loop = asyncio.get_running_loop()
+        self.m_queue = asyncio.Queue()
+        self.m_subscription = watcher.subscribe(self.onTransition, states, debounce)
+
+    def onTransition(self, transition):
+        self.m_loop.call_soon_threadsafe(self.m_queue.put_nowait, transition)
+
+    def close(self):
+        self.m_subscription.cancel()
+        self.m_loop.call_soon_threadsafe(self.m_queue.put_nowait, None)
+
+    def __aiter__(self):
+        return self
+
+    async def __anext__(self):
+        transition = await self.m_queue.get()
+        if transition is None:
+            raise StopAsyncIteration
+        return transition
+
+
+class FSMWatcher(object):
+    '''
+    *	@param brief:一个电箱的状态机跳变分发,作为TelemetryCache的监听者,
+                     所有订阅共用同一路轮询,订阅数量不增加控制器的请求数
+    *	@param cache: TelemetryCache
+    *	@param enum: 状态值转换为的枚举类型,一般为RbtFSM
+    '''
+
+    def __init__(self, cache, enum=None):
+        self.m_cache = cache
+        self.m_enum = enum
+        self.m_lock = threading.Lock()
+        self.m_subscriptions = ()
+        cache.addListener(self.onSnapshot)
+
+    def toState(self, fsm):
+        if self.m_enum is None:
+            return fsm
+        try:
+            return self.m_enum(fsm)
+        except ValueError:
+            return fsm
+
+    def subscribe(self, callback, states=None, debounce=0.0):
+        '''
+        *	@param return: FSMSubscription,调用cancel()取消
+        '''
+        subscription = FSMSubscription(self, callback, states, debounce)
+        # 以订阅时最新快照中的状态为起点,订阅后立即发生的跳变也能收到
+        latest = self.m_cache.latest()
+        if latest is not None and latest.errorCode == 0:
+            subscription.onSample(latest.fsm, latest.sendTime, latest.recvTime)
+        with self.m_lock:
+            self.m_subscriptions = self.m_subscriptions + (subscription,)
+        return subscription
+
+    def unsubscribe(self, subscription):
+        with self.m_lock:
+            self.m_subscriptions = tuple([s for s in self.m_subscriptions if s is not subscription])
+
+    def stream(self, states=None, debounce=0.0):
+        return FSMStream(self, states, debounce)
+
+    def close(self):
+        self.m_cache.removeListener(self.onSnapshot)
+        with self.m_lock:
+            self.m_subscriptions = ()
+
+    def onSnapshot(self, snapshot):
+        if snapshot.errorCode != 0:
+            return
+        for subscription in self.m_subscriptions:
+            try:
+                subscription.onSample(snapshot.fsm, snapshot.sendTime, snapshot.recvTime)
+            except Exception as e:
+                print('FSMWatcher callback error: ' + repr(e))
@@ -0,0 +1,103 @@
+#!/usr/bin/env python
+# _*_ coding:utf-8 _*_
+
+import threading
+from collections import OrderedDict
+
+
+class KinematicsCache(object):
+    '''
+    *	@param brief:HRIF_GetInverseKin/HRIF_GetForwardKin应答的LRU缓存,由CPSClient.enableKinCache挂接
+                     键为电箱,指令,rbtID与量化后的全部输入(目标位置,参考关节角,tcp,ucs),值为应答字符串;
+                     设置工具/用户坐标,机器人型号变化或重新连接时清空该电箱的缓存
+    *	@param capacity: 每个电箱最多缓存的应答数,超出时淘汰最久未使用的
+    *	@param quantum: 输入的量化步长(mm/°),差值小于该值的输入视为相同;默认与控制器应答的3位小数一致
+    '''
+
+    def __init__(self, capacity=1024, quantum=0.001):
+        self.capacity = capacity
+        self.quantum = quantum
+        self.m_lock = threading.Lock()
+        self.m_boxes = {}
+        self.m_models = {}
+        self.reset()
+
+    def reset(self):
+        '''
+        *	@param brief:清空统计,不清空缓存
+        '''
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.invalidations = 0
+
+    def key(self, name, rbtID, *values):
+        scale = 1.0 / self.quantum
+        return (name, rbtID) + tuple([int(round(float(v) * scale)) for group in values for v in group])
+
+    def get(self, boxID, key):
+        '''
+        *	@param return: 应答字符串列表的拷贝,未命中时为None
+        '''
+        with self.m_lock:
+            entries = self.m_boxes.get(boxID)
+            value = None if entries is None else entries.get(key)
+            if value is None:
+                self.misses += 1
+                return None
+            entries.move_to_end(key)
+            self.hits += 1
+            return list(value)
+
+    def put(self, boxID, key, value):
+        with self.m_lock:
+            entries = self.m_boxes.get(boxID)
+            if entries is None:
+                entries = self.m_boxes[boxID] = OrderedDict()
+            entries[key] = tuple(value)
+            entries.move_to_end(key)
+            while len(entries) > self.capacity:
+                entries.popitem(last=False)
+                self.evictions += 1
+
+    def invalidate(self, boxID=None):
+        '''
+        *	@param brief:清空一个电箱(None为全部)的缓存
+        '''
+        with self.m_lock:
+            boxes = list(self.m_boxes) if boxID is None else [boxID]
+            for box in boxes:
+                if self.m_boxes.pop(box, None):
+                    self.invalidations += 1
+            if boxID is None:
+                self.m_models = {}
+            else:
+                self.m_models.pop(boxID, None)
+
+    def checkModel(self, boxID, model):
+        '''
+        *	@param brief:记录HRIF_ReadRobotModel读到的型号,与上次不同时清空该电箱的缓存
+        '''
+        with self.m_lock:
+            previous = self.m_models.get(boxID)
+            self.m_models[boxID] = model
+        if previous is not None and previous != model:
+            self.invalidate(boxID)
+            with self.m_lock:
+                self.m_models[boxID] = model
+
+    def snapshot(self):
+        '''
+        *	@param return: {hits, misses, hitRate, evictions, invalidations, size, capacity},size为各电箱缓存数之和
+        '''
+        with self.m_lock:
+            total = self.hits + self.misses
+            return {
+                'hits': self.hits,
+                'misses': self.misses,
+                'hitRate': self.hits / float(total) if total else 0.0,
+                'evictions': self.evictions,
+                'invalidations': self.invalidations,
+                'size': sum([len(entries) for entries in self.m_boxes.values()]),
+                'capacity': self.capacity,
+            }
@@ -0,0 +1,392 @@
+#!/usr/bin/env python
+# _*_ coding:utf-8 _*_
+
+import re
+from collections import namedtuple
+
+import numpy as np
+
+from cps_pose import poseToMatrix, matrixToPose, invertMatrix, poseError, remoteBatch
+
+# 本地逆解的错误码,与CPS.dic_ErrorCode一致
+ErrUnreachable = 39507
+ErrJointLimit = 39508
+
+# Elfin系列为6个旋转关节,肩,肘,腕各由两个相交关节组成,腕部三轴交于一点
+# 零位时手臂竖直向上,各关节坐标系与基坐标系同向,按URDF方式描述为
+#   (相对上一关节的偏移 mm, 转轴)
+#   J1 基座 Z | J2 肩 Y,高d1 | J3 肘 Y,上臂a2 | J4 小臂 Z | J5 腕 Y,小臂d4 | J6 法兰 Z,腕长d6
+# 关节角为0,0,90,0,90,0时小臂水平指向+X,法兰朝下,姿态为180,0,180
+# limits: 6个关节的(下限, 上限)(°),必须给出,逆解超出范围时返回39508
+KinematicModel = namedtuple('KinematicModel', ['name', 'd1', 'a2', 'd4', 'd6', 'limits'])
+
+# 已登记的型号,getModel/readModel只在其中查找;本模块不附带经过核实的型号参数,
+# 须由registerModel或modelFromOrigins按厂家提供的URDF/数据手册写入
+Models = {}
+
+
+def validateModel(model):
+    '''
+    *	@param brief:检查型号参数,连杆长度须为正,limits须为6组(下限, 上限)且下限小于上限
+    *	@param return: limits转换为元组的KinematicModel,参数不合法时抛出ValueError
+    '''
+    for name in ('d1', 'a2', 'd4', 'd6'):
+        if not getattr(model, name) > 0:
+            raise ValueError('%s: %s must be positive' % (model.name, name))
+    if model.limits is None:
+        raise ValueError('%s: joint limits are required' % model.name)
+    limits = np.asarray(model.limits, np.float64)
+    if limits.shape != (6, 2) or not np.all(np.isfinite(limits)):
+        raise ValueError('%s: limits must be 6 finite (lower, upper) pairs' % model.name)
+    if not np.all(limits[:, 0] < limits[:, 1]):
+        raise ValueError('%s: lower limit must be less than upper limit' % model.name)
+    return model._replace(limits=tuple([tuple(pair) for pair in limits.tolist()]))
+
+
+# 名义尺寸(mm),由各型号臂展推算,未经标定,只用于模拟器与离线测试;
+# 实际关节范围未知,名义参数取±360°,逆解不会因关节范围失败;
+# getModel/readModel不会选用,需要时由nominalModel显式取得
+NominalLimits = ((-360.0, 360.0),) * 6
+NominalModels = {}
+for _model in (KinematicModel('Elfin03', 190.0, 270.0, 320.0, 150.0, NominalLimits),
+               KinematicModel('Elfin05', 220.0, 380.0, 420.0, 180.0, NominalLimits),
+               KinematicModel('Elfin10', 263.0, 480.0, 520.0, 180.0, NominalLimits),
+               KinematicModel('Elfin15', 263.0, 730.0, 570.0, 180.0, NominalLimits)):
+    NominalModels[_model.name] = validateModel(_model)
+
+
+def registerModel(model):
+    '''
+    *	@param brief:添加或替换一个型号的参数,参数不合法时抛出ValueError(见validateModel)
+    *	@param model: KinematicModel
+    '''
+    model = validateModel(model)
+    Models[model.name] = model
+
+
+def modelFromOrigins(name, origins, limits, tolerance=1e-6):
+    '''
+    *	@param brief:由URDF形式的关节原点建立型号参数,零位时各关节坐标系与基坐标系同向,转轴依次为Z,Y,Y,Z,Y,Z
+                     封闭逆解要求各关节原点都在基座Z轴上(肩部无横向偏置,肘部无偏置,腕部三轴交于一点),
+                     任一原点的X或Y不为0时抛出ValueError,不能用本模块的正解/逆解
+    *	@param origins: 7组(x, y, z)(mm),J1..J6相对上一关节的原点,最后一组为法兰相对J6
+    *	@param tolerance: 视为0的偏置(mm)
+    *	@param return: 经validateModel检查的KinematicModel,可传给registerModel
+    '''
+    origins = np.asarray(origins, np.float64)
+    if origins.shape != (7, 3) or not np.all(np.isfinite(origins)):
+        raise ValueError('%s: origins must be 7 finite (x, y, z) triples' % name)
+    offsets = np.abs(origins[:, :2]).max(axis=1)
+    if np.any(offsets > tolerance):
+        joint = int(np.argmax(offsets > tolerance))
+        raise ValueError('%s: %s has a lateral offset, closed-form kinematics needs zero offsets and a spherical wrist'
+                         % (name, 'flange' if joint == 6 else 'J%d' % (joint + 1)))
+    z = origins[:, 2]
+    return validateModel(KinematicModel(name, z[0] + z[1], z[2], z[3] + z[4], z[5] + z[6], limits))
+
+
+def modelName(text):
+    '''
+    *	@param brief:控制器返回的型号名称(如E05, Elfin5, Elfin05-L)转换为Models/NominalModels中的名称
+    '''
+    if text in Models or text in NominalModels:
+        return text
+    match = re.search(r'(\d+)', str(text))
+    if match is None:
+        return text
+    return 'Elfin%02d' % int(match.group(1))
+
+
+def getModel(model):
+    '''
+    *	@param model: 型号名称或KinematicModel
+    *	@param return: KinematicModel,型号未经registerModel登记时抛出ValueError
+    '''
+    if isinstance(model, KinematicModel):
+        return model
+    name = modelName(model)
+    if name not in Models:
+        raise ValueError('robot model %s is not registered' % model)
+    return Models[name]
+
+
+def nominalModel(model):
+    '''
+    *	@param brief:型号的名义参数(见NominalModels),未经标定,不能代替控制器的正解/逆解
+    *	@param return: KinematicModel,没有该型号时抛出ValueError
+    '''
+    name = modelName(model)
+    if name not in NominalModels:
+        raise ValueError('no nominal parameters for robot model %s' % model)
+    return NominalModels[name]
+
+
+def readModel(cps, boxID, rbtID):
+    '''
+    *	@param brief:通过HRIF_ReadRobotModel读取控制器的机器人型号
+    *	@param return: (错误码, KinematicModel),型号未经registerModel登记时返回(39501, None),不使用名义参数
+    '''
+    result = []
+    nRet = cps.HRIF_ReadRobotModel(boxID, rbtID, result)
+    if nRet != 0:
+        return nRet, None
+    try:
+        return 0, getModel(result[0])
+    except ValueError:
+        return 39501, None
+
+
+def flangeMatrix(joints, model):
+    '''
+    *	@param brief:基坐标系下法兰的齐次变换矩阵
+    *	@param joints: (6,) 或 (N, 6) 关节角(°)
+    *	@param return: (4, 4) 或 (N, 4, 4)
+    '''
+    m = getModel(model)
+    q = np.radians(np.asarray(joints, np.float64))
+    c, s = np.cos(q), np.sin(q)
+    c1, c2, c3, c4, c5, c6 = [c[..., i] for i in range(6)]
+    s1, s2, s3, s4, s5, s6 = [s[..., i] for i in range(6)]
+    # J2,J3同轴向,合并为一次转动;上臂与小臂在该平面内
+    c23 = np.cos(q[..., 1] + q[..., 2])
+    s23 = np.sin(q[..., 1] + q[..., 2])
+    # 腕部中心在J1转动前的XZ平面内
+    r = m.a2 * s2 + m.d4 * s23
+    z = m.d1 + m.a2 * c2 + m.d4 * c23
+    # R03 = Rz(q1)·Ry(q2+q3),R36 = Rz(q4)·Ry(q5)·Rz(q6)
+    R03 = np.empty(q.shape[:-1] + (3, 3))
+    R03[..., 0, 0] = c1 * c23
+    R03[..., 0, 1] = -s1
+    R03[..., 0, 2] = c1 * s23
+    R03[..., 1, 0] = s1 * c23
+    R03[..., 1, 1] = c1
+    R03[..., 1, 2] = s1 * s23
+    R03[..., 2, 0] = -s23
+    R03[..., 2, 1] = 0.0
+    R03[..., 2, 2] = c23
+    R36 = np.empty(q.shape[:-1] + (3, 3))
+    R36[..., 0, 0] = c4 * c5 * c6 - s4 * s6
+    R36[..., 0, 1] = -c4 * c5 * s6 - s4 * c6
+    R36[..., 0, 2] = c4 * s5
+    R36[..., 1, 0] = s4 * c5 * c6 + c4 * s6
+    R36[..., 1, 1] = -s4 * c5 * s6 + c4 * c6
+    R36[..., 1, 2] = s4 * s5
+    R36[..., 2, 0] = -s5 * c6
+    R36[..., 2, 1] = s5 * s6
+    R36[..., 2, 2] = c5
+    R = R03 @ R36
+    T = np.zeros(q.shape[:-1] + (4, 4))
+    T[..., 0:3, 0:3] = R
+    T[..., 0, 3] = c1 * r + m.d6 * R[..., 0, 2]
+    T[..., 1, 3] = s1 * r + m.d6 * R[..., 1, 2]
+    T[..., 2, 3] = z + m.d6 * R[..., 2, 2]
+    T[..., 3, 3] = 1.0
+    return T
+
+
+def forwardKin(joints, model, tcp=None, ucs=None):
+    '''
+    *	@param brief:本地正解,与HRIF_GetForwardKin相同: 由关节角计算指定用户坐标系下工具坐标系的空间位置
+                     joints为(N, 6)时一次计算N组
+    *	@param joints: (6,) 或 (N, 6) 关节角(°)
+    *	@param model: 型号名称或KinematicModel,可由readModel读取
+    *	@param tcp: 工具坐标,(6,)或与joints对应的(N, 6),None为法兰
+    *	@param ucs: 用户坐标,(6,)或(N, 6),None为基坐标系
+    *	@param return: (6,) 或 (N, 6) 空间位置[X, Y, Z, Rx, Ry, Rz]
+    '''
+    T = flangeMatrix(joints, model)
+    if tcp is not None:
+        T = T @ poseToMatrix(tcp)
+    if ucs is not None:
+        T = invertMatrix(poseToMatrix(ucs)) @ T
+    return matrixToPose(T)
+
+
+def targetMatrix(poses, tcp=None, ucs=None):
+    # 用户坐标系下工具位置 -> 基坐标系下法兰位置: UCS·T·TCP⁻¹
+    T = poseToMatrix(poses)
+    if ucs is not None:
+        T = poseToMatrix(ucs) @ T
+    if tcp is not None:
+        T = T @ invertMatrix(poseToMatrix(tcp))
+    return T
+
+
+def ikBranches(T, model, refJoints, eps=1e-9):
+    '''
+    *	@param brief:法兰位置的全部8组封闭解: 肩(前/后) x 肘(上/下) x 腕(翻转/不翻转)
+                     腕部奇异(J5=0或180°)时J4取参考值,肩部奇异(腕部中心在J1轴上)时J1取参考值
+    *	@param T: (N, 4, 4) 基坐标系下法兰位置
+    *	@param refJoints: (N, 6) 参考关节角(°)
+    *	@param return: (关节角 (N, 8, 6)(°),未折算到参考值附近, 可达 (N, 8))
+    '''
+    m = getModel(model)
+    ref = np.radians(refJoints)
+    R = T[:, None, 0:3, 0:3]
+    # 腕部中心
+    pw = T[:, 0:3, 3] - m.d6 * T[:, 0:3, 2]
+    rho = np.hypot(pw[:, 0], pw[:, 1])
+    base = np.where(rho < eps, ref[:, 0], np.arctan2(pw[:, 1], pw[:, 0]))
+    shoulder = np.array([1, 1, 1, 1, -1, -1, -1, -1], np.float64)
+    elbow = np.array([1, 1, -1, -1, 1, 1, -1, -1], np.float64)
+    wrist = np.array([1, -1, 1, -1, 1, -1, 1, -1], np.float64)
+    q = np.empty((len(T), 8, 6))
+    q[:, :, 0] = base[:, None] + np.where(shoulder < 0, np.pi, 0.0)
+    r = shoulder * rho[:, None]
+    h = (pw[:, 2] - m.d1)[:, None]
+    D = (r * r + h * h - m.a2 * m.a2 - m.d4 * m.d4) / (2.0 * m.a2 * m.d4)
+    reachable = np.abs(D) <= 1.0 + 1e-9
+    q3 = elbow * np.arccos(np.clip(D, -1.0, 1.0))
+    q[:, :, 2] = q3
+    q[:, :, 1] = np.arctan2(r, h) - np.arctan2(m.d4 * np.sin(q3), m.a2 + m.d4 * np.cos(q3))
+    # R36 = R03ᵀ·R
+    q23 = q[:, :, 1] + q[:, :, 2]
+    c1, s1, c23, s23 = np.cos(q[:, :, 0]), np.sin(q[:, :, 0]), np.cos(q23), np.sin(q23)
+    R03 = np.empty(q.shape[:2] + (3, 3))
+    R03[..., 0, 0] = c1 * c23
+    R03[..., 0, 1] = -s1
+    R03[..., 0, 2] = c1 * s23
+    R03[..., 1, 0] = s1 * c23
+    R03[..., 1, 1] = c1
+    R03[..., 1, 2] = s1 * s23
+    R03[..., 2, 0] = -s23
+    R03[..., 2, 1] = 0.0
+    R03[..., 2, 2] = c23
+    R36 = np.swapaxes(R03, -1, -2) @ R
+    c5 = np.clip(R36[..., 2, 2], -1.0, 1.0)
+    q5 = wrist * np.arccos(c5)
+    singular = np.abs(np.sin(q5)) < 1e-7
+    q4 = np.where(singular, ref[:, None, 3], np.arctan2(wrist * R36[..., 1, 2], wrist * R36[..., 0, 2]))
+    # 奇异时R36 = Rz(q4+q6)(J5=0)或Rz(q4-q6)·Ry(180°)(J5=180°)
+    q6 = np.where(c5 > 0, np.arctan2(R36[..., 1, 0], R36[..., 0, 0]) - q4,
+                  q4 - np.arctan2(-R36[..., 1, 0], -R36[..., 0, 0]))
+    q6 = np.where(singular, q6, np.arctan2(wrist * R36[..., 2, 1], -wrist * R36[..., 2, 0]))
+    q[:, :, 3] = q4
+    q[:, :, 4] = q5
+    q[:, :, 5] = q6
+    return np.degrees(q), reachable
+
+
+def jointLimits(model):
+    limits = np.asarray(getModel(model).limits, np.float64)
+    return limits[:, 0], limits[:, 1]
+
+
+def inverseKin(poses, refJoints, model, tcp=None, ucs=None):
+    '''
+    *	@param brief:本地逆解,与HRIF_GetInverseKin相同: 由用户坐标系下工具的空间位置计算关节角
+                     从8组封闭解中选取与参考关节角距离(各关节差的平方和)最小且在关节范围内的一组,
+                     每个关节取与参考值相差不超过180°的等价角度;poses为(N, 6)时一次计算N组,不可达时不抛出异常
+                     codes, joints = inverseKin(targets, cps_current_joints, model)
+                     reachable = targets[codes == 0]
+    *	@param poses: (6,) 或 (N, 6) 目标空间位置
+    *	@param refJoints: (6,) 或 (N, 6) 参考关节角(°)
+    *	@param model: 型号名称或KinematicModel
+    *	@param tcp/ucs: (6,)或(N, 6),None为法兰/基坐标系
+    *	@param return: (错误码, 关节角),poses为(N, 6)时为(错误码 (N,), 关节角 (N, 6));
+                       错误码: 0 成功,39507 超出工作空间,39508 各组解均超出关节范围;失败时关节角为参考值
+    '''
+    poses = np.asarray(poses, np.float64)
+    single = poses.ndim == 1
+    poses = np.atleast_2d(poses)
+    ref = np.broadcast_to(np.asarray(refJoints, np.float64), poses.shape)
+    q, reachable = ikBranches(targetMatrix(poses, tcp, ucs), model, ref)
+    lower, upper = jointLimits(model)
+    refB = ref[:, None, :]
+    # 折算到参考值附近,超出范围时换到另一侧的等价角度
+    q = refB + (q - refB + 180.0) % 360.0 - 180.0
+    q = np.where(q > upper, q - 360.0, q)
+    q = np.where(q < lower, q + 360.0, q)
+    inLimits = np.all((q >= lower - 1e-9) & (q <= upper + 1e-9), axis=2)
+    valid = reachable & inLimits
+    distance = np.where(valid, np.sum((q - refB) ** 2, axis=2), np.inf)
+    best = np.argmin(distance, axis=1)
+    joints = np.array(q[np.arange(len(q)), best])
+    codes = np.where(valid.any(axis=1), 0, np.where(reachable.any(axis=1), ErrJointLimit, ErrUnreachable))
+    joints[codes != 0] = ref[codes != 0]
+    if single:
+        return int(codes[0]), joints[0]
+    return codes, joints
+
+
+# 本地正解与控制器的核对结果
+#   errorCode: 控制器通讯或计算的错误码,非0时其余字段无效
+#   maxPosError/maxRotError: 最大位置误差(mm)与姿态误差(°)
+#   ok: 两项误差均在容差内
+#   local/remote: (N, 6) 本地与控制器的结果
+CrossCheck = namedtuple('CrossCheck', ['errorCode', 'maxPosError', 'maxRotError', 'ok', 'local', 'remote'])
+
+
+def randomJoints(n, limit=170.0, seed=None):
+    '''
+    *	@param brief:核对用的随机关节角,各关节在±limit内均匀分布
+    '''
+    return np.random.default_rng(seed).uniform(-limit, limit, (n, 6))
+
+
+def crossCheck(cps, boxID, rbtID, joints, model=None, tcp=None, ucs=None, posTol=0.1, rotTol=0.01, batch=100):
+    '''
+    *	@param brief:用同样的关节角调用控制器的HRIF_GetForwardKin,与本地正解比较,命令按batch条一批经pipeline发送
+    *	@param joints: (N, 6) 关节角(°)
+    *	@param model: 默认由HRIF_ReadRobotModel读取
+    *	@param tcp/ucs: (6,),默认全0
+    *	@param posTol/rotTol: 位置(mm)与姿态(°)容差,控制器应答保留3位小数
+    *	@param return: CrossCheck
+    '''
+    joints = np.atleast_2d(np.asarray(joints, np.float64))
+    tcp = [0.0] * 6 if tcp is None else list(tcp)
+    ucs = [0.0] * 6 if ucs is None else list(ucs)
+    if model is None:
+        nRet, model = readModel(cps, boxID, rbtID)
+        if nRet != 0:
+            return CrossCheck(nRet, None, None, False, None, None)
+    local = forwardKin(joints, model, tcp, ucs)
+    codes, remote = remoteBatch(cps, boxID, rbtID, 'HRIF_GetForwardKin', [(j.tolist(), tcp, ucs) for j in joints],
+                                batch=batch)
+    if codes.any():
+        return CrossCheck(int(codes[codes != 0][0]), None, None, False, local, remote)
+    pos, rot = poseError(local, remote)
+    maxPos, maxRot = float(pos.max()), float(rot.max())
+    return CrossCheck(0, maxPos, maxRot, maxPos <= posTol and maxRot <= rotTol, local, remote)
+
+
+# 本地逆解与控制器的核对结果
+#   errorCode: 第一个通讯错误码,控制器对个别位置无解不算错误
+#   maxJointError: 双方选解一致时的最大关节差(°)
+#   mismatch: 选解不一致(关节差超过1°)或一方无解的位置个数
+#   ok: mismatch为0且maxJointError在容差内
+#   local/remote: (N, 6) 本地与控制器的关节角,无解时为参考值/NaN
+InverseCheck = namedtuple('InverseCheck', ['errorCode', 'maxJointError', 'mismatch', 'ok', 'local', 'remote'])
+
+
+def crossCheckInverse(cps, boxID, rbtID, joints, refJoints=None, model=None, tcp=None, ucs=None, jointTol=0.01,
+                      batch=100):
+    '''
+    *	@param brief:由joints经本地正解得到目标位置,分别用本地逆解与HRIF_GetInverseKin求解并比较,检验选解规则是否一致
+    *	@param joints: (N, 6) 关节角(°)
+    *	@param refJoints: (N, 6) 参考关节角,默认为joints
+    *	@param jointTol: 关节角容差(°)
+    *	@param return: InverseCheck
+    '''
+    joints = np.atleast_2d(np.asarray(joints, np.float64))
+    ref = joints if refJoints is None else np.broadcast_to(np.asarray(refJoints, np.float64), joints.shape)
+    tcp = [0.0] * 6 if tcp is None else list(tcp)
+    ucs = [0.0] * 6 if ucs is None else list(ucs)
+    if model is None:
+        nRet, model = readModel(cps, boxID, rbtID)
+        if nRet != 0:
+            return InverseCheck(nRet, None, None, False, None, None)
+    poses = forwardKin(joints, model, tcp, ucs)
+    localCodes, local = inverseKin(poses, ref, model, tcp, ucs)
+    codes, remote = remoteBatch(cps, boxID, rbtID, 'HRIF_GetInverseKin',
+                                [(poses[i].tolist(), ref[i].tolist(), tcp, ucs) for i in range(len(poses))],
+                                batch=batch)
+    commError = [c for c in codes if 39500 <= c <= 39504]
+    if commError:
+        return InverseCheck(int(commError[0]), None, None, False, local, remote)
+    both = (localCodes == 0) & (codes == 0)
+    diff = np.abs(local - remote).max(axis=1)
+    same = both & (diff <= 1.0)
+    maxError = float(diff[same].max()) if same.any() else 0.0
+    mismatch = int(np.sum((localCodes == 0) != (codes == 0)) + np.sum(both & (diff > 1.0)))
+    return InverseCheck(0, maxError, mismatch, mismatch == 0 and maxError <= jointTol, local, remote)
@@ -0,0 +1,109 @@
+#!/usr/bin/env python
+# _*_ coding:utf-8 _*_
+
+import threading
+import time
+from collections import namedtuple
+from concurrent.futures import Future
+
+from cps_wait import motionState
+
+# 运动结束的结果
+#   reason: 'done' 运动完成, 'blending' 过渡完成, 'error' 机器人报错, 'estop' 急停/断电/电箱断开,
+#           'disabled' 机器人去使能, 'timeout' 超过期限, 'commError' 连续读取状态失败或遥测已停止(39500),
+#           'commandFailed' 运动指令返回错误
+#   安全光幕触发与暂停时继续等待,与CPSClient._waitMotion的判定一致(cps_wait.motionState)
+#   errorCode: 指令或读取的错误码,机器人报错时为ReadRobotState中的错误码
+#   snapshot: 判定时的TelemetrySnapshot,没有时为None
+#   elapsed: 从指令应答到判定的时间(s)
+MotionResult = namedtuple('MotionResult', ['reason', 'errorCode', 'snapshot', 'elapsed'])
+
+
+class MotionFuture(Future):
+    '''
+    *	@param brief:运动完成的future,由TelemetryCache的快照驱动,result()为MotionResult
+                     只采用运动指令应答之后发出的快照,避免把运动开始前的"已完成"当作结果;
+                     没有观察到运动中状态时,要求完成状态持续settle秒(用于极短或零距离运动)
+    *	@param cache: TelemetryCache
+    *	@param blending: True时过渡完成(blendingDone)即结束,否则要求运动停止
+    *	@param timeout: 期限(s),None表示不限
+    *	@param settle: 见上
+    *	@param maxFailures: 连续读取失败达到该次数时以commError结束;偶发的失败快照不结束等待
+    *	@param failTime: 读取持续失败超过该时间(s)时也以commError结束
+    '''
+
+    def __init__(self, cache, blending=False, timeout=None, settle=0.1, maxFailures=5, failTime=0.5):
+        Future.__init__(self)
+        self.m_cache = cache
+        self.m_blending = blending
+        self.m_settle = settle
+        self.m_start = time.monotonic()
+        self.m_bMoving = False
+        self.m_doneSince = None
+        self.m_nDisable = 0
+        self.m_maxFailures = maxFailures
+        self.m_failTime = failTime
+        self.m_nFail = 0
+        self.m_failSince = None
+        self.m_lock = threading.Lock()
+        self.m_timer = None
+        if timeout is not None:
+            self.m_timer = threading.Timer(timeout, self.onTimeout)
+            self.m_timer.daemon = True
+            self.m_timer.start()
+        cache.addListener(self.onSnapshot)
+
+    def finish(self, reason, errorCode, snapshot):
+        with self.m_lock:
+            if self.done():
+                return
+            self.m_cache.removeListener(self.onSnapshot)
+            if self.m_timer is not None:
+                self.m_timer.cancel()
+            self.set_result(MotionResult(reason, errorCode, snapshot, time.monotonic() - self.m_start))
+
+    def onTimeout(self):
+        self.finish('timeout', 0, self.m_cache.latest())
+
+    def onSnapshot(self, snapshot):
+        if self.done() or snapshot.sendTime < self.m_start:
+            return
+        if snapshot.errorCode != 0:
+            # 遥测已停止时不会再有快照,立即结束
+            self.m_nFail += 1
+            if self.m_failSince is None:
+                self.m_failSince = snapshot.recvTime
+            if not self.m_cache.isRunning() or self.m_nFail >= self.m_maxFailures or \
+                    snapshot.recvTime - self.m_failSince >= self.m_failTime:
+                self.finish('commError', snapshot.errorCode, snapshot)
+            return
+        self.m_nFail = 0
+        self.m_failSince = None
+        reason, errorCode = motionState(snapshot.state, self.m_blending, snapshot.fsm)
+        # 偶发读到去使能时不立即结束,连续5次才认为已去使能
+        if reason == 'disabled':
+            self.m_nDisable += 1
+            if self.m_nDisable >= 5:
+                self.finish('disabled', 0, snapshot)
+            return
+        self.m_nDisable = 0
+        if reason in ('error', 'estop'):
+            self.finish(reason, errorCode, snapshot)
+            return
+        if reason is None:
+            self.m_bMoving = True
+            self.m_doneSince = None
+            return
+        if self.m_doneSince is None:
+            self.m_doneSince = snapshot.recvTime
+        if self.m_bMoving or snapshot.recvTime - self.m_doneSince >= self.m_settle:
+            self.finish(reason, 0, snapshot)
+
+
+def failedMotion(errorCode):
+    '''
+    *	@param brief:运动指令本身失败时返回的已完成future
+    '''
+    future = Future()
+    future.set_result(MotionResult('commandFailed', errorCode, None, 0.0))
+    return future
@@ -0,0 +1,174 @@
+#!/usr/bin/env python
+# _*_ coding:utf-8 _*_
+
+import copy
+import time
+from concurrent.futures import Future
+
+
+class CmdRecorder(object):
+    '''
+    *	@param brief:替代RbtClient,只记录HRIF_*生成的命令而不发送
+    '''
+
+    def __init__(self):
+        self.cmds = []
+
+    def sendAndRecv(self, cmd, result):
+        self.cmds.append((cmd, result))
+        return 0
+
+
+class CPSPipeline(object):
+    '''
+    *	@param brief:批量指令模式,先缓存HRIF_*命令,再一次sendall发出,按顺序接收应答
+                     with cps.pipeline(boxID) as p:
+                         f1 = p.HRIF_ReadRobotState(boxID, rbtID, state)
+                         f2 = p.HRIF_ReadActPos(boxID, rbtID, pos)
+                     退出with时发送并接收,state/pos按普通调用方式填充,f1/f2.result()为错误码
+    '''
+
+    # 组合指令内部依赖上一条应答或多次收发,不能放入批量
+    Unsupported = ('HRIF_Connect', 'HRIF_DisConnect', 'HRIF_IsConnected', 'HRIF_ReadRobotFlags',
+                   'HRIF_ReadCurFSMFromCPS', 'HRIF_ReadCmdTcpPos', 'HRIF_ReadActTcpPos', 'HRIF_IsMotionDone',
+                   'HRIF_IsBlendingDone', 'HRIF_SetScriptForceControlState', 'HRIF_ReadSnapshot')
+
+    # 改变工具/用户坐标的命令,应答后清空原客户端中该电箱的正解/逆解缓存
+    KinInvalidating = ('HRIF_SetTCP', 'HRIF_SetUCS', 'HRIF_SetTCPByName', 'HRIF_SetUCSByName')
+
+    def __init__(self, cps, boxID, channel=None):
+        self.boxID = boxID
+        self.m_cps = cps
+        # 电箱打开了多条连接时(BoxChannels)批量指令走指定的连接,默认control
+        client = cps.g_clients[boxID]
+        if hasattr(client, 'channels'):
+            client = client.channels.get(channel, client.control)
+        self.m_client = client
+        self.m_recorder = CmdRecorder()
+        # HRIF_*在替身上执行,命令进入m_recorder而不是发往控制器
+        self.m_view = copy.copy(cps)
+        self.m_view.g_clients = list(cps.g_clients)
+        self.m_view.g_clients[boxID] = self.m_recorder
+        # 应答在execute时才收到,批量中的正解/逆解不经过缓存
+        self.m_view.m_kinCache = None
+        self.m_queue = []
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        if exc_type is None:
+            self.execute()
+        else:
+            self.cancel()
+        return False
+
+    def __len__(self):
+        return len(self.m_queue)
+
+    def __getattr__(self, name):
+        if not name.startswith('HRIF_'):
+            raise AttributeError(name)
+        if name in self.Unsupported:
+            raise ValueError(name + ' can not be pipelined')
+        method = getattr(self.m_view, name)
+
+        def queued(*args, **kwargs):
+            boxID = kwargs['boxID'] if 'boxID' in kwargs else args[0]
+            if boxID != self.boxID:
+                raise ValueError('pipeline is bound to box %d' % self.boxID)
+            return self.queue(method, *args, **kwargs)
+
+        return queued
+
+    def queue(self, method, *args, **kwargs):
+        future = Future()
+        nCmds = len(self.m_recorder.cmds)
+        ret = method(*args, **kwargs)
+        if len(self.m_recorder.cmds) == nCmds:
+            # 参数检查未通过,没有生成命令,直接返回该结果
+            future.set_result(ret)
+            return future
+        cmds = self.m_recorder.cmds[nCmds:]
+        del self.m_recorder.cmds[:]
+        post = self.postAction(method.__name__, args, kwargs, cmds[-1][1])
+        for i in range(len(cmds)):
+            cmd, result = cmds[i]
+            # 收到最后一条应答后在原客户端上执行post
+            self.m_queue.append((cmd, result, future, post if i == len(cmds) - 1 else None))
+        return future
+
+    def postAction(self, name, args, kwargs, fields):
+        '''
+        *	@param brief:应答后需要在原客户端上完成的处理,参数为错误码,返回最终的错误码
+        *	@param fields: 该命令实际接收应答的结果对象
+        '''
+        cps, boxID = self.m_cps, self.boxID
+        if name in self.KinInvalidating:
+            return lambda code: cps.invalidateKinCache(boxID, code)
+        if name == 'HRIF_ReadRobotModel':
+            # result为ArrayResult/StructResult时替身用内部的字符串列表接收,收到后再解码到result
+            result = kwargs['result'] if 'result' in kwargs else args[2]
+            return lambda code: code if code != 0 else cps.applyRobotModel(boxID, fields, result)
+        return None
+
+    def cancel(self):
+        for cmd, result, future, post in self.m_queue:
+            future.cancel()
+        self.m_queue = []
+
+    def execute(self):
+        '''
+        *	@param brief:发送缓存的全部命令并按顺序接收应答
+        *	@param return: 各命令的错误码列表
+        '''
+        queue, self.m_queue = self.m_queue, []
+        if not queue:
+            return []
+        client = self.m_client
+        stats = client.m_stats
+        codes = []
+        data = b''.join([cmd if type(cmd) is bytes else cmd.encode() for cmd, result, future, post in queue])
+        # 整批发送与接收期间占用连接,其他线程的请求排在整批之后
+        # 批内含启动主站/上电等长耗时命令时,整批不设超时
+        blocking = client.RecvTimeout is not None and any([client.isLongCommand(entry[0]) for entry in queue])
+        with client.m_lock:
+            start = time.perf_counter()
+            sendTime = time.monotonic()
+            try:
+                if blocking:
+                    client.tcp.settimeout(None)
+                client.tcp.sendall(data)
+            except OSError as e:
+                code = client.commError(e)
+                for cmd, result, future, post in queue:
+                    future.set_result(code)
+                    codes.append(code)
+                return codes
+            code = 39500
+            for cmd, result, future, post in queue:
+                if not client.m_bConnect:
+                    # 连接已因收发异常关闭,其余命令不再读取,直接失败
+                    future.set_result(code)
+                    codes.append(code)
+                    continue
+                client.m_nRecv = 0
+                code = client.recvReply(cmd, result)
+                recvTime = time.monotonic()
+                if not codes and client.m_bConnect:
+                    # 只有第一条应答的延迟不含批内排队
+                    client.m_rtt.update(recvTime - sendTime)
+                client.lastReplyTime = (sendTime, recvTime)
+                if type(result) is not list:
+                    result.sendTime = sendTime
+                    result.recvTime = recvTime
+                if stats is not None:
+                    # 批量中每条命令的延迟从整批发出时算起
+                    stats.record(cmd, code, time.perf_counter() - start, len(cmd), client.m_nRecv)
+                if post is not None:
+                    code = post(code)
+                future.set_result(code)
+                codes.append(code)
+            if blocking and client.m_bConnect:
+                client.tcp.settimeout(client.RecvTimeout)
+        return codes
@@ -0,0 +1,447 @@
+#!/usr/bin/env python
+# _*_ coding:utf-8 _*_
+
+from collections import namedtuple
+
+import numpy as np
+
+# 空间位置为[X, Y, Z, Rx, Ry, Rz],位置单位mm,姿态为RPY角(°)
+# 与控制器一致: 绕固定轴依次旋转Rx, Ry, Rz, 即 R = Rz·Ry·Rx
+# 以下函数均接受单个位置(6,)或批量(N, 6),返回相同的维数
+
+
+def rpyToMatrix(rpy):
+    '''
+    *	@param brief:RPY角(°)转换为旋转矩阵
+    *	@param rpy: (..., 3)
+    *	@param return: (..., 3, 3)
+    '''
+    a = np.radians(np.asarray(rpy, np.float64))
+    cx, cy, cz = np.cos(a[..., 0]), np.cos(a[..., 1]), np.cos(a[..., 2])
+    sx, sy, sz = np.sin(a[..., 0]), np.sin(a[..., 1]), np.sin(a[..., 2])
+    R = np.empty(a.shape[:-1] + (3, 3))
+    R[..., 0, 0] = cz * cy
+    R[..., 0, 1] = cz * sy * sx - sz * cx
+    R[..., 0, 2] = cz * sy * cx + sz * sx
+    R[..., 1, 0] = sz * cy
+    R[..., 1, 1] = sz * sy * sx + cz * cx
+    R[..., 1, 2] = sz * sy * cx - cz * sx
+    R[..., 2, 0] = -sy
+    R[..., 2, 1] = cy * sx
+    R[..., 2, 2] = cy * cx
+    return R
+
+
+# Ry距±90°小于该值(弧度)时按万向节锁处理
+GimbalLockEps = 1e-9
+
+
+def matrixToRpy(R):
+    '''
+    *	@param brief:旋转矩阵转换为RPY角(°),Rx,Rz在[-180°, 180°]内,Ry在[-90°, 90°]内
+                     Ry为±90°(万向节锁)时只能确定Rx与Rz的和或差,此时取Rx = 0,由Rz表示全部转动
+    *	@param R: (..., 3, 3)
+    *	@param return: (..., 3)
+    '''
+    R = np.asarray(R, np.float64)
+    rpy = np.empty(R.shape[:-2] + (3,))
+    cy = np.hypot(R[..., 0, 0], R[..., 1, 0])
+    lock = cy < GimbalLockEps
+    rpy[..., 0] = np.where(lock, 0.0, np.arctan2(R[..., 2, 1], R[..., 2, 2]))
+    rpy[..., 1] = np.arctan2(-R[..., 2, 0], cy)
+    rpy[..., 2] = np.where(lock, np.arctan2(-R[..., 0, 1], R[..., 1, 1]), np.arctan2(R[..., 1, 0], R[..., 0, 0]))
+    return np.degrees(rpy)
+
+
+def poseToMatrix(pose):
+    '''
+    *	@param brief:空间位置转换为齐次变换矩阵
+    *	@param pose: (..., 6)
+    *	@param return: (..., 4, 4)
+    '''
+    pose = np.asarray(pose, np.float64)
+    T = np.zeros(pose.shape[:-1] + (4, 4))
+    T[..., 0:3, 0:3] = rpyToMatrix(pose[..., 3:6])
+    T[..., 0:3, 3] = pose[..., 0:3]
+    T[..., 3, 3] = 1.0
+    return T
+
+
+def matrixToPose(T):
+    '''
+    *	@param brief:齐次变换矩阵转换为空间位置
+    *	@param T: (..., 4, 4)
+    *	@param return: (..., 6)
+    '''
+    T = np.asarray(T, np.float64)
+    pose = np.empty(T.shape[:-2] + (6,))
+    pose[..., 0:3] = T[..., 0:3, 3]
+    pose[..., 3:6] = matrixToRpy(T[..., 0:3, 0:3])
+    return pose
+
+
+def invertMatrix(T):
+    '''
+    *	@param brief:齐次变换矩阵求逆,利用旋转矩阵正交,不做一般矩阵求逆
+    *	@param T: (..., 4, 4)
+    '''
+    T = np.asarray(T, np.float64)
+    inv = np.zeros_like(T)
+    Rt = np.swapaxes(T[..., 0:3, 0:3], -1, -2)
+    inv[..., 0:3, 0:3] = Rt
+    inv[..., 0:3, 3] = -np.einsum('...ij,...j->...i', Rt, T[..., 0:3, 3])
+    inv[..., 3, 3] = 1.0
+    return inv
+
+
+def poseError(a, b):
+    '''
+    *	@param brief:两组空间位置的位置误差(mm)与姿态误差(°,两姿态间的转角)
+    *	@param return: (位置误差 (...), 姿态误差 (...))
+    '''
+    Ra = rpyToMatrix(np.asarray(a, np.float64)[..., 3:6])
+    Rb = rpyToMatrix(np.asarray(b, np.float64)[..., 3:6])
+    pos = np.linalg.norm(np.asarray(a, np.float64)[..., 0:3] - np.asarray(b, np.float64)[..., 0:3], axis=-1)
+    # 相对转动 Raᵀ·Rb 的转角,用atan2避免小角度时arccos的精度损失
+    Rr = np.swapaxes(Ra, -1, -2) @ Rb
+    sin2 = np.stack([Rr[..., 2, 1] - Rr[..., 1, 2], Rr[..., 0, 2] - Rr[..., 2, 0], Rr[..., 1, 0] - Rr[..., 0, 1]], -1)
+    cos2 = Rr[..., 0, 0] + Rr[..., 1, 1] + Rr[..., 2, 2] - 1.0
+    rot = np.degrees(np.arctan2(np.linalg.norm(sin2, axis=-1), cos2))
+    return pos, rot
+
+
+def quaternionToMatrix(quat):
+    '''
+    *	@param brief:单位四元数[W, X, Y, Z]转换为旋转矩阵,输入不要求已归一化
+    *	@param quat: (..., 4)
+    *	@param return: (..., 3, 3)
+    '''
+    q = np.asarray(quat, np.float64)
+    q = q / np.linalg.norm(q, axis=-1, keepdims=True)
+    w, x, y, z = q[..., 0], q[..., 1], q[..., 2], q[..., 3]
+    R = np.empty(q.shape[:-1] + (3, 3))
+    R[..., 0, 0] = 1.0 - 2.0 * (y * y + z * z)
+    R[..., 0, 1] = 2.0 * (x * y - w * z)
+    R[..., 0, 2] = 2.0 * (x * z + w * y)
+    R[..., 1, 0] = 2.0 * (x * y + w * z)
+    R[..., 1, 1] = 1.0 - 2.0 * (x * x + z * z)
+    R[..., 1, 2] = 2.0 * (y * z - w * x)
+    R[..., 2, 0] = 2.0 * (x * z - w * y)
+    R[..., 2, 1] = 2.0 * (y * z + w * x)
+    R[..., 2, 2] = 1.0 - 2.0 * (x * x + y * y)
+    return R
+
+
+def positiveQuaternion(q):
+    '''
+    *	@param brief:q与-q表示同一姿态,统一取W不小于0;W接近0(转角接近180°)时W取0,X,Y,Z中第一个不为0的项取正,
+                     使不同计算方法的结果一致
+    *	@param q: (..., 4)
+    '''
+    q = np.array(q, np.float64)
+    zero = np.abs(q) <= GimbalLockEps
+    q[..., 0] = np.where(zero[..., 0], 0.0, q[..., 0])
+    # 第一个不为0的分量,W为0时从X开始
+    first = np.take_along_axis(q, np.argmin(zero, axis=-1)[..., None], -1)
+    return q * np.where(first < 0, -1.0, 1.0)
+
+
+def matrixToQuaternion(R):
+    '''
+    *	@param brief:旋转矩阵转换为单位四元数[W, X, Y, Z],W不小于0
+                     按Shepperd方法从W,X,Y,Z中绝对值最大的一项开始计算,180°附近不损失精度
+    *	@param R: (..., 3, 3)
+    *	@param return: (..., 4)
+    '''
+    R = np.asarray(R, np.float64)
+    r00, r11, r22 = R[..., 0, 0], R[..., 1, 1], R[..., 2, 2]
+    d = np.stack([1.0 + r00 + r11 + r22, 1.0 + r00 - r11 - r22, 1.0 - r00 + r11 - r22, 1.0 - r00 - r11 + r22], -1)
+    k = np.argmax(d, axis=-1)
+    s = 2.0 * np.sqrt(np.maximum(np.take_along_axis(d, k[..., None], -1)[..., 0], 1e-300))
+    a = (R[..., 2, 1] - R[..., 1, 2]) / s
+    b = (R[..., 0, 2] - R[..., 2, 0]) / s
+    c = (R[..., 1, 0] - R[..., 0, 1]) / s
+    xy = (R[..., 0, 1] + R[..., 1, 0]) / s
+    xz = (R[..., 0, 2] + R[..., 2, 0]) / s
+    yz = (R[..., 1, 2] + R[..., 2, 1]) / s
+    quarter = 0.25 * s
+    # 每行为k=0..3时的[W, X, Y, Z]
+    candidates = np.stack([np.stack([quarter, a, b, c], -1),
+                           np.stack([a, quarter, xy, xz], -1),
+                           np.stack([b, xy, quarter, yz], -1),
+                           np.stack([c, xz, yz, quarter], -1)], -2)
+    q = np.take_along_axis(candidates, k[..., None, None], -2)[..., 0, :]
+    return positiveQuaternion(q / np.linalg.norm(q, axis=-1, keepdims=True))
+
+
+def slerp(q1, q2, alpha):
+    '''
+    *	@param brief:四元数球面插值,取两者间较短的一段
+    *	@param q1/q2: (..., 4)
+    *	@param alpha: 标量或(...)
+    '''
+    q1 = np.asarray(q1, np.float64)
+    q2 = np.asarray(q2, np.float64)
+    alpha = np.asarray(alpha, np.float64)[..., None]
+    dot = np.sum(q1 * q2, axis=-1, keepdims=True)
+    q2 = np.where(dot < 0, -q2, q2)
+    dot = np.clip(np.abs(dot), 0.0, 1.0)
+    theta = np.arccos(dot)
+    sinTheta = np.sin(theta)
+    near = sinTheta < 1e-9
+    # 夹角很小时退化为线性插值
+    safe = np.where(near, 1.0, sinTheta)
+    w1 = np.where(near, 1.0 - alpha, np.sin((1.0 - alpha) * theta) / safe)
+    w2 = np.where(near, alpha, np.sin(alpha * theta) / safe)
+    q = w1 * q1 + w2 * q2
+    return q / np.linalg.norm(q, axis=-1, keepdims=True)
+
+
+def rpyToQuaternion(rpy):
+    '''
+    *	@param brief:RPY角(°)转换为四元数[W, X, Y, Z],同HRIF_RPY2Quaternion,由半角公式直接计算,不经过旋转矩阵;
+                     符号与matrixToQuaternion相同,见positiveQuaternion
+    *	@param rpy: (..., 3)
+    *	@param return: (..., 4)
+    '''
+    a = np.radians(np.asarray(rpy, np.float64)) * 0.5
+    cx, cy, cz = np.cos(a[..., 0]), np.cos(a[..., 1]), np.cos(a[..., 2])
+    sx, sy, sz = np.sin(a[..., 0]), np.sin(a[..., 1]), np.sin(a[..., 2])
+    # q = qz·qy·qx
+    return positiveQuaternion(np.stack([cx * cy * cz + sx * sy * sz,
+                                        sx * cy * cz - cx * sy * sz,
+                                        cx * sy * cz + sx * cy * sz,
+                                        cx * cy * sz - sx * sy * cz], -1))
+
+
+def quaternionToRpy(quat):
+    '''
+    *	@param brief:四元数[W, X, Y, Z]转换为RPY角(°),同HRIF_Quaternion2RPY,输入不要求已归一化;万向节锁的处理见matrixToRpy
+    *	@param quat: (..., 4)
+    *	@param return: (..., 3)
+    '''
+    return matrixToRpy(quaternionToMatrix(quat))
+
+
+def formatValues(values, digits=3):
+    '''
+    *	@param brief:数值转换为与控制器应答相同的字符串(保留digits位小数)
+    *	@param values: (k,) 或 (N, k)
+    *	@param return: 字符串列表,(N, k)时为N个列表
+    '''
+    values = np.asarray(values, np.float64)
+    # 舍入后为0的负数按0输出,不产生'-0.000'
+    values = np.where(np.abs(values) < 0.5 * 10.0 ** -digits, 0.0, values)
+    fmt = '%%.%df' % digits
+    if values.ndim > 1:
+        return [[fmt % v for v in row] for row in values.tolist()]
+    return [fmt % v for v in values.tolist()]
+
+
+def fillResult(values, result, digits=3):
+    '''
+    *	@param brief:按sendAndRecv的方式把本地计算结果填入result,用于代替远程调用
+    *	@param result: list或cps_codec中的结果对象
+    *	@param return: 0
+    '''
+    fields = formatValues(values, digits)
+    if type(result) is list:
+        result.clear()
+        result.extend(fields)
+    else:
+        result.decodeFields(','.join(fields) + ',;')
+    return 0
+
+
+# 以下与控制器的点位计算指令相同,各参数可为(6,)或(N, 6),按numpy规则广播,不经过网络
+#   T1, T2 为pos1, pos2对应的齐次变换矩阵
+
+
+def poseAdd(pos1, pos2):
+    '''
+    *	@param brief:点位加法,同HRIF_PoseAdd: 第二个点左乘第一个点,T2·T1
+    '''
+    return matrixToPose(poseToMatrix(pos2) @ poseToMatrix(pos1))
+
+
+def poseSub(pos1, pos2):
+    '''
+    *	@param brief:点位减法,同HRIF_PoseSub: 以第二个点为参考点,T2⁻¹·T1,即poseAdd的逆运算
+    '''
+    return matrixToPose(invertMatrix(poseToMatrix(pos2)) @ poseToMatrix(pos1))
+
+
+def poseTrans(pos1, pos2):
+    '''
+    *	@param brief:坐标变换,同HRIF_PoseTrans: T1·T2,即pos1坐标系下的pos2在基坐标系下的位置
+    '''
+    return matrixToPose(poseToMatrix(pos1) @ poseToMatrix(pos2))
+
+
+def poseInverse(pos1):
+    '''
+    *	@param brief:坐标逆变换,同HRIF_PoseInverse: T1⁻¹
+    '''
+    return matrixToPose(invertMatrix(poseToMatrix(pos1)))
+
+
+def poseDist(pos1, pos2):
+    '''
+    *	@param brief:点位距离,同HRIF_PoseDist
+    *	@param return: (..., 2) [位置距离(mm), 姿态距离(两姿态间的转角,°)]
+    '''
+    pos, rot = poseError(pos1, pos2)
+    return np.stack([pos, rot], -1)
+
+
+def poseInterpolate(pos1, pos2, alpha):
+    '''
+    *	@param brief:空间位置直线插补,同HRIF_PoseInterpolate: 位置线性插值,姿态球面插值
+    *	@param alpha: 插补比例,0为pos1,1为pos2;可为(N,)数组,与(6,)的pos1/pos2一起得到N个插补点
+    '''
+    pos1 = np.asarray(pos1, np.float64)
+    pos2 = np.asarray(pos2, np.float64)
+    alpha = np.asarray(alpha, np.float64)
+    q = slerp(matrixToQuaternion(rpyToMatrix(pos1[..., 3:6])), matrixToQuaternion(rpyToMatrix(pos2[..., 3:6])), alpha)
+    xyz = pos1[..., 0:3] + alpha[..., None] * (pos2[..., 0:3] - pos1[..., 0:3])
+    return np.concatenate([xyz, matrixToRpy(quaternionToMatrix(q))], -1)
+
+
+def remoteBatch(cps, boxID, rbtID, name, argsList, width=6, batch=100, raw=False):
+    '''
+    *	@param brief:按batch条一批经pipeline调用控制器的HRIF_*,argsList为每次调用result之前的参数
+    *	@param width: 每个应答取前width个数值
+    *	@param raw: True时返回应答的原始字符串列表
+    *	@param return: (错误码 (N,), 应答 (N, width),失败的行为NaN)
+    '''
+    codes = np.zeros(len(argsList), np.int64)
+    results = [[] for i in range(len(argsList))]
+    for start in range(0, len(argsList), batch):
+        end = min(start + batch, len(argsList))
+        with cps.pipeline(boxID) as p:
+            method = getattr(p, name)
+            futures = [method(boxID, rbtID, *(list(argsList[i]) + [results[i]])) for i in range(start, end)]
+        codes[start:end] = [future.result() for future in futures]
+    if raw:
+        return codes, [result[0:width] for result in results]
+    values = np.full((len(argsList), width), np.nan)
+    for i, result in enumerate(results):
+        if codes[i] == 0:
+            values[i] = [float(v) for v in result[0:width]]
+    return codes, values
+
+
+# 本地点位计算与控制器的核对结果
+#   errorCode: 第一个错误码,非0时误差无效
+#   maxPosError/maxRotError: 最大位置误差(mm)与姿态误差(°);PoseDist为两项距离各自的最大差值
+#   ok: 两项误差均在容差内
+PoseCheck = namedtuple('PoseCheck', ['errorCode', 'maxPosError', 'maxRotError', 'ok'])
+
+# 核对的指令: 名称 -> (HRIF_*, 本地函数, 参数)
+PoseOps = (
+    ('PoseAdd', 'HRIF_PoseAdd', poseAdd, ('pos1', 'pos2')),
+    ('PoseSub', 'HRIF_PoseSub', poseSub, ('pos1', 'pos2')),
+    ('PoseTrans', 'HRIF_PoseTrans', poseTrans, ('pos1', 'pos2')),
+    ('PoseInverse', 'HRIF_PoseInverse', poseInverse, ('pos1',)),
+    ('PoseDist', 'HRIF_PoseDist', poseDist, ('pos1', 'pos2')),
+    ('PoseInterpolate', 'HRIF_PoseInterpolate', poseInterpolate, ('pos1', 'pos2', 'alpha')),
+)
+
+
+def randomPoses(n, reach=800.0, seed=None):
+    '''
+    *	@param brief:核对用的随机空间位置,位置在±reach内,姿态为RPY角的常用范围(Ry在±90°内)
+    '''
+    rng = np.random.default_rng(seed)
+    poses = np.empty((n, 6))
+    poses[:, 0:3] = rng.uniform(-reach, reach, (n, 3))
+    poses[:, 3] = rng.uniform(-180.0, 180.0, n)
+    poses[:, 4] = rng.uniform(-89.0, 89.0, n)
+    poses[:, 5] = rng.uniform(-180.0, 180.0, n)
+    return poses
+
+
+def crossCheckPoses(cps, boxID, rbtID, pos1, pos2, alpha=0.5, posTol=0.01, rotTol=0.01, ops=None, batch=100):
+    '''
+    *	@param brief:用同样的参数调用控制器的点位计算指令,与本地结果比较;姿态按转角比较,RPY的等价表示不算误差
+    *	@param pos1/pos2: (N, 6)
+    *	@param alpha: 标量或(N,)
+    *	@param ops: 核对的指令名称,默认PoseOps中的全部
+    *	@param return: {指令名称: PoseCheck}
+    '''
+    pos1 = np.atleast_2d(np.asarray(pos1, np.float64))
+    pos2 = np.broadcast_to(np.asarray(pos2, np.float64), pos1.shape)
+    alpha = np.broadcast_to(np.asarray(alpha, np.float64), pos1.shape[:1])
+    args = {'pos1': pos1, 'pos2': pos2, 'alpha': alpha}
+    checks = {}
+    for name, method, local, params in PoseOps:
+        if ops is not None and name not in ops:
+            continue
+        values = [args[p] for p in params]
+        expected = local(*values)
+        width = expected.shape[-1]
+        argsList = [[v[i].tolist() if v.ndim > 1 else float(v[i]) for v in values] for i in range(len(pos1))]
+        codes, remote = remoteBatch(cps, boxID, rbtID, method, argsList, width, batch)
+        if codes.any():
+            checks[name] = PoseCheck(int(codes[codes != 0][0]), None, None, False)
+            continue
+        if width == 2:
+            maxPos, maxRot = np.abs(expected - remote).max(axis=0)
+        else:
+            pos, rot = poseError(expected, remote)
+            maxPos, maxRot = pos.max(), rot.max()
+        checks[name] = PoseCheck(0, float(maxPos), float(maxRot), maxPos <= posTol and maxRot <= rotTol)
+    return checks
+
+
+# 四元数转换与控制器的核对结果
+#   errorCode: 第一个错误码,非0时其余字段无效
+#   maxError: RPY2Quaternion为四元数分量的最大差值,Quaternion2RPY为姿态转角误差(°)
+#   textMismatch: 本地formatValues的字符串与控制器应答不完全相同的个数
+#   ok: maxError在容差内且textMismatch为0
+QuaternionCheck = namedtuple('QuaternionCheck', ['errorCode', 'maxError', 'textMismatch', 'ok'])
+
+
+def randomRpy(n, seed=None, gimbalLock=0.1):
+    '''
+    *	@param brief:核对用的随机RPY角,其中gimbalLock比例的Ry为±90°
+    '''
+    rng = np.random.default_rng(seed)
+    rpy = np.empty((n, 3))
+    rpy[:, 0] = rng.uniform(-180.0, 180.0, n)
+    rpy[:, 1] = rng.uniform(-90.0, 90.0, n)
+    rpy[:, 2] = rng.uniform(-180.0, 180.0, n)
+    lock = rng.random(n) < gimbalLock
+    rpy[lock, 1] = rng.choice([-90.0, 90.0], int(lock.sum()))
+    return rpy
+
+
+def crossCheckQuaternions(cps, boxID, rbtID, rpy, quatTol=1e-3, rotTol=0.01, batch=100):
+    '''
+    *	@param brief:用控制器的HRIF_RPY2Quaternion与HRIF_Quaternion2RPY核对本地转换,
+                     Quaternion2RPY的输入为控制器返回的四元数,与替换远程调用时的数据流相同
+    *	@param rpy: (N, 3)
+    *	@param return: {指令名称: QuaternionCheck}
+    '''
+    rpy = np.atleast_2d(np.asarray(rpy, np.float64))
+    checks = {}
+    codes, text = remoteBatch(cps, boxID, rbtID, 'HRIF_RPY2Quaternion', rpy.tolist(), 4, batch, raw=True)
+    if codes.any():
+        return {'RPY2Quaternion': QuaternionCheck(int(codes[codes != 0][0]), None, 0, False)}
+    remote = np.array(text, np.float64)
+    local = rpyToQuaternion(rpy)
+    mismatch = sum([a != b for a, b in zip(formatValues(local), text)])
+    maxError = float(np.abs(local - remote).max())
+    checks['RPY2Quaternion'] = QuaternionCheck(0, maxError, mismatch, maxError <= quatTol and mismatch == 0)
+
+    codes, text = remoteBatch(cps, boxID, rbtID, 'HRIF_Quaternion2RPY', remote.tolist(), 3, batch, raw=True)
+    if codes.any():
+        checks['Quaternion2RPY'] = QuaternionCheck(int(codes[codes != 0][0]), None, 0, False)
+        return checks
+    local = quaternionToRpy(remote)
+    mismatch = sum([a != b for a, b in zip(formatValues(local), text)])
+    zeros = np.zeros((len(rpy), 3))
+    maxError = float(poseError(np.concatenate([zeros, local], 1),
+                               np.concatenate([zeros, np.array(text, np.float64)], 1))[1].max())
+    checks['Quaternion2RPY'] = QuaternionCheck(0, maxError, mismatch, maxError <= rotTol and mismatch == 0)
+    return checks
@@ -0,0 +1,221 @@
+#!/usr/bin/env python
+# _*_ coding:utf-8 _*_
+
+import json
+import os
+import threading
+import time
+
+import numpy as np
+
+# 一条记录
+#   sendTime/recvTime: 发出请求与收到最后一条应答的time.monotonic()时间
+#   errorCode: 保留字段,TelemetryRecorder只记录成功的快照,始终为0
+#   joint/pcs/tcp/ucs: ReadActPos,jointVel: ReadActJointVel,jointCur: ReadActJointCur
+RecordDtype = np.dtype([
+    ('sendTime', np.float64),
+    ('recvTime', np.float64),
+    ('errorCode', np.int32),
+    ('joint', np.float64, 6),
+    ('pcs', np.float64, 6),
+    ('tcp', np.float64, 6),
+    ('ucs', np.float64, 6),
+    ('jointVel', np.float64, 6),
+    ('jointCur', np.float64, 6),
+])
+
+
+class RingBuffer(object):
+    '''
+    *	@param brief:定长结构化数组环形缓冲,每写满一段调用spill(段)
+                     capacity为segment的整数倍,每段在内存中连续,可直接写入文件
+    *	@param dtype: 记录类型
+    *	@param segment: 每段记录数
+    *	@param segments: 缓冲中的段数
+    *	@param spill: 段写满时的回调,参数为该段的视图,回调返回后该段可被覆盖
+    '''
+
+    def __init__(self, dtype, segment=4096, segments=4, spill=None):
+        self.segment = segment
+        self.capacity = segment * segments
+        self.m_buf = np.zeros(self.capacity, dtype)
+        self.m_spill = spill
+        self.count = 0
+        self.spilled = 0
+
+    def append(self, record):
+        index = self.count % self.capacity
+        self.m_buf[index] = record
+        self.count += 1
+        if self.count % self.segment == 0:
+            self.flush()
+
+    def flush(self):
+        '''
+        *	@param brief:将尚未交给spill的记录(可能不足一段)交给spill
+        '''
+        while self.spilled < self.count:
+            start = self.spilled % self.capacity
+            end = min(start + self.segment - self.spilled % self.segment, start + self.count - self.spilled)
+            if self.m_spill is not None:
+                self.m_spill(self.m_buf[start:end])
+            self.spilled += end - start
+
+    def recent(self, n=None):
+        '''
+        *	@param brief:最近n条记录的拷贝,按时间顺序,n最大为capacity
+        '''
+        n = min(self.count, self.capacity) if n is None else min(n, self.count, self.capacity)
+        end = self.count % self.capacity
+        if n <= end:
+            return self.m_buf[end - n:end].copy()
+        return np.concatenate((self.m_buf[self.capacity - (n - end):], self.m_buf[:end]))
+
+
+def openRecording(path):
+    '''
+    *	@param brief:以只读内存映射打开记录文件,切片时才从磁盘读取
+    *	@param return: RecordDtype的np.memmap,空文件时为长度0的数组
+    '''
+    n = os.path.getsize(path) // RecordDtype.itemsize
+    if n == 0:
+        return np.zeros(0, RecordDtype)
+    return np.memmap(path, RecordDtype, 'r', shape=(n,))
+
+
+def recordingInfo(path):
+    '''
+    *	@param brief:记录文件的说明(path + '.json'):boxID,rbtID,rate,startTime(time.time()),startMonotonic
+    '''
+    with open(path + '.json') as f:
+        return json.load(f)
+
+
+def timeSlice(records, t0=None, t1=None):
+    '''
+    *	@param brief:按recvTime截取[t0, t1)的记录,对memmap只读取所需部分
+    '''
+    times = records['recvTime']
+    start = 0 if t0 is None else int(np.searchsorted(times, t0, 'left'))
+    end = len(records) if t1 is None else int(np.searchsorted(times, t1, 'left'))
+    return records[start:end]
+
+
+class TelemetryRecorder(object):
+    '''
+    *	@param brief:订阅电箱的TelemetryCache(见CPSClient.telemetry),将每个快照的 ActPos/ActJointVel/ActJointCur
+                     写入环形缓冲,每写满一段追加到磁盘文件,内存占用与记录时长无关;
+                     读取失败或内容不完整的快照不记录,文件中的errorCode均为0
+                     with TelemetryRecorder(cps, 0, 0, 'run.bin') as rec:
+                         ...
+                     records = openRecording('run.bin')
+    *	@param cps: CPSClient
+    *	@param path: 记录文件,已存在时覆盖
+    *	@param rate: 遥测缓存首次创建时的轮询频率(Hz),缓存已在运行时沿用其频率
+    *	@param segment/segments: 见RingBuffer
+    '''
+
+    def __init__(self, cps, boxID, rbtID, path, rate=100.0, segment=4096, segments=4):
+        self.m_cps = cps
+        self.boxID = boxID
+        self.rbtID = rbtID
+        self.path = path
+        self.rate = rate
+        self.m_file = None
+        self.m_cache = None
+        # 由本记录器启动的遥测缓存,停止记录且没有其他监听者时一并停止
+        self.m_bOwnCache = False
+        self.skipped = 0
+        # 读取方(samples/recent)与轮询线程之间的互斥
+        self.m_lock = threading.Lock()
+        self.m_ring = RingBuffer(RecordDtype, segment, segments, self.spill)
+
+    def __enter__(self):
+        self.start()
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.stop()
+        return False
+
+    def start(self):
+        if self.m_cache is not None:
+            return
+        self.m_file = open(self.path, 'wb')
+        previous = self.m_cps.m_telemetry.get((self.boxID, self.rbtID))
+        self.m_bOwnCache = previous is None or not previous.isRunning()
+        cache = self.m_cps.telemetry(self.boxID, self.rbtID, self.rate)
+        cache.addFields('pos', 'jointVel', 'jointCur')
+        with open(self.path + '.json', 'w') as f:
+            json.dump({'boxID': self.boxID, 'rbtID': cache.rbtID, 'rate': cache.rate, 'startTime': time.time(),
+                       'startMonotonic': time.monotonic()}, f)
+        self.m_cache = cache
+        cache.addListener(self.onSnapshot)
+
+    def stop(self):
+        '''
+        *	@param brief:停止记录,缓冲中剩余的记录写入文件后关闭
+        '''
+        cache, self.m_cache = self.m_cache, None
+        if cache is not None:
+            cache.removeListener(self.onSnapshot)
+            if self.m_bOwnCache and not cache.m_listeners:
+                self.m_cps.stopTelemetry(self.boxID, self.rbtID)
+        with self.m_lock:
+            if self.m_file is not None:
+                self.m_ring.flush()
+                self.m_file.close()
+                self.m_file = None
+
+    def isRunning(self):
+        return self.m_cache is not None
+
+    def count(self):
+        return self.m_ring.count
+
+    def spill(self, segment):
+        segment.tofile(self.m_file)
+        self.m_file.flush()
+
+    def recent(self, n=None):
+        '''
+        *	@param brief:内存中最近n条记录的拷贝
+        '''
+        with self.m_lock:
+            return self.m_ring.recent(n)
+
+    def samples(self):
+        '''
+        *	@param brief:已写入文件的全部记录,只读内存映射
+        '''
+        with self.m_lock:
+            if self.m_file is not None:
+                self.m_file.flush()
+            return openRecording(self.path)
+
+    def onSnapshot(self, snapshot):
+        '''
+        *	@param brief:遥测轮询线程中调用,失败或缺少内容的快照计入skipped
+        '''
+        record = toRecord(snapshot)
+        with self.m_lock:
+            # stop()之后仍可能收到正在分发的快照
+            if self.m_file is None:
+                return
+            if record is None:
+                self.skipped += 1
+                return
+            self.m_ring.append(record)
+
+
+def toRecord(snapshot):
+    '''
+    *	@param brief:由TelemetrySnapshot生成一条记录(元组),失败或各数组长度不为6时返回None
+    '''
+    if snapshot.errorCode != 0 or snapshot.pos is None or snapshot.jointVel is None or snapshot.jointCur is None:
+        return None
+    arrays = tuple(snapshot.pos) + (snapshot.jointVel, snapshot.jointCur)
+    for values in arrays:
+        if len(values) != 6:
+            return None
+    return (snapshot.sendTime, snapshot.recvTime, 0) + arrays
@@ -0,0 +1,212 @@
+#!/usr/bin/env python
+# _*_ coding:utf-8 _*_
+
+import threading
+import time
+from collections import namedtuple
+
+import numpy as np
+
+from cps_stats import RttEstimator
+
+# 由位置推导的一组量,时间单位s
+#   time: 求导所在的采样时间
+#   joint/jointVel/jointAcc: 关节位置(°),速度(°/s),加速度(°/s²)
+#   pcs/pcsVel/pcsAcc: 空间位置(mm,°),速度,加速度;姿态为RPY角的变化率,不是角速度矢量
+#   tcpSpeed: TCP线速度大小(mm/s)
+DerivedSample = namedtuple('DerivedSample', ['time', 'joint', 'jointVel', 'jointAcc', 'pcs', 'pcsVel', 'pcsAcc',
+                                             'tcpSpeed'])
+
+
+def fitDerivatives(tWin, xWin, tEval, order):
+    '''
+    *	@param brief:对每个窗口做最小二乘多项式拟合(时间间隔可不均匀的Savitzky-Golay),求tEval处的一阶与二阶导数
+    *	@param tWin: (n, w) 各窗口的采样时间
+    *	@param xWin: (n, w, m) 各窗口的采样值
+    *	@param tEval: (n,) 求导时间
+    *	@param order: 多项式阶数,不小于2
+    *	@param return: (速度 (n, m), 加速度 (n, m))
+    '''
+    tau = tWin - tEval[:, None]
+    # 按窗口时长归一化,避免高次项的法方程病态
+    scale = np.maximum(np.abs(tau).max(axis=1), 1e-9)
+    tau = tau / scale[:, None]
+    V = tau[:, :, None] ** np.arange(order + 1)
+    Vt = np.transpose(V, (0, 2, 1))
+    coef = np.linalg.solve(Vt @ V, Vt @ xWin)
+    vel = coef[:, 1, :] / scale[:, None]
+    acc = 2.0 * coef[:, 2, :] / (scale * scale)[:, None]
+    return vel, acc
+
+
+def unwrapAngles(pcs):
+    '''
+    *	@param brief:RPY角在±180°处跳变,求导前沿时间轴展开
+    *	@param pcs: (n, 6) 空间位置
+    '''
+    pcs = np.array(pcs, np.float64)
+    pcs[:, 3:6] = np.unwrap(pcs[:, 3:6], period=360.0, axis=0)
+    return pcs
+
+
+def derivatives(t, x, window=9, order=2, method='savgol'):
+    '''
+    *	@param brief:整段采样的速度与加速度,用于离线分析(如TelemetryFile.slice的结果)
+    *	@param t: (n,) 采样时间,递增
+    *	@param x: (n, m) 采样值,RPY角需先经unwrapAngles展开
+    *	@param window: Savitzky-Golay窗口样本数,边界处使用最近的完整窗口
+    *	@param method: 'savgol' 多项式拟合,'diff' 二阶精度差分(np.gradient)
+    *	@param return: (速度 (n, m), 加速度 (n, m))
+    '''
+    t = np.asarray(t, np.float64)
+    x = np.asarray(x, np.float64)
+    order = max(order, 2)
+    if method == 'diff' or len(t) < max(window, order + 1):
+        vel = np.gradient(x, t, axis=0)
+        return vel, np.gradient(vel, t, axis=0)
+    n = len(t)
+    starts = np.clip(np.arange(n) - window // 2, 0, n - window)
+    index = starts[:, None] + np.arange(window)
+    return fitDerivatives(t[index], x[index], t, order)
+
+
+class DerivedSignals(object):
+    '''
+    *	@param brief:由位置采样流推导关节与TCP的速度,加速度,只需轮询ReadActPos
+                     缓存最近window个样本,latest()对该窗口拟合并求最后一个样本处的导数
+                     signals = DerivedSignals()
+                     cps.telemetry(boxID).addListener(signals.onSnapshot)
+                     signals.latest().jointVel
+    *	@param window: 窗口样本数,窗口越长越平滑,滞后越大
+    *	@param order: 多项式阶数
+    *	@param method: 'savgol' 或 'diff'(只用最后3个样本)
+    '''
+
+    def __init__(self, window=9, order=2, method='savgol'):
+        self.order = max(order, 2)
+        self.window = max(window, self.order + 1, 3)
+        self.method = method
+        self.count = 0
+        self.m_lock = threading.Lock()
+        self.m_t = np.zeros(self.window)
+        self.m_x = np.zeros((self.window, 12))
+
+    def append(self, t, joint, pcs):
+        '''
+        *	@param brief:追加一个样本
+        *	@param t: 采样时间(s),必须递增
+        '''
+        with self.m_lock:
+            i = self.count % self.window
+            self.m_t[i] = t
+            self.m_x[i, 0:6] = joint
+            self.m_x[i, 6:12] = pcs
+            self.count += 1
+
+    def onSnapshot(self, snapshot):
+        '''
+        *	@param brief:TelemetryCache监听函数,采样时间取请求发出与应答收到的中点
+        '''
+        if snapshot.errorCode != 0:
+            return
+        self.append((snapshot.sendTime + snapshot.recvTime) * 0.5, snapshot.pos.joint, snapshot.pos.pcs)
+
+    def samples(self):
+        '''
+        *	@param return: 窗口中样本的拷贝(t (n,), x (n, 12)),按时间顺序,x为关节与空间位置
+        '''
+        with self.m_lock:
+            n = min(self.count, self.window)
+            order = np.arange(self.count - n, self.count) % self.window
+            return self.m_t[order], self.m_x[order]
+
+    def latest(self):
+        '''
+        *	@param return: 最新样本处的DerivedSample,样本不足3个时为None
+        '''
+        t, raw = self.samples()
+        if len(t) < 3:
+            return None
+        x = raw.copy()
+        x[:, 6:12] = unwrapAngles(x[:, 6:12])
+        if self.method == 'diff' or len(t) < self.window:
+            vel, acc = derivatives(t[-3:], x[-3:], method='diff')
+            vel, acc = vel[-1], acc[-1]
+        else:
+            vel, acc = fitDerivatives(t[None, :], x[None, :, :], t[-1:], self.order)
+            vel, acc = vel[0], acc[0]
+        return DerivedSample(t[-1], raw[-1, 0:6], vel[0:6], acc[0:6], raw[-1, 6:12], vel[6:12], acc[6:12],
+                             float(np.sqrt(np.sum(vel[6:9] ** 2))))
+
+
+class StatePredictor(object):
+    '''
+    *	@param brief:补偿通讯延迟的关节状态估计
+                     位置采样时刻取请求发出与应答收到的中点(假设上下行对称),由窗口拟合的速度与加速度外推到指定时刻;
+                     默认外推到PushServoJ实际生效的时刻: 现在 + 单程延迟 + servoDelay
+                     predictor = StatePredictor(servoDelay=0.004)
+                     cps.telemetry(boxID).addListener(predictor.onSnapshot)
+                     cps.HRIF_PushServoJ(boxID, rbtID, plan(predictor.predictPose()))
+    *	@param window/order: 见DerivedSignals
+    *	@param servoDelay: 控制器收到PushServoJ到执行的额外延迟(s),与StartServo的servoTime/lookaheadTime有关
+    *	@param horizon: 最大外推时长(s),超过时按该时长外推,避免采样中断后发散
+    *	@param rtt: 使用的RttEstimator,如cps.rtt(boxID);默认由采样的收发时间自行估计
+    '''
+
+    def __init__(self, window=7, order=2, servoDelay=0.0, horizon=0.1, rtt=None):
+        self.servoDelay = servoDelay
+        self.horizon = horizon
+        self.rtt = RttEstimator() if rtt is None else rtt
+        self.m_bOwnRtt = rtt is None
+        self.m_signals = DerivedSignals(window, order)
+
+    def update(self, sendTime, recvTime, joint, pcs):
+        '''
+        *	@param brief:加入一次位置读取
+        *	@param sendTime/recvTime: 请求发出与应答收到的time.monotonic()时间
+        '''
+        if self.m_bOwnRtt:
+            self.rtt.update(recvTime - sendTime)
+        self.m_signals.append((sendTime + recvTime) * 0.5, joint, pcs)
+
+    def updateResult(self, pos):
+        '''
+        *	@param brief:加入HRIF_ReadActPos读到的StructResult(ActPos, ActPosSizes)
+        '''
+        self.update(pos.sendTime, pos.recvTime, pos.value.joint, pos.value.pcs)
+
+    def onSnapshot(self, snapshot):
+        '''
+        *	@param brief:TelemetryCache监听函数
+        '''
+        if snapshot.errorCode == 0:
+            self.update(snapshot.sendTime, snapshot.recvTime, snapshot.pos.joint, snapshot.pos.pcs)
+
+    def applyTime(self, now=None):
+        '''
+        *	@param brief:现在发出的PushServoJ在控制器上生效的时刻
+        '''
+        return (time.monotonic() if now is None else now) + self.rtt.oneWay() + self.servoDelay
+
+    def predict(self, t=None):
+        '''
+        *	@param brief:外推到时刻t的DerivedSample,t默认为applyTime()
+        *	@param return: 各量为t时刻的估计,样本不足时为None
+        '''
+        d = self.m_signals.latest()
+        if d is None:
+            return None
+        t = self.applyTime() if t is None else t
+        dt = min(max(t - d.time, 0.0), self.horizon)
+        pcsVel = d.pcsVel + d.pcsAcc * dt
+        return DerivedSample(d.time + dt, d.joint + d.jointVel * dt + 0.5 * d.jointAcc * dt * dt,
+                             d.jointVel + d.jointAcc * dt, d.jointAcc,
+                             d.pcs + d.pcsVel * dt + 0.5 * d.pcsAcc * dt * dt, pcsVel, d.pcsAcc,
+                             float(np.sqrt(np.sum(pcsVel[0:3] ** 2))))
+
+    def predictPose(self, t=None):
+        '''
+        *	@param brief:时刻t(默认applyTime())的关节位置估计,6个关节角度(°),样本不足时为None
+        '''
+        d = self.predict(t)
+        return None if d is None else d.joint
@@ -0,0 +1,561 @@
+#!/usr/bin/env python
+# _*_ coding:utf-8 _*_
+# 本地CPS控制器模拟器,实现 TCP 10003 指令协议与 XML-RPC 20000 的 HRLog/SendVarValue 接口
+# 用法: python cps_sim.py [--port 10003] [--rpc-port 20000] [--latency 0.001] [--jitter 0.0005]
+#
+# 运动模型为梯形速度插补,起止位置由cps_kinematics做正解/逆解换算,
+# 参数为已登记的型号(Models),未登记时用未经标定的名义参数(NominalModels):
+#   关节运动(MoveJ,WayPoint type=0 isJoint=1)目标取RawACSpoints,迪卡尔目标由正解得到
+#   迪卡尔运动(MoveL等)目标取points,关节目标由逆解得到
+#   运动过程中关节位置与迪卡尔位置各自线性插值,中间点的迪卡尔位置不是关节位置的正解
+# 未实现的命令应答Fail(ErrUnknownCommand),处理命令时的异常应答Fail(ErrSimError),连接保持
+
+import argparse
+import math
+import random
+import socket
+import socketserver
+import threading
+import time
+from xmlrpc.server import SimpleXMLRPCServer
+
+from cps_codec import decodeCommand
+from cps_kinematics import KinematicModel, Models, NominalModels, modelName, validateModel, forwardKin, inverseKin
+from cps_pose import poseAdd, poseSub, poseTrans, poseInverse, poseDist, poseInterpolate, rpyToQuaternion, \
+    quaternionToRpy
+
+# 模拟器自定义的失败码
+ErrNotEnabled = 39600
+ErrBadCommand = 39601
+ErrUnknownCommand = 39602
+ErrSimError = 39603
+
+
+class SimRobot(object):
+    '''
+    *	@param brief:单台机器人的状态与关节空间运动模型,所有连接共享,由lock保护
+    '''
+
+    JointVel = 30.0
+    JointAcc = 100.0
+    LinearVel = 100.0
+    LinearAcc = 500.0
+
+    def __init__(self, model='Elfin05'):
+        self.lock = threading.Lock()
+        # model可以是型号名称或KinematicModel,ReadRobotModel应答其名称
+        self.m_kinModel = validateModel(model) if isinstance(model, KinematicModel) else None
+        self.model = model.name if isinstance(model, KinematicModel) else model
+        self.electrify = 1
+        self.enabled = 1
+        self.error = 0
+        self.paused = 0
+        self.override = 1.0
+        self.joint = [0.0, 0.0, 90.0, 0.0, 90.0, 0.0]
+        self.pcs = self.forwardKin(self.joint)
+        self.jointVel = [0.0] * 6
+        self.pcsVel = [0.0] * 6
+        self.tcp = [0.0] * 6
+        self.ucs = [0.0] * 6
+        self.tcpByName = {'TCP': [0.0] * 6}
+        self.ucsByName = {'Base': [0.0] * 6}
+        self.waypointID = '0'
+        self.ftState = 0
+        self.m_motion = None
+
+    def move(self, joint=None, pcs=None, vel=None, acc=None):
+        '''
+        *	@param brief:开始一段梯形速度运动,给定joint时按关节距离规划,否则按迪卡尔距离规划
+        '''
+        now = time.monotonic()
+        self.update(now)
+        self.paused = 0
+        startJoint, startPcs = list(self.joint), list(self.pcs)
+        endJoint = list(joint) if joint is not None else self.inverseKin(pcs, startJoint)[1]
+        endPcs = list(pcs) if pcs is not None else self.forwardKin(endJoint)
+        if joint is None:
+            dist = math.sqrt(sum([(endPcs[i] - startPcs[i]) ** 2 for i in range(3)]))
+            if dist == 0:
+                dist = max([abs(endPcs[i] - startPcs[i]) for i in range(3, 6)])
+            vel = vel or self.LinearVel
+            acc = acc or self.LinearAcc
+        else:
+            dist = max([abs(endJoint[i] - startJoint[i]) for i in range(6)])
+            vel = vel or self.JointVel
+            acc = acc or self.JointAcc
+        vel = vel * self.override
+        acc = acc * self.override
+        if dist <= 0:
+            self.joint, self.pcs = endJoint, endPcs
+            self.m_motion = None
+            return
+        tAcc = vel / acc
+        if dist < vel * tAcc:
+            tAcc = math.sqrt(dist / acc)
+            vel = acc * tAcc
+            duration = 2 * tAcc
+        else:
+            duration = dist / vel + tAcc
+        self.m_motion = (now, duration, tAcc, vel, acc, dist, startJoint, endJoint, startPcs, endPcs)
+
+    def forwardKin(self, joint, tcp=None, ucs=None):
+        return forwardKin(joint, self.kinModel(), tcp, ucs).tolist()
+
+    def inverseKin(self, pcs, refJoint, tcp=None, ucs=None):
+        # 逆解失败时关节角为参考值
+        code, joint = inverseKin(pcs, refJoint, self.kinModel(), tcp, ucs)
+        return code, joint.tolist()
+
+    def kinModel(self):
+        # 依次使用传入的参数,已登记的型号,该型号的名义参数,Elfin05的名义参数
+        if self.m_kinModel is not None:
+            return self.m_kinModel
+        name = modelName(self.model)
+        if name in Models:
+            return Models[name]
+        return NominalModels.get(name, NominalModels['Elfin05'])
+
+    def stop(self):
+        self.update(time.monotonic())
+        self.m_motion = None
+        self.paused = 0
+        self.jointVel = [0.0] * 6
+        self.pcsVel = [0.0] * 6
+
+    def pause(self):
+        self.update(time.monotonic())
+        if self.m_motion is not None and not self.paused:
+            self.paused = time.monotonic()
+            self.jointVel = [0.0] * 6
+            self.pcsVel = [0.0] * 6
+
+    def resume(self):
+        # 暂停的时长从运动起始时间中扣除,插补从暂停处继续
+        if self.m_motion is not None and self.paused:
+            self.m_motion = (self.m_motion[0] + time.monotonic() - self.paused,) + self.m_motion[1:]
+        self.paused = 0
+
+    def update(self, now):
+        # 按当前时间计算插补位置与速度
+        if self.m_motion is None or self.paused:
+            return
+        start, duration, tAcc, vel, acc, dist, startJoint, endJoint, startPcs, endPcs = self.m_motion
+        t = now - start
+        if t >= duration:
+            self.joint, self.pcs = endJoint, endPcs
+            self.jointVel = [0.0] * 6
+            self.pcsVel = [0.0] * 6
+            self.m_motion = None
+            return
+        if t < tAcc:
+            s, v = 0.5 * acc * t * t, acc * t
+        elif t < duration - tAcc:
+            s, v = 0.5 * acc * tAcc * tAcc + vel * (t - tAcc), vel
+        else:
+            s, v = dist - 0.5 * acc * (duration - t) ** 2, acc * (duration - t)
+        ratio, rate = s / dist, v / dist
+        self.joint = [startJoint[i] + (endJoint[i] - startJoint[i]) * ratio for i in range(6)]
+        self.pcs = [startPcs[i] + (endPcs[i] - startPcs[i]) * ratio for i in range(6)]
+        self.jointVel = [(endJoint[i] - startJoint[i]) * rate for i in range(6)]
+        self.pcsVel = [(endPcs[i] - startPcs[i]) * rate for i in range(6)]
+
+    def isMoving(self):
+        return self.m_motion is not None and not self.paused
+
+    def isPaused(self):
+        return 1 if self.paused else 0
+
+    def fsm(self):
+        if not self.electrify:
+            return 7
+        if self.error:
+            return 22
+        if not self.enabled:
+            return 24
+        if self.paused:
+            return 32
+        if self.m_motion is not None:
+            return 25
+        return 33
+
+
+class SimServer(socketserver.ThreadingTCPServer):
+    allow_reuse_address = True
+    daemon_threads = True
+
+
+def fmt(values):
+    return ['%.3f' % v for v in values]
+
+
+class CPSSimulator(object):
+    '''
+    *	@param brief:模拟控制器,每个TCP连接一个线程,所有连接共用一台SimRobot
+                     with CPSSimulator(port=0, rpcPort=None) as sim:
+                         cps.HRIF_Connect(0, '127.0.0.1', sim.port)
+    *	@param port: 指令端口,0表示自动分配
+    *	@param rpcPort: XML-RPC端口,None表示不启动
+    *	@param latency: 每收到一批数据后的固定延迟(s),模拟网络往返,执行前后各占一半
+    *	@param jitter: 在latency上叠加的随机延迟上限(s)
+    *	@param cmdTime: 每条指令的处理耗时(s)
+    '''
+
+    def __init__(self, host='127.0.0.1', port=10003, rpcPort=20000, latency=0.0, jitter=0.0, cmdTime=0.0,
+                 model='Elfin05'):
+        self.host = host
+        self.port = port
+        self.rpcPort = rpcPort
+        self.latency = latency
+        self.jitter = jitter
+        self.cmdTime = cmdTime
+        self.robot = SimRobot(model)
+        self.logs = []
+        self.vars = {}
+        self.commandCount = 0
+        self.m_server = None
+        self.m_rpcServer = None
+        self.m_threads = []
+        self.m_handlers = self.handlers()
+
+    def __enter__(self):
+        self.start()
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.stop()
+        return False
+
+    def start(self):
+        sim = self
+
+        class Handler(socketserver.BaseRequestHandler):
+            def handle(self):
+                sim.serve(self.request)
+
+        self.m_server = SimServer((self.host, self.port), Handler)
+        self.port = self.m_server.server_address[1]
+        self.m_threads.append(threading.Thread(target=self.m_server.serve_forever, daemon=True))
+        if self.rpcPort is not None:
+            self.m_rpcServer = SimpleXMLRPCServer((self.host, self.rpcPort), logRequests=False, allow_none=True)
+            self.m_rpcServer.register_function(self.HRLog, 'HRLog')
+            self.m_rpcServer.register_function(self.SendVarValue, 'SendVarValue')
+            self.m_rpcServer.register_function(self.SendScriptError, 'SendScriptError')
+            self.rpcPort = self.m_rpcServer.server_address[1]
+            self.m_threads.append(threading.Thread(target=self.m_rpcServer.serve_forever, daemon=True))
+        for thread in self.m_threads:
+            thread.start()
+        return self.port
+
+    def stop(self):
+        if self.m_server is not None:
+            self.m_server.shutdown()
+            self.m_server.server_close()
+        if self.m_rpcServer is not None:
+            self.m_rpcServer.shutdown()
+            self.m_rpcServer.server_close()
+        self.m_threads = []
+
+    # XML-RPC 接口
+    def HRLog(self, nLevel, msg):
+        self.logs.append((nLevel, msg))
+        return 0
+
+    def SendVarValue(self, name, value):
+        self.vars[name] = value
+        return 0
+
+    def SendScriptError(self, msg, detail):
+        self.logs.append((2, msg))
+        return 0
+
+    def delay(self):
+        # 单程延迟,收到请求后与发出应答前各调用一次
+        t = (self.latency + random.uniform(0, self.jitter)) * 0.5
+        if t > 0:
+            time.sleep(t)
+
+    def serve(self, conn):
+        conn.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        pending = b''
+        while True:
+            try:
+                data = conn.recv(65536)
+            except OSError:
+                break
+            if not data:
+                break
+            pending += data
+            self.delay()
+            replies = []
+            while b';' in pending:
+                frame, pending = pending.split(b';', 1)
+                frame = frame.decode('utf-8', 'ignore').strip() + ';'
+                if self.cmdTime > 0:
+                    time.sleep(self.cmdTime)
+                replies.append(self.execute(frame))
+            if replies:
+                self.delay()
+                conn.sendall(''.join(replies).encode())
+        conn.close()
+
+    def execute(self, frame):
+        '''
+        *	@param brief:执行一条命令并返回应答字符串
+        '''
+        self.commandCount += 1
+        try:
+            command, args = decodeCommand(frame)
+        except (IndexError, ValueError):
+            return frame.split(',', 1)[0] + ',Fail,' + str(ErrBadCommand) + ',;'
+        handler = self.m_handlers.get(command)
+        if handler is None:
+            return command + ',Fail,' + str(ErrUnknownCommand) + ',;'
+        robot = self.robot
+        try:
+            with robot.lock:
+                robot.update(time.monotonic())
+                ret = handler(args)
+        except Exception as e:
+            self.logs.append((2, '[sim]' + command + ': ' + repr(e)))
+            ret = ErrSimError
+        if type(ret) is int:
+            return command + ',Fail,' + str(ret) + ',;'
+        return command + ',OK,' + ''.join([str(v) + ',' for v in ret]) + ';'
+
+    def handlers(self):
+        robot = self.robot
+
+        def setAttr(name, value):
+            def handler(args):
+                setattr(robot, name, value)
+                return []
+            return handler
+
+        def reply(func):
+            def handler(args):
+                return func()
+            return handler
+
+        def requireEnabled(func):
+            def handler(args):
+                if not robot.enabled or robot.error or not robot.electrify:
+                    return ErrNotEnabled
+                return func(args)
+            return handler
+
+        def grpStop(args):
+            robot.stop()
+            return []
+
+        def grpInterrupt(args):
+            robot.pause()
+            return []
+
+        def grpContinue(args):
+            robot.resume()
+            return []
+
+        def grpPowerOff(args):
+            robot.stop()
+            robot.enabled = 0
+            return []
+
+        def setOverride(args):
+            robot.override = min(max(args['vel'], 0.01), 1.0)
+            return []
+
+        def wayPoint(args, end, acs, vel, acc):
+            robot.waypointID = str(args['cmdID'])
+            if args['type'] == 0 and args['isJoint'] == 1:
+                robot.move(joint=acs, vel=vel, acc=acc)
+            else:
+                robot.move(pcs=end, vel=vel, acc=acc)
+            return []
+
+        def moveRelJ(args):
+            joint = list(robot.joint)
+            joint[args['nAxis']] += args['dDistance'] * (1 if args['nDirection'] else -1)
+            robot.move(joint=joint)
+            return []
+
+        def moveRelL(args):
+            pcs = list(robot.pcs)
+            pcs[args['nAxis']] += args['dDistance'] * (1 if args['nDirection'] else -1)
+            robot.move(pcs=pcs)
+            return []
+
+        def shortJog(key, axis, limit):
+            def handler(args):
+                values = list(getattr(robot, key))
+                values[args[axis]] += limit * (1 if args['derection'] else -1)
+                if key == 'pcs':
+                    robot.move(pcs=values, vel=10)
+                else:
+                    robot.move(joint=values, vel=10)
+                return []
+            return handler
+
+        def pushServoJ(args):
+            robot.m_motion = None
+            robot.joint = list(args['dACS'])
+            robot.pcs = robot.forwardKin(robot.joint)
+            return []
+
+        def pushServoP(args):
+            robot.m_motion = None
+            robot.pcs = list(args['pose'])
+            robot.joint = robot.inverseKin(robot.pcs, robot.joint)[1]
+            return []
+
+        def inverse(args):
+            code, joint = robot.inverseKin(args['rawPCS'], args['rawACS'], args['tcp'], args['ucs'])
+            return code if code != 0 else fmt(joint)
+
+        def readRobotState(args):
+            moving = 1 if robot.isMoving() else 0
+            done = 0 if robot.m_motion is not None else 1
+            return [moving, robot.enabled, robot.error, 0, 0, 1 - robot.enabled, robot.isPaused(), 0, 0,
+                    robot.electrify, 1, done, done]
+
+        def byName(table, key, name):
+            def handler(args):
+                if args[name] not in table:
+                    return ErrBadCommand
+                if key is None:
+                    return fmt(table[args[name]])
+                setattr(robot, key, list(table[args[name]]))
+                return []
+            return handler
+
+        def setFrame(key, name):
+            def handler(args):
+                setattr(robot, key, list(args[name]))
+                return []
+            return handler
+
+        def setFTState(args):
+            robot.ftState = 2 if args['state'] == 1 else 0
+            return []
+
+        def jointCur(args):
+            return fmt([0.5 + 0.02 * v for v in robot.jointVel])
+
+        zeros6 = reply(lambda: fmt([0.0] * 6))
+        zero1 = reply(lambda: [0])
+        # 只应答OK,不改变模拟状态
+        accepted = reply(lambda: [])
+        return {
+            # 初始化与使能
+            'Electrify': setAttr('electrify', 1),
+            'BlackOut': setAttr('electrify', 0),
+            'IsSimulation': reply(lambda: [1]),
+            'ReadControllerState': reply(lambda: [1]),
+            'ReadVersion': reply(lambda: ['sim', 'sim', 'sim', 'sim', 'sim', 'sim', 'sim', 'sim']),
+            'ReadRobotModel': reply(lambda: [robot.model]),
+            'GrpPowerOn': setAttr('enabled', 1),
+            'GrpPowerOff': grpPowerOff,
+            'GrpReset': setAttr('error', 0),
+            'GrpStop': grpStop,
+            'GrpInterrupt': grpInterrupt,
+            'GrpContinue': grpContinue,
+            # 状态读取
+            'SetOverride': setOverride,
+            'ReadRobotState': readRobotState,
+            'ReadCurFSM': reply(lambda: [robot.fsm()]),
+            'ReadCurWayPointID': reply(lambda: [robot.waypointID]),
+            'ReadEmergencyInfo': reply(lambda: [0, 0, 0, 0]),
+            'ReadAxisErrorCode': reply(lambda: [0] * 6),
+            'ReadBoxInfo': reply(lambda: [1, robot.electrify, '48.000', '1.000', 0, 0]),
+            'ReadBoxDI': zero1,
+            'ReadBoxDO': zero1,
+            'ReadBoxCI': zero1,
+            'ReadBoxCO': zero1,
+            'ReadEI': zero1,
+            'ReadEO': zero1,
+            'ReadJointMaxVel': reply(lambda: fmt([180.0] * 6)),
+            'ReadJointMaxAcc': reply(lambda: fmt([500.0] * 6)),
+            'ReadLinearMaxVel': reply(lambda: fmt([1000.0])),
+            # 位置,速度,电流
+            'ReadActPos': reply(lambda: fmt(robot.joint + robot.pcs + robot.tcp + robot.ucs)),
+            'ReadCmdPos': reply(lambda: fmt(robot.joint + robot.pcs)),
+            'ReadActACS': reply(lambda: fmt(robot.joint)),
+            'ReadCmdJointVel': reply(lambda: fmt(robot.jointVel)),
+            'ReadActJointVel': reply(lambda: fmt(robot.jointVel)),
+            'ReadCmdTcpVel': reply(lambda: fmt(robot.pcsVel)),
+            'ReadActTcpVel': reply(lambda: fmt(robot.pcsVel)),
+            'ReadCmdJointCur': jointCur,
+            'ReadActJointCur': jointCur,
+            'ReadTcpVelocity': reply(lambda: fmt([math.sqrt(sum([v * v for v in robot.pcsVel[0:3]]))] * 2)),
+            # 坐标,正解与逆解使用cps_kinematics的名义参数
+            'PCS2ACS': inverse,
+            'ACS2PCS': lambda args: fmt(robot.forwardKin(args['rawACS'], args['tcp'], args['ucs'])),
+            # 点位计算
+            'Quaternion2RPY': lambda args: fmt(quaternionToRpy([args['dQuaW'], args['dQuaX'], args['dQuaY'],
+                                                                args['dQuaZ']])),
+            'RPY2Quaternion': lambda args: fmt(rpyToQuaternion([args['Rx'], args['Ry'], args['Rz']])),
+            'PoseAdd': lambda args: fmt(poseAdd(args['pos1'], args['pos2'])),
+            'PoseSub': lambda args: fmt(poseSub(args['pos1'], args['pos2'])),
+            'PoseTrans': lambda args: fmt(poseTrans(args['pos1'], args['pos2'])),
+            'PoseInverse': lambda args: fmt(poseInverse(args['pos1'])),
+            'CalPointDistance': lambda args: fmt(poseDist(args['pos1'], args['pos2'])),
+            'PoseInterpolate': lambda args: fmt(poseInterpolate(args['pos1'], args['pos2'], args['alpha'])),
+            'SetCurTCP': setFrame('tcp', 'TCP'),
+            'SetCurUCS': setFrame('ucs', 'UCS'),
+            'ReadCurTCP': reply(lambda: fmt(robot.tcp)),
+            'ReadCurUCS': reply(lambda: fmt(robot.ucs)),
+            'SetTCPByName': byName(robot.tcpByName, 'tcp', 'TcpName'),
+            'SetUCSByName': byName(robot.ucsByName, 'ucs', 'UcsName'),
+            'ReadTCPByName': byName(robot.tcpByName, None, 'TCP'),
+            'ReadUCSByName': byName(robot.ucsByName, None, 'UCS'),
+            # 力控
+            'SetForceControlState': setFTState,
+            'SetScriptForceControlState': setFTState,
+            'ReadFTControlState': reply(lambda: [robot.ftState]),
+            'ReadForceData': zeros6,
+            'ReadFTCabData': zeros6,
+            # 运动
+            'WayPoint': requireEnabled(lambda a: wayPoint(a, a['points'], a['RawACSpoints'], a['speed'], a['Acc'])),
+            'WayPointEx': requireEnabled(lambda a: wayPoint(a, a['points'], a['RawACSpoints'], a['speed'], a['acc'])),
+            'WayPoint2': requireEnabled(lambda a: wayPoint(a, a['EndPos'], a['AcsPos'], a['Vel'], a['Acc'])),
+            'MoveRelJ': requireEnabled(moveRelJ),
+            'MoveRelL': requireEnabled(moveRelL),
+            'ShortJogJ': requireEnabled(shortJog('joint', 'axisId', 2.0)),
+            'ShortJogL': requireEnabled(shortJog('pcs', 'pcsId', 2.0)),
+            'PushServoJ': requireEnabled(pushServoJ),
+            'PushServoP': requireEnabled(pushServoP),
+            # 接受但不模拟的命令
+            'ConnectToBox': accepted,
+            'StartMaster': accepted,
+            'SetBoxDO': accepted,
+            'SetBoxCO': accepted,
+            'SetEndDO': accepted,
+            'StartServo': accepted,
+            'PushMovePaths': accepted,
+            'LongJogJ': accepted,
+            'LongJogL': accepted,
+        }
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=10003)
+    parser.add_argument('--rpc-port', type=int, default=20000)
+    parser.add_argument('--latency', type=float, default=0.0, help='每批数据的固定延迟(s)')
+    parser.add_argument('--jitter', type=float, default=0.0, help='随机延迟上限(s)')
+    parser.add_argument('--cmd-time', type=float, default=0.0, help='每条指令处理耗时(s)')
+    parser.add_argument('--model', default='Elfin05')
+    args = parser.parse_args()
+
+    sim = CPSSimulator(args.host, args.port, args.rpc_port, args.latency, args.jitter, args.cmd_time, args.model)
+    sim.start()
+    print('CPS simulator on %s:%d, xmlrpc %d' % (args.host, sim.port, sim.rpcPort))
+    try:
+        while True:
+            time.sleep(1)
+    except KeyboardInterrupt:
+        sim.stop()
+
+
+if __name__ == '__main__':
+    main()
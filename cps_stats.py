@@ -0,0 +1,178 @@
+#!/usr/bin/env python
+# _*_ coding:utf-8 _*_
+
+import threading
+
+# 延迟直方图按2的幂分桶,单位微秒: 桶k统计 [2^(k-1), 2^k) us,桶0为1us以下
+HistBuckets = 32
+
+
+class CommandRecord(object):
+    '''
+    *	@param brief:单个协议命令的统计
+    '''
+
+    __slots__ = ('count', 'errors', 'bytesSent', 'bytesRecv', 'totalTime', 'minTime', 'maxTime', 'hist')
+
+    def __init__(self):
+        self.count = 0
+        self.errors = {}
+        self.bytesSent = 0
+        self.bytesRecv = 0
+        self.totalTime = 0.0
+        self.minTime = None
+        self.maxTime = 0.0
+        self.hist = [0] * HistBuckets
+
+    def snapshot(self, errorNames):
+        return {
+            'count': self.count,
+            'errors': dict([(code, {'count': n, 'name': errorNames.get(code, '')}) for code, n in self.errors.items()]),
+            'bytesSent': self.bytesSent,
+            'bytesRecv': self.bytesRecv,
+            'totalTime': self.totalTime,
+            'minTime': self.minTime,
+            'maxTime': self.maxTime,
+            'hist': list(self.hist),
+        }
+
+
+class CommandStats(object):
+    '''
+    *	@param brief:按协议命令名统计次数,错误码,收发字节数和延迟直方图,由RbtClient.enableStats挂接
+    '''
+
+    def __init__(self):
+        self.m_records = {}
+        # 同一电箱的多条连接共用一份统计
+        self.m_lock = threading.Lock()
+
+    def record(self, cmd, errorCode, elapsed, nSent, nRecv):
+        if type(cmd) is bytes:
+            name = cmd[:cmd.find(b',')].decode()
+        else:
+            name = cmd[:cmd.find(',')]
+        with self.m_lock:
+            self.update(name, errorCode, elapsed, nSent, nRecv)
+
+    def update(self, name, errorCode, elapsed, nSent, nRecv):
+        rec = self.m_records.get(name)
+        if rec is None:
+            rec = self.m_records[name] = CommandRecord()
+        rec.count += 1
+        if errorCode != 0:
+            rec.errors[errorCode] = rec.errors.get(errorCode, 0) + 1
+        rec.bytesSent += nSent
+        rec.bytesRecv += nRecv
+        rec.totalTime += elapsed
+        if rec.minTime is None or elapsed < rec.minTime:
+            rec.minTime = elapsed
+        if elapsed > rec.maxTime:
+            rec.maxTime = elapsed
+        rec.hist[min(int(elapsed * 1e6).bit_length(), HistBuckets - 1)] += 1
+
+    def snapshot(self, errorNames={}):
+        '''
+        *	@param brief:当前统计的拷贝
+        *	@param errorNames: 错误码 -> 说明,一般为dic_ErrorCode
+        *	@param return: {命令: {count, errors: {错误码: {count, name}}, bytesSent, bytesRecv, totalTime,
+                                  minTime, maxTime, hist}},时间单位秒
+        '''
+        with self.m_lock:
+            return dict([(name, rec.snapshot(errorNames)) for name, rec in self.m_records.items()])
+
+    def reset(self):
+        with self.m_lock:
+            self.m_records = {}
+
+
+class RttEstimator(object):
+    '''
+    *	@param brief:往返时间估计,平滑方法同TCP(RFC 6298): srtt与rttvar为指数加权平均
+                     rto = srtt + max(granularity, k * rttvar),限制在[minRto, maxRto];超时后backoff加倍,新样本恢复
+    *	@param alpha: srtt的权重
+    *	@param beta: rttvar的权重
+    *	@param k: rttvar的倍数
+    *	@param granularity: 时钟粒度(s)
+    *	@param minRto: rto下限(s),尚无样本时rto也取该值
+    *	@param maxRto: rto上限(s)
+    '''
+
+    def __init__(self, alpha=0.125, beta=0.25, k=4, granularity=0.001, minRto=1.0, maxRto=60.0):
+        self.alpha = alpha
+        self.beta = beta
+        self.k = k
+        self.granularity = granularity
+        self.minRto = minRto
+        self.maxRto = maxRto
+        self.m_backoff = 1
+        self.srtt = None
+        self.rttvar = 0.0
+        self.minRtt = None
+        self.last = None
+        self.count = 0
+
+    def update(self, rtt):
+        if self.srtt is None:
+            self.srtt = rtt
+            self.rttvar = rtt * 0.5
+        else:
+            self.rttvar += self.beta * (abs(self.srtt - rtt) - self.rttvar)
+            self.srtt += self.alpha * (rtt - self.srtt)
+        if self.minRtt is None or rtt < self.minRtt:
+            self.minRtt = rtt
+        self.last = rtt
+        self.count += 1
+        self.m_backoff = 1
+
+    def rto(self):
+        '''
+        *	@param brief:等待应答的超时估计(s)
+        '''
+        if self.srtt is None:
+            rto = self.minRto
+        else:
+            rto = max(self.minRto, min(self.srtt + max(self.granularity, self.k * self.rttvar), self.maxRto))
+        return min(rto * self.m_backoff, self.maxRto)
+
+    def backoff(self):
+        '''
+        *	@param brief:等待应答超时后调用,rto加倍直到maxRto,下一个样本到达后恢复
+        '''
+        if self.rto() < self.maxRto:
+            self.m_backoff *= 2
+
+    def oneWay(self):
+        '''
+        *	@param brief:单程延迟估计(s),假设上下行对称,尚无样本时为0
+        '''
+        return 0.0 if self.srtt is None else self.srtt * 0.5
+
+    def snapshot(self):
+        return {'srtt': self.srtt, 'rttvar': self.rttvar, 'min': self.minRtt, 'last': self.last, 'count': self.count,
+                'rto': self.rto()}
+
+
+def bucketBound(k):
+    '''
+    *	@param brief:直方图桶k的上界(秒)
+    '''
+    return (1 << k) * 1e-6
+
+
+def histPercentile(hist, p):
+    '''
+    *	@param brief:由直方图估计百分位延迟,返回所在桶的上界(秒)
+    *	@param hist: snapshot中的hist
+    *	@param p: 百分位,0-100
+    '''
+    total = sum(hist)
+    if total == 0:
+        return 0.0
+    target = total * p / 100.0
+    acc = 0
+    for k in range(len(hist)):
+        acc += hist[k]
+        if acc >= target:
+            return bucketBound(k)
+    return bucketBound(len(hist) - 1)
@@ -0,0 +1,244 @@
+#!/usr/bin/env python
+# _*_ coding:utf-8 _*_
+
+import threading
+import time
+from collections import namedtuple
+
+from cps_codec import ArrayResult, StructResult, RobotState, ActPos, ActPosSizes
+from cps_channels import Telemetry
+
+# HRIF_ReadSnapshot可读取的内容,按此顺序连续发出
+#   state: RobotState, pos: ActPos(各字段为float64数组), jointVel/jointCur/ftData: float64数组, fsm: RbtFSM状态值
+SnapshotFields = ('state', 'pos', 'jointVel', 'jointCur', 'ftData', 'fsm')
+
+# 内容 -> 读取接口
+SnapshotReads = {
+    'state': 'HRIF_ReadRobotState',
+    'pos': 'HRIF_ReadActPos',
+    'jointVel': 'HRIF_ReadActJointVel',
+    'jointCur': 'HRIF_ReadActJointCur',
+    'ftData': 'HRIF_ReadFTData',
+    'fsm': 'HRIF_ReadCurFSM',
+}
+
+# 一次完整读取的结果
+#   sendTime: 第一条请求发出前, recvTime: 最后一条应答收到后, 均为time.monotonic()时间
+#   errorCode: 0表示全部成功,否则为第一个失败的错误码,各内容为None
+#   未请求的内容为None
+RobotSnapshot = namedtuple('RobotSnapshot', ('sendTime', 'recvTime', 'errorCode') + SnapshotFields)
+
+# 一次轮询的结果
+#   seq: 序号,从1开始递增
+#   sendTime/recvTime: 发出请求与收到最后一条应答的time.monotonic()时间
+#   errorCode: 0表示成功,否则各内容为None
+#   state: RobotState,pos: ActPos(各字段为float64数组),fsm: RbtFSM状态值
+#   jointVel/jointCur/ftData: float64数组,只在TelemetryCache.addFields加入后读取,否则为None
+TelemetrySnapshot = namedtuple('TelemetrySnapshot', ['seq', 'sendTime', 'recvTime', 'errorCode', 'state', 'pos',
+                                                     'fsm', 'jointVel', 'jointCur', 'ftData'],
+                               defaults=(None, None, None))
+
+
+def failedSnapshot(sendTime, recvTime, errorCode):
+    return RobotSnapshot(sendTime, recvTime, errorCode, *([None] * len(SnapshotFields)))
+
+
+def snapshotResults(fields):
+    '''
+    *	@param brief:为fields中的每项创建结果对象
+    *	@param return: 按SnapshotFields顺序的[(内容, 接口名, 结果)],fields含未知内容时返回None
+    '''
+    for name in fields:
+        if name not in SnapshotReads:
+            return None
+    reads = []
+    for name in SnapshotFields:
+        if name not in fields:
+            continue
+        if name == 'state':
+            result = StructResult(RobotState, dtype=int)
+        elif name == 'pos':
+            result = StructResult(ActPos, ActPosSizes)
+        elif name == 'fsm':
+            result = ArrayResult(int)
+        else:
+            result = ArrayResult()
+        reads.append((name, SnapshotReads[name], result))
+    return reads
+
+
+def makeSnapshot(sendTime, recvTime, codes, reads):
+    '''
+    *	@param brief:由各条读取的错误码与结果对象组成RobotSnapshot
+    '''
+    for code in codes:
+        if code != 0:
+            return failedSnapshot(sendTime, recvTime, code)
+    values = dict.fromkeys(SnapshotFields)
+    for name, method, result in reads:
+        if name == 'fsm':
+            values[name] = int(result.values[0])
+        elif isinstance(result, StructResult):
+            values[name] = result.value
+        else:
+            values[name] = result.values
+    return RobotSnapshot(sendTime, recvTime, 0, **values)
+
+
+def readSnapshot(cps, boxID, rbtID, fields=SnapshotFields, channel=Telemetry):
+    '''
+    *	@param brief:将fields对应的读取指令一次发出,按顺序接收应答,见CPSClient.HRIF_ReadSnapshot
+    '''
+    reads = snapshotResults(fields)
+    sendTime = time.monotonic()
+    if reads is None:
+        return failedSnapshot(sendTime, sendTime, 39501)
+    p = cps.pipeline(boxID, channel)
+    for name, method, result in reads:
+        getattr(p, method)(boxID, rbtID, result)
+    codes = p.execute()
+    return makeSnapshot(sendTime, time.monotonic(), codes, reads)
+
+
+class TelemetryCache(object):
+    '''
+    *	@param brief:后台线程按固定频率批量读取 ReadRobotState/ReadActPos/ReadCurFSM,缓存最新快照
+                     读取方调用latest()直接取快照,不产生网络往返,多个读取方共用一路轮询
+                     快照整体替换,读取无需加锁
+                     cache = cps.telemetry(boxID)
+                     snapshot = cache.latest()
+    *	@param cps: CPSClient
+    *	@param rate: 轮询频率(Hz)
+    '''
+
+    def __init__(self, cps, boxID=0, rbtID=0, rate=100.0):
+        self.m_cps = cps
+        self.boxID = boxID
+        self.rbtID = rbtID
+        self.rate = rate
+        self.m_latest = None
+        self.m_seq = 0
+        self.m_fields = ('state', 'pos', 'fsm')
+        self.m_listeners = ()
+        # 监听者元组与读取内容整体替换,轮询线程使用时不加锁;修改在锁内完成,并发增删不会丢失
+        self.m_listenerLock = threading.Lock()
+        self.m_cond = threading.Condition()
+        self.m_thread = None
+        self.m_bRun = False
+
+    def __enter__(self):
+        self.start()
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.stop()
+        return False
+
+    def start(self):
+        if self.m_thread is not None:
+            return
+        self.m_bRun = True
+        self.m_thread = threading.Thread(target=self.run, name='TelemetryCache-%d' % self.boxID, daemon=True)
+        self.m_thread.start()
+
+    def stop(self):
+        '''
+        *	@param brief:停止轮询,并发布一个错误码为39500的快照,仍在等待的MotionFuture等随之结束
+        '''
+        self.m_bRun = False
+        if self.m_thread is None:
+            return
+        if self.m_thread is not threading.current_thread():
+            self.m_thread.join()
+        self.m_thread = None
+        now = time.monotonic()
+        self.publish(TelemetrySnapshot(self.m_seq + 1, now, now, 39500, None, None, None))
+
+    def isRunning(self):
+        return self.m_thread is not None
+
+    def latest(self):
+        '''
+        *	@param return: 最新的TelemetrySnapshot,尚未轮询时为None
+        '''
+        return self.m_latest
+
+    def waitNext(self, seq=None, timeout=None):
+        '''
+        *	@param brief:等待序号大于seq的快照
+        *	@param seq: 默认为当前最新快照的序号
+        *	@param return: 新快照,超时返回None
+        '''
+        if seq is None:
+            seq = self.m_seq
+        with self.m_cond:
+            if not self.m_cond.wait_for(lambda: self.m_seq > seq, timeout):
+                return None
+            return self.m_latest
+
+    def addListener(self, callback):
+        '''
+        *	@param brief:每个新快照在轮询线程中调用callback(snapshot),回调应尽快返回
+        '''
+        with self.m_listenerLock:
+            self.m_listeners = self.m_listeners + (callback,)
+
+    def removeListener(self, callback):
+        with self.m_listenerLock:
+            # 绑定方法每次取值都是新对象,按相等比较
+            self.m_listeners = tuple([c for c in self.m_listeners if c != callback])
+
+    def addFields(self, *fields):
+        '''
+        *	@param brief:轮询时额外读取的内容(jointVel/jointCur/ftData),从下一次轮询起生效,加入后不再移除
+        '''
+        for name in fields:
+            if name not in SnapshotFields:
+                raise ValueError('unknown snapshot field: ' + name)
+        with self.m_listenerLock:
+            self.m_fields = self.m_fields + tuple([name for name in fields if name not in self.m_fields])
+
+    def poll(self):
+        '''
+        *	@param brief:立即读取一次,返回TelemetrySnapshot,不发布
+        '''
+        fields = self.m_fields
+        snapshot = self.m_cps.HRIF_ReadSnapshot(self.boxID, self.rbtID, fields)
+        return TelemetrySnapshot(self.m_seq + 1, snapshot.sendTime, snapshot.recvTime, snapshot.errorCode,
+                                 snapshot.state, snapshot.pos, snapshot.fsm, snapshot.jointVel, snapshot.jointCur,
+                                 snapshot.ftData)
+
+    def publish(self, snapshot):
+        with self.m_cond:
+            self.m_latest = snapshot
+            self.m_seq = snapshot.seq
+            self.m_cond.notify_all()
+        for callback in self.m_listeners:
+            try:
+                callback(snapshot)
+            except Exception as e:
+                print('TelemetryCache listener error: ' + repr(e))
+
+    def run(self):
+        period = 1.0 / self.rate
+        nextTime = time.monotonic()
+        failed = False
+        while self.m_bRun:
+            try:
+                snapshot = self.poll()
+                failed = False
+            except Exception as e:
+                # 读取出错时发布失败快照并继续轮询,等待方不会因轮询线程退出而一直等待;连续出错只打印一次
+                if not failed:
+                    print('TelemetryCache poll error: ' + repr(e))
+                failed = True
+                now = time.monotonic()
+                snapshot = TelemetrySnapshot(self.m_seq + 1, now, now, 39503, None, None, None)
+            self.publish(snapshot)
+            # 按固定节拍调度,轮询耗时不累积到周期上
+            nextTime += period
+            delay = nextTime - time.monotonic()
+            if delay > 0:
+                time.sleep(delay)
+            else:
+                nextTime = time.monotonic()
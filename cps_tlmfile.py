@@ -0,0 +1,246 @@
+#!/usr/bin/env python
+# _*_ coding:utf-8 _*_
+
+import json
+import os
+import threading
+
+import numpy as np
+
+from cps_codec import RobotState
+
+# 遥测文件为一个目录,每列一个定长二进制文件,可直接内存映射:
+#   meta.json        列定义,样本数,索引间隔
+#   <列名>.bin       每个样本一行,float32/float64
+#   index.bin        每indexStride个样本记录一次时间,读取时整体载入内存,用于定位时间范围
+#   state_idx.bin    RobotState/FSM变化时的样本序号(int64),第一个样本必定记录
+#   state_val.bin    变化后的状态值(int32,每行13个状态位与FSM)
+# 状态位很少变化,只记录变化点(差分编码),读取时按需展开
+Version = 1
+
+# (列名, 类型, 每个样本的值个数)
+# 控制器应答保留3位小数,位置使用float32已足够(1000mm处分辨率约0.06um),时间使用float64
+Columns = (
+    ('time', '<f8', 1),
+    ('joint', '<f4', 6),
+    ('pcs', '<f4', 6),
+    ('tcp', '<f4', 6),
+    ('ucs', '<f4', 6),
+)
+
+StateFields = RobotState._fields + ('fsm',)
+
+
+def columnFile(path, name):
+    return os.path.join(path, name + '.bin')
+
+
+class TelemetryWriter(object):
+    '''
+    *	@param brief:写入遥测文件,可直接挂在TelemetryCache上:
+                     writer = TelemetryWriter('run.tlm')
+                     cache.addListener(writer.appendSnapshot)
+                     ...
+                     cache.removeListener(writer.appendSnapshot)
+                     writer.close()
+    *	@param path: 目录,已存在的同名文件会被覆盖
+    *	@param indexStride: 时间索引间隔(样本数)
+    *	@param chunk: 内存中缓存的样本数,写满后追加到文件
+    *	@param columns: 列定义,默认Columns,可改变各列精度
+    '''
+
+    def __init__(self, path, indexStride=1024, chunk=1024, columns=Columns):
+        self.path = path
+        self.indexStride = indexStride
+        self.chunk = chunk
+        self.columns = columns
+        self.count = 0
+        self.m_buffered = 0
+        self.m_lastState = None
+        # 轮询线程写入,其他线程关闭
+        self.m_lock = threading.Lock()
+        if not os.path.isdir(path):
+            os.makedirs(path)
+        self.m_buf = {}
+        self.m_files = {}
+        for name, dtype, width in columns:
+            self.m_buf[name] = np.zeros((chunk, width) if width > 1 else chunk, dtype)
+            self.m_files[name] = open(columnFile(path, name), 'wb')
+        for name in ('index', 'state_idx', 'state_val'):
+            self.m_files[name] = open(columnFile(path, name), 'wb')
+        self.writeMeta()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+        return False
+
+    def writeMeta(self):
+        meta = {
+            'version': Version,
+            'count': self.count,
+            'indexStride': self.indexStride,
+            'columns': [[name, dtype, width] for name, dtype, width in self.columns],
+            'stateFields': list(StateFields),
+        }
+        with open(os.path.join(self.path, 'meta.json'), 'w') as f:
+            json.dump(meta, f)
+
+    def append(self, time, joint, pcs, tcp, ucs, state, fsm):
+        '''
+        *	@param brief:追加一个样本
+        *	@param time: 采样时间(s),必须递增
+        *	@param state: RobotState或13个状态值
+        '''
+        with self.m_lock:
+            if self.m_files:
+                self.write(time, joint, pcs, tcp, ucs, state, fsm)
+
+    def write(self, time, joint, pcs, tcp, ucs, state, fsm):
+        i = self.m_buffered
+        buf = self.m_buf
+        buf['time'][i] = time
+        buf['joint'][i] = joint
+        buf['pcs'][i] = pcs
+        buf['tcp'][i] = tcp
+        buf['ucs'][i] = ucs
+        if self.count % self.indexStride == 0:
+            np.array([time], '<f8').tofile(self.m_files['index'])
+        current = tuple(state) + (fsm,)
+        if current != self.m_lastState:
+            np.array([self.count], '<i8').tofile(self.m_files['state_idx'])
+            np.array(current, '<i4').tofile(self.m_files['state_val'])
+            self.m_lastState = current
+        self.count += 1
+        self.m_buffered += 1
+        if self.m_buffered == self.chunk:
+            self.writeChunk()
+
+    def appendSnapshot(self, snapshot):
+        '''
+        *	@param brief:追加一个TelemetrySnapshot,读取失败的快照不记录
+        '''
+        if snapshot.errorCode != 0:
+            return
+        pos = snapshot.pos
+        self.append(snapshot.recvTime, pos.joint, pos.pcs, pos.tcp, pos.ucs, snapshot.state, snapshot.fsm)
+
+    def flush(self):
+        with self.m_lock:
+            if self.m_files:
+                self.writeChunk()
+
+    def writeChunk(self):
+        for name, dtype, width in self.columns:
+            self.m_buf[name][:self.m_buffered].tofile(self.m_files[name])
+        self.m_buffered = 0
+        for f in self.m_files.values():
+            f.flush()
+        self.writeMeta()
+
+    def close(self):
+        with self.m_lock:
+            if self.m_files:
+                self.writeChunk()
+                for f in self.m_files.values():
+                    f.close()
+                self.m_files = {}
+
+
+class TelemetryFile(object):
+    '''
+    *	@param brief:读取遥测文件,各列以只读内存映射打开,按时间截取返回零拷贝视图
+                     tlm = TelemetryFile('run.tlm')
+                     view = tlm.slice(t0, t1)    # {'time': ..., 'joint': ..., ...}
+                     flags = tlm.state(t0, t1)   # 展开后的状态位
+                     写入未正常关闭时,以各列文件中完整的样本数为准
+    '''
+
+    def __init__(self, path):
+        self.path = path
+        with open(os.path.join(path, 'meta.json')) as f:
+            meta = json.load(f)
+        if meta['version'] != Version:
+            raise ValueError('unsupported telemetry file version %s' % meta['version'])
+        self.indexStride = meta['indexStride']
+        self.stateFields = tuple(meta['stateFields'])
+        self.columns = {}
+        count = None
+        for name, dtype, width in meta['columns']:
+            dtype = np.dtype(dtype)
+            n = os.path.getsize(columnFile(path, name)) // (dtype.itemsize * width)
+            count = n if count is None else min(count, n)
+            self.columns[name] = (dtype, width)
+        self.count = count
+        self.m_maps = {}
+        for name, (dtype, width) in self.columns.items():
+            self.m_maps[name] = self.mapColumn(name, dtype, (count, width) if width > 1 else (count,))
+        self.index = np.fromfile(columnFile(path, 'index'), '<f8')[:(count + self.indexStride - 1) // self.indexStride]
+        self.stateIdx = np.fromfile(columnFile(path, 'state_idx'), '<i8')
+        self.stateVal = np.fromfile(columnFile(path, 'state_val'), '<i4').reshape(-1, len(self.stateFields))
+        n = min(len(self.stateIdx), len(self.stateVal))
+        self.stateIdx, self.stateVal = self.stateIdx[:n], self.stateVal[:n]
+
+    def mapColumn(self, name, dtype, shape):
+        if shape[0] == 0:
+            return np.zeros(shape, dtype)
+        return np.memmap(columnFile(self.path, name), dtype, 'r', shape=shape)
+
+    def __len__(self):
+        return self.count
+
+    def column(self, name):
+        return self.m_maps[name]
+
+    def searchTime(self, t):
+        # 先在内存中的稀疏索引定位块,再只在该块内查找,避免整列读盘
+        block = int(np.searchsorted(self.index, t, 'right')) - 1
+        if block < 0:
+            return 0
+        start = block * self.indexStride
+        end = min(start + self.indexStride, self.count)
+        return start + int(np.searchsorted(self.m_maps['time'][start:end], t, 'left'))
+
+    def range(self, t0=None, t1=None):
+        '''
+        *	@param brief:时间范围[t0, t1)对应的样本序号范围(i0, i1)
+        '''
+        i0 = 0 if t0 is None else self.searchTime(t0)
+        i1 = self.count if t1 is None else self.searchTime(t1)
+        return i0, max(i0, i1)
+
+    def slice(self, t0=None, t1=None):
+        '''
+        *	@param brief:时间范围[t0, t1)内各列的零拷贝视图
+        *	@param return: {列名: 数组视图}
+        '''
+        i0, i1 = self.range(t0, t1)
+        return dict([(name, m[i0:i1]) for name, m in self.m_maps.items()])
+
+    def stateRows(self, i0, i1):
+        # 样本[i0, i1)使用的状态变化记录序号
+        rows = np.searchsorted(self.stateIdx, np.arange(i0, i1), 'right') - 1
+        return np.maximum(rows, 0)
+
+    def state(self, t0=None, t1=None, fields=None):
+        '''
+        *	@param brief:展开时间范围内每个样本的状态值
+        *	@param fields: 状态名列表,默认全部(StateFields)
+        *	@param return: {状态名: int32数组}
+        '''
+        i0, i1 = self.range(t0, t1)
+        rows = self.stateRows(i0, i1)
+        fields = self.stateFields if fields is None else fields
+        return dict([(name, self.stateVal[rows, self.stateFields.index(name)]) for name in fields])
+
+    def stateChanges(self, t0=None, t1=None):
+        '''
+        *	@param brief:时间范围内的状态变化点
+        *	@param return: (时间数组, 状态值数组(每行对应StateFields))
+        '''
+        i0, i1 = self.range(t0, t1)
+        start = int(np.searchsorted(self.stateIdx, i0, 'left'))
+        end = int(np.searchsorted(self.stateIdx, i1, 'left'))
+        return self.m_maps['time'][self.stateIdx[start:end]], self.stateVal[start:end]
@@ -0,0 +1,151 @@
+#!/usr/bin/env python
+# _*_ coding:utf-8 _*_
+
+import math
+import time
+from collections import namedtuple
+
+# 等待的结果
+#   reason: 'done' 运动完成, 'blending' 过渡完成, 'error' 机器人报错, 'estop' 急停/断电/电箱断开,
+#           'disabled' 机器人去使能, 'timeout' 超过期限, 'commError' 读取失败
+#   errorCode: 读取失败时为接口错误码,机器人报错时为ReadRobotState中的错误码
+#   state: 最后一次读到的状态(RobotState或FSM值),没有时为None
+#   polls: 读取次数
+#   elapsed: 等待时间(s)
+WaitResult = namedtuple('WaitResult', ['reason', 'errorCode', 'state', 'polls', 'elapsed'])
+
+# 状态机状态分类,_waitMotion/waitMovementDone/MotionFuture共用
+# 安全光幕错误,EtherCAT错误,超出安全空间,碰撞停车,机器人错误,去使能
+ErrorFSM = (9, 10, 17, 20, 21, 22, 24)
+# 电箱断开,急停,本体断电
+EstopFSM = (2, 4, 5, 6, 7)
+# 运动中,长点动,停止中;安全光幕触发与暂停时同样继续等待
+WaitFSM = (11, 12, 25, 26, 27, 32)
+
+
+def motionState(rbt, isblending, fsm=None):
+    '''
+    *	@param brief:由RobotState(及状态机状态)判断运动等待是否结束
+                     安全光幕触发或暂停时继续等待;去使能由调用方连续计数后判定
+    *	@param rbt: RobotState
+    *	@param isblending: True时过渡完成即结束,否则要求运动停止
+    *	@param fsm: RbtFSM状态值,None表示未读取
+    *	@param return: (reason, errorCode),reason为None表示继续等待
+    '''
+    if rbt.enabled == 0:
+        return 'disabled', 0
+    if rbt.error == 1 or fsm in ErrorFSM:
+        return 'error', rbt.errorCode
+    if rbt.emergencyStop == 1 or rbt.electrify == 0 or rbt.boxConnected == 0:
+        return 'estop', 0
+    if rbt.safetyGuard == 1 or rbt.paused == 1:
+        return None, 0
+    if isblending:
+        if rbt.blendingDone == 1:
+            return 'blending', 0
+    elif rbt.moving == 0:
+        return 'done', 0
+    return None, 0
+
+
+def fsmState(fsm):
+    '''
+    *	@param brief:只读到状态机状态时的判断,分类与motionState一致
+    *	@param return: reason,None表示继续等待
+    '''
+    if fsm in WaitFSM:
+        return None
+    if fsm in ErrorFSM:
+        return 'error'
+    if fsm in EstopFSM:
+        return 'estop'
+    return 'done'
+
+
+def estimateMoveTime(distance, speed, acc):
+    '''
+    *	@param brief:按梯形速度曲线估计运动时间(s)
+    *	@param distance: 运动距离,直线运动为mm,关节运动为最大关节转角(°)
+    *	@param speed: 速度,mm/s或°/s
+    *	@param acc: 加速度,mm/s²或°/s²
+    '''
+    distance = abs(distance)
+    if speed <= 0 or acc <= 0:
+        return None
+    # 达不到最大速度时为三角形曲线
+    if distance <= speed * speed / acc:
+        return 2.0 * math.sqrt(distance / acc)
+    return distance / speed + speed / acc
+
+
+def expectedMoveTime(start, target, speed, acc, isJoint):
+    '''
+    *	@param brief:由起止位置估计运动时间(s)
+    *	@param start/target: 关节运动为6个关节角度,直线运动为空间坐标(只使用X,Y,Z)
+    *	@param isJoint: 1关节运动,0直线运动
+    '''
+    if isJoint:
+        distance = max([abs(float(target[i]) - float(start[i])) for i in range(6)])
+    else:
+        distance = math.sqrt(sum([(float(target[i]) - float(start[i])) ** 2 for i in range(3)]))
+    return estimateMoveTime(distance, speed, acc)
+
+
+class WaitEngine(object):
+    '''
+    *	@param brief:自适应频率的轮询等待
+                     已知预计完成时间时,先按剩余时间的一半休眠,越接近完成查询越密,到达预计时间后以minPeriod查询;
+                     超过预计时间或没有预计时间时,间隔按backoff倍数逐渐增大,直到maxPeriod;
+                     任何时候休眠都不超过期限
+    *	@param minPeriod: 最短查询间隔(s)
+    *	@param maxPeriod: 最长查询间隔(s)
+    *	@param backoff: 间隔增长倍数
+    '''
+
+    def __init__(self, minPeriod=0.005, maxPeriod=0.2, backoff=1.5):
+        self.minPeriod = minPeriod
+        self.maxPeriod = maxPeriod
+        self.backoff = backoff
+
+    def nextDelay(self, elapsed, expected, lastDelay):
+        if expected is not None and elapsed < expected:
+            return min(max((expected - elapsed) * 0.5, self.minPeriod), self.maxPeriod)
+        if lastDelay is None:
+            return self.minPeriod
+        return min(max(lastDelay * self.backoff, self.minPeriod), self.maxPeriod)
+
+    def wait(self, poll, expected=None, timeout=None, delay=None):
+        '''
+        *	@param brief:反复调用poll直到其给出结束原因或超过期限
+        *	@param poll: 无参函数,返回(reason, errorCode, state),reason为None表示继续等待
+        *	@param expected: 预计完成时间(s),None表示未知
+        *	@param timeout: 期限(s),None表示不限
+        *	@param delay: 第一次查询前的休眠(s),用于等待指令生效,None时按预计完成时间计算
+        *	@param return: WaitResult
+        '''
+        start = time.monotonic()
+        deadline = None if timeout is None else start + timeout
+        polls = 0
+        state = None
+        lastDelay = None
+        if delay is None:
+            delay = self.nextDelay(0.0, expected, None)
+        while True:
+            if delay > 0:
+                if deadline is not None:
+                    delay = min(delay, deadline - time.monotonic())
+                if delay > 0:
+                    time.sleep(delay)
+            reason, errorCode, pollState = poll()
+            polls += 1
+            if pollState is not None:
+                state = pollState
+            now = time.monotonic()
+            if reason is not None:
+                return WaitResult(reason, errorCode, state, polls, now - start)
+            if deadline is not None and now >= deadline:
+                return WaitResult('timeout', 0, state, polls, now - start)
+            delay = self.nextDelay(now - start, expected, lastDelay)
+            # 到达预计时间前的间隔不计入退避
+            if expected is None or now - start >= expected:
+                lastDelay = delay
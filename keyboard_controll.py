@@ -3,68 +3,27 @@ import math
 import numpy as np
 from dazu.CPS import CPSClient
 import yaml
-from scipy.spatial.transform import Rotation as R
+from cps_pose import poseToMatrix, matrixToPose, rpyToMatrix, matrixToRpy, poseTrans
 from collections import deque
 import socket
 
 import cv2
 def rpy_to_transformation_matrix(x, y, z, roll, pitch, yaw):
-    # Create rotation matrix from RPY angles
-    r = R.from_euler('xyz', [roll, pitch, yaw], degrees=True)  # Specify the sequence of axes 'xyz'
-    rotation_matrix = r.as_matrix()
-
-    # Create a 4x4 transformation matrix
-    transformation_matrix = np.eye(4)  # Start with identity matrix
-
-    # Set the rotation part (3x3) of the transformation matrix
-    transformation_matrix[:3, :3] = rotation_matrix
-
-    # Set the translation part (position) in the last column
-    transformation_matrix[:3, 3] = [x, y, z]
-
-    return transformation_matrix
+    # 4x4 transformation matrix, RPY convention of the controller (R = Rz·Ry·Rx)
+    return poseToMatrix([x, y, z, roll, pitch, yaw])
 
 
 # Function to convert a 4x4 transformation matrix to position and RPY
 def transformation_matrix_to_rpy(matrix):
-    # Extract the translation (x, y, z) from the last column of the matrix
-    translation = matrix[:3, 3]
-    x, y, z = translation
-
-    # Extract the rotation matrix (top-left 3x3 part of the transformation matrix)
-    rotation_matrix = matrix[:3, :3]
-
-    # Convert the rotation matrix to RPY (roll, pitch, yaw) in radians
-    r = R.from_matrix(rotation_matrix)
-    roll, pitch, yaw = r.as_euler('xyz', degrees=True)
-
+    x, y, z, roll, pitch, yaw = matrixToPose(matrix)
     return x, y, z, roll, pitch, yaw
 
 
 def update_pose(current_pose, x, y, z, roll, pitch, yaw):
-    # Extract the current position and rotation (RPY) from the current pose
-    current_position = current_pose[:3]  # Assuming current_pose = [x, y, z, roll, pitch, yaw]
-    current_rotation = current_pose[3:]
-
-    # Update translation (position)
-    updated_position = np.array(current_position) + np.array([x, y, z])
-
-    # Create the rotation from RPY (roll, pitch, yaw)
-    new_rotation = R.from_euler('xyz', [roll, pitch, yaw], degrees=True)
-
-    # Convert the current rotation (RPY) to a Rotation object
-    current_rotation_r = R.from_euler('xyz', current_rotation, degrees=True)
-
-    # Combine the rotations (multiplying quaternion or matrix form)
-    updated_rotation = current_rotation_r * new_rotation
-
-    # Extract updated RPY from the new combined rotation
-    updated_rpy = updated_rotation.as_euler('xyz', degrees=True)
-
-    # Return the updated pose (position + RPY)
-    updated_pose = np.concatenate([updated_position, updated_rpy])
-
-    return updated_pose
+    # Translation is added in the base frame, rotation is applied in the tool frame
+    current_pose = np.asarray(current_pose, dtype=float)
+    updated_rotation = rpyToMatrix(current_pose[3:]) @ rpyToMatrix([roll, pitch, yaw])
+    return np.concatenate([current_pose[:3] + np.array([x, y, z]), matrixToRpy(updated_rotation)])
 
 
 class RobotController:
@@ -211,19 +170,10 @@ class RobotController:
                 break
 
             self.current_pose = self.client.read_pos()
-            roll, pitch, yaw = self.current_pose[3], self.current_pose[4], self.current_pose[5]
-            base2end_rpy_matrix = R.from_euler('xyz', [roll, pitch, yaw], degrees=True).as_matrix()
-            transformation_matrix_diff_rpy = R.from_euler('xyz', [rx, ry, rz], degrees=True).as_matrix()
-            xyz_diff = np.array([x, y, z]) @ np.linalg.inv(base2end_rpy_matrix)
-            rpy = R.from_matrix(base2end_rpy_matrix @ transformation_matrix_diff_rpy).as_euler("xyz", degrees=True)
-            pose = np.array([self.current_pose[0] + xyz_diff[0],
-                             self.current_pose[1] + xyz_diff[1],
-                             self.current_pose[2] + xyz_diff[2],
-                             rpy[0],
-                             rpy[1],
-                             rpy[2]
-                             ], dtype=float)
-            rpy0 = R.from_matrix(transformation_matrix_diff_rpy).as_euler("xyz", degrees=True)
+            # 沿工具坐标系平移与旋转: 当前位置右乘增量
+            pose = poseTrans(self.current_pose, [x, y, z, rx, ry, rz])
+            xyz_diff = pose[0:3] - np.asarray(self.current_pose[0:3], dtype=float)
+            rpy0 = matrixToRpy(rpyToMatrix([rx, ry, rz]))
             speed = xyz_diff + rpy0
             acc = [1, 1]
             dServoTime = 0.1
@@ -135,21 +135,15 @@ def move_robot(cps_client, target_pose):
         print(f"读取关节位置失败，错误码: {status}")
         cps.HRIF_DisConnect(0)  # 读取失败时断开连接并退出
         exit()
-    ret = cps_client.HRIF_MoveL(0, 0, points=target_pose, RawACSpoints=RawACSpoints[0:6], tcp="TCP", ucs=ucs,
-                                speed=speed, Acc=acceleration, radius=radius, isSeek=0, bit=0, state=1, cmdID=1)
-    if ret == 0:
-        # 等待运动完成
-        while True:
-            motion_done_result = []
-            motion_done = cps_client.HRIF_IsMotionDone(0, 0, motion_done_result)  # 检查运动是否完成
-            if motion_done == 0 and motion_done_result and motion_done_result[0] == 1:
-                break  # 运动完成
-            elif motion_done < 0:
-                print(f"运动过程中出错，错误码: {motion_done}")
-                break
-            time.sleep(0.5)  # 等待一段时间再次检查
-    else:
-        print(f"机器人运动失败，错误码: {ret}")
+    motion = cps_client.HRIF_MoveL(0, 0, points=target_pose, RawACSpoints=RawACSpoints[0:6], tcp="TCP", ucs=ucs,
+                                   speed=speed, Acc=acceleration, radius=radius, isSeek=0, bit=0, state=1, cmdID=1,
+                                   future=True)
+    # 等待运动完成
+    done = motion.result()
+    if done.reason == 'commandFailed':
+        print(f"机器人运动失败，错误码: {done.errorCode}")
+    elif done.reason != 'done':
+        print(f"运动过程中出错: {done.reason}，错误码: {done.errorCode}")
 
 
 # 函数：随机方向上的移动
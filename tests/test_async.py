@@ -0,0 +1,85 @@
+#!/usr/bin/env python
+# _*_ coding:utf-8 _*_
+# AsyncCPSClient: 并发请求按顺序分发,组合指令与CPSClient一致,收发超时后关闭连接
+
+import asyncio
+
+import pytest
+
+from CPS import CPSClient
+from cps_async import AsyncCPSClient
+from cps_codec import StructResult, ActPos, ActPosSizes
+from cps_sim import CPSSimulator
+
+
+def testConcurrentReads():
+    async def run(port):
+        cps = AsyncCPSClient()
+        assert await cps.HRIF_Connect(0, '127.0.0.1', port) == 0
+        fsm, state, pos = [], [], StructResult(ActPos, ActPosSizes)
+        codes = await asyncio.gather(cps.HRIF_ReadCurFSM(0, 0, fsm), cps.HRIF_ReadRobotState(0, 0, state),
+                                     cps.HRIF_ReadActPos(0, 0, pos))
+        # 普通列表没有时间戳,取连接最近一次应答的时间
+        assert cps.lastReplyTime(0)[1] >= pos.recvTime
+        await cps.HRIF_DisConnect(0)
+        return codes, fsm, state, pos
+
+    with CPSSimulator(port=0, rpcPort=None) as sim:
+        codes, fsm, state, pos = asyncio.run(run(sim.port))
+    assert codes == [0, 0, 0]
+    assert fsm == ['33'] and len(state) == 13
+    assert list(pos.value.joint) == [0.0, 0.0, 90.0, 0.0, 90.0, 0.0]
+    assert pos.recvTime >= pos.sendTime
+
+
+def testCompositeMatchesSync():
+    names = ('HRIF_IsMotionDone', 'HRIF_IsBlendingDone', 'HRIF_ReadActTcpPos', 'HRIF_ReadCmdTcpPos')
+
+    async def run(port):
+        cps = AsyncCPSClient()
+        await cps.HRIF_Connect(0, '127.0.0.1', port)
+        out = {}
+        for name in names:
+            result = []
+            assert await getattr(cps, name)(0, 0, result) == 0
+            out[name] = result
+        await cps.HRIF_DisConnect(0)
+        return out
+
+    with CPSSimulator(port=0, rpcPort=None) as sim:
+        out = asyncio.run(run(sim.port))
+        cps = CPSClient()
+        cps.HRIF_Connect(0, '127.0.0.1', sim.port)
+        for name in names:
+            result = []
+            assert getattr(cps, name)(0, 0, result) == 0
+            assert out[name] == result, name
+        cps.HRIF_DisConnect(0)
+    assert out['HRIF_IsMotionDone'] == [True]
+
+
+def testFutureRejected():
+    cps = AsyncCPSClient()
+    with pytest.raises(ValueError):
+        asyncio.run(cps.HRIF_MoveJ(0, 0, [0.0] * 6, [0.0] * 6, 'TCP', 'Base', 10, 10, 0, 1, 0, 0, 0, 'id',
+                                   future=True))
+
+
+def testTimeoutClosesConnection():
+    async def run():
+        # 接受连接但不应答
+        server = await asyncio.start_server(lambda reader, writer: None, '127.0.0.1', 0)
+        port = server.sockets[0].getsockname()[1]
+        cps = AsyncCPSClient()
+        await cps.HRIF_Connect(0, '127.0.0.1', port)
+        codes = await asyncio.gather(cps.HRIF_ReadCurFSM(0, 0, [], timeout=0.1),
+                                     cps.HRIF_ReadCurFSM(0, 0, [], timeout=5.0))
+        connected = await cps.HRIF_IsConnected(0)
+        server.close()
+        await server.wait_closed()
+        return codes, connected
+
+    codes, connected = asyncio.run(run())
+    # 第一条超时后关闭连接,排在后面的请求返回39500
+    assert codes == [39503, 39500]
+    assert not connected
@@ -0,0 +1,114 @@
+#!/usr/bin/env python
+# _*_ coding:utf-8 _*_
+# 遥测分发: 写入线程运行时读取方只得到一致的快照,轮询出错时发布失败快照,只轮询指定的内容
+
+import os
+import time
+
+import numpy as np
+
+from CPS import CPSClient
+from cps_broker import TelemetryBroker, BrokerConnection, BrokerClient, Slices, ErrReadOnly
+from cps_codec import RobotState, ActPos
+from cps_sim import CPSSimulator, ErrUnknownCommand
+from cps_telemetry import RobotSnapshot, SnapshotFields
+
+
+class CountingCPS(object):
+    # 第k次读取的全部数值都是k,拷贝中混有两次写入时数值不一致
+    def __init__(self, failures=0):
+        self.count = 0
+        self.failures = failures
+
+    def HRIF_ReadSnapshot(self, boxID, rbtID, fields=SnapshotFields):
+        if self.failures > 0:
+            self.failures -= 1
+            raise RuntimeError('decode failed')
+        self.count += 1
+        k = float(self.count)
+        six = np.full(6, k)
+        now = time.monotonic()
+        return RobotSnapshot(now, now, 0, RobotState(*([self.count] * 13)), ActPos(six, six, six, six), six, six,
+                             six, self.count)
+
+
+def attach(broker, port):
+    connection = BrokerConnection(broker.boxID)
+    connection.Connect2CPS('test', port)
+    return connection
+
+
+def testReadWhileWriting():
+    port = os.getpid()
+    with TelemetryBroker(CountingCPS(), 'test', port, rate=1e6) as broker:
+        connection = attach(broker, port)
+        try:
+            while broker.publishCount == 0:
+                time.sleep(0.001)
+            reads = 0
+            deadline = time.monotonic() + 0.5
+            while time.monotonic() < deadline:
+                data = connection.read()
+                if data is None:
+                    continue
+                values = data[Slices['state'].start:]
+                assert (values == values[0]).all(), 'torn snapshot'
+                reads += 1
+            assert reads > 0
+        finally:
+            connection.DisconnectFromCPS()
+        assert broker.publishCount > 10
+
+
+def testChecksumRejectsTornData():
+    port = os.getpid() + 1
+    with TelemetryBroker(CountingCPS(), 'test', port, rate=1e3) as broker:
+        connection = attach(broker, port)
+        try:
+            while broker.publishCount == 0:
+                time.sleep(0.001)
+            broker.m_bRun = False
+            broker.m_thread.join()
+            assert connection.read() is not None
+            # 序号为偶数但数据与校验不符,相当于写入顺序对读取方不可见
+            broker.m_data[Slices['fsm']] = -1.0
+            assert connection.read() is None
+        finally:
+            connection.DisconnectFromCPS()
+
+
+def testPollErrorPublishesFailure():
+    port = os.getpid() + 2
+    with TelemetryBroker(CountingCPS(failures=1000000), 'test', port, rate=1e3) as broker:
+        connection = attach(broker, port)
+        try:
+            while broker.publishCount == 0:
+                time.sleep(0.001)
+            assert connection.readSnapshot()[0] == 39503
+            assert broker.m_thread.is_alive()
+        finally:
+            connection.DisconnectFromCPS()
+
+
+def testUnsupportedField():
+    # 控制器没有力传感器: ReadForceData应答Fail,轮询该内容时整个快照失败
+    with CPSSimulator(port=0, rpcPort=None) as sim:
+        del sim.m_handlers['ReadForceData']
+        cps = CPSClient()
+        cps.HRIF_Connect(0, '127.0.0.1', sim.port)
+        assert cps.HRIF_ReadSnapshot(0, 0).errorCode == ErrUnknownCommand
+        fields = ('state', 'pos', 'fsm')
+        with TelemetryBroker(cps, 'test', sim.port, fields=fields) as broker:
+            reader = BrokerClient()
+            assert reader.HRIF_Connect(0, 'test', sim.port) == 0
+            while broker.publishCount == 0:
+                time.sleep(0.001)
+            pos, fsm, ft = [], [], []
+            assert reader.HRIF_ReadActPos(0, 0, pos) == 0 and len(pos) == 24
+            assert reader.HRIF_ReadCurFSM(0, 0, fsm) == 0 and fsm == ['33']
+            # 未轮询的内容
+            assert reader.HRIF_ReadFTData(0, 0, ft) == ErrReadOnly
+            assert reader.HRIF_ReadSnapshot(0, 0, fields).errorCode == 0
+            assert reader.HRIF_ReadSnapshot(0, 0, ('pos', 'jointVel')).errorCode == ErrReadOnly
+            reader.HRIF_DisConnect(0)
+        cps.HRIF_DisConnect(0)
@@ -0,0 +1,54 @@
+#!/usr/bin/env python
+# _*_ coding:utf-8 _*_
+# 多通道连接: 读取命令走telemetry,Servo命令走servo,其余及未打开的通道走control
+
+from CPS import CPSClient
+from cps_channels import BoxChannels, commandChannel, Control, Telemetry, Servo
+from cps_sim import CPSSimulator
+
+
+def testCommandChannel():
+    assert commandChannel('ReadActPos') == Telemetry
+    assert commandChannel('PushServoJ') == Servo
+    assert commandChannel('ReadServoEsJState') == Servo
+    assert commandChannel('WayPoint') == Control
+
+
+def testRouting():
+    with CPSSimulator(port=0, rpcPort=None) as sim:
+        cps = CPSClient()
+        cps.HRIF_Connect(0, '127.0.0.1', sim.port)
+        control = cps.g_clients[0]
+        assert cps.openChannel(0, 'telemetry') == 0
+        box = cps.g_clients[0]
+        assert isinstance(box, BoxChannels) and box.control is control
+        telemetry = box.channels[Telemetry]
+        assert box.m_routes[b'ReadActPos'] is telemetry
+        # servo未打开,不在表中,回落到control
+        assert b'PushServoJ' not in box.m_routes and b'WayPoint' not in box.m_routes
+        pos, fsm = [], []
+        assert cps.HRIF_ReadActPos(0, 0, pos) == 0 and len(pos) == 24
+        assert cps.HRIF_GrpDisable(0, 0) == 0
+        assert telemetry.m_rtt.count == 1 and control.m_rtt.count == 1
+        # 关闭后读取命令回到control
+        assert cps.closeChannel(0, 'telemetry') == 0
+        assert box.m_routes == {} and not telemetry.isConnected()
+        assert cps.HRIF_ReadCurFSM(0, 0, fsm) == 0 and control.m_rtt.count == 2
+        cps.HRIF_DisConnect(0)
+
+
+def testCloseChannelArgs():
+    with CPSSimulator(port=0, rpcPort=None) as sim:
+        cps = CPSClient()
+        cps.HRIF_Connect(0, '127.0.0.1', sim.port)
+        assert cps.openChannel(0, 'servo') == 0
+        routes = cps.g_clients[0].m_routes
+        assert cps.closeChannel(0, Control) == 39501
+        assert cps.closeChannel(0, 'unknown') == 39501
+        assert cps.closeChannel(cps.MaxBox, 'servo') == 39501
+        assert cps.HRIF_IsConnected(0) and cps.g_clients[0].m_routes is routes
+        assert cps.openChannel(0, 'unknown') == 39501
+        # 路由表整体替换,不修改原来的表
+        assert cps.closeChannel(0, 'servo') == 0
+        assert cps.g_clients[0].m_routes is not routes and routes[b'PushServoJ'] is not None
+        cps.HRIF_DisConnect(0)
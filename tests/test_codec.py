@@ -0,0 +1,348 @@
+#!/usr/bin/env python
+# _*_ coding:utf-8 _*_
+# 编码表生成的命令与原先逐个拼接字符串的结果逐字节一致;数值应答的解码
+
+import numpy as np
+import pytest
+
+from CPS import CPSClient
+from cps_codec import CommandTable, Encoders, parseArgSpec, ArrayResult, StructResult, RobotState, ActPos, \
+    ActPosSizes
+from cps_pipeline import CmdRecorder
+
+
+# 以下与原CPS.py中逐个拼接字符串的写法相同,作为参照
+def legacySetMaxPcsRange(rbtID, pMax, pMin, pUcs):
+    command = 'SetMaxPcsRange,'
+    command += str(rbtID) + ','
+    for i in range(0, 3):
+        command += str(pMax[i])
+        command += ','
+    for v in (180, 180, 180):
+        command += str(v)
+        command += ','
+    for i in range(0, 3):
+        command += str(pMin[i])
+        command += ','
+    for v in (-180, -180, -180):
+        command += str(v)
+        command += ','
+    for i in range(0, 6):
+        command += str(pUcs[i]) + ','
+    command += ';'
+    return command
+
+
+def legacyUcsTcp2Base(UcsTcp, TCP, UCS):
+    command = 'UcsTcp2Base,0,'
+    for i in range(0, 6):
+        command += str(UcsTcp[i]) + ','
+    for i in range(0, 6):
+        command += str(TCP[i]) + ','
+    for i in range(0, 6):
+        command += str(UCS[i]) + ','
+    command += ';'
+    return command
+
+
+def legacyMoveJ(rbtID, points, RawACSpoints, tcp, ucs, speed, Acc, radius, isJoint, isSeek, bit, state, cmdID):
+    command = 'WayPoint,'
+    command += str(rbtID) + ','
+    for i in range(0, 6):
+        command += str(points[i]) + ','
+    for i in range(0, 6):
+        command += str(RawACSpoints[i]) + ','
+    command += str(tcp) + ','
+    command += str(ucs) + ','
+    command += str(speed) + ','
+    command += str(Acc) + ','
+    command += str(radius) + ','
+    command += '0,'
+    command += str(isJoint) + ','
+    command += str(isSeek) + ','
+    command += str(bit) + ','
+    command += str(state) + ','
+    command += str(cmdID) + ','
+    command += ';'
+    return command
+
+
+def legacyPushServoEsJ(rbtID, nPointSize, sPoints):
+    command = 'PushServoEsJ,'
+    command += str(rbtID) + ','
+    command += str(nPointSize) + ','
+    for i in range(len(sPoints)):
+        command += str(sPoints[i]) + ','
+    command += ';'
+    return command
+
+
+def legacySetBoxAOVal(index, value, pattern):
+    return 'SetBoxAO,' + str(index) + ',' + str(value) + ',' + str(pattern) + ',;'
+
+
+POS = [0.1, -2.5, 1e-05, 180, -180.0, np.float64(1234.5678)]
+ACS = [0.0, 0.0, 90.0, 0.0, 90.0, 0.0]
+
+
+def recorded(name, *args):
+    # 经CPSClient的HRIF_*接口生成的命令
+    cps = CPSClient.__new__(CPSClient)
+    recorder = CmdRecorder()
+    cps.g_clients = [recorder]
+    getattr(cps, 'HRIF_' + name)(0, *args)
+    return recorder.cmds[0][0]
+
+
+def testLegacyIdentity():
+    assert Encoders.SetMaxPcsRange(0, POS, ACS, POS) == legacySetMaxPcsRange(0, POS, ACS, POS).encode()
+    assert Encoders.UcsTcp2Base(POS, ACS, POS) == legacyUcsTcp2Base(POS, ACS, POS).encode()
+    assert Encoders.MoveJ(0, POS, ACS, 'TCP', 'Base', 50, 100.5, 0, 1, 0, 0, 0, 'id1') == \
+        legacyMoveJ(0, POS, ACS, 'TCP', 'Base', 50, 100.5, 0, 1, 0, 0, 0, 'id1').encode()
+    assert Encoders.PushServoEsJ(0, 2, POS + ACS) == legacyPushServoEsJ(0, 2, POS + ACS).encode()
+    assert Encoders.PushServoEsJ(0, 0, []) == legacyPushServoEsJ(0, 0, []).encode()
+    assert Encoders.SetBoxAOVal(1, 2.25, 0) == legacySetBoxAOVal(1, 2.25, 0).encode()
+
+
+def testClientUsesEncoders():
+    assert recorded('MoveJ', 0, POS, ACS, 'TCP', 'Base', 50, 100, 0, 1, 0, 0, 0, 'id1') == \
+        legacyMoveJ(0, POS, ACS, 'TCP', 'Base', 50, 100, 0, 1, 0, 0, 0, 'id1').encode()
+    assert recorded('UcsTcp2Base', POS, ACS, POS, []) == legacyUcsTcp2Base(POS, ACS, POS).encode()
+
+
+def sampleArgs(spec):
+    args = []
+    for name, count, kind in parseArgSpec(spec):
+        if name is None:
+            continue
+        value = {'i': 3, 'f': -0.125, 's': 'Name'}[kind]
+        if count is None:
+            args.append(value)
+        elif count == '*':
+            args.append([value, value])
+        else:
+            args.append([value] * count)
+    return args
+
+
+# 按sampleArgs的参数,由原CPS.py中各HRIF_*逐个拼接生成的命令
+LegacyCommands = {
+    'ShutdownRobot': 'OSCmd,1,;',
+    'Connect2Box': 'ConnectToBox,;',
+    'Electrify': 'Electrify,;',
+    'BlackOut': 'BlackOut,;',
+    'Connect2Controller': 'StartMaster,;',
+    'IsSimulateRobot': 'IsSimulation,;',
+    'IsControllerStarted': 'ReadControllerState,;',
+    'ReadVersion': 'ReadVersion,3,;',
+    'ReadRobotModel': 'ReadRobotModel,3,;',
+    'GrpEnable': 'GrpPowerOn,3,;',
+    'GrpDisable': 'GrpPowerOff,3,;',
+    'GrpReset': 'GrpReset,3,;',
+    'GrpStop': 'GrpStop,3,;',
+    'GrpInterrupt': 'GrpInterrupt,3,;',
+    'GrpContinue': 'GrpContinue,3,;',
+    'GrpCloseFreeDriver': 'GrpCloseFreeDriver,3,;',
+    'GrpOpenFreeDriver': 'GrpOpenFreeDriver,3,;',
+    'RunFunc': 'RunFunc,Name,Name,Name,;',
+    'StartScript': 'StartScript,;',
+    'StopScript': 'StopScript,3,;',
+    'PauseScript': 'PauseScript,;',
+    'ContinueScript': 'ContinueScript,;',
+    'ReadBoxInfo': 'ReadBoxInfo,3,;',
+    'ReadBoxCI': 'ReadBoxCI,3,;',
+    'ReadBoxDI': 'ReadBoxDI,3,;',
+    'ReadBoxCO': 'ReadBoxCO,3,;',
+    'ReadBoxDO': 'ReadBoxDO,3,;',
+    'ReadBoxAI': 'ReadBoxAI,3,;',
+    'ReadBoxAO': 'ReadBoxAO,3,;',
+    'SetBoxCO': 'SetBoxCO,3,3,;',
+    'SetBoxDO': 'SetBoxDO,3,3,;',
+    'SetBoxAOMode': 'SetBoxAOMode,3,3,;',
+    'SetBoxAOVal': 'SetBoxAO,3,-0.125,3,;',
+    'SetEndDO': 'SetEndDO,3,3,3,;',
+    'ReadEndDI': 'ReadEI,3,3,;',
+    'ReadEndDO': 'ReadEO,3,3,;',
+    'ReadEndAI': 'ReadEAI,3,3,;',
+    'ReadEndBTN': 'ReadEndBTN,3,;',
+    'SetOverride': 'SetOverride,3,-0.125,;',
+    'SetToolMotion': 'SetTCPMotion,3,3,;',
+    'SetPayload': 'SetPayload,3,-0.125,-0.125,-0.125,-0.125,;',
+    'SetJointMaxVel': 'SetJointMaxVel,3,-0.125,-0.125,;',
+    'SetJointMaxAcc': 'SetJointMaxAcc,3,-0.125,-0.125,;',
+    'SetLinearMaxVel': 'SetLinearMaxVel,3,-0.125,;',
+    'SetLinearMaxAcc': 'SetLinearMaxAcc,3,-0.125,;',
+    'SetMaxAcsRange': 'SetMaxAcsRange,3,-0.125,-0.125,-0.125,-0.125,-0.125,-0.125,-0.125,-0.125,-0.125,-0.125,'
+                      '-0.125,-0.125,;',
+    'SetMaxPcsRange': 'SetMaxPcsRange,3,-0.125,-0.125,-0.125,180,180,180,-0.125,-0.125,-0.125,-180,-180,-180,-0.125,'
+                      '-0.125,-0.125,-0.125,-0.125,-0.125,;',
+    'ReadJointMaxVel': 'ReadJointMaxVel,3,;',
+    'ReadJointMaxAcc': 'ReadJointMaxAcc,3,;',
+    'ReadJointMaxJerk': 'ReadJointMaxJerk,3,;',
+    'ReadLinearMaxSpeed': 'ReadLinearMaxVel,3,;',
+    'ReadEmergencyInfo': 'ReadEmergencyInfo,3,;',
+    'ReadRobotState': 'ReadRobotState,3,;',
+    'ReadCurWaypointID': 'ReadCurWayPointID,3,;',
+    'ReadAxiserrorCode': 'ReadAxisErrorCode,3,;',
+    'ReadCurFSM': 'ReadCurFSM,3,;',
+    'ReadActPos': 'ReadActPos,3,;',
+    'ReadCmdJointPos': 'ReadCmdPos,3,;',
+    'ReadActJointPos': 'ReadActACS,3,;',
+    'ReadCmdJointVel': 'ReadCmdJointVel,3,;',
+    'ReadActJointVel': 'ReadActJointVel,3,;',
+    'ReadCmdTcpVel': 'ReadCmdTcpVel,3,;',
+    'ReadActTcpVel': 'ReadActTcpVel,3,;',
+    'ReadCmdJointCur': 'ReadCmdJointCur,3,;',
+    'ReadActJointCur': 'ReadActJointCur,3,;',
+    'ReadTcpVelocity': 'ReadTcpVelocity,3,;',
+    'Quaternion2RPY': 'Quaternion2RPY,3,-0.125,-0.125,-0.125,-0.125,;',
+    'RPY2Quaternion': 'RPY2Quaternion,3,-0.125,-0.125,-0.125,;',
+    'GetInverseKin': 'PCS2ACS,3,-0.125,-0.125,-0.125,-0.125,-0.125,-0.125,-0.125,-0.125,-0.125,-0.125,-0.125,-0.125,'
+                     '-0.125,-0.125,-0.125,-0.125,-0.125,-0.125,-0.125,-0.125,-0.125,-0.125,-0.125,-0.125,;',
+    'GetForwardKin': 'ACS2PCS,3,-0.125,-0.125,-0.125,-0.125,-0.125,-0.125,-0.125,-0.125,-0.125,-0.125,-0.125,-0.125,'
+                     '-0.125,-0.125,-0.125,-0.125,-0.125,-0.125,;',
+    'Base2UcsTcp': 'Base2UcsTcp,3,-0.125,-0.125,-0.125,-0.125,-0.125,-0.125,-0.125,-0.125,-0.125,-0.125,-0.125,'
+                   '-0.125,-0.125,-0.125,-0.125,-0.125,-0.125,-0.125,;',
+    'UcsTcp2Base': 'UcsTcp2Base,0,-0.125,-0.125,-0.125,-0.125,-0.125,-0.125,-0.125,-0.125,-0.125,-0.125,-0.125,'
+                   '-0.125,-0.125,-0.125,-0.125,-0.125,-0.125,-0.125,;',
+    'PoseAdd': 'PoseAdd,3,-0.125,-0.125,-0.125,-0.125,-0.125,-0.125,-0.125,-0.125,-0.125,-0.125,-0.125,-0.125,;',
+    'PoseSub': 'PoseSub,3,-0.125,-0.125,-0.125,-0.125,-0.125,-0.125,-0.125,-0.125,-0.125,-0.125,-0.125,-0.125,;',
+    'PoseTrans': 'PoseTrans,3,-0.125,-0.125,-0.125,-0.125,-0.125,-0.125,-0.125,-0.125,-0.125,-0.125,-0.125,-0.125,;',
+    'PoseInverse': 'PoseInverse,3,-0.125,-0.125,-0.125,-0.125,-0.125,-0.125,;',
+    'PoseDist': 'CalPointDistance,3,-0.125,-0.125,-0.125,-0.125,-0.125,-0.125,-0.125,-0.125,-0.125,-0.125,-0.125,'
+                '-0.125,;',
+    'PoseInterpolate': 'PoseInterpolate,3,-0.125,-0.125,-0.125,-0.125,-0.125,-0.125,-0.125,-0.125,-0.125,-0.125,'
+                       '-0.125,-0.125,-0.125,;',
+    'PoseDefdFrame': 'DefdFrame,3,-0.125,-0.125,-0.125,-0.125,-0.125,-0.125,-0.125,-0.125,-0.125,-0.125,-0.125,'
+                     '-0.125,-0.125,-0.125,-0.125,-0.125,-0.125,-0.125,;',
+    'SetTCP': 'SetCurTCP,3,-0.125,-0.125,-0.125,-0.125,-0.125,-0.125,;',
+    'SetUCS': 'SetCurUCS,3,-0.125,-0.125,-0.125,-0.125,-0.125,-0.125,;',
+    'ReadCurTCP': 'ReadCurTCP,3,;',
+    'ReadCurUCS': 'ReadCurUCS,3,;',
+    'SetTCPByName': 'SetTCPByName,3,Name,;',
+    'SetUCSByName': 'SetUCSByName,3,Name,;',
+    'ReadTCPByName': 'ReadTCPByName,3,Name,;',
+    'ReadUCSByName': 'ReadUCSByName,3,Name,;',
+    'SetForceControlState': 'SetForceControlState,3,3,;',
+    'ReadForceControlState': 'ReadFTControlState,3,;',
+    'SetForceToolCoordinateMotion': 'SetForceToolCoordinateMotion,3,3,;',
+    'ForceControlInterrupt': 'GrpFCInterrupt,3,;',
+    'ForceControlContinue': 'GrpFCContinue,3,;',
+    'SetForceZero': 'SetForceZero,3,;',
+    'SetMaxSearchVelocities': 'HRSetMaxSearchVelocities,3,-0.125,-0.125,;',
+    'SetControlFreedom': 'HRSetControlFreedom,3,3,3,3,3,3,3,;',
+    'SetForceControlStrategy': 'HRSetForceControlStrategy,3,3,;',
+    'SetFreeDrivePositionAndOrientation': 'SetFTPosition,3,-0.125,-0.125,-0.125,-0.125,-0.125,-0.125,;',
+    'SetPIDControlParams': 'HRSetPIDControlParams,3,-0.125,-0.125,-0.125,-0.125,-0.125,-0.125,;',
+    'SetMassParams': 'HRSetMassParams,3,-0.125,-0.125,-0.125,-0.125,-0.125,-0.125,;',
+    'SetDampParams': 'HRSetDampParams,3,-0.125,-0.125,-0.125,-0.125,-0.125,-0.125,;',
+    'SetStiffParams': 'HRSetStiffParams,3,-0.125,-0.125,-0.125,-0.125,-0.125,-0.125,;',
+    'SetForceControlGoal': 'HRSetControlGoal,3,-0.125,-0.125,-0.125,-0.125,-0.125,-0.125,;',
+    'SetControlGoal': 'HRSetControlGoal,3,-0.125,-0.125,-0.125,-0.125,-0.125,-0.125,-0.125,-0.125,-0.125,-0.125,'
+                      '-0.125,-0.125,;',
+    'SetForceDataLimit': 'HRSetForceDataLimit,3,-0.125,-0.125,-0.125,-0.125,-0.125,-0.125,-0.125,-0.125,-0.125,'
+                         '-0.125,-0.125,-0.125,;',
+    'SetForceDistanceLimit': 'HRSetForceDistanceLimit,3,-0.125,-0.125,;',
+    'ReadFTCabData': 'ReadFTCabData,3,;',
+    'ReadFTData': 'ReadForceData,3,;',
+    'SetTangentForceBounds': 'SetTangentForceBounds,3,-0.125,-0.125,-0.125,;',
+    'SetScriptForceControlState': 'SetScriptForceControlState,3,3,3,Name,-0.125,-0.125,-0.125,-0.125,-0.125,-0.125,'
+                                  '-0.125,-0.125,3,3,3,3,3,3,-0.125,-0.125,-0.125,-0.125,-0.125,-0.125,-0.125,'
+                                  '-0.125,-0.125,-0.125,-0.125,-0.125,-0.125,-0.125,-0.125,-0.125,-0.125,-0.125,'
+                                  '-0.125,-0.125,-0.125,-0.125,-0.125,-0.125,;',
+    'ShortJogJ': 'ShortJogJ,3,3,3,;',
+    'ShortJogL': 'ShortJogL,3,3,3,;',
+    'LongJogJ': 'LongJogJ,3,3,3,3,;',
+    'LongJogL': 'LongJogL,3,3,3,3,;',
+    'LongMoveEvent': 'LongMoveEvent,3,;',
+    'WayPointEx': 'WayPointEx,3,-0.125,-0.125,-0.125,-0.125,-0.125,-0.125,-0.125,-0.125,-0.125,-0.125,-0.125,-0.125,'
+                  '-0.125,-0.125,-0.125,-0.125,-0.125,-0.125,-0.125,-0.125,-0.125,-0.125,-0.125,-0.125,-0.125,'
+                  '-0.125,-0.125,3,3,3,3,3,Name,;',
+    'WayPoint': 'WayPoint,3,-0.125,-0.125,-0.125,-0.125,-0.125,-0.125,-0.125,-0.125,-0.125,-0.125,-0.125,-0.125,'
+                'Name,Name,-0.125,-0.125,-0.125,3,3,3,3,3,Name,;',
+    'WayPoint2': 'WayPoint2,3,-0.125,-0.125,-0.125,-0.125,-0.125,-0.125,-0.125,-0.125,-0.125,-0.125,-0.125,-0.125,'
+                 'Name,Name,Name,-0.125,-0.125,-0.125,3,3,3,3,3,-0.125,-0.125,-0.125,-0.125,-0.125,-0.125,;',
+    'MoveJ': 'WayPoint,3,-0.125,-0.125,-0.125,-0.125,-0.125,-0.125,-0.125,-0.125,-0.125,-0.125,-0.125,-0.125,Name,'
+             'Name,-0.125,-0.125,-0.125,0,3,3,3,3,Name,;',
+    'MoveL': 'WayPoint,3,-0.125,-0.125,-0.125,-0.125,-0.125,-0.125,-0.125,-0.125,-0.125,-0.125,-0.125,-0.125,Name,'
+             'Name,-0.125,-0.125,-0.125,1,0,3,3,3,Name,;',
+    'MoveC': 'MoveC,3,-0.125,-0.125,-0.125,-0.125,-0.125,-0.125,-0.125,-0.125,-0.125,-0.125,-0.125,-0.125,-0.125,'
+             '-0.125,-0.125,-0.125,-0.125,-0.125,3,3,-0.125,-0.125,-0.125,-0.125,Name,Name,Name,;',
+    'MoveZ': 'MoveZ,3,-0.125,-0.125,-0.125,-0.125,-0.125,-0.125,-0.125,-0.125,-0.125,-0.125,-0.125,-0.125,-0.125,'
+             '-0.125,-0.125,-0.125,-0.125,-0.125,-0.125,-0.125,-0.125,-0.125,3,3,3,-0.125,-0.125,-0.125,Name,Name,'
+             'Name,;',
+    'MoveE': 'MoveE,3,-0.125,-0.125,-0.125,-0.125,-0.125,-0.125,-0.125,-0.125,-0.125,-0.125,-0.125,-0.125,-0.125,'
+             '-0.125,-0.125,-0.125,-0.125,-0.125,-0.125,-0.125,-0.125,-0.125,-0.125,-0.125,-0.125,-0.125,-0.125,'
+             '-0.125,-0.125,-0.125,3,3,-0.125,-0.125,-0.125,-0.125,Name,Name,Name,;',
+    'MoveS': 'MoveS,3,-0.125,-0.125,-0.125,-0.125,-0.125,Name,Name,Name,;',
+    'MoveRelJ': 'MoveRelJ,3,3,3,-0.125,;',
+    'MoveRelL': 'MoveRelL,3,3,3,-0.125,3,;',
+    'WayPointRel': 'WayPointRel,3,3,3,-0.125,-0.125,-0.125,-0.125,-0.125,-0.125,-0.125,-0.125,-0.125,-0.125,-0.125,'
+                   '-0.125,3,3,3,3,3,3,3,-0.125,-0.125,-0.125,-0.125,-0.125,-0.125,Name,Name,-0.125,-0.125,-0.125,3,'
+                   '3,3,3,Name,;',
+    'StartPushMovePathJ': 'StartPushMovePath,3,Name,-0.125,-0.125,;',
+    'PushMovePathJ': 'PushMovePathJ,3,Name,-0.125,-0.125,-0.125,-0.125,-0.125,-0.125,;',
+    'EndPushMovePathJ': 'EndPushMovePath,3,Name,;',
+    'MovePathJ': 'MovePath,3,Name,;',
+    'ReadMovePathJState': 'ReadMovePathState,3,Name,;',
+    'UpdateMovePathJName': 'UpdateMovePathName,3,Name,Name,;',
+    'DelMovePathJ': 'DelMovePath,3,Name,;',
+    'ReadTrackProcess': 'ReadSoftMotionProgress,3,;',
+    'InitMovePathL': 'InitMovePathL,3,Name,-0.125,-0.125,-0.125,Name,Name,;',
+    'PushMovePathL': 'PushMovePathL,3,Name,-0.125,-0.125,-0.125,-0.125,-0.125,-0.125,;',
+    'PushMovePaths': 'PushMovePaths,3,Name,3,3,-0.125,-0.125,;',
+    'MovePathL': 'MovePathL,3,Name,;',
+    'SetMovePathOverride': 'SetMovePathOverride,3,-0.125,;',
+    'StartServo': 'StartServo,3,-0.125,-0.125,;',
+    'PushServoJ': 'PushServoJ,3,-0.125,-0.125,-0.125,-0.125,-0.125,-0.125,;',
+    'PushServoP': 'PushServoP,3,-0.125,-0.125,-0.125,-0.125,-0.125,-0.125,-0.125,-0.125,-0.125,-0.125,-0.125,-0.125,'
+                  '-0.125,-0.125,-0.125,-0.125,-0.125,-0.125,;',
+    'InitServoEsJ': 'InitServoEsJ,3,;',
+    'StartServoEsJ': 'StartServoEsJ,3,-0.125,-0.125,;',
+    'PushServoEsJ': 'PushServoEsJ,3,3,-0.125,-0.125,;',
+    'ReadServoEsJState': 'ReadServoEsJState,3,;',
+    'SetMoveTraceParams': 'SetMoveTraceParams,3,3,-0.125,-0.125,-0.125,;',
+    'SetMoveTraceInitParams': 'SetMoveTraceInitParams,3,-0.125,-0.125,-0.125,-0.125,;',
+    'SetMoveTraceUcs': 'SetMoveTraceUcs,3,-0.125,-0.125,;',
+    'SetTrackingState': 'SetTrackingState,3,3,;',
+    'HRAppCmd': 'HRAppCmd,Name,Name,Name,Name,;',
+    'WriteEndHoldingRegisters': 'WriteHoldingRegisters,3,3,3,3,3,3,3,;',
+    'ReadEndHoldingRegisters': 'ReadHoldingRegisters,3,3,3,3,3,;',
+    'cdsSetIO': 'cdsSetIO,3,3,3,3,3,3,3,3,3,3,-0.125,-0.125,;',
+}
+
+
+def testLegacyCoversTable():
+    assert sorted(LegacyCommands) == sorted(api for api, command, spec in CommandTable)
+
+
+@pytest.mark.parametrize('api, command, spec', CommandTable)
+def testTableIdentity(api, command, spec):
+    assert getattr(Encoders, api)(*sampleArgs(spec)) == LegacyCommands[api].encode()
+
+
+def testArrayResult():
+    result = ArrayResult()
+    assert result.decodeFields('1.000,-2.500,3,;').tolist() == [1.0, -2.5, 3.0]
+    assert len(ArrayResult().decodeFields(';')) == 0
+    assert ArrayResult(int).decodeFields('1,0,25,;').dtype.kind == 'i'
+    for fields in ('1.000,abc,;', '1.000,,3,;', '1.000,2.5abc,;', '1.0 2.0,;'):
+        with pytest.raises(ValueError):
+            result.decodeFields(fields)
+    # 解析失败时保留上一次的结果
+    assert result.values.tolist() == [1.0, -2.5, 3.0]
+
+
+def testStructResult():
+    state = StructResult(RobotState, dtype=int)
+    state.decodeFields(','.join(['0'] * 13) + ',;')
+    assert state.value.moving == 0 and len(state.value) == 13
+    pos = StructResult(ActPos, ActPosSizes)
+    pos.decodeFields(','.join(['%d.000' % i for i in range(24)]) + ',;')
+    assert pos.value.ucs.tolist() == [18.0, 19.0, 20.0, 21.0, 22.0, 23.0]
+    # 字段数不符时不更新结果
+    with pytest.raises(ValueError):
+        pos.decodeFields(','.join(['0.000'] * 23) + ',;')
+    with pytest.raises(ValueError):
+        state.decodeFields(','.join(['0'] * 14) + ',;')
+    assert pos.value.ucs.tolist() == [18.0, 19.0, 20.0, 21.0, 22.0, 23.0]
@@ -0,0 +1,121 @@
+#!/usr/bin/env python
+# _*_ coding:utf-8 _*_
+# RbtClient应答分帧: 半条应答,多条应答合并,应答解析失败与连接断开
+
+import socket
+import threading
+import time
+import xmlrpc.client
+
+from CPS import RbtClient
+
+
+def makeClient(bufSize=8):
+    client = RbtClient()
+    client.RecvBufSize = bufSize
+    client.m_recvBuf = bytearray(bufSize)
+    client.m_recvView = memoryview(client.m_recvBuf)
+    client.tcp, peer = socket.socketpair()
+    client.m_bConnect = True
+    # 日志服务不可达
+    client.rpcClient = xmlrpc.client.ServerProxy('http://127.0.0.1:1')
+    return client, peer
+
+
+def sendLater(peer, chunks, delay=0.01):
+    def run():
+        for chunk in chunks:
+            time.sleep(delay)
+            peer.sendall(chunk)
+
+    thread = threading.Thread(target=run, daemon=True)
+    thread.start()
+    return thread
+
+
+def testSplitFrame():
+    client, peer = makeClient()
+    sendLater(peer, [b'ReadActPos,O', b'K,1.000,2.0', b'00,3.000,;'])
+    result = []
+    assert client.recvReply('ReadActPos,0,;', result) == 0
+    assert result == ['1.000', '2.000', '3.000']
+    assert len(client.m_pending) == 0
+
+
+def testMergedFrames():
+    client, peer = makeClient(bufSize=4096)
+    peer.sendall(b'ReadCurFSM,OK,33,;ReadOverride,OK,0.500,;ReadCurFSM,OK,25,')
+    first, second, third = [], [], []
+    assert client.recvReply('ReadCurFSM,0,;', first) == 0
+    assert client.recvReply('ReadOverride,0,;', second) == 0
+    assert first == ['33'] and second == ['0.500']
+    # 第三条的结尾稍后到达
+    sendLater(peer, [b';'])
+    assert client.recvReply('ReadCurFSM,0,;', third) == 0
+    assert third == ['25']
+
+
+def testFailWithoutLogServer():
+    client, peer = makeClient()
+    peer.sendall(b'WayPoint,Fail,20018,;ReadCurFSM,OK,33,;')
+    result = []
+    assert client.recvReply('WayPoint,0,;', result) == 20018
+    assert client.isConnected()
+    assert client.recvReply('ReadCurFSM,0,;', result) == 0
+    assert result == ['33']
+
+
+def testBadReplyKeepsConnection():
+    client, peer = makeClient()
+    peer.sendall(b'WayPoint,Fail,abc,;ReadCurFSM,OK,33,;')
+    result = []
+    assert client.recvReply('WayPoint,0,;', result) == 39502
+    assert client.isConnected()
+    assert client.recvReply('ReadCurFSM,0,;', result) == 0
+    assert result == ['33']
+
+
+def testConnectionClosed():
+    client, peer = makeClient()
+    peer.sendall(b'ReadCurFSM,OK,3')
+    peer.close()
+    assert client.recvReply('ReadCurFSM,0,;', []) == 39500
+    assert not client.isConnected()
+    assert len(client.m_pending) == 0
+
+
+def testDefaultBlocks():
+    client = RbtClient()
+    assert client.RecvTimeout is None
+
+
+def testLongCommandIgnoresTimeout():
+    client, peer = makeClient(64)
+    client.setRecvTimeout(0.1)
+    sendLater(peer, [b'Electrify,OK,;'], delay=0.3)
+    assert client.sendAndRecv('Electrify,;', []) == 0
+    assert client.isConnected() and client.tcp.gettimeout() == 0.1
+    peer.close()
+
+
+def testRecvTimeout():
+    client, peer = makeClient(64)
+    client.setRecvTimeout(0.1)
+    # 不应答
+    assert client.sendAndRecv('ReadCurFSM,0,;', []) == 39503
+    assert not client.isConnected()
+    # 超时后rto退避加倍
+    assert client.m_rtt.rto() == 2 * client.m_rtt.minRto
+    peer.close()
+
+
+def testLastReplyTime():
+    client, peer = makeClient(64)
+    assert client.lastReplyTime is None
+    peer.sendall(b'ReadCurFSM,OK,33,;')
+    before = time.monotonic()
+    result = []
+    assert client.sendAndRecv('ReadCurFSM,0,;', result) == 0
+    sendTime, recvTime = client.lastReplyTime
+    assert result == ['33'] and before <= sendTime <= recvTime <= time.monotonic()
+    peer.close()
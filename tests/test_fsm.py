@@ -0,0 +1,119 @@
+#!/usr/bin/env python
+# _*_ coding:utf-8 _*_
+# 状态机跳变订阅: 去抖,按状态过滤,取消订阅,异步迭代
+
+import asyncio
+import threading
+
+import pytest
+
+from CPS import RbtFSM
+from cps_fsm import FSMWatcher, FSMStream
+from cps_telemetry import TelemetryCache, TelemetrySnapshot
+
+
+class Feed(object):
+    # 按给定的接收时间发布快照,收发时间相差2ms
+    def __init__(self):
+        self.cache = TelemetryCache(None)
+        self.watcher = FSMWatcher(self.cache, RbtFSM)
+        self.seq = 0
+
+    def publish(self, fsm, recvTime, errorCode=0):
+        self.seq += 1
+        self.cache.publish(TelemetrySnapshot(self.seq, recvTime - 0.002, recvTime, errorCode, None, None, fsm))
+
+
+def testTransition():
+    feed = Feed()
+    feed.publish(33, 1.0)
+    seen = []
+    feed.watcher.subscribe(seen.append)
+    # 订阅时的状态不算跳变
+    feed.publish(33, 1.01)
+    assert seen == []
+    feed.publish(25, 1.02)
+    # 读取失败的快照忽略
+    feed.publish(None, 1.03, 39500)
+    feed.publish(99, 1.04)
+    assert [(t.previous, t.current) for t in seen] == [(RbtFSM.enCPSState_Standy, RbtFSM.enCPSState_Moving),
+                                                       (RbtFSM.enCPSState_Moving, 99)]
+    assert seen[0].time == pytest.approx(1.019) and seen[0].lastSeen == 1.01
+    assert type(seen[1].current) is int
+
+
+def testDebounce():
+    feed = Feed()
+    feed.publish(33, 1.0)
+    seen = []
+    feed.watcher.subscribe(seen.append, debounce=0.1)
+    # 持续不到0.1s的抖动被忽略
+    feed.publish(25, 1.01)
+    feed.publish(25, 1.05)
+    feed.publish(33, 1.08)
+    assert seen == []
+    feed.publish(25, 1.2)
+    feed.publish(25, 1.29)
+    assert seen == []
+    feed.publish(25, 1.31)
+    assert len(seen) == 1
+    # 报告的是首次观察到新状态的时间
+    assert seen[0].current == RbtFSM.enCPSState_Moving
+    assert seen[0].time == pytest.approx(1.199) and seen[0].lastSeen == 1.08
+    feed.publish(25, 1.5)
+    assert len(seen) == 1
+
+
+def testStateFilter():
+    feed = Feed()
+    feed.publish(33, 1.0)
+    standby = []
+    feed.watcher.subscribe(standby.append, [RbtFSM.enCPSState_Standy])
+    for i, fsm in enumerate((25, 33, 22, 33, 25)):
+        feed.publish(fsm, 1.1 + i * 0.1)
+    assert [(t.previous, t.current) for t in standby] == [(25, 33), (22, 33)]
+
+
+def testUnsubscribe():
+    feed = Feed()
+    feed.publish(33, 1.0)
+    first, second = [], []
+    sub = feed.watcher.subscribe(first.append)
+    feed.watcher.subscribe(second.append)
+    feed.publish(25, 1.1)
+    sub.cancel()
+    feed.publish(33, 1.2)
+    assert len(first) == 1 and len(second) == 2
+    assert len(feed.watcher.m_subscriptions) == 1
+    feed.watcher.close()
+    feed.publish(25, 1.3)
+    assert len(second) == 2 and feed.cache.m_listeners == ()
+
+
+def testStream():
+    feed = Feed()
+    feed.publish(33, 1.0)
+
+    async def run():
+        stream = feed.watcher.stream([RbtFSM.enCPSState_Moving])
+
+        def publish():
+            # 在其他线程中发布,与遥测轮询线程相同
+            for i, fsm in enumerate((25, 33, 25)):
+                feed.publish(fsm, 1.1 + i * 0.1)
+            stream.close()
+
+        thread = threading.Thread(target=publish)
+        thread.start()
+        seen = [transition async for transition in stream]
+        thread.join()
+        return seen
+
+    seen = asyncio.run(run())
+    assert [t.current for t in seen] == [RbtFSM.enCPSState_Moving] * 2
+    assert feed.watcher.m_subscriptions == ()
+
+
+def testStreamNeedsRunningLoop():
+    with pytest.raises(RuntimeError):
+        FSMStream(Feed().watcher)
@@ -0,0 +1,89 @@
+#!/usr/bin/env python
+# _*_ coding:utf-8 _*_
+# 正解/逆解缓存: 量化键,LRU淘汰,清空,型号变化时清空
+
+from CPS import CPSClient
+from cps_codec import ArrayResult, TimedResult
+from cps_kincache import KinematicsCache
+from cps_sim import CPSSimulator
+
+
+def testQuantizedKey():
+    cache = KinematicsCache(quantum=0.001)
+    key = cache.key('GetForwardKin', 0, [10.0, 20.0], [0.0])
+    assert cache.key('GetForwardKin', 0, [10.0004, 19.9996], [0.0]) == key
+    assert cache.key('GetForwardKin', 0, [10.002, 20.0], [0.0]) != key
+    assert cache.key('GetForwardKin', 1, [10.0, 20.0], [0.0]) != key
+    assert cache.key('GetInverseKin', 0, [10.0, 20.0], [0.0]) != key
+
+
+def testLruEviction():
+    cache = KinematicsCache(capacity=2)
+    cache.put(0, 'a', ['1'])
+    cache.put(0, 'b', ['2'])
+    # 访问a后,b成为最久未使用
+    assert cache.get(0, 'a') == ['1']
+    cache.put(0, 'c', ['3'])
+    assert cache.get(0, 'b') is None
+    assert cache.get(0, 'a') == ['1'] and cache.get(0, 'c') == ['3']
+    stats = cache.snapshot()
+    assert stats['evictions'] == 1 and stats['size'] == 2 and stats['hits'] == 3 and stats['misses'] == 1
+
+
+def testInvalidate():
+    cache = KinematicsCache()
+    cache.put(0, 'a', ['1'])
+    cache.put(1, 'a', ['2'])
+    cache.invalidate(0)
+    assert cache.get(0, 'a') is None and cache.get(1, 'a') == ['2']
+    cache.invalidate()
+    assert cache.snapshot()['size'] == 0
+
+
+def testCheckModel():
+    cache = KinematicsCache()
+    cache.checkModel(0, 'Elfin05')
+    cache.put(0, 'a', ['1'])
+    cache.checkModel(0, 'Elfin05')
+    assert cache.get(0, 'a') == ['1']
+    cache.checkModel(0, 'Elfin10')
+    assert cache.get(0, 'a') is None
+    assert cache.m_models[0] == 'Elfin10'
+
+
+def testReadRobotModelInvalidates():
+    with CPSSimulator(port=0, rpcPort=None) as sim:
+        cps = CPSClient()
+        cps.HRIF_Connect(0, '127.0.0.1', sim.port)
+        cps.enableKinCache()
+        name = TimedResult()
+        assert cps.HRIF_ReadRobotModel(0, 0, name) == 0
+        assert name == ['Elfin05'] and name.recvTime is not None
+        cps.HRIF_GetForwardKin(0, 0, [0.0] * 6, [0.0] * 6, [0.0] * 6, [])
+        assert cps.kinCacheStats()['size'] == 1
+        sim.robot.model = 'Elfin10'
+        # 型号名称不是数值,ArrayResult解码失败,缓存仍按读到的型号清空
+        assert cps.HRIF_ReadRobotModel(0, 0, ArrayResult()) == 39502
+        assert cps.kinCacheStats()['size'] == 0
+        cps.HRIF_DisConnect(0)
+
+
+def testPipelinedSetTCPInvalidates():
+    with CPSSimulator(port=0, rpcPort=None) as sim:
+        cps = CPSClient()
+        cps.HRIF_Connect(0, '127.0.0.1', sim.port)
+        cps.enableKinCache()
+        joints = [0.0, 0.0, 90.0, 0.0, 90.0, 0.0]
+        before, after = [], []
+        cps.HRIF_GetForwardKin(0, 0, joints, [0.0] * 6, [0.0] * 6, before)
+        assert cps.kinCacheStats()['size'] == 1
+        with cps.pipeline(0) as p:
+            future = p.HRIF_SetTCP(0, 0, [0.0, 0.0, 100.0, 0.0, 0.0, 0.0])
+            # 执行前不清空
+            assert cps.kinCacheStats()['size'] == 1
+        assert future.result() == 0
+        stats = cps.kinCacheStats()
+        assert stats['size'] == 0 and stats['invalidations'] == 1
+        cps.HRIF_GetForwardKin(0, 0, joints, [0.0] * 6, [0.0] * 6, after)
+        assert cps.kinCacheStats()['misses'] == 2
+        cps.HRIF_DisConnect(0)
@@ -0,0 +1,99 @@
+#!/usr/bin/env python
+# _*_ coding:utf-8 _*_
+# 本地正解/逆解: 8组封闭解的往返,超出工作空间(39507)与关节范围(39508),型号登记检查
+
+import numpy as np
+import pytest
+
+from cps_kinematics import KinematicModel, Models, NominalLimits, ErrUnreachable, ErrJointLimit, registerModel, \
+    modelFromOrigins, nominalModel, getModel, flangeMatrix, forwardKin, inverseKin, ikBranches, randomJoints
+
+Nominal = nominalModel('Elfin05')
+
+
+def wrap(q):
+    return (np.asarray(q) + 180.0) % 360.0 - 180.0
+
+
+def testAllBranchesRoundTrip():
+    joints = randomJoints(200, limit=170.0, seed=3)
+    # 避开腕部奇异(J5接近0或180°)
+    joints = joints[np.abs(np.sin(np.radians(joints[:, 4]))) > 0.1]
+    T = flangeMatrix(joints, Nominal)
+    q, reachable = ikBranches(T, Nominal, joints)
+    assert reachable.all()
+    for branch in range(8):
+        assert np.allclose(flangeMatrix(q[:, branch], Nominal), T, atol=1e-6)
+    # 原关节角是8组解之一
+    diff = np.abs(wrap(q - joints[:, None, :])).max(axis=2)
+    assert (diff.min(axis=1) < 1e-6).all()
+
+
+def testInverseKinRoundTrip():
+    joints = randomJoints(100, limit=170.0, seed=4)
+    joints = joints[np.abs(np.sin(np.radians(joints[:, 4]))) > 0.1]
+    tcp = [0.0, 0.0, 120.0, 0.0, 0.0, 0.0]
+    ucs = [300.0, -200.0, 50.0, 0.0, 0.0, 90.0]
+    poses = forwardKin(joints, Nominal, tcp, ucs)
+    codes, solved = inverseKin(poses, joints, Nominal, tcp, ucs)
+    assert (codes == 0).all()
+    assert np.allclose(solved, joints, atol=1e-6)
+
+
+def testUnreachable():
+    code, joints = inverseKin([5000.0, 0.0, 0.0, 180.0, 0.0, 180.0], [0.0] * 6, Nominal)
+    assert code == ErrUnreachable
+    assert list(joints) == [0.0] * 6
+
+
+def testJointLimit():
+    # J1限制在±5°,目标的J1为90°,肩部前后两侧的解分别为90°与-90°,均超出范围
+    limits = ((-5.0, 5.0),) + NominalLimits[1:]
+    model = KinematicModel('TestLimit', Nominal.d1, Nominal.a2, Nominal.d4, Nominal.d6, limits)
+    target = [90.0, 30.0, 60.0, 10.0, 45.0, 20.0]
+    pose = forwardKin(target, Nominal)
+    assert inverseKin(pose, target, Nominal)[0] == 0
+    code, joints = inverseKin(pose, target, model)
+    assert code == ErrJointLimit
+    assert np.allclose(joints, target)
+    # 同一型号登记后按名称使用
+    try:
+        registerModel(model)
+        assert inverseKin(pose, target, 'TestLimit')[0] == ErrJointLimit
+    finally:
+        Models.pop('TestLimit', None)
+
+
+def testRegisterRequiresLimits():
+    with pytest.raises(ValueError):
+        registerModel(Nominal._replace(name='TestNone', limits=None))
+    with pytest.raises(ValueError):
+        registerModel(Nominal._replace(name='TestShape', limits=((-360.0, 360.0),) * 5))
+    with pytest.raises(ValueError):
+        registerModel(Nominal._replace(name='TestOrder', limits=((10.0, -10.0),) * 6))
+    with pytest.raises(ValueError):
+        registerModel(Nominal._replace(name='TestLink', a2=0.0))
+    assert not [name for name in Models if name.startswith('Test')]
+
+
+def testModelFromOrigins():
+    origins = [(0, 0, 100.0), (0, 0, 120.0), (0, 0, 380.0), (0, 0, 200.0), (0, 0, 220.0), (0, 0, 80.0),
+               (0, 0, 100.0)]
+    model = modelFromOrigins('TestOrigins', origins, NominalLimits)
+    assert model == Nominal._replace(name='TestOrigins')
+    # 肩部横向偏置,肘部偏置,腕部三轴不交于一点都不能用封闭解
+    for joint, offset in ((1, (0, 140.0, 120.0)), (3, (-15.0, 0, 200.0)), (5, (0, 110.0, 80.0))):
+        shifted = list(origins)
+        shifted[joint] = offset
+        with pytest.raises(ValueError, match='J%d' % (joint + 1)):
+            modelFromOrigins('TestOffset', shifted, NominalLimits)
+    with pytest.raises(ValueError):
+        modelFromOrigins('TestShape', origins[:6], NominalLimits)
+    assert not [name for name in Models if name.startswith('Test')]
+
+
+def testNominalNotSelected():
+    # 名义参数不会被getModel自动选用
+    with pytest.raises(ValueError):
+        getModel('Elfin05')
+    assert nominalModel('E05') is Nominal
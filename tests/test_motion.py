@@ -0,0 +1,109 @@
+#!/usr/bin/env python
+# _*_ coding:utf-8 _*_
+# 运动等待: _waitMotion/waitMovementDone/MotionFuture的状态分类一致,偶发读取失败继续等待,遥测停止时future结束
+
+import time
+
+from cps_codec import RobotState
+from cps_motion import MotionFuture
+from cps_telemetry import TelemetryCache, TelemetrySnapshot
+from cps_wait import motionState, fsmState
+
+Idle = RobotState(moving=0, enabled=1, error=0, errorCode=0, errorAxis=0, brake=0, paused=0, emergencyStop=0,
+                  safetyGuard=0, electrify=1, boxConnected=1, blendingDone=1, inPos=1)
+
+
+def snapshot(seq, state, fsm=33):
+    now = time.monotonic()
+    return TelemetrySnapshot(seq, now, now, 0, state, None, fsm)
+
+
+def testSafetyGuardKeepsWaiting():
+    guard = Idle._replace(moving=1, safetyGuard=1)
+    assert motionState(guard, False) == (None, 0)
+    assert fsmState(12) is None
+    cache = TelemetryCache(None)
+    future = MotionFuture(cache)
+    cache.publish(snapshot(1, guard, 12))
+    assert not future.done()
+    cache.publish(snapshot(2, Idle))
+    assert future.result(0).reason == 'done'
+
+
+def testErrorAndEstop():
+    assert motionState(Idle._replace(error=1, errorCode=7), False) == ('error', 7)
+    assert motionState(Idle, False, fsm=21) == ('error', 0)
+    assert motionState(Idle._replace(emergencyStop=1), False) == ('estop', 0)
+    assert fsmState(21) == 'error' and fsmState(5) == 'estop' and fsmState(33) == 'done'
+    cache = TelemetryCache(None)
+    future = MotionFuture(cache)
+    cache.publish(snapshot(1, Idle._replace(emergencyStop=1), 5))
+    assert future.result(0).reason == 'estop'
+
+
+def testDisabledNeedsFiveSamples():
+    cache = TelemetryCache(None)
+    future = MotionFuture(cache)
+    disabled = Idle._replace(enabled=0)
+    for seq in range(1, 5):
+        cache.publish(snapshot(seq, disabled))
+        assert not future.done()
+    cache.publish(snapshot(5, disabled))
+    assert future.result(0).reason == 'disabled'
+
+
+class IdleCPS(object):
+    def HRIF_ReadSnapshot(self, boxID, rbtID, fields):
+        now = time.monotonic()
+        return TelemetrySnapshot(0, now, now, 0, Idle._replace(moving=1), None, 25)
+
+
+def testStopFailsPendingFuture():
+    cache = TelemetryCache(IdleCPS(), rate=200.0)
+    cache.start()
+    future = MotionFuture(cache)
+    cache.stop()
+    result = future.result(2.0)
+    assert result.reason == 'commError' and result.errorCode == 39500
+
+
+class FlakyCPS(object):
+    # 前failures次读取失败,之后运动中moving次,然后停止
+    def __init__(self, failures, moving=2):
+        self.failures = failures
+        self.moving = moving
+
+    def HRIF_ReadSnapshot(self, boxID, rbtID, fields):
+        now = time.monotonic()
+        if self.failures > 0:
+            self.failures -= 1
+            return TelemetrySnapshot(0, now, now, 39503, None, None, None)
+        self.moving -= 1
+        return TelemetrySnapshot(0, now, now, 0, Idle._replace(moving=int(self.moving >= 0)), None, 33)
+
+
+def testTransientReadFailure():
+    cache = TelemetryCache(FlakyCPS(3), rate=200.0)
+    future = MotionFuture(cache)
+    with cache:
+        result = future.result(2.0)
+    assert result.reason == 'done'
+
+
+def testConsecutiveReadFailures():
+    cache = TelemetryCache(FlakyCPS(1000), rate=200.0)
+    seen = []
+    cache.addListener(lambda snapshot: seen.append(snapshot.errorCode))
+    future = MotionFuture(cache, failTime=10.0)
+    with cache:
+        result = future.result(2.0)
+    assert result.reason == 'commError' and result.errorCode == 39503
+    assert seen[:5] == [39503] * 5
+
+
+def testReadFailureTimeLimit():
+    cache = TelemetryCache(FlakyCPS(1000), rate=200.0)
+    future = MotionFuture(cache, maxFailures=1000, failTime=0.05)
+    with cache:
+        result = future.result(2.0)
+    assert result.reason == 'commError' and result.elapsed < 1.0
@@ -0,0 +1,96 @@
+#!/usr/bin/env python
+# _*_ coding:utf-8 _*_
+# 批量指令: 批内的Fail应答,收发超时后其余命令直接失败
+
+import socket
+import threading
+
+from CPS import CPSClient
+from cps_codec import ArrayResult, StructResult, ActPos, ActPosSizes
+from cps_sim import CPSSimulator, ErrNotEnabled
+
+
+def runWithTimeout(func, timeout=5.0):
+    # 在子线程中执行,卡住时测试失败而不是一直等待
+    out = []
+    thread = threading.Thread(target=lambda: out.append(func()), daemon=True)
+    thread.start()
+    thread.join(timeout)
+    assert not thread.is_alive(), 'pipeline hung'
+    return out[0]
+
+
+def testFailInsideBatch():
+    # 不启动XML-RPC日志服务,Fail应答的日志发送失败
+    with CPSSimulator(port=0, rpcPort=None) as sim:
+        cps = CPSClient()
+        cps.HRIF_Connect(0, '127.0.0.1', sim.port)
+        assert cps.HRIF_GrpDisable(0, 0) == 0
+        fsm, pos = [], []
+
+        def batch():
+            with cps.pipeline(0) as p:
+                f1 = p.HRIF_ReadCurFSM(0, 0, fsm)
+                f2 = p.HRIF_MoveJ(0, 0, [0.0] * 6, [0.0, 0.0, 90.0, 0.0, 90.0, 0.0], 'TCP', 'Base', 10, 10, 0, 1, 0,
+                                  0, 0, 'id')
+                f3 = p.HRIF_ReadActPos(0, 0, pos)
+            return f1.result(), f2.result(), f3.result()
+
+        assert runWithTimeout(batch) == (0, ErrNotEnabled, 0)
+        assert len(fsm) == 1 and len(pos) == 24
+        sendTime, recvTime = cps.lastReplyTime(0)
+        assert sendTime <= recvTime
+        assert cps.HRIF_IsConnected(0)
+        cps.HRIF_DisConnect(0)
+
+
+def testTimeoutFailsRestOfBatch():
+    cps = CPSClient()
+    client = cps.g_clients[0]
+    client.tcp, peer = socket.socketpair()
+    client.tcp.settimeout(0.2)
+    client.m_bConnect = True
+    # 只应答第一条
+    peer.sendall(b'ReadCurFSM,OK,33,;')
+    p = cps.pipeline(0)
+    p.HRIF_ReadCurFSM(0, 0, [])
+    p.HRIF_ReadCurFSM(0, 0, [])
+    p.HRIF_ReadCurFSM(0, 0, [])
+    assert runWithTimeout(p.execute) == [0, 39503, 39503]
+    assert not cps.HRIF_IsConnected(0)
+    peer.close()
+
+
+def testShortReplyInsideBatch():
+    # 字段数不符的应答返回39502,批内其余应答照常读取
+    cps = CPSClient()
+    client = cps.g_clients[0]
+    client.tcp, peer = socket.socketpair()
+    client.tcp.settimeout(1.0)
+    client.m_bConnect = True
+    peer.sendall(b'ReadActPos,OK,' + b'0.000,' * 23 + b';ReadCurFSM,OK,33,;')
+    pos, fsm = StructResult(ActPos, ActPosSizes), []
+    p = cps.pipeline(0)
+    p.HRIF_ReadActPos(0, 0, pos)
+    p.HRIF_ReadCurFSM(0, 0, fsm)
+    assert runWithTimeout(p.execute) == [39502, 0]
+    assert fsm == ['33'] and cps.HRIF_IsConnected(0)
+    peer.close()
+
+
+def testReadRobotModelResult():
+    # 型号名称为数值时可解码到ArrayResult,应答后填入调用方的result
+    with CPSSimulator(port=0, rpcPort=None) as sim:
+        sim.robot.model = '5'
+        cps = CPSClient()
+        cps.HRIF_Connect(0, '127.0.0.1', sim.port)
+        cps.enableKinCache()
+        model, names = ArrayResult(int), []
+        with cps.pipeline(0) as p:
+            f1 = p.HRIF_ReadRobotModel(0, 0, model)
+            f2 = p.HRIF_ReadRobotModel(0, 0, names)
+        assert f1.result() == 0 and f2.result() == 0
+        assert list(model.values) == [5] and model.recvTime is not None
+        assert names == ['5']
+        assert cps.kinCache().m_models[0] == '5'
+        cps.HRIF_DisConnect(0)
@@ -0,0 +1,42 @@
+#!/usr/bin/env python
+# _*_ coding:utf-8 _*_
+# 本地点位计算: 已知值,加减互逆,批量与单个一致
+
+import numpy as np
+
+from cps_pose import poseAdd, poseSub, poseTrans, poseInverse, poseDist, poseInterpolate, poseError, randomPoses, \
+    rpyToMatrix, matrixToRpy, poseToMatrix, matrixToPose, formatValues
+
+
+def testPoseKnownValues():
+    frame = [100.0, 0.0, 0.0, 0.0, 0.0, 90.0]
+    assert np.allclose(poseTrans(frame, [10.0, 0.0, 0.0, 0.0, 0.0, 0.0]), [100.0, 10.0, 0.0, 0.0, 0.0, 90.0])
+    assert np.allclose(poseInverse(frame), [0.0, 100.0, 0.0, 0.0, 0.0, -90.0])
+    assert np.allclose(poseDist([0.0] * 6, [3.0, 4.0, 0.0, 0.0, 0.0, 90.0]), [5.0, 90.0])
+    middle = poseInterpolate([0.0] * 6, [100.0, 0.0, 0.0, 0.0, 0.0, 90.0], 0.5)
+    assert np.allclose(middle, [50.0, 0.0, 0.0, 0.0, 0.0, 45.0])
+
+
+def testGimbalLockConvention():
+    # Ry为±90°时取Rx = 0: +90°时只能确定Rz - Rx,-90°时只能确定Rz + Rx
+    assert np.allclose(matrixToRpy(rpyToMatrix([30.0, 90.0, 20.0])), [0.0, 90.0, -10.0])
+    assert np.allclose(matrixToRpy(rpyToMatrix([30.0, -90.0, 20.0])), [0.0, -90.0, 50.0])
+
+
+def testFormatNegativeZero():
+    assert formatValues([-1e-9, -0.0004, 1.0, -0.0006, -0.0]) == ['0.000', '0.000', '1.000', '-0.001', '0.000']
+    assert formatValues([[-1e-12, 2.0]], digits=1) == [['0.0', '2.0']]
+    # 本地计算的数值误差不输出'-0.000'
+    pose = matrixToPose(poseToMatrix([-1e-12, 0.0, 100.0, 180.0, 0.0, 180.0]))
+    assert formatValues(pose) == ['0.000', '0.000', '100.000', '180.000', '0.000', '180.000']
+
+
+def testAddSubRoundTrip():
+    pos1 = randomPoses(200, seed=6)
+    pos2 = randomPoses(200, seed=7)
+    pos, rot = poseError(poseSub(poseAdd(pos1, pos2), pos2), pos1)
+    assert pos.max() < 1e-6 and rot.max() < 1e-6
+    pos, rot = poseError(poseTrans(pos2, poseInverse(pos2)), np.zeros(6))
+    assert pos.max() < 1e-6 and rot.max() < 1e-6
+    # 批量结果与逐个计算一致
+    assert np.allclose(poseAdd(pos1, pos2)[3], poseAdd(pos1[3], pos2[3]))
@@ -0,0 +1,51 @@
+#!/usr/bin/env python
+# _*_ coding:utf-8 _*_
+# 四元数与RPY换算: 已知值,万向节锁,批量往返
+
+import math
+
+import numpy as np
+
+from cps_pose import rpyToMatrix, rpyToQuaternion, quaternionToRpy, matrixToQuaternion, randomRpy
+
+C45 = math.cos(math.radians(45.0))
+
+
+def testQuaternionKnownValues():
+    assert np.allclose(rpyToQuaternion([0.0, 0.0, 90.0]), [C45, 0.0, 0.0, C45])
+    assert np.allclose(rpyToQuaternion([90.0, 0.0, 0.0]), [C45, C45, 0.0, 0.0])
+    assert np.allclose(rpyToQuaternion([0.0, 0.0, 0.0]), [1.0, 0.0, 0.0, 0.0])
+    assert np.allclose(quaternionToRpy([C45, 0.0, 0.0, C45]), [0.0, 0.0, 90.0])
+    # 输入不要求归一化
+    assert np.allclose(quaternionToRpy([2.0, 0.0, 2.0, 0.0]), [0.0, 90.0, 0.0])
+    # 绕X轴180°,W不小于0
+    R = rpyToMatrix([180.0, 0.0, 0.0])
+    assert np.allclose(matrixToQuaternion(R), [0.0, 1.0, 0.0, 0.0])
+
+
+def testSignMatchesMatrixPath():
+    # 半角公式与经过旋转矩阵的结果符号一致,W不小于0
+    assert np.allclose(rpyToQuaternion([180.0, 180.0, -180.0]), [1.0, 0.0, 0.0, 0.0])
+    edges = np.array([[180.0, 180.0, -180.0], [180.0, 0.0, 0.0], [0.0, 0.0, 180.0], [-180.0, 0.0, 0.0],
+                      [0.0, 90.0, 180.0], [90.0, 0.0, -180.0], [180.0, -90.0, 180.0]])
+    rpy = np.concatenate([edges, randomRpy(500, seed=9)])
+    quat = rpyToQuaternion(rpy)
+    assert np.all(quat[:, 0] >= 0.0)
+    assert np.allclose(quat, matrixToQuaternion(rpyToMatrix(rpy)), atol=1e-9)
+
+
+def testGimbalLock():
+    for ry in (90.0, -90.0):
+        rpy = quaternionToRpy(rpyToQuaternion([30.0, ry, 40.0]))
+        # 只能确定Rx与Rz的和或差,取Rx = 0,姿态不变
+        assert abs(rpy[0]) < 1e-9 and abs(rpy[1] - ry) < 1e-6
+        assert np.allclose(rpyToMatrix(rpy), rpyToMatrix([30.0, ry, 40.0]), atol=1e-9)
+
+
+def testQuaternionRoundTripBatch():
+    rpy = randomRpy(500, seed=5)
+    quat = rpyToQuaternion(rpy)
+    back = quaternionToRpy(quat)
+    assert back.shape == (500, 3)
+    assert np.allclose(rpyToMatrix(back), rpyToMatrix(rpy), atol=1e-9)
+    assert np.allclose(quat[7], rpyToQuaternion(rpy[7]))
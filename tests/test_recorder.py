@@ -0,0 +1,44 @@
+#!/usr/bin/env python
+# _*_ coding:utf-8 _*_
+# TelemetryRecorder: 由TelemetryCache的快照驱动,失败或不完整的快照不记录
+
+import time
+
+import numpy as np
+
+from CPS import CPSClient
+from cps_codec import ActPos
+from cps_recorder import TelemetryRecorder, openRecording, toRecord
+from cps_sim import CPSSimulator
+from cps_telemetry import TelemetrySnapshot
+
+
+def testToRecordSkipsBadSnapshots():
+    six = np.zeros(6)
+    pos = ActPos(six, six, six, six)
+    assert toRecord(TelemetrySnapshot(1, 0.0, 0.0, 0, None, pos, 33, six, six)) is not None
+    assert toRecord(TelemetrySnapshot(2, 0.0, 0.0, 39503, None, None, None)) is None
+    # 关节数组不足6个时不记录,而不是写入时报ValueError
+    short = ActPos(np.zeros(3), six, six, six)
+    assert toRecord(TelemetrySnapshot(3, 0.0, 0.0, 0, None, short, 33, six, six)) is None
+    assert toRecord(TelemetrySnapshot(4, 0.0, 0.0, 0, None, pos, 33, None, six)) is None
+
+
+def testRecordFromCache(tmp_path):
+    path = str(tmp_path / 'run.bin')
+    with CPSSimulator(port=0, rpcPort=None) as sim:
+        cps = CPSClient()
+        cps.HRIF_Connect(0, '127.0.0.1', sim.port)
+        rec = TelemetryRecorder(cps, 0, 0, path, rate=200.0, segment=8, segments=2)
+        with rec:
+            deadline = time.monotonic() + 5.0
+            while rec.count() < 20 and time.monotonic() < deadline:
+                time.sleep(0.01)
+        assert not rec.isRunning()
+        # 记录器启动的遥测缓存随之停止
+        assert (0, 0) not in cps.m_telemetry
+        cps.HRIF_DisConnect(0)
+    records = openRecording(path)
+    assert len(records) == rec.count() >= 20
+    assert (records['errorCode'] == 0).all()
+    assert np.all(np.diff(records['recvTime']) > 0)
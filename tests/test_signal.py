@@ -0,0 +1,107 @@
+#!/usr/bin/env python
+# _*_ coding:utf-8 _*_
+# 由位置求导: Savitzky-Golay拟合在匀速与匀加速时精确(含窗口边界),StatePredictor按延迟外推
+
+import numpy as np
+import pytest
+
+from cps_codec import StructResult, ActPos, ActPosSizes
+from cps_signal import derivatives, unwrapAngles, DerivedSignals, StatePredictor
+from cps_stats import RttEstimator
+
+Velocity = np.array([3.0, -1.5, 0.0, 10.0, 0.25, -7.0])
+
+
+def jitteredTimes(n, period=0.01, seed=1):
+    # 不均匀的采样间隔
+    rng = np.random.default_rng(seed)
+    return 100.0 + np.cumsum(period * (1.0 + 0.3 * rng.uniform(-1.0, 1.0, n)))
+
+
+def testConstantVelocity():
+    t = jitteredTimes(40)
+    x = 5.0 + np.outer(t - t[0], Velocity)
+    for window in (5, 9):
+        vel, acc = derivatives(t, x, window=window)
+        # 包括前后各window//2个边界样本
+        np.testing.assert_allclose(vel, np.tile(Velocity, (len(t), 1)), rtol=0, atol=1e-9)
+        np.testing.assert_allclose(acc, 0.0, atol=1e-6)
+    vel, acc = derivatives(t, x, method='diff')
+    np.testing.assert_allclose(vel, np.tile(Velocity, (len(t), 1)), atol=1e-9)
+
+
+def testConstantAcceleration():
+    t = jitteredTimes(30)
+    tau = t - t[0]
+    x = np.column_stack([2.0 + 1.0 * tau + 0.5 * 4.0 * tau ** 2, -3.0 * tau ** 2])
+    vel, acc = derivatives(t, x, window=7, order=2)
+    np.testing.assert_allclose(vel[:, 0], 1.0 + 4.0 * tau, atol=1e-8)
+    np.testing.assert_allclose(vel[:, 1], -6.0 * tau, atol=1e-8)
+    np.testing.assert_allclose(acc, np.tile([4.0, -6.0], (len(t), 1)), atol=1e-6)
+
+
+def testShortInputFallsBackToDiff():
+    t = np.array([0.0, 0.01, 0.025])
+    vel, acc = derivatives(t, np.outer(t, Velocity), window=9)
+    np.testing.assert_allclose(vel, np.tile(Velocity, (3, 1)), atol=1e-9)
+
+
+def testUnwrapAngles():
+    # Rz从179°经180°到-179°,展开后连续
+    pcs = np.zeros((3, 6))
+    pcs[:, 5] = [179.0, -180.0, -179.0]
+    assert unwrapAngles(pcs)[:, 5].tolist() == [179.0, 180.0, 181.0]
+
+
+def feed(signals, t):
+    for ti in t:
+        tau = ti - t[0]
+        signals.append(ti, Velocity * tau, [100.0 + 30.0 * tau, -40.0 * tau, 500.0, 0.0, 0.0, 179.0 + 20.0 * tau])
+
+
+def testDerivedSignals():
+    signals = DerivedSignals(window=7)
+    t = jitteredTimes(20)
+    feed(signals, t[:2])
+    assert signals.latest() is None
+    # 窗口未满时用最后3个样本差分
+    feed(signals, t[:5])
+    np.testing.assert_allclose(signals.latest().jointVel, Velocity, atol=1e-9)
+    signals = DerivedSignals(window=7)
+    # 超过窗口长度,环形缓存回绕
+    feed(signals, t)
+    d = signals.latest()
+    assert d.time == t[-1]
+    np.testing.assert_allclose(d.jointVel, Velocity, atol=1e-9)
+    np.testing.assert_allclose(d.jointAcc, 0.0, atol=1e-6)
+    # Rz越过180°,变化率仍为20°/s
+    np.testing.assert_allclose(d.pcsVel, [30.0, -40.0, 0.0, 0.0, 0.0, 20.0], atol=1e-8)
+    assert d.tcpSpeed == pytest.approx(50.0)
+
+
+def testPredictConstantVelocity():
+    rtt = RttEstimator()
+    rtt.update(0.004)
+    predictor = StatePredictor(window=7, servoDelay=0.003, horizon=0.1, rtt=rtt)
+    assert predictor.predict(0.0) is None
+    t = jitteredTimes(10)
+    for ti in t:
+        # 采样时刻为收发中点
+        predictor.update(ti - 0.001, ti + 0.001, Velocity * (ti - t[0]), [0.0] * 6)
+    assert predictor.applyTime(now=t[-1]) == pytest.approx(t[-1] + 0.002 + 0.003)
+    d = predictor.predict(t[-1] + 0.05)
+    np.testing.assert_allclose(d.joint, Velocity * (t[-1] + 0.05 - t[0]), atol=1e-8)
+    np.testing.assert_allclose(d.jointVel, Velocity, atol=1e-9)
+    # 超过horizon时只外推horizon
+    np.testing.assert_allclose(predictor.predictPose(t[-1] + 10.0), Velocity * (t[-1] + 0.1 - t[0]), atol=1e-7)
+    # 早于最后一个样本时不外推
+    np.testing.assert_allclose(predictor.predictPose(t[0]), Velocity * (t[-1] - t[0]), atol=1e-9)
+
+
+def testPredictorOwnRtt():
+    predictor = StatePredictor()
+    pos = StructResult(ActPos, ActPosSizes)
+    pos.decodeFields('1.000,' * 24 + ';')
+    pos.sendTime, pos.recvTime = 10.0, 10.006
+    predictor.updateResult(pos)
+    assert predictor.rtt.srtt == pytest.approx(0.006) and predictor.rtt.count == 1
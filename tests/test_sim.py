@@ -0,0 +1,20 @@
+#!/usr/bin/env python
+# _*_ coding:utf-8 _*_
+# 模拟器: 未实现的命令与处理异常应答Fail,连接保持
+
+from CPS import CPSClient
+from cps_sim import CPSSimulator, ErrUnknownCommand, ErrSimError
+
+
+def testUnknownCommandFails():
+    with CPSSimulator(port=0, rpcPort=None) as sim:
+        cps = CPSClient()
+        cps.HRIF_Connect(0, '127.0.0.1', sim.port)
+        assert cps.HRIF_ReadBoxAI(0, 0, []) == ErrUnknownCommand
+        # 处理函数抛出异常
+        sim.m_handlers['ReadCurFSM'] = lambda args: 1 / 0
+        assert cps.HRIF_ReadCurFSM(0, 0, []) == ErrSimError
+        result = []
+        assert cps.HRIF_ReadActPos(0, 0, result) == 0 and len(result) == 24
+        assert cps.HRIF_IsConnected(0)
+        cps.HRIF_DisConnect(0)
@@ -0,0 +1,75 @@
+#!/usr/bin/env python
+# _*_ coding:utf-8 _*_
+# 命令统计: 延迟直方图的分桶与百分位;往返时间估计(RFC 6298)的rto与超时退避
+
+import pytest
+
+from cps_stats import CommandStats, RttEstimator, HistBuckets, bucketBound, histPercentile
+
+
+def testHistBuckets():
+    stats = CommandStats()
+    # 0.5us -> 桶0, 1.5us -> 桶1, 3us -> 桶2, 1000us -> 桶10, 超出范围 -> 最后一个桶
+    for elapsed in (0.5e-6, 1.5e-6, 3e-6, 1000e-6, 1e5):
+        stats.record(b'ReadActPos,0,;', 0, elapsed, 14, 40)
+    stats.record('ReadActPos,0,;', 39502, 1.5e-6, 14, 20)
+    rec = stats.snapshot({39502: 'bad reply'})['ReadActPos']
+    hist = [0] * HistBuckets
+    hist[0], hist[1], hist[2], hist[10], hist[HistBuckets - 1] = 1, 2, 1, 1, 1
+    assert rec['hist'] == hist
+    assert rec['count'] == 6 and rec['bytesSent'] == 84 and rec['bytesRecv'] == 220
+    assert rec['errors'] == {39502: {'count': 1, 'name': 'bad reply'}}
+    assert rec['minTime'] == 0.5e-6 and rec['maxTime'] == 1e5
+
+
+def testHistPercentile():
+    hist = [0] * HistBuckets
+    # 9个样本在桶1 [1, 2)us,1个在桶10 [512, 1024)us
+    hist[1], hist[10] = 9, 1
+    assert histPercentile(hist, 50) == bucketBound(1) == pytest.approx(2e-6)
+    assert histPercentile(hist, 90) == bucketBound(1)
+    assert histPercentile(hist, 99) == bucketBound(10) == pytest.approx(1024e-6)
+    assert histPercentile(hist, 100) == bucketBound(10)
+    assert histPercentile([0] * HistBuckets, 50) == 0.0
+
+
+def testRtoUpdate():
+    rtt = RttEstimator(minRto=0.0)
+    # 第一个样本: srtt = R, rttvar = R/2
+    rtt.update(0.1)
+    assert rtt.srtt == pytest.approx(0.1) and rtt.rttvar == pytest.approx(0.05)
+    assert rtt.rto() == pytest.approx(0.1 + 4 * 0.05)
+    # rttvar = 3/4 * 0.05 + 1/4 * |0.1 - 0.2|, srtt = 7/8 * 0.1 + 1/8 * 0.2
+    rtt.update(0.2)
+    assert rtt.rttvar == pytest.approx(0.0625) and rtt.srtt == pytest.approx(0.1125)
+    assert rtt.rto() == pytest.approx(0.1125 + 4 * 0.0625)
+    assert rtt.minRtt == 0.1 and rtt.last == 0.2 and rtt.count == 2
+    assert rtt.oneWay() == pytest.approx(0.05625)
+
+
+def testRtoBounds():
+    # 尚无样本时为minRto;rttvar很小时取时钟粒度
+    assert RttEstimator().rto() == 1.0
+    rtt = RttEstimator(minRto=0.0, granularity=0.01)
+    rtt.update(0.001)
+    for i in range(50):
+        rtt.update(0.001)
+    assert rtt.rto() == pytest.approx(0.001 + 0.01, rel=1e-3)
+    rtt = RttEstimator(minRto=0.5)
+    rtt.update(0.001)
+    assert rtt.rto() == 0.5
+
+
+def testRtoBackoff():
+    rtt = RttEstimator(minRto=0.0, maxRto=1.0)
+    rtt.update(0.1)
+    rtt.backoff()
+    assert rtt.rto() == pytest.approx(0.6)
+    rtt.backoff()
+    # 加倍到maxRto为止
+    assert rtt.rto() == 1.0
+    rtt.backoff()
+    assert rtt.rto() == 1.0
+    # 新样本到达后恢复
+    rtt.update(0.1)
+    assert rtt.rto() < 0.3
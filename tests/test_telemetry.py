@@ -0,0 +1,78 @@
+#!/usr/bin/env python
+# _*_ coding:utf-8 _*_
+# TelemetryCache: 并发增删监听者,读取异常时轮询继续,每台机器人一路轮询
+
+import threading
+
+from CPS import CPSClient
+from cps_telemetry import TelemetryCache, failedSnapshot
+
+
+class RaisingCPS(object):
+    # 前几次读取抛出异常,之后返回失败快照
+    def __init__(self, failures):
+        self.failures = failures
+
+    def HRIF_ReadSnapshot(self, boxID, rbtID, fields):
+        if self.failures > 0:
+            self.failures -= 1
+            raise RuntimeError('decode failed')
+        return failedSnapshot(0.0, 0.0, 39500)
+
+
+def testConcurrentListeners():
+    cache = TelemetryCache(None)
+    callbacks = [(lambda snapshot: None) for i in range(800)]
+
+    def add(part):
+        for callback in part:
+            cache.addListener(callback)
+
+    threads = [threading.Thread(target=add, args=(callbacks[i::8],)) for i in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert len(cache.m_listeners) == len(callbacks)
+
+    threads = [threading.Thread(target=lambda part: [cache.removeListener(c) for c in part], args=(callbacks[i::8],))
+               for i in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert cache.m_listeners == ()
+
+
+def testPollErrorKeepsPolling():
+    cache = TelemetryCache(RaisingCPS(3), rate=200.0)
+    seen = []
+    cache.addListener(lambda snapshot: seen.append(snapshot.errorCode))
+    with cache:
+        snapshot = cache.waitNext(0, timeout=2.0)
+        assert snapshot is not None and snapshot.errorCode == 39503
+        # 异常之后仍在轮询
+        assert cache.waitNext(5, timeout=2.0) is not None
+        assert cache.m_thread.is_alive()
+    assert seen[:3] == [39503] * 3 and 39500 in seen
+
+
+def testRemoveBoundMethod():
+    cache = TelemetryCache(None)
+    seen = []
+    cache.addListener(seen.append)
+    cache.removeListener(seen.append)
+    assert cache.m_listeners == ()
+
+
+def testCachePerRobot():
+    # 同一电箱的两台机器人各自一路轮询,可单独停止
+    cps = CPSClient()
+    first, second = cps.telemetry(0, 0, rate=200.0), cps.telemetry(0, 1, rate=200.0)
+    assert first is not second and second.rbtID == 1
+    assert cps.telemetry(0, 1) is second
+    cps.stopTelemetry(0, 1)
+    assert list(cps.m_telemetry) == [(0, 0)] and first.isRunning() and not second.isRunning()
+    cps.telemetry(0, 1, rate=200.0)
+    cps.stopTelemetry(0)
+    assert cps.m_telemetry == {} and not first.isRunning()
@@ -0,0 +1,90 @@
+#!/usr/bin/env python
+# _*_ coding:utf-8 _*_
+# 遥测文件: 写入后读回,按列读取,经稀疏索引按时间截取,最后一块不完整及文件被截断
+
+import os
+
+import numpy as np
+import pytest
+
+from cps_codec import RobotState
+from cps_tlmfile import TelemetryWriter, TelemetryFile, columnFile
+
+Samples = 2550
+Stride = 100
+
+
+def state(i):
+    # 每300个样本切换一次运动状态
+    moving = (i // 300) % 2
+    return RobotState(moving, 1, 0, 0, 0, 0, 0, 0, 0, 1, 1, 1 - moving, 1 - moving), 25 if moving else 33
+
+
+def sampleTime(i):
+    return 1000.0 + i * 0.01
+
+
+@pytest.fixture
+def tlmPath(tmp_path):
+    path = str(tmp_path / 'run.tlm')
+    with TelemetryWriter(path, indexStride=Stride, chunk=64) as writer:
+        for i in range(Samples):
+            rbt, fsm = state(i)
+            writer.append(sampleTime(i), [i] * 6, [i + 0.5] * 6, [0.0] * 6, [1.0] * 6, rbt, fsm)
+    return path
+
+
+def testWriteRead(tlmPath):
+    tlm = TelemetryFile(tlmPath)
+    assert len(tlm) == Samples
+    # 最后一块只有50个样本
+    assert len(tlm.index) == (Samples + Stride - 1) // Stride
+    np.testing.assert_array_equal(tlm.column('time'), [sampleTime(i) for i in range(Samples)])
+    assert tlm.column('joint').shape == (Samples, 6) and tlm.column('joint').dtype == np.float32
+    assert tlm.column('joint')[Samples - 1].tolist() == [Samples - 1] * 6
+    assert tlm.column('pcs')[7].tolist() == [7.5] * 6
+    # 状态只记录变化点
+    assert tlm.stateIdx.tolist() == list(range(0, Samples, 300))
+
+
+def testColumnSelection(tlmPath):
+    tlm = TelemetryFile(tlmPath)
+    view = tlm.slice(sampleTime(10), sampleTime(20))
+    assert sorted(view) == ['joint', 'pcs', 'tcp', 'time', 'ucs']
+    assert view['joint'][:, 0].tolist() == list(range(10, 20))
+    flags = tlm.state(sampleTime(295), sampleTime(305), ['moving', 'fsm'])
+    assert sorted(flags) == ['fsm', 'moving']
+    assert flags['moving'].tolist() == [0] * 5 + [1] * 5
+    assert flags['fsm'].tolist() == [33] * 5 + [25] * 5
+    times, values = tlm.stateChanges(sampleTime(250), sampleTime(650))
+    assert times.tolist() == [sampleTime(300), sampleTime(600)]
+    assert values[:, tlm.stateFields.index('moving')].tolist() == [1, 0]
+
+
+def testTimeRange(tlmPath):
+    tlm = TelemetryFile(tlmPath)
+    times = np.array([sampleTime(i) for i in range(Samples)])
+    probes = [0.0, times[0], times[0] + 0.005, times[99], times[100], times[100] - 1e-6, times[1234] + 0.003,
+              times[2499], times[2500], times[-1], times[-1] + 0.005, 1e9]
+    for t in probes:
+        assert tlm.searchTime(t) == int(np.searchsorted(times, t, 'left')), t
+    assert tlm.range() == (0, Samples)
+    assert tlm.range(times[500], times[400]) == (500, 500)
+    assert tlm.range(times[2540], None) == (2540, Samples)
+
+
+def testTruncatedFile(tlmPath):
+    # 写入未正常结束: joint列缺少最后2.5个样本,time列缺少最后1个样本
+    joint = columnFile(tlmPath, 'joint')
+    with open(joint, 'r+b') as f:
+        f.truncate(os.path.getsize(joint) - int(2.5 * 6 * 4))
+    path = columnFile(tlmPath, 'time')
+    with open(path, 'r+b') as f:
+        f.truncate(os.path.getsize(path) - 8)
+    tlm = TelemetryFile(tlmPath)
+    count = Samples - 3
+    assert len(tlm) == count and tlm.column('joint').shape == (count, 6)
+    assert tlm.column('time')[-1] == sampleTime(count - 1)
+    assert tlm.searchTime(sampleTime(Samples)) == count
+    assert tlm.range(sampleTime(count - 10), 1e9) == (count - 10, count)
+    assert len(tlm.state(sampleTime(count - 10))['moving']) == 10
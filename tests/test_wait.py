@@ -0,0 +1,75 @@
+#!/usr/bin/env python
+# _*_ coding:utf-8 _*_
+# waitMovementDone: 运动完成返回0,超时39505,报错39509,急停或断电39510
+
+import threading
+import time
+
+from CPS import CPSClient
+from cps_sim import CPSSimulator
+from cps_wait import fsmState, estimateMoveTime
+
+
+def connect(sim):
+    cps = CPSClient()
+    cps.HRIF_Connect(0, '127.0.0.1', sim.port)
+    return cps
+
+
+def testFsmState():
+    for fsm in (11, 12, 25, 26, 27, 32):
+        assert fsmState(fsm) is None
+    for fsm in (9, 10, 17, 20, 21, 22, 24):
+        assert fsmState(fsm) == 'error'
+    for fsm in (2, 4, 5, 6, 7):
+        assert fsmState(fsm) == 'estop'
+    assert fsmState(33) == 'done'
+
+
+def testDone():
+    with CPSSimulator(port=0, rpcPort=None) as sim:
+        cps = connect(sim)
+        sim.robot.move(joint=[0.0, 0.0, 90.0, 0.0, 90.0, 3.0], vel=30.0, acc=300.0)
+        expected = estimateMoveTime(3.0, 30.0, 300.0)
+        start = time.monotonic()
+        result = []
+        assert cps.waitMovementDone(0, 0, result, expected=expected, timeout=5.0) == 0
+        assert result == ['33'] and time.monotonic() - start >= expected * 0.9
+        cps.HRIF_DisConnect(0)
+
+
+def testTimeout():
+    with CPSSimulator(port=0, rpcPort=None) as sim:
+        cps = connect(sim)
+        sim.robot.move(joint=[0.0, 0.0, 90.0, 0.0, 90.0, 90.0], vel=1.0, acc=10.0)
+        result = []
+        assert cps.waitMovementDone(0, 0, result, timeout=0.1) == 39505
+        assert result == ['25']
+        cps.HRIF_DisConnect(0)
+
+
+def testErrorAndEstop():
+    with CPSSimulator(port=0, rpcPort=None) as sim:
+        cps = connect(sim)
+        sim.robot.error = 1
+        result = []
+        assert cps.waitMovementDone(0, 0, result, timeout=1.0) == 39509 and result == ['22']
+        sim.robot.error = 0
+        sim.robot.enabled = 0
+        assert cps.waitMovementDone(0, 0, result, timeout=1.0) == 39509 and result == ['24']
+        sim.robot.electrify = 0
+        assert cps.waitMovementDone(0, 0, result, timeout=1.0) == 39510 and result == ['7']
+        cps.HRIF_DisConnect(0)
+
+
+def testErrorDuringMotion():
+    with CPSSimulator(port=0, rpcPort=None) as sim:
+        cps = connect(sim)
+        sim.robot.move(joint=[0.0, 0.0, 90.0, 0.0, 90.0, 90.0], vel=1.0, acc=10.0)
+        # 运动中报错
+        timer = threading.Timer(0.05, setattr, (sim.robot, 'error', 1))
+        timer.start()
+        result = []
+        assert cps.waitMovementDone(0, 0, result, timeout=2.0) == 39509 and result == ['22']
+        timer.join()
+        cps.HRIF_DisConnect(0)